@@ -2,9 +2,13 @@
 Apply database migrations
 """
 import sqlite3
+import sys
 from pathlib import Path
 import logging
 
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+from app.db import apply_pending_migrations, VERSIONED_MIGRATIONS
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -71,9 +75,25 @@ def main():
         else:
             logger.warning(f"Migration file not found: {migration}")
     
+    # Versioned migrations (skipped when already recorded in schema_version)
+    versioned_status = "failed"
+    conn = sqlite3.connect(str(DATABASE_PATH))
+    try:
+        applied = apply_pending_migrations(conn, MIGRATIONS_DIR)
+        logger.info(f"✓ Versioned migrations applied: {applied or 'none pending'}")
+        versioned_status = (
+            f"{len(applied)} applied now, "
+            f"{len(VERSIONED_MIGRATIONS) - len(applied)}/{len(VERSIONED_MIGRATIONS)} already applied"
+        )
+    except Exception as e:
+        logger.error(f"✗ Versioned migrations failed: {e}")
+    finally:
+        conn.close()
+
     logger.info("")
     logger.info("=" * 60)
-    logger.info(f"Migration complete: {success_count}/{len(migrations)} successful")
+    logger.info(f"Migration complete: {success_count}/{len(migrations)} scripts successful")
+    logger.info(f"Versioned migrations: {versioned_status}")
     logger.info("=" * 60)
 
 if __name__ == "__main__":
@@ -18,7 +18,74 @@ class Settings(BaseSettings):
     # Database
     # Default to the existing hardcoded path structure for backward compatibility
     # relative to backend/ (CWD)
-    DATABASE_URL: str = "sqlite:///../database/business.db" 
+    DATABASE_URL: str = "sqlite:///../database/business.db"
+
+    # Connection pool (see app.db.ConnectionPool)
+    DB_POOL_READERS: int = 8
+    DB_POOL_WRITERS: int = 1  # SQLite serializes writers; more only helps if writes are short
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_HEALTH_CHECK_SECONDS: float = 30.0  # Probe idle connections older than this
+    DB_BUSY_TIMEOUT_MS: int = 5000
+
+    # Single-writer queue for DC / invoice writes (see app.core.write_queue)
+    WRITE_QUEUE_MAX_DEPTH: int = 256  # Pending units before submits are rejected with 503
+    WRITE_QUEUE_GROUP_MAX: int = 32  # Queued units committed in one transaction
+
+    # LLM provider routing (see app.services.provider_router)
+    LLM_PROVIDER: str = "groq"  # Preferred provider; others are failover / hedge targets
+    LLM_HEDGE_ENABLED: bool = False
+    LLM_HEDGE_AFTER_MS: int = 1500  # Fire a second provider if the first has not answered by then
+    LLM_BREAKER_FAILURES: int = 3  # Consecutive failures that open a provider's circuit
+    LLM_BREAKER_COOLDOWN_SECONDS: float = 30.0
+
+    # LLM response cache (see app.services.llm_cache)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_TTL_SECONDS: int = 6 * 3600
+    LLM_CACHE_MAX_ENTRIES: int = 2000
+
+    # LLM provider HTTP clients (see app.services.http_clients)
+    LLM_HTTP_MAX_CONNECTIONS: int = 20
+    LLM_HTTP_MAX_KEEPALIVE: int = 10
+    LLM_HTTP_KEEPALIVE_SECONDS: float = 60.0
+    LLM_HTTP2: bool = True  # Needs the h2 package (httpx[http2]); falls back to HTTP/1.1
+
+    # Export jobs (see app.services.export_job_service)
+    EXPORT_WORKERS: int = 2
+    EXPORT_FRESHNESS_SECONDS: int = 300  # Identical requests within this window reuse the same job
+    EXPORT_RETENTION_HOURS: int = 24
+    EXPORT_MAX_TOTAL_MB: int = 500  # Least recently used artifacts are evicted above this
+
+    # Batch PO upload (see app.services.po_batch_ingest)
+    INGEST_PARSE_WORKERS: int = 0  # Parser processes; 0 = one per CPU
+    INGEST_WRITE_CHUNK: int = 100  # POs per write transaction
+
+    # PO drop folder (see app.services.po_folder_watcher)
+    INGEST_WATCH_DIR: str = ""  # Empty = watcher disabled in the API process
+    INGEST_WATCH_POLL_SECONDS: float = 2.0
+    INGEST_WATCH_SETTLE_SECONDS: float = 2.0  # Files must be unchanged this long before pickup
+    INGEST_WATCH_BATCH_FILES: int = 200
+    INGEST_WATCH_BATCH_MB: float = 64
+
+    # Voice session store (see app.services.session_store)
+    SESSION_STORE: str = "memory"  # memory | sqlite (shared by all workers, survives restarts)
+    SESSION_DB_PATH: str = "database/sessions.db"  # sqlite backend; relative paths are under backend/
+    SESSION_MAX_SESSIONS: int = 1000
+    SESSION_TTL_SECONDS: int = 24 * 3600  # Idle time after which a session is dropped
+    SESSION_SWEEP_SECONDS: int = 300
+
+    # SQL query accounting (see app.core.query_stats)
+    DB_QUERY_STATS: bool = True  # Time pooled-connection statements; X-DB-Queries / X-DB-Time headers
+    DB_SLOW_QUERY_MS: float = 100
+    DB_SLOW_QUERY_LOG_SIZE: int = 200  # Recent slow queries kept in memory
+    DB_QUERY_FINGERPRINTS: int = 500  # Distinct slow statements tracked (least recently seen dropped)
+
+    # Health sampling (see app.services.system_sampler)
+    SYSTEM_SAMPLE_SECONDS: float = 5.0  # Process / system / SQLite sample interval
+    SYSTEM_SAMPLE_HISTORY: int = 120  # Samples kept for /api/health/metrics history
+
+    # Request logging (see app.middleware.metrics)
+    REQUEST_LOG_SAMPLE_RATE: float = 0.0  # Fraction of requests logged; 5xx and slow requests always are
+    REQUEST_LOG_SLOW_MS: float = 1000  # 0 = don't force-log slow requests
 
     # CORS
     BACKEND_CORS_ORIGINS: list[str] = ["*"]
@@ -42,6 +42,9 @@ class StructuredFormatter(logging.Formatter):
             log_data["status_code"] = record.status_code
         if hasattr(record, "client_ip"):
             log_data["client_ip"] = record.client_ip
+        if hasattr(record, "db_queries"):
+            log_data["db_queries"] = record.db_queries
+            log_data["db_time_ms"] = round(record.db_time_ms, 2)
             
         return json.dumps(log_data)
 
@@ -74,6 +77,8 @@ class HumanReadableFormatter(logging.Formatter):
             extras.append(f"duration={record.duration_ms:.0f}ms")
         if hasattr(record, "status_code"):
             extras.append(f"status={record.status_code}")
+        if hasattr(record, "db_queries"):
+            extras.append(f"db={record.db_queries}q/{record.db_time_ms:.0f}ms")
             
         if extras:
             msg += f" [{', '.join(extras)}]"
@@ -0,0 +1,171 @@
+"""
+SQL Query Accounting
+Per-request query counts / SQL time and a ring-buffered slow-query log.
+
+Pooled connections (app.db.PooledConnection) report every execute / executemany / executescript
+here. The request middleware (app.middleware.metrics) opens a RequestQueries for each request
+in a context variable; Starlette copies the context into the threadpool that runs sync
+endpoints and dependencies, so their queries are attributed to the right request.
+
+Timings cover the statement up to its first result row (what execute() does); rows fetched
+afterwards are not included. Queries slower than DB_SLOW_QUERY_MS are logged with the request ID,
+under a normalized fingerprint (literals and IN lists collapsed). The first time a fingerprint
+is seen, its EXPLAIN QUERY PLAN is captured.
+"""
+import re
+import hashlib
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from collections import OrderedDict, deque
+from contextvars import ContextVar, Token
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Statements worth an EXPLAIN QUERY PLAN
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+_RX_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_RX_STRING = re.compile(r"'(?:[^']|'')*'")
+_RX_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_RX_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_RX_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql: str) -> str:
+    """SQL with comments removed, literals replaced by ? and IN lists collapsed to (?...)"""
+    sql = _RX_COMMENT.sub(" ", sql)
+    sql = _RX_STRING.sub("?", sql)
+    sql = _RX_NUMBER.sub("?", sql)
+    sql = _RX_IN_LIST.sub("(?...)", sql)
+    return _RX_SPACE.sub(" ", sql).strip()
+
+
+class RequestQueries:
+    """Query totals of one request"""
+    __slots__ = ("request_id", "method", "path", "count", "time_ms", "slowest")
+
+    # Statements kept per request in `slowest`
+    KEEP_SLOWEST = 3
+
+    def __init__(self, request_id: str, method: str = "", path: str = ""):
+        self.request_id = request_id
+        self.method = method
+        self.path = path
+        self.count = 0
+        self.time_ms = 0.0
+        self.slowest: List[Tuple[float, str]] = []  # (ms, sql), slowest first
+
+    def add(self, sql: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.time_ms += elapsed_ms
+        if len(self.slowest) < self.KEEP_SLOWEST or elapsed_ms > self.slowest[-1][0]:
+            self.slowest.append((elapsed_ms, sql))
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            del self.slowest[self.KEEP_SLOWEST:]
+
+
+_current: ContextVar[Optional[RequestQueries]] = ContextVar("request_queries", default=None)
+
+
+def begin_request(request_id: str, method: str = "", path: str = "") -> Tuple[RequestQueries, Token]:
+    queries = RequestQueries(request_id, method, path)
+    return queries, _current.set(queries)
+
+
+def end_request(token: Token) -> None:
+    _current.reset(token)
+
+
+def current_request() -> Optional[RequestQueries]:
+    return _current.get()
+
+
+class SlowQueryLog:
+    """Ring buffer of recent slow queries plus per-fingerprint aggregates (LRU-bounded)"""
+
+    def __init__(self, size: int = settings.DB_SLOW_QUERY_LOG_SIZE, max_fingerprints: int = settings.DB_QUERY_FINGERPRINTS):
+        self.entries: deque = deque(maxlen=size)
+        self.fingerprints: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.max_fingerprints = max_fingerprints
+        self._lock = threading.Lock()
+
+    def record(self, conn: sqlite3.Connection, sql: str, params: Any, elapsed_ms: float, request: Optional[RequestQueries]) -> None:
+        key = fingerprint(sql)
+        now = datetime.utcnow().isoformat() + "Z"
+        with self._lock:
+            stats = self.fingerprints.get(key)
+            first_sighting = stats is None
+            if first_sighting:
+                stats = self.fingerprints[key] = {
+                    "id": hashlib.sha1(key.encode()).hexdigest()[:12],
+                    "fingerprint": key,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "first_seen": now,
+                    "plan": None,
+                }
+                while len(self.fingerprints) > self.max_fingerprints:
+                    self.fingerprints.popitem(last=False)
+            else:
+                self.fingerprints.move_to_end(key)
+            stats["count"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+            stats["last_seen"] = now
+            self.entries.append({
+                "timestamp": now,
+                "request_id": request.request_id if request else None,
+                "request": f"{request.method} {request.path}" if request else None,
+                "duration_ms": round(elapsed_ms, 3),
+                "fingerprint_id": stats["id"],
+                "sql": sql.strip()[:1000],
+            })
+
+        if first_sighting:
+            # Outside the lock: EXPLAIN runs on the caller's connection
+            stats["plan"] = self._explain(conn, sql, params)
+        extra = {"duration_ms": elapsed_ms}
+        if request is not None:
+            extra["request_id"] = request.request_id
+        logger.warning(f"Slow query ({elapsed_ms:.1f} ms): {key[:200]}", extra=extra)
+
+    @staticmethod
+    def _explain(conn: sqlite3.Connection, sql: str, params: Any) -> Optional[List[str]]:
+        if not sql.lstrip().upper().startswith(_EXPLAINABLE) or (params is None and "?" in sql):
+            return None  # params is None for executemany: no single parameter set to plan with
+        try:
+            rows = sqlite3.Connection.execute(conn, f"EXPLAIN QUERY PLAN {sql}", params or ())
+            return [row[3] for row in rows.fetchall()]
+        except sqlite3.Error as e:
+            return [f"unavailable: {e}"]
+
+    def snapshot(self, limit: int = 50) -> Dict[str, Any]:
+        with self._lock:
+            entries = list(self.entries)[-limit:][::-1]
+            fingerprints = sorted(self.fingerprints.values(), key=lambda s: s["total_ms"], reverse=True)[:limit]
+            fingerprints = [{**s, "total_ms": round(s["total_ms"], 3), "max_ms": round(s["max_ms"], 3)} for s in fingerprints]
+        return {"threshold_ms": settings.DB_SLOW_QUERY_MS, "recent": entries, "fingerprints": fingerprints}
+
+    def clear(self) -> None:
+        with self._lock:
+            self.entries.clear()
+            self.fingerprints.clear()
+
+
+def record_query(conn: sqlite3.Connection, sql: str, params: Any, elapsed_ms: float) -> None:
+    """Called by pooled connections after each statement"""
+    request = _current.get()
+    if request is not None:
+        request.add(sql, elapsed_ms)
+    if elapsed_ms >= settings.DB_SLOW_QUERY_MS:
+        slow_query_log.record(conn, sql, params, elapsed_ms, request)
+
+
+# Singleton instance
+slow_query_log = SlowQueryLog()
@@ -0,0 +1,219 @@
+"""
+Write Queue
+Single-writer command queue for transactional write units (DC create / update, invoice creation).
+
+A unit is a function taking the write connection; it must not commit or roll back itself.
+Callers submit units and wait for their result. One writer thread executes them in order, and
+units already waiting when it picks up work are group-committed: one BEGIN IMMEDIATE ... COMMIT
+for up to WRITE_QUEUE_GROUP_MAX units, each inside its own SAVEPOINT, so a unit that raises
+(e.g. a DomainError) is rolled back alone and its exception re-raised to its caller. Results
+are handed back only after the COMMIT.
+
+The thread borrows a writer-lane connection from the pool for each group, so get_db endpoints
+still get their turn between groups. The queue is bounded (WRITE_QUEUE_MAX_DEPTH): when it is
+full, submit raises WriteQueueFull (503) instead of piling up work.
+
+Units run in the submitter's contextvars context, so their SQL counts toward the request's
+X-DB-Queries (app.core.query_stats).
+"""
+import time
+import queue
+import asyncio
+import logging
+import threading
+import contextvars
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.exceptions import AppException
+from app.db import ConnectionPool, get_pool
+
+logger = logging.getLogger(__name__)
+
+
+class WriteQueueFull(AppException):
+    def __init__(self, depth: int):
+        super().__init__(
+            message=f"Too many pending writes ({depth}), retry shortly",
+            error_code="WRITE_QUEUE_FULL",
+            status_code=503
+        )
+
+
+class _Command:
+    __slots__ = ("fn", "context", "future", "submitted_at")
+
+    def __init__(self, fn: Callable[[Any], Any]):
+        self.fn = fn
+        self.context = contextvars.copy_context()
+        self.future: Future = Future()
+        self.submitted_at = time.perf_counter()
+
+
+class WriteQueue:
+    """Serialize write units onto one thread, group-committing the ones that queue up"""
+
+    def __init__(
+        self,
+        pool: Optional[ConnectionPool] = None,
+        max_depth: Optional[int] = None,
+        group_max: Optional[int] = None,
+    ):
+        self._pool = pool
+        self.max_depth = max_depth or settings.WRITE_QUEUE_MAX_DEPTH
+        self.group_max = group_max or settings.WRITE_QUEUE_GROUP_MAX
+        self._queue: "queue.Queue[Optional[_Command]]" = queue.Queue(maxsize=self.max_depth)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        # Metrics (submit side under _lock; the rest only written by the writer thread)
+        self.submitted = 0
+        self.rejected = 0
+        self.depth_max = 0
+        self.completed = 0
+        self.failed = 0
+        self.groups = 0
+        self.group_size_max = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        self.exec_ms_total = 0.0
+        self.exec_ms_max = 0.0
+
+    @property
+    def pool(self) -> ConnectionPool:
+        return self._pool or get_pool()
+
+    def submit(self, fn: Callable[[Any], Any]) -> Future:
+        """Queue a unit; the returned future resolves after its group commits"""
+        self._ensure_started()
+        command = _Command(fn)
+        try:
+            self._queue.put_nowait(command)
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            raise WriteQueueFull(self.max_depth)
+        with self._lock:
+            self.submitted += 1
+            self.depth_max = max(self.depth_max, self._queue.qsize())
+        return command.future
+
+    def execute(self, fn: Callable[[Any], Any], timeout: Optional[float] = None) -> Any:
+        """Submit and block until committed (sync callers)"""
+        return self.submit(fn).result(timeout)
+
+    async def run(self, fn: Callable[[Any], Any]) -> Any:
+        """Submit and await until committed (async endpoints; no threadpool worker is held)"""
+        return await asyncio.wrap_future(self.submit(fn))
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Finish queued units, then stop the writer thread (application shutdown)"""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(None)
+        thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            command = self._queue.get()
+            if command is None:
+                return
+            group, stopping = [command], False
+            while len(group) < self.group_max:
+                try:
+                    command = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if command is None:
+                    stopping = True
+                    break
+                group.append(command)
+            try:
+                self._execute_group(group)
+            except Exception as e:  # Never let the writer thread die
+                logger.error(f"Write queue group failed: {e}", exc_info=True)
+            if stopping:
+                return
+
+    def _execute_group(self, group: List[_Command]) -> None:
+        start = time.perf_counter()
+        group = [c for c in group if c.future.set_running_or_notify_cancel()]
+        if not group:
+            return
+        for command in group:
+            wait_ms = (start - command.submitted_at) * 1000
+            self.wait_ms_total += wait_ms
+            self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+
+        outcomes = []
+        try:
+            with self.pool.connection(readonly=False) as db:
+                db.execute("BEGIN IMMEDIATE")
+                for command in group:
+                    db.execute("SAVEPOINT write_unit")
+                    try:
+                        result = command.context.run(command.fn, db)
+                    except Exception as e:
+                        db.execute("ROLLBACK TO write_unit")
+                        db.execute("RELEASE write_unit")
+                        outcomes.append((command, e, None))
+                    else:
+                        db.execute("RELEASE write_unit")
+                        outcomes.append((command, None, result))
+                db.commit()
+        except Exception as e:
+            # BEGIN / COMMIT or a savepoint failed: nothing of this group was written
+            logger.error(f"Write queue transaction failed ({len(group)} units): {e}")
+            self.failed += len(group)
+            for command in group:
+                command.future.set_exception(e)
+            return
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.exec_ms_total += elapsed_ms
+            self.exec_ms_max = max(self.exec_ms_max, elapsed_ms)
+            self.groups += 1
+            self.group_size_max = max(self.group_size_max, len(group))
+
+        for command, error, result in outcomes:
+            if error is not None:
+                self.failed += 1
+                command.future.set_exception(error)
+            else:
+                self.completed += 1
+                command.future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        executed = self.completed + self.failed
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "depth": self._queue.qsize(),
+            "depth_max": self.depth_max,
+            "max_depth": self.max_depth,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+            "groups": self.groups,
+            "avg_group_size": round(executed / self.groups, 2) if self.groups else None,
+            "group_size_max": self.group_size_max,
+            "avg_wait_ms": round(self.wait_ms_total / executed, 3) if executed else None,
+            "max_wait_ms": round(self.wait_ms_max, 3),
+            "avg_group_ms": round(self.exec_ms_total / self.groups, 3) if self.groups else None,
+            "max_group_ms": round(self.exec_ms_max, 3),
+        }
+
+
+# Singleton instance
+write_queue = WriteQueue()
@@ -1,23 +1,56 @@
 """
 FastAPI Database Connection Manager
 Handles SQLite connection with WAL mode and explicit transactions
+
+Connections are served from a bounded pool with two lanes:
+- reader lane: many connections opened with PRAGMA query_only, used by GET endpoints
+- writer lane: few connections (SQLite allows one writer at a time), used by mutations
+PRAGMAs are issued once per connection when it is opened, not once per request.
 """
 import sqlite3
+import threading
+import time
+from collections import deque
 from pathlib import Path
-from typing import Generator
+from typing import Generator, Optional, Dict, Any, List
 from contextlib import contextmanager
 import logging
 
+from app.core.config import settings
+from app.core.query_stats import record_query
+
 logger = logging.getLogger(__name__)
 
 DATABASE_PATH = Path(__file__).parent.parent / "database" / "business.db"
+MIGRATIONS_DIR = Path(__file__).parent.parent.parent / "migrations"
+
+# Versioned migrations applied on startup (and by apply_migrations.py) when missing
+# from schema_version. Each file records its own schema_version row.
+VERSIONED_MIGRATIONS = [
+    (5, "005_canonical_dates.sql"),
+    (6, "006_po_item_rollup.sql"),
+    (7, "007_search_index.sql"),
+    (8, "008_alert_engine.sql"),
+    (9, "009_invoice_po_links.sql"),
+    (10, "010_daily_facts.sql"),
+    (11, "011_exports.sql"),
+    (12, "012_llm_cache.sql"),
+    (13, "013_po_content_hash.sql"),
+    (14, "014_po_ingest_ledger.sql"),
+    (15, "015_invoice_sequences.sql"),
+    (16, "016_search_po_details.sql"),
+    (17, "017_alert_changes_dedupe.sql"),
+]
+
+# Upper bounds (ms) of the pool wait-time histogram buckets
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
 
 
 def validate_database_path():
     """Validate database path exists and is accessible"""
     if not DATABASE_PATH.parent.exists():
         raise RuntimeError(f"Database directory does not exist: {DATABASE_PATH.parent}")
-    
+
     # Create database file if it doesn't exist
     if not DATABASE_PATH.exists():
         logger.warning(f"Database file not found, will be created: {DATABASE_PATH}")
@@ -25,13 +58,91 @@ def validate_database_path():
         logger.info(f"Database path validated: {DATABASE_PATH}")
 
 
+def apply_pending_migrations(conn: sqlite3.Connection, migrations_dir: Path = MIGRATIONS_DIR) -> List[int]:
+    """
+    Apply versioned migrations not yet recorded in schema_version.
+    Each migration runs in its own transaction. Returns the versions applied.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    applied_versions = {row[0] for row in conn.execute("SELECT version FROM schema_version")}
+
+    applied = []
+    for version, filename in VERSIONED_MIGRATIONS:
+        if version in applied_versions:
+            continue
+        sql = (migrations_dir / filename).read_text(encoding="utf-8")
+        logger.info(f"Applying migration {filename}")
+        try:
+            conn.executescript(f"BEGIN;\n{sql}\nCOMMIT;")
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.rollback()
+            logger.error(f"Migration {filename} failed, rolled back", exc_info=True)
+            raise
+        applied.append(version)
+    return applied
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    sqlite3.Connection that remembers which lane it belongs to and when it was last used.
+    Statements are timed and reported to app.core.query_stats (per-request counts, slow-query log).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.readonly = False
+        self.last_used = time.monotonic()
+
+    def execute(self, sql, parameters=(), /):
+        if not settings.DB_QUERY_STATS:
+            return super().execute(sql, parameters)
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            record_query(self, sql, parameters, (time.perf_counter() - start) * 1000)
+
+    def executemany(self, sql, parameters, /):
+        if not settings.DB_QUERY_STATS:
+            return super().executemany(sql, parameters)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, parameters)
+        finally:
+            record_query(self, sql, None, (time.perf_counter() - start) * 1000)
+
+    def executescript(self, sql_script, /):
+        if not settings.DB_QUERY_STATS:
+            return super().executescript(sql_script)
+        start = time.perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            record_query(self, sql_script, None, (time.perf_counter() - start) * 1000)
+
+
+def _init_connection(conn: sqlite3.Connection, readonly: bool = False) -> None:
+    """Per-connection initialization - runs once when the connection is opened"""
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute(f"PRAGMA busy_timeout = {int(settings.DB_BUSY_TIMEOUT_MS)}")
+    if readonly:
+        conn.execute("PRAGMA query_only = ON")
+
+
 def get_connection() -> sqlite3.Connection:
-    """Get a new database connection with row factory"""
+    """Get a new (unpooled) database connection with row factory"""
     try:
         conn = sqlite3.connect(str(DATABASE_PATH), check_same_thread=False)
-        conn.row_factory = sqlite3.Row
-        conn.execute("PRAGMA foreign_keys = ON")
-        conn.execute("PRAGMA journal_mode = WAL")
+        _init_connection(conn)
         logger.debug(f"Database connection established: {DATABASE_PATH}")
         return conn
     except sqlite3.Error as e:
@@ -39,9 +150,244 @@ def get_connection() -> sqlite3.Connection:
         raise
 
 
+class PoolTimeoutError(RuntimeError):
+    """Raised when no pooled connection becomes available within the configured timeout"""
+
+
+class _Lane:
+    """One bounded set of connections (readers or writers) plus its wait-time metrics"""
+
+    def __init__(self, name: str, max_size: int):
+        self.name = name
+        self.max_size = max(1, max_size)
+        self.idle: deque = deque()
+        self.created = 0
+        self.in_use = 0
+        self.cond = threading.Condition()
+
+        # Metrics
+        self.acquired_total = 0
+        self.waited_total = 0
+        self.timeouts_total = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.health_check_failures = 0
+
+    def record_wait(self, wait_ms: float) -> None:
+        self.acquired_total += 1
+        self.wait_ms_total += wait_ms
+        self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+        if wait_ms >= 1:
+            self.waited_total += 1
+        for idx, bound in enumerate(WAIT_BUCKETS_MS):
+            if wait_ms <= bound:
+                self.wait_buckets[idx] += 1
+                break
+        else:
+            self.wait_buckets[-1] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.max_size,
+            "open": self.created,
+            "in_use": self.in_use,
+            "idle": len(self.idle),
+            "acquired_total": self.acquired_total,
+            "waited_total": self.waited_total,
+            "timeouts_total": self.timeouts_total,
+            "wait_ms_avg": round(self.wait_ms_total / self.acquired_total, 3) if self.acquired_total else 0.0,
+            "wait_ms_max": round(self.wait_ms_max, 3),
+            "wait_ms_buckets": {
+                **{f"le_{bound}": count for bound, count in zip(WAIT_BUCKETS_MS, self.wait_buckets)},
+                "le_inf": self.wait_buckets[-1],
+            },
+            "health_check_failures": self.health_check_failures,
+        }
+
+
+class ConnectionPool:
+    """
+    Bounded SQLite connection pool with separate reader and writer lanes.
+
+    Connections are opened lazily up to the lane size. Idle connections that have not
+    been used for `health_check_interval` seconds are probed with `SELECT 1` before
+    being handed out and transparently replaced if the probe fails.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        readers: int = 8,
+        writers: int = 1,
+        timeout: float = 30.0,
+        health_check_interval: float = 30.0,
+    ):
+        self.db_path = Path(db_path)
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self._lanes = {
+            True: _Lane("readers", readers),
+            False: _Lane("writers", writers),
+        }
+        self._closed = False
+
+    def _open(self, readonly: bool) -> PooledConnection:
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False, factory=PooledConnection)
+        _init_connection(conn, readonly=readonly)
+        conn.readonly = readonly
+        logger.debug(f"Opened pooled {'reader' if readonly else 'writer'} connection: {self.db_path}")
+        return conn
+
+    def _is_healthy(self, conn: PooledConnection) -> bool:
+        if time.monotonic() - conn.last_used < self.health_check_interval:
+            return True
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error as e:
+            logger.warning(f"Pooled connection failed health check, replacing: {e}")
+            return False
+
+    def acquire(self, readonly: bool = False) -> PooledConnection:
+        """Borrow a connection from the reader or writer lane, blocking up to `timeout` seconds"""
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+
+        lane = self._lanes[readonly]
+        start = time.monotonic()
+        deadline = start + self.timeout
+
+        with lane.cond:
+            while True:
+                if lane.idle:
+                    conn = lane.idle.pop()
+                    break
+                if lane.created < lane.max_size:
+                    lane.created += 1
+                    conn = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    lane.timeouts_total += 1
+                    raise PoolTimeoutError(
+                        f"Timed out after {self.timeout}s waiting for a {lane.name} connection"
+                    )
+                lane.cond.wait(remaining)
+            lane.in_use += 1
+            lane.record_wait((time.monotonic() - start) * 1000)
+
+        try:
+            if conn is not None and not self._is_healthy(conn):
+                lane.health_check_failures += 1
+                self._close_quietly(conn)
+                conn = None
+            if conn is None:
+                conn = self._open(readonly)
+        except Exception:
+            with lane.cond:
+                lane.in_use -= 1
+                lane.created -= 1
+                lane.cond.notify()
+            raise
+
+        return conn
+
+    def release(self, conn: PooledConnection, discard: bool = False) -> None:
+        """Return a connection to its lane. Any open transaction is rolled back first."""
+        lane = self._lanes[conn.readonly]
+
+        if not discard:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+            except sqlite3.Error as e:
+                logger.warning(f"Discarding pooled connection after failed rollback: {e}")
+                discard = True
+
+        with lane.cond:
+            lane.in_use -= 1
+            if discard or self._closed:
+                lane.created -= 1
+                self._close_quietly(conn)
+            else:
+                conn.last_used = time.monotonic()
+                lane.idle.append(conn)
+            lane.cond.notify()
+
+    @contextmanager
+    def connection(self, readonly: bool = False):
+        """Context manager that borrows and returns a pooled connection"""
+        conn = self.acquire(readonly=readonly)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool sizes and wait-time metrics per lane"""
+        stats = {}
+        for lane in self._lanes.values():
+            with lane.cond:
+                stats[lane.name] = lane.stats()
+        return stats
+
+    def close(self) -> None:
+        """Close all idle connections; borrowed connections are closed when released"""
+        self._closed = True
+        for lane in self._lanes.values():
+            with lane.cond:
+                while lane.idle:
+                    self._close_quietly(lane.idle.pop())
+                    lane.created -= 1
+                lane.cond.notify_all()
+
+    @staticmethod
+    def _close_quietly(conn: sqlite3.Connection) -> None:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+
+# Factory pattern with singleton cache (pool is created on first use, after settings load)
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Get or create the global connection pool"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    DATABASE_PATH,
+                    readers=settings.DB_POOL_READERS,
+                    writers=settings.DB_POOL_WRITERS,
+                    timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+                    health_check_interval=settings.DB_POOL_HEALTH_CHECK_SECONDS,
+                )
+                logger.info(
+                    f"Connection pool created: readers={settings.DB_POOL_READERS}, "
+                    f"writers={settings.DB_POOL_WRITERS}"
+                )
+    return _pool
+
+
+def close_pool():
+    """Close the global connection pool (application shutdown, tests)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
 def get_db() -> Generator[sqlite3.Connection, None, None]:
-    """Dependency for FastAPI routes"""
-    conn = get_connection()
+    """Dependency for FastAPI routes (writer lane, commits on success)"""
+    pool = get_pool()
+    conn = pool.acquire(readonly=False)
     try:
         yield conn
         conn.commit()
@@ -51,8 +397,18 @@ def get_db() -> Generator[sqlite3.Connection, None, None]:
         logger.error(f"Transaction rolled back due to error: {e}")
         raise
     finally:
-        conn.close()
-        logger.debug("Database connection closed")
+        pool.release(conn)
+        logger.debug("Database connection returned to pool")
+
+
+def get_read_db() -> Generator[sqlite3.Connection, None, None]:
+    """Dependency for read-only FastAPI routes (reader lane, query_only connections)"""
+    pool = get_pool()
+    conn = pool.acquire(readonly=True)
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
 
 
 @contextmanager
@@ -60,7 +416,7 @@ def db_transaction(conn: sqlite3.Connection):
     """
     Explicit transaction context manager
     Use this for operations that require atomic multi-step writes
-    
+
     Example:
         with db_transaction(db):
             db.execute("INSERT INTO table1 ...")
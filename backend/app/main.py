@@ -7,9 +7,16 @@ from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers import dashboard, po, dc, invoice, reports, search, alerts, reconciliation, po_notes, health, voice, smart_reports, ai_reports
-from app.middleware import RequestLoggingMiddleware
+from app.middleware import RequestMetricsMiddleware
 from app.core.logging_config import setup_logging
-from app.db import validate_database_path
+from app.db import validate_database_path, close_pool, get_connection, apply_pending_migrations
+from app.services.export_job_service import export_job_service
+from app.services.po_batch_ingest import po_batch_ingest_service
+from app.services.po_folder_watcher import po_folder_watcher
+from app.services.system_sampler import system_sampler
+from app.core.write_queue import write_queue
+from app.services.llm_client import close_llm_client
+from app.services.context_manager import context_manager
 import logging
 import uuid # For error tracing
 
@@ -35,8 +42,8 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
-# Request logging middleware
-app.add_middleware(RequestLoggingMiddleware)
+# Request metrics + sampled request logging (pure ASGI, see app.middleware.metrics)
+app.add_middleware(RequestMetricsMiddleware)
 
 # Include routers
 app.include_router(health.router, prefix="/api", tags=["Health"])
@@ -100,6 +107,15 @@ async def startup_event():
     db_status = "❌ Failed"
     try:
         validate_database_path()
+        conn = get_connection()
+        try:
+            applied = apply_pending_migrations(conn)
+        finally:
+            conn.close()
+        if applied:
+            logger.info(f"Applied schema migrations: {applied}")
+        export_job_service.recover()
+        export_job_service.evict()
         db_status = "✅ Connected"
     except Exception as e:
         logger.error(f"Database validation failed: {e}")
@@ -128,11 +144,24 @@ async def startup_event():
         logger.error("Startup aborted due to critical infrastructure failure.")
         raise RuntimeError("Database connection failed")
 
+    context_manager.start_sweeper()
+    system_sampler.start()
+    if po_folder_watcher.start():
+        logger.info(f"✓ Watching PO drop folder {po_folder_watcher.watch_dir}")
+
     logger.info("✓ System ready. Listening for requests...")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Sales Manager API - Shutting down")
+    export_job_service.shutdown()
+    await system_sampler.stop()
+    await po_folder_watcher.stop()
+    po_batch_ingest_service.shutdown()
+    await context_manager.stop_sweeper()
+    await close_llm_client()
+    write_queue.stop()
+    close_pool()
 
 @app.get("/")
 def root():
@@ -1,4 +1,4 @@
 """Middleware package"""
-from .logging import RequestLoggingMiddleware
+from .metrics import RequestMetricsMiddleware, request_metrics
 
-__all__ = ["RequestLoggingMiddleware"]
+__all__ = ["RequestMetricsMiddleware", "request_metrics"]
@@ -1,98 +0,0 @@
-"""
-Request Logging Middleware
-Logs all HTTP requests with timing, status, and context
-"""
-import time
-import uuid
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
-import logging
-
-logger = logging.getLogger(__name__)
-
-
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    """
-    Middleware to log all HTTP requests with structured context
-    
-    Adds:
-    - Unique request ID
-    - Request timing
-    - Client IP
-    - Request/response details
-    """
-    
-    async def dispatch(self, request: Request, call_next):
-        # Generate unique request ID
-        request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
-        
-        # Record start time
-        start_time = time.time()
-        
-        # Extract client info
-        client_ip = None
-        if request.client:
-            client_ip = request.client.host
-        
-        # Log request start
-        logger.info(
-            f"Request started: {request.method} {request.url.path}",
-            extra={
-                "request_id": request_id,
-                "method": request.method,
-                "path": request.url.path,
-                "query_params": str(request.query_params) if request.query_params else None,
-                "client_ip": client_ip,
-                "user_agent": request.headers.get("user-agent"),
-            }
-        )
-        
-        try:
-            # Process request
-            response: Response = await call_next(request)
-            
-            # Calculate duration
-            duration_ms = (time.time() - start_time) * 1000
-            
-            # Log successful response
-            logger.info(
-                f"Request completed: {request.method} {request.url.path}",
-                extra={
-                    "request_id": request_id,
-                    "method": request.method,
-                    "path": request.url.path,
-                    "status_code": response.status_code,
-                    "duration_ms": duration_ms,
-                }
-            )
-            
-            # Add request ID to response headers for tracing
-            response.headers["X-Request-ID"] = request_id
-            
-            # Add timing header
-            response.headers["X-Response-Time"] = f"{duration_ms:.2f}ms"
-            
-            return response
-            
-        except Exception as e:
-            # Calculate duration even for errors
-            duration_ms = (time.time() - start_time) * 1000
-            
-            # Log error
-            logger.error(
-                f"Request failed: {request.method} {request.url.path}",
-                extra={
-                    "request_id": request_id,
-                    "method": request.method,
-                    "path": request.url.path,
-                    "duration_ms": duration_ms,
-                    "error": str(e),
-                    "error_type": type(e).__name__,
-                },
-                exc_info=True
-            )
-            
-            # Re-raise to let FastAPI handle it
-            raise
@@ -0,0 +1,240 @@
+"""
+Request Metrics Middleware
+Pure ASGI instrumentation: per-route latency / response size histograms, status counters and
+in-flight gauges, exposed in Prometheus text format on /api/metrics.
+
+Being plain ASGI (no BaseHTTPMiddleware), it only wraps `send`: responses, including streaming
+ones (voice SSE, exports, NDJSON uploads), pass through untouched. Routes are labelled by their
+path template ("/api/po/{po_number}"), so label cardinality stays bounded.
+
+All updates happen on the event loop thread, so the counters need no locks; /api/metrics is an
+async endpoint for the same reason (it renders on the loop, between updates).
+
+SQL issued while handling a request is counted through app.core.query_stats: totals go out as
+X-DB-Queries / X-DB-Time headers (as of the response start) and into per-route counters.
+
+Request logging is sampled: REQUEST_LOG_SAMPLE_RATE of the requests, plus every 5xx and every
+request slower than REQUEST_LOG_SLOW_MS, get one log line on completion.
+"""
+import time
+import uuid
+import random
+import logging
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Tuple
+
+from app.core.config import settings
+from app.core.query_stats import RequestQueries, begin_request, end_request
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds
+DURATION_BUCKETS_S = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Dict[str, Any]) -> str:
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}" if labels else ""
+
+
+def format_metric(name: str, metric_type: str, help_text: str, samples: Iterable[Tuple[Dict[str, Any], float]]) -> List[str]:
+    """Prometheus text exposition lines for one metric family"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+    lines.extend(f"{name}{_labels(labels)} {value}" for labels, value in samples)
+    return lines
+
+
+def route_template(scope) -> str:
+    """
+    Path template of the matched route, with any router prefix: FastAPI may hand over the
+    included (un-prefixed) route, so the prefix is taken from the leading segments of the
+    request path that the route's own template does not cover
+    """
+    route = scope.get("route")
+    template = getattr(route, "path_format", None) or getattr(route, "path", None)
+    if not template:
+        return UNMATCHED_ROUTE
+    if ":path}" in template:  # multi-segment parameter, the prefix can't be counted off
+        return template
+    segments = scope["path"].split("/")
+    return "/".join(segments[:max(len(segments) - template.count("/"), 0)]) + template
+
+
+class _Histogram:
+    __slots__ = ("bounds", "buckets", "total", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.buckets[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def samples(self, labels: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any], float]]:
+        """(suffix, labels, value) with cumulative buckets"""
+        samples, cumulative = [], 0
+        for bound, count in zip(self.bounds, self.buckets):
+            cumulative += count
+            samples.append(("_bucket", {**labels, "le": bound}, cumulative))
+        samples.append(("_bucket", {**labels, "le": "+Inf"}, self.count))
+        samples.append(("_sum", labels, round(self.total, 6)))
+        samples.append(("_count", labels, self.count))
+        return samples
+
+
+class _RouteStats:
+    __slots__ = ("statuses", "duration", "size", "db_queries", "db_seconds")
+
+    def __init__(self):
+        self.statuses: Dict[int, int] = {}
+        self.duration = _Histogram(DURATION_BUCKETS_S)
+        self.size = _Histogram(SIZE_BUCKETS_BYTES)
+        self.db_queries = 0
+        self.db_seconds = 0.0
+
+
+class RequestMetrics:
+    """In-process request metrics, keyed by (method, route template)"""
+
+    def __init__(self):
+        self.routes: Dict[Tuple[str, str], _RouteStats] = {}
+        self.in_flight: Dict[str, int] = {}
+        self.in_flight_max = 0
+        self.started_at = time.time()
+
+    def request_started(self, method: str) -> None:
+        self.in_flight[method] = self.in_flight.get(method, 0) + 1
+        self.in_flight_max = max(self.in_flight_max, sum(self.in_flight.values()))
+
+    def request_finished(
+        self, method: str, route: str, status: int, duration_s: float, size: int,
+        db_queries: int = 0, db_time_ms: float = 0.0
+    ) -> None:
+        self.in_flight[method] -= 1
+        stats = self.routes.get((method, route))
+        if stats is None:
+            stats = self.routes[(method, route)] = _RouteStats()
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+        stats.duration.observe(duration_s)
+        stats.size.observe(size)
+        stats.db_queries += db_queries
+        stats.db_seconds += db_time_ms / 1000
+
+    def render(self) -> List[str]:
+        """Prometheus text lines for all request metrics"""
+        routes = sorted(self.routes.items())
+        lines = format_metric(
+            "http_requests_total", "counter", "HTTP requests by route template and status",
+            [
+                ({"method": m, "route": r, "status": status}, count)
+                for (m, r), stats in routes for status, count in sorted(stats.statuses.items())
+            ]
+        )
+        for name, attr, help_text in (
+            ("http_request_duration_seconds", "duration", "Time until the last response byte was sent"),
+            ("http_response_size_bytes", "size", "Response body size"),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for (method, route), stats in routes:
+                lines.extend(
+                    f"{name}{suffix}{_labels(labels)} {value}"
+                    for suffix, labels, value in getattr(stats, attr).samples({"method": method, "route": route})
+                )
+        lines += format_metric(
+            "http_db_queries_total", "counter", "SQL statements issued while handling requests",
+            [({"method": m, "route": r}, stats.db_queries) for (m, r), stats in routes]
+        )
+        lines += format_metric(
+            "http_db_seconds_total", "counter", "Time spent in SQL statements while handling requests",
+            [({"method": m, "route": r}, round(stats.db_seconds, 6)) for (m, r), stats in routes]
+        )
+        lines += format_metric(
+            "http_requests_in_flight", "gauge", "Requests being handled",
+            (({"method": m}, count) for m, count in sorted(self.in_flight.items()))
+        )
+        lines += format_metric("http_requests_in_flight_max", "gauge", "Highest concurrent requests since start", [({}, self.in_flight_max)])
+        lines += format_metric("process_start_time_seconds", "gauge", "Start time of the process (unix)", [({}, round(self.started_at, 3))])
+        return lines
+
+
+class RequestMetricsMiddleware:
+    """
+    Records request metrics and adds X-Request-ID / X-Response-Time / X-DB-Queries / X-DB-Time
+    headers (all as of the response start)
+    """
+
+    def __init__(self, app, metrics: "RequestMetrics" = None):
+        self.app = app
+        self.metrics = metrics or request_metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        method = scope["method"]
+        request_id = str(uuid.uuid4())
+        response = {"status": 500, "size": 0}
+        queries, token = begin_request(request_id, method, scope["path"])
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-request-id", request_id.encode()))
+                headers.append((b"x-response-time", f"{(time.perf_counter() - start) * 1000:.2f}ms".encode()))
+                headers.append((b"x-db-queries", str(queries.count).encode()))
+                headers.append((b"x-db-time", f"{queries.time_ms:.2f}ms".encode()))
+                message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body":
+                response["size"] += len(message.get("body", b""))
+            await send(message)
+
+        self.metrics.request_started(method)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            end_request(token)
+            duration = time.perf_counter() - start
+            route = route_template(scope)
+            self.metrics.request_finished(
+                method, route, response["status"], duration, response["size"], queries.count, queries.time_ms
+            )
+            self._log(queries, scope, route, response["status"], duration)
+
+    @staticmethod
+    def _log(queries: RequestQueries, scope, route: str, status: int, duration_s: float) -> None:
+        duration_ms = duration_s * 1000
+        slow = settings.REQUEST_LOG_SLOW_MS and duration_ms >= settings.REQUEST_LOG_SLOW_MS
+        if status < 500 and not slow and random.random() >= settings.REQUEST_LOG_SAMPLE_RATE:
+            return
+        logger.log(
+            logging.WARNING if status >= 500 or slow else logging.INFO,
+            f"Request completed: {queries.method} {scope['path']}",
+            extra={
+                "request_id": queries.request_id,
+                "method": queries.method,
+                "path": scope["path"],
+                "route": route,
+                "status_code": status,
+                "duration_ms": duration_ms,
+                "db_queries": queries.count,
+                "db_time_ms": queries.time_ms,
+                "db_slowest": [(round(ms, 2), sql.strip()[:200]) for ms, sql in queries.slowest],
+            }
+        )
+
+
+# Singleton instance
+request_metrics = RequestMetrics()
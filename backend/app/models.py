@@ -55,6 +55,9 @@ class PODelivery(BaseModel):
     dely_date: Optional[str] = None
     entry_allow_date: Optional[str] = None
     dest_code: Optional[int] = None
+    # Per-lot breakdown (only populated when requested with lots=true)
+    dispatched_quantity: Optional[float] = None
+    pending_quantity: Optional[float] = None
 
 class POItem(BaseModel):
     """Purchase Order Item"""
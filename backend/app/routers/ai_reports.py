@@ -3,7 +3,11 @@ AI-Powered Report Endpoints
 Provides computed aggregations for AI summary generation
 """
 from fastapi import APIRouter, Depends, HTTPException
-from app.db import get_db
+from app.db import get_db, get_read_db
+from app.services.daily_facts_service import daily_facts_service
+from app.services.llm_cache import llm_cache, fingerprint
+from app.services.llm_client import get_llm_client
+from app.utils.date_utils import period_start
 from typing import Literal
 import sqlite3
 from datetime import datetime
@@ -13,52 +17,24 @@ router = APIRouter()
 
 @router.get("/monthly-summary")
 def get_monthly_summary(
-    period: Literal["month", "quarter", "year"] = "month",
-    db: sqlite3.Connection = Depends(get_db)
+    period: Literal["month", "quarter", "year", "fy"] = "month",
+    db: sqlite3.Connection = Depends(get_read_db)
 ):
     """
     Monthly Summary Report - Aggregated metrics with PO breakdown
     Returns computed data for AI summary generation
     """
     try:
-        # Calculate date range
         today = datetime.now()
-        if period == "month":
-            start_date = today.replace(day=1)
-        elif period == "quarter":
-            quarter_month = ((today.month - 1) // 3) * 3 + 1
-            start_date = today.replace(month=quarter_month, day=1)
-        else:  # year
-            start_date = today.replace(month=1, day=1)
-        
-        start_date_str = start_date.strftime('%Y-%m-%d')
+        start_date_str = period_start(period, today)
         end_date_str = today.strftime('%Y-%m-%d')
         
-        # Overall metrics
-        metrics_query = """
-            SELECT 
-                COALESCE(SUM(poi.ord_qty), 0) as total_ordered_qty,
-                COALESCE(SUM(dci.dispatch_qty), 0) as total_dispatched_qty,
-                COALESCE(SUM(poi.ord_qty) - SUM(dci.dispatch_qty), 0) as pending_qty
-            FROM purchase_order_items poi
-            LEFT JOIN delivery_challan_items dci ON poi.id = dci.po_item_id
-            JOIN purchase_orders po ON poi.po_number = po.po_number
-            WHERE po.po_date >= ?
-        """
-        metrics_row = db.execute(metrics_query, (start_date_str,)).fetchone()
-        
-        # Total invoiced value
-        invoiced_query = """
-            SELECT COALESCE(SUM(total_invoice_value), 0)
-            FROM gst_invoices
-            WHERE invoice_date >= ?
-        """
-        invoiced_row = db.execute(invoiced_query, (start_date_str,)).fetchone()
-        
-        total_ordered = float(metrics_row[0] or 0)
-        total_dispatched = float(metrics_row[1] or 0)
-        pending_qty = float(metrics_row[2] or 0)
-        total_invoiced = float(invoiced_row[0] or 0)
+        # Overall metrics (daily_facts: POs dated in the period, invoices dated in the period)
+        facts = daily_facts_service.totals(db, start_date_str)
+        total_ordered = float(facts["po_ordered_qty"])
+        total_dispatched = float(facts["po_dispatched_qty"])
+        pending_qty = total_ordered - total_dispatched
+        total_invoiced = float(facts["invoiced_value"])
         efficiency_pct = round((total_dispatched / total_ordered * 100), 1) if total_ordered > 0 else 0.0
         
         # PO breakdown
@@ -67,12 +43,12 @@ def get_monthly_summary(
                 po.po_number,
                 po.supplier_name,
                 SUM(poi.ord_qty) as ordered,
-                COALESCE(SUM(dci.dispatch_qty), 0) as dispatched,
-                SUM(poi.ord_qty) - COALESCE(SUM(dci.dispatch_qty), 0) as pending
+                COALESCE(SUM(r.dispatched_qty), 0) as dispatched,
+                SUM(poi.ord_qty) - COALESCE(SUM(r.dispatched_qty), 0) as pending
             FROM purchase_orders po
             JOIN purchase_order_items poi ON po.po_number = poi.po_number
-            LEFT JOIN delivery_challan_items dci ON poi.id = dci.po_item_id
-            WHERE po.po_date >= ?
+            LEFT JOIN po_item_rollup r ON r.po_item_id = poi.id
+            WHERE po.po_date_iso >= ?
             GROUP BY po.po_number, po.supplier_name
             ORDER BY pending DESC
         """
@@ -110,7 +86,7 @@ def get_monthly_summary(
 @router.get("/pending-analysis")
 def get_pending_analysis(
     period: Literal["month", "quarter", "year"] = "month",
-    db: sqlite3.Connection = Depends(get_db)
+    db: sqlite3.Connection = Depends(get_read_db)
 ):
     """
     Pending Analysis Report - Detailed breakdown by PO with age buckets
@@ -133,13 +109,13 @@ def get_pending_analysis(
             SELECT 
                 po.po_number,
                 po.supplier_name,
-                SUM(poi.ord_qty) - COALESCE(SUM(dci.dispatch_qty), 0) as pending_qty,
-                CAST(julianday('now') - julianday(po.po_date) AS INTEGER) as age_days,
+                SUM(poi.ord_qty) - COALESCE(SUM(r.dispatched_qty), 0) as pending_qty,
+                CAST(julianday('now') - julianday(po.po_date_iso) AS INTEGER) as age_days,
                 po.po_date
             FROM purchase_orders po
             JOIN purchase_order_items poi ON po.po_number = poi.po_number
-            LEFT JOIN delivery_challan_items dci ON poi.id = dci.po_item_id
-            WHERE po.po_date >= ?
+            LEFT JOIN po_item_rollup r ON r.po_item_id = poi.id
+            WHERE po.po_date_iso >= ?
             GROUP BY po.po_number, po.supplier_name, po.po_date
             HAVING pending_qty > 0
             ORDER BY pending_qty DESC
@@ -181,7 +157,7 @@ def get_pending_analysis(
 @router.get("/billing-lag")
 def get_billing_lag(
     period: Literal["month", "quarter", "year"] = "month",
-    db: sqlite3.Connection = Depends(get_db)
+    db: sqlite3.Connection = Depends(get_read_db)
 ):
     """
     Billing & Lag Report - Uninvoiced DCs and invoice lag statistics
@@ -205,11 +181,10 @@ def get_billing_lag(
                 dc.dc_number,
                 dc.dc_date,
                 dc.po_number,
-                CAST(julianday('now') - julianday(dc.dc_date) AS INTEGER) as age_days
+                CAST(julianday('now') - julianday(dc.dc_date_iso) AS INTEGER) as age_days
             FROM delivery_challans dc
-            LEFT JOIN gst_invoices i ON dc.dc_number = i.linked_dc_numbers
-            WHERE i.invoice_number IS NULL
-              AND dc.dc_date >= ?
+            WHERE NOT EXISTS (SELECT 1 FROM gst_invoice_dc_links link WHERE link.dc_number = dc.dc_number)
+              AND dc.dc_date_iso >= ?
             ORDER BY dc.dc_date DESC
         """
         uninvoiced_rows = db.execute(uninvoiced_query, (start_date_str,)).fetchall()
@@ -217,10 +192,11 @@ def get_billing_lag(
         # Invoice lag statistics
         lag_query = """
             SELECT 
-                CAST(julianday(i.invoice_date) - julianday(dc.dc_date) AS INTEGER) as lag_days
+                CAST(julianday(i.invoice_date_iso) - julianday(dc.dc_date_iso) AS INTEGER) as lag_days
             FROM gst_invoices i
-            JOIN delivery_challans dc ON i.linked_dc_numbers = dc.dc_number
-            WHERE i.invoice_date >= ?
+            JOIN gst_invoice_dc_links link ON link.invoice_number = i.invoice_number
+            JOIN delivery_challans dc ON dc.dc_number = link.dc_number
+            WHERE i.invoice_date_iso >= ?
               AND i.invoice_date IS NOT NULL
               AND dc.dc_date IS NOT NULL
         """
@@ -263,7 +239,7 @@ def get_billing_lag(
 @router.get("/po-health-summary")
 def get_po_health_summary(
     period: Literal["month", "quarter", "year"] = "month",
-    db: sqlite3.Connection = Depends(get_db)
+    db: sqlite3.Connection = Depends(get_read_db)
 ):
     """
     PO Health Summary Report - One row per PO with complete status
@@ -290,25 +266,25 @@ def get_po_health_summary(
                 po.po_date,
                 po.po_value,
                 SUM(poi.ord_qty) as total_ordered_qty,
-                COALESCE(SUM(dci.dispatch_qty), 0) as dispatched_qty,
-                SUM(poi.ord_qty) - COALESCE(SUM(dci.dispatch_qty), 0) as pending_qty,
-                CAST(julianday('now') - julianday(po.po_date) AS INTEGER) as po_age_days,
+                COALESCE(SUM(r.dispatched_qty), 0) as dispatched_qty,
+                SUM(poi.ord_qty) - COALESCE(SUM(r.dispatched_qty), 0) as pending_qty,
+                CAST(julianday('now') - julianday(po.po_date_iso) AS INTEGER) as po_age_days,
                 CASE 
-                    WHEN COALESCE(SUM(dci.dispatch_qty), 0) = 0 THEN 'NOT_STARTED'
-                    WHEN COALESCE(SUM(dci.dispatch_qty), 0) < SUM(poi.ord_qty) THEN 'PARTIALLY_DISPATCHED'
+                    WHEN COALESCE(SUM(r.dispatched_qty), 0) = 0 THEN 'NOT_STARTED'
+                    WHEN COALESCE(SUM(r.dispatched_qty), 0) < SUM(poi.ord_qty) THEN 'PARTIALLY_DISPATCHED'
                     ELSE 'FULLY_DISPATCHED'
                 END as fulfillment_status,
                 CASE 
                     WHEN EXISTS (
-                        SELECT 1 FROM gst_invoices i 
-                        WHERE i.po_numbers LIKE '%' || po.po_number || '%'
+                        SELECT 1 FROM gst_invoice_po_links pl
+                        WHERE pl.po_number = po.po_number
                     ) THEN 'INVOICED'
                     ELSE 'NOT_INVOICED'
                 END as invoice_status
             FROM purchase_orders po
             JOIN purchase_order_items poi ON po.po_number = poi.po_number
-            LEFT JOIN delivery_challan_items dci ON poi.id = dci.po_item_id
-            WHERE po.po_date >= ?
+            LEFT JOIN po_item_rollup r ON r.po_item_id = poi.id
+            WHERE po.po_date_iso >= ?
             GROUP BY po.po_number, po.supplier_name, po.po_date, po.po_value
             ORDER BY pending_qty DESC, po_age_days DESC
         """
@@ -354,7 +330,7 @@ def get_po_health_summary(
 @router.get("/po-aging-risk")
 def get_po_aging_risk(
     period: Literal["month", "quarter", "year"] = "month",
-    db: sqlite3.Connection = Depends(get_db)
+    db: sqlite3.Connection = Depends(get_read_db)
 ):
     """
     PO Aging & Risk Report - Age buckets with pending quantity distribution
@@ -376,12 +352,12 @@ def get_po_aging_risk(
         aging_query = """
             SELECT 
                 po.po_number,
-                CAST(julianday('now') - julianday(po.po_date) AS INTEGER) as age_days,
-                SUM(poi.ord_qty) - COALESCE(SUM(dci.dispatch_qty), 0) as pending_qty
+                CAST(julianday('now') - julianday(po.po_date_iso) AS INTEGER) as age_days,
+                SUM(poi.ord_qty) - COALESCE(SUM(r.dispatched_qty), 0) as pending_qty
             FROM purchase_orders po
             JOIN purchase_order_items poi ON po.po_number = poi.po_number
-            LEFT JOIN delivery_challan_items dci ON poi.id = dci.po_item_id
-            WHERE po.po_date >= ?
+            LEFT JOIN po_item_rollup r ON r.po_item_id = poi.id
+            WHERE po.po_date_iso >= ?
             GROUP BY po.po_number, po.po_date
             HAVING pending_qty > 0
         """
@@ -427,7 +403,7 @@ def get_po_aging_risk(
 @router.get("/po-fulfillment-efficiency")
 def get_po_fulfillment_efficiency(
     period: Literal["month", "quarter", "year"] = "month",
-    db: sqlite3.Connection = Depends(get_db)
+    db: sqlite3.Connection = Depends(get_read_db)
 ):
     """
     PO Fulfillment Efficiency Report - Fulfillment % per PO
@@ -451,12 +427,12 @@ def get_po_fulfillment_efficiency(
                 po.po_number,
                 po.supplier_name,
                 SUM(poi.ord_qty) as ordered,
-                COALESCE(SUM(dci.dispatch_qty), 0) as dispatched,
-                CAST((COALESCE(SUM(dci.dispatch_qty), 0) * 100.0 / SUM(poi.ord_qty)) AS INTEGER) as fulfillment_pct
+                COALESCE(SUM(r.dispatched_qty), 0) as dispatched,
+                CAST((COALESCE(SUM(r.dispatched_qty), 0) * 100.0 / SUM(poi.ord_qty)) AS INTEGER) as fulfillment_pct
             FROM purchase_orders po
             JOIN purchase_order_items poi ON po.po_number = poi.po_number
-            LEFT JOIN delivery_challan_items dci ON poi.id = dci.po_item_id
-            WHERE po.po_date >= ?
+            LEFT JOIN po_item_rollup r ON r.po_item_id = poi.id
+            WHERE po.po_date_iso >= ?
             GROUP BY po.po_number, po.supplier_name
             ORDER BY fulfillment_pct DESC
         """
@@ -501,7 +477,7 @@ def get_po_fulfillment_efficiency(
 @router.get("/po-dependency-analysis")
 def get_po_dependency_analysis(
     period: Literal["month", "quarter", "year"] = "month",
-    db: sqlite3.Connection = Depends(get_db)
+    db: sqlite3.Connection = Depends(get_read_db)
 ):
     """
     PO Dependency Analysis - DC and Invoice coverage per PO
@@ -535,13 +511,13 @@ def get_po_dependency_analysis(
                 END as dc_status,
                 CASE 
                     WHEN EXISTS (
-                        SELECT 1 FROM gst_invoices i 
-                        WHERE i.po_numbers LIKE '%' || po.po_number || '%'
+                        SELECT 1 FROM gst_invoice_po_links pl
+                        WHERE pl.po_number = po.po_number
                     ) THEN 'HAS_INVOICE'
                     ELSE 'NO_INVOICE'
                 END as invoice_status
             FROM purchase_orders po
-            WHERE po.po_date >= ?
+            WHERE po.po_date_iso >= ?
         """
         coverage_rows = db.execute(coverage_query, (start_date_str,)).fetchall()
         
@@ -579,22 +555,25 @@ class GenerateSummaryRequest(BaseModel):
     period: str
     data: dict
 
+# Summary models per provider (plain-text analysis, not the voice agent's JSON protocol)
+SUMMARY_MODELS = {
+    "groq": "llama-3.3-70b-versatile",
+    "openrouter": "meta-llama/llama-3.1-8b-instruct:free",
+}
+SUMMARY_SYSTEM_PROMPT = "You are a concise sales analyst for a manufacturing company. Reply in plain text."
+
+
 @router.post("/generate-summary")
-async def generate_ai_summary(
-    request: GenerateSummaryRequest,
-    db: sqlite3.Connection = Depends(get_db)
-):
+async def generate_ai_summary(request: GenerateSummaryRequest):
     """
     Generate AI summary from report data using LLM
     PO-CENTRIC: All summaries reference PO numbers explicitly
+    Answers are served from the LLM cache until the underlying data changes (see llm_cache)
     """
     try:
-        import os
-        import httpx
-        
-        # Get API key
-        api_key = os.getenv("GROQ_API_KEY") or os.getenv("OPENROUTER_API_KEY")
-        if not api_key:
+        llm_client = get_llm_client()
+        provider = next((p for p in SUMMARY_MODELS if llm_client.is_configured(p)), None)
+        if not provider:
             return {
                 "summary": "AI summary unavailable: No API key configured.",
                 "error": "missing_api_key"
@@ -649,31 +628,26 @@ Generate a 2-3 sentence summary that:
 
 Be factual. If data is missing, state it clearly."""
 
-        # Call LLM
-        if "GROQ_API_KEY" in os.environ:
-            url = "https://api.groq.com/openai/v1/chat/completions"
-            headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
-            payload = {
-                "model": "llama-3.3-70b-versatile",
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.3,
-                "max_tokens": 200
-            }
-        else:
-            url = "https://openrouter.ai/api/v1/chat/completions"
-            headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
-            payload = {
-                "model": "meta-llama/llama-3.1-8b-instruct:free",
-                "messages": [{"role": "user", "content": prompt}]
-            }
-        
-        async with httpx.AsyncClient(trust_env=False) as client:
-            response = await client.post(url, headers=headers, json=payload, timeout=30.0)
-            response.raise_for_status()
-            result = response.json()
-            summary = result["choices"][0]["message"]["content"].strip()
-        
-        return {"summary": summary}
+        # Call LLM (cached per prompt + report data)
+        result = await llm_cache.chat(
+            llm_client,
+            [
+                {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            provider=provider,
+            data_fingerprint=fingerprint({
+                "report_type": request.report_type,
+                "period": request.period,
+                "data": request.data
+            }),
+            model=SUMMARY_MODELS[provider],
+            temperature=0.3,
+            max_tokens=200
+        )
+        summary = (result.get("content") or "").strip()
+        
+        return {"summary": summary, "cached": result.get("cached", False)}
         
     except Exception as e:
         import traceback
@@ -682,3 +656,9 @@ Be factual. If data is missing, state it clearly."""
             "summary": f"AI summary unavailable due to error: {str(e)}",
             "error": str(e)
         }
+
+
+@router.post("/cache/invalidate")
+def invalidate_llm_cache(db: sqlite3.Connection = Depends(get_db)):
+    """Drop all cached AI answers (data changes already invalidate them automatically)"""
+    return {"removed": llm_cache.invalidate(db)}
@@ -3,7 +3,7 @@ Dashboard Router
 Summary statistics and recent activity
 """
 from fastapi import APIRouter, Depends, HTTPException
-from app.db import get_db
+from app.db import get_read_db
 from app.models import DashboardSummary
 import sqlite3
 from typing import List, Dict, Any
@@ -12,7 +12,7 @@ from datetime import datetime
 router = APIRouter()
 
 @router.get("/summary", response_model=DashboardSummary)
-def get_dashboard_summary(db: sqlite3.Connection = Depends(get_db)):
+def get_dashboard_summary(db: sqlite3.Connection = Depends(get_read_db)):
     """Get dashboard summary statistics"""
     try:
         # 1. Total Sales (Month)
@@ -36,10 +36,9 @@ def get_dashboard_summary(db: sqlite3.Connection = Depends(get_db)):
 
         # 4. Active Challans (Uninvoiced)
         active_challans = db.execute("""
-            SELECT COUNT(DISTINCT dc.dc_number)
+            SELECT COUNT(*)
             FROM delivery_challans dc
-            LEFT JOIN gst_invoices i ON dc.dc_number = i.linked_dc_numbers
-            WHERE i.invoice_number IS NULL
+            WHERE NOT EXISTS (SELECT 1 FROM gst_invoice_dc_links link WHERE link.dc_number = dc.dc_number)
         """).fetchone()[0]
 
         # 5. Total PO Value (All Time)
@@ -61,7 +60,7 @@ def get_dashboard_summary(db: sqlite3.Connection = Depends(get_db)):
 
 
 @router.get("/activity")
-def get_recent_activity(limit: int = 10, db: sqlite3.Connection = Depends(get_db)) -> List[Dict[str, Any]]:
+def get_recent_activity(limit: int = 10, db: sqlite3.Connection = Depends(get_read_db)) -> List[Dict[str, Any]]:
     """Get recent activity (POs, DCs, Invoices)"""
     try:
         activities = []
@@ -2,7 +2,8 @@
 Delivery Challan Router
 """
 from fastapi import APIRouter, Depends, HTTPException
-from app.db import get_db
+from app.db import get_read_db
+from app.core.write_queue import write_queue
 from app.models import DCListItem, DCCreate, DCStats
 from app.errors import not_found, internal_error
 from app.core.exceptions import (
@@ -23,7 +24,7 @@ router = APIRouter()
 
 
 @router.get("/stats", response_model=DCStats)
-def get_dc_stats(db: sqlite3.Connection = Depends(get_db)):
+def get_dc_stats(db: sqlite3.Connection = Depends(get_read_db)):
     """Get DC Page Statistics"""
     try:
         # Total Challans
@@ -50,7 +51,7 @@ def get_dc_stats(db: sqlite3.Connection = Depends(get_db)):
 
 
 @router.get("/", response_model=List[DCListItem])
-def list_dcs(po: Optional[int] = None, db: sqlite3.Connection = Depends(get_db)):
+def list_dcs(po: Optional[int] = None, db: sqlite3.Connection = Depends(get_read_db)):
     """List all Delivery Challans, optionally filtered by PO"""
     
     # Optimized query with JOIN to eliminate N+1 problem
@@ -97,7 +98,7 @@ def list_dcs(po: Optional[int] = None, db: sqlite3.Connection = Depends(get_db))
 
 
 @router.get("/{dc_number}")
-def get_dc_detail(dc_number: str, db: sqlite3.Connection = Depends(get_db)):
+def get_dc_detail(dc_number: str, db: sqlite3.Connection = Depends(get_read_db)):
     """Get Delivery Challan detail with items"""
     
     # Get DC header
@@ -145,9 +146,9 @@ def get_dc_detail(dc_number: str, db: sqlite3.Connection = Depends(get_db)):
              """, (po_item_id, lot_no)).fetchone()[0]
         else:
              total_dispatched = db.execute("""
-                SELECT COALESCE(SUM(dispatch_qty), 0) FROM delivery_challan_items 
-                WHERE po_item_id = ?
-             """, (po_item_id,)).fetchone()[0]
+                SELECT COALESCE(dispatched_qty, 0) FROM po_item_rollup WHERE po_item_id = ?
+             """, (po_item_id,)).fetchone()
+             total_dispatched = total_dispatched[0] if total_dispatched else 0
              
         item_dict["remaining_post_dc"] = max(0, lot_ordered - total_dispatched)
         result_items.append(item_dict)
@@ -159,7 +160,7 @@ def get_dc_detail(dc_number: str, db: sqlite3.Connection = Depends(get_db)):
 
 
 @router.post("/")
-def create_dc(dc: DCCreate, items: List[dict], db: sqlite3.Connection = Depends(get_db)):
+async def create_dc(dc: DCCreate, items: List[dict]):
     """
     Create new Delivery Challan with items
     items format: [{
@@ -171,48 +172,36 @@ def create_dc(dc: DCCreate, items: List[dict], db: sqlite3.Connection = Depends(
     }]
     """
     
-    # Use service layer with transaction protection
+    # Runs as one unit on the single DB writer (BEGIN IMMEDIATE, group commit), see app.core.write_queue
     try:
-        # CRITICAL: Use BEGIN IMMEDIATE for SQLite concurrency protection
-        db.execute("BEGIN IMMEDIATE")
-        
-        try:
-            result = service_create_dc(dc, items, db)
-            db.commit()
-            
-            # Service returns ServiceResult - extract data
-            if result.success:
-                return result.data
-            else:
-                # Should not happen if service raises DomainError
-                raise HTTPException(
-                    status_code=500,
-                    detail=result.message or "Unknown error"
-                )
-                
-        except DomainError as e:
-            # Convert domain error to HTTP response
-            db.rollback()
-            status_code = map_error_code_to_http_status(e.error_code)
-            raise HTTPException(
-                status_code=status_code,
-                detail={
-                    "message": e.message,
-                    "error_code": e.error_code.value,
-                    "details": e.details
-                }
-            )
-        except Exception as e:
-            db.rollback()
-            raise
-            
+        result = await write_queue.run(lambda db: service_create_dc(dc, items, db))
+    except DomainError as e:
+        # Convert domain error to HTTP response
+        status_code = map_error_code_to_http_status(e.error_code)
+        raise HTTPException(
+            status_code=status_code,
+            detail={
+                "message": e.message,
+                "error_code": e.error_code.value,
+                "details": e.details
+            }
+        )
     except sqlite3.IntegrityError as e:
         logger.error(f"DC creation failed due to integrity error: {e}", exc_info=e)
         raise internal_error(f"Database integrity error: {str(e)}", e)
 
+    # Service returns ServiceResult - extract data
+    if result.success:
+        return result.data
+    # Should not happen if service raises DomainError
+    raise HTTPException(
+        status_code=500,
+        detail=result.message or "Unknown error"
+    )
+
 
 @router.get("/{dc_number}/invoice")
-def check_dc_has_invoice_endpoint(dc_number: str, db: sqlite3.Connection = Depends(get_db)):
+def check_dc_has_invoice_endpoint(dc_number: str, db: sqlite3.Connection = Depends(get_read_db)):
     """Check if DC has an associated GST Invoice"""
     invoice_number = check_dc_has_invoice(dc_number, db)
     
@@ -226,45 +215,33 @@ def check_dc_has_invoice_endpoint(dc_number: str, db: sqlite3.Connection = Depen
 
 
 @router.put("/{dc_number}")
-def update_dc(dc_number: str, dc: DCCreate, items: List[dict], db: sqlite3.Connection = Depends(get_db)):
+async def update_dc(dc_number: str, dc: DCCreate, items: List[dict]):
     """Update existing Delivery Challan - BLOCKED if invoice exists"""
     
-    # Use service layer with transaction protection
+    # Runs as one unit on the single DB writer (BEGIN IMMEDIATE, group commit), see app.core.write_queue
     try:
-        # CRITICAL: Use BEGIN IMMEDIATE for SQLite concurrency protection
-        db.execute("BEGIN IMMEDIATE")
-        
-        try:
-            result = service_update_dc(dc_number, dc, items, db)
-            db.commit()
-            
-            # Service returns ServiceResult - extract data
-            if result.success:
-                return result.data
-            else:
-                # Should not happen if service raises DomainError
-                raise HTTPException(
-                    status_code=500,
-                    detail=result.message or "Unknown error"
-                )
-                
-        except DomainError as e:
-            # Convert domain error to HTTP response
-            db.rollback()
-            status_code = map_error_code_to_http_status(e.error_code)
-            raise HTTPException(
-                status_code=status_code,
-                detail={
-                    "message": e.message,
-                    "error_code": e.error_code.value,
-                    "details": e.details
-                }
-            )
-        except Exception as e:
-            db.rollback()
-            raise
-            
+        result = await write_queue.run(lambda db: service_update_dc(dc_number, dc, items, db))
+    except DomainError as e:
+        # Convert domain error to HTTP response
+        status_code = map_error_code_to_http_status(e.error_code)
+        raise HTTPException(
+            status_code=status_code,
+            detail={
+                "message": e.message,
+                "error_code": e.error_code.value,
+                "details": e.details
+            }
+        )
     except sqlite3.IntegrityError as e:
         logger.error(f"DC update failed due to integrity error: {e}", exc_info=e)
         raise internal_error(f"Database integrity error: {str(e)}", e)
 
+    # Service returns ServiceResult - extract data
+    if result.success:
+        return result.data
+    # Should not happen if service raises DomainError
+    raise HTTPException(
+        status_code=500,
+        detail=result.message or "Unknown error"
+    )
+
@@ -2,14 +2,21 @@
 Health Check Endpoints
 Provides health, readiness, and metrics endpoints for monitoring
 """
-from fastapi import APIRouter, Depends, HTTPException
-from app.db import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from app.db import get_read_db, get_pool
+from app.services.llm_client import llm_http_stats, llm_router_metrics
+from app.services.llm_cache import llm_cache
+from app.services.context_manager import context_manager
+from app.services.po_folder_watcher import po_folder_watcher
+from app.services.system_sampler import system_sampler
+from app.middleware.metrics import request_metrics, format_metric
+from app.core.query_stats import slow_query_log
+from app.core.write_queue import write_queue
 import sqlite3
 from datetime import datetime
 from typing import Dict, Any
 import logging
-import psutil
-import os
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -18,6 +25,10 @@ logger = logging.getLogger(__name__)
 START_TIME = datetime.utcnow()
 
 
+def _iso(timestamp: float) -> str:
+    return datetime.utcfromtimestamp(timestamp).isoformat() + "Z"
+
+
 @router.get("/health")
 def health_check() -> Dict[str, Any]:
     """
@@ -36,7 +47,7 @@ def health_check() -> Dict[str, Any]:
 
 
 @router.get("/health/ready")
-def readiness_check(db: sqlite3.Connection = Depends(get_db)) -> Dict[str, Any]:
+def readiness_check() -> Dict[str, Any]:
     """
     Readiness check - verifies all dependencies are available
     
@@ -44,47 +55,26 @@ def readiness_check(db: sqlite3.Connection = Depends(get_db)) -> Dict[str, Any]:
     - Kubernetes readiness probes
     - Deployment verification
     
+    Reads the latest background sample (app.services.system_sampler): the database probe and
+    the logs directory are checked there, not per call. A stale sample means sampling has
+    stalled, which also counts as not ready.
+
     Returns 200 if ready, 503 if not ready
     """
-    
+    sample = system_sampler.latest() or system_sampler.collect()
+
     checks = {
-        "database": "unknown",
-        "filesystem": "unknown"
+        "database": "healthy" if sample["sqlite"]["ok"] else f"unhealthy: {sample['sqlite']['error']}",
+        "filesystem": "healthy" if sample["logs_writable"] else "unhealthy: logs directory not writable",
     }
-    
-    all_healthy = True
-    
-    # Check database connectivity
-    try:
-        result = db.execute("SELECT 1").fetchone()
-        if result and result[0] == 1:
-            checks["database"] = "healthy"
-        else:
-            checks["database"] = "unhealthy: unexpected result"
-            all_healthy = False
-    except Exception as e:
-        checks["database"] = f"unhealthy: {str(e)}"
-        all_healthy = False
-        logger.error(f"Database health check failed: {e}", exc_info=True)
-    
-    # Check filesystem (logs directory)
-    try:
-        logs_dir = "logs"
-        if os.path.exists(logs_dir) and os.access(logs_dir, os.W_OK):
-            checks["filesystem"] = "healthy"
-        else:
-            checks["filesystem"] = "unhealthy: logs directory not writable"
-            all_healthy = False
-    except Exception as e:
-        checks["filesystem"] = f"unhealthy: {str(e)}"
-        all_healthy = False
-    
-    # Overall status
-    overall_status = "ready" if all_healthy else "not_ready"
+    if system_sampler.is_stale(sample):
+        checks["sampler"] = "unhealthy: no sample since " + _iso(sample["timestamp"])
+    all_healthy = all(status == "healthy" for status in checks.values())
     
     response = {
-        "status": overall_status,
+        "status": "ready" if all_healthy else "not_ready",
         "timestamp": datetime.utcnow().isoformat() + "Z",
+        "sampled_at": _iso(sample["timestamp"]),
         "checks": checks
     }
     
@@ -95,6 +85,120 @@ def readiness_check(db: sqlite3.Connection = Depends(get_db)) -> Dict[str, Any]:
     return response
 
 
+@router.get("/health/db-pool")
+def db_pool_stats() -> Dict[str, Any]:
+    """
+    Connection pool statistics
+
+    Per lane (readers / writers): size, open and in-use connections,
+    acquisitions, wait-time average / max / histogram and timeouts.
+    Use this to size DB_POOL_READERS / DB_POOL_WRITERS under load.
+    """
+    return {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "pool": get_pool().stats()
+    }
+
+
+@router.get("/health/write-queue")
+def write_queue_stats() -> Dict[str, Any]:
+    """
+    Single-writer queue metrics (DC / invoice writes)
+
+    Depth (current / highest / bound), submitted / rejected / completed / failed units, groups
+    committed with average and largest group size, queue wait and group transaction times.
+    """
+    return {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        **write_queue.stats()
+    }
+
+
+@router.get("/health/http-pool")
+def http_pool_stats() -> Dict[str, Any]:
+    """
+    LLM provider HTTP client statistics
+
+    Per provider: requests, connections opened, reuse ratio and negotiated HTTP versions.
+    A reuse ratio near 1.0 means voice turns are riding warm keep-alive connections.
+    """
+    return {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        **llm_http_stats()
+    }
+
+
+@router.get("/health/llm-router")
+def llm_router_stats() -> Dict[str, Any]:
+    """
+    LLM provider routing metrics
+
+    Routing decisions (primary / failover / hedge / hedge_won / skipped_open_breaker / all_failed)
+    and per provider: rolling p50 / p95 latency, error rate and circuit breaker state.
+    """
+    return {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        **llm_router_metrics()
+    }
+
+
+@router.get("/health/llm-cache")
+def llm_cache_stats(db: sqlite3.Connection = Depends(get_read_db)) -> Dict[str, Any]:
+    """
+    LLM response cache metrics
+
+    Entry count, hit / miss / stale counters since startup and the current data_version
+    (entries computed at an older version are discarded on lookup).
+    """
+    return {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        **llm_cache.stats(db)
+    }
+
+
+@router.get("/health/sessions")
+def session_stats() -> Dict[str, Any]:
+    """
+    Voice session store metrics
+
+    Backend (memory / sqlite), live session and message counts, approximate payload bytes
+    and LRU eviction / TTL expiration counters.
+    """
+    return {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        **context_manager.stats()
+    }
+
+
+@router.get("/health/slow-queries")
+def slow_queries(limit: int = Query(50, ge=1, le=500)) -> Dict[str, Any]:
+    """
+    Slow-query log (statements slower than DB_SLOW_QUERY_MS)
+
+    recent: newest slow executions with the request ID (X-Request-ID) that issued them.
+    fingerprints: statements normalized (literals / IN lists collapsed) and aggregated,
+    heaviest total time first, with the EXPLAIN QUERY PLAN captured on first sighting.
+    """
+    return {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        **slow_query_log.snapshot(limit)
+    }
+
+
+@router.get("/health/ingest-watcher")
+def ingest_watcher_stats() -> Dict[str, Any]:
+    """
+    PO drop-folder watcher metrics
+
+    Files done / failed / duplicate, throughput while busy, backlog of settled files not yet
+    taken, files still settling, backpressure waits (writer lane busy) and the last micro-batch.
+    """
+    return {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        **po_folder_watcher.stats()
+    }
+
+
 @router.get("/health/live")
 def liveness_check() -> Dict[str, Any]:
     """
@@ -124,44 +228,73 @@ def liveness_check() -> Dict[str, Any]:
 
 
 @router.get("/health/metrics")
-def metrics() -> Dict[str, Any]:
+def metrics(history: int = Query(0, ge=0, le=1000)) -> Dict[str, Any]:
     """
     Basic metrics endpoint
     
-    Provides:
-    - System metrics (CPU, memory)
-    - Application uptime
+    Provides (from the latest background sample, see app.services.system_sampler):
+    - System metrics (CPU, memory, disk of the database volume)
     - Process info
+    - SQLite file stats (pages, freelist, WAL size)
+    - Application uptime
+
+    history=N adds the last N samples, oldest first (SYSTEM_SAMPLE_SECONDS apart).
     """
-    try:
-        # Get process info
-        process = psutil.Process(os.getpid())
-        
-        # Calculate uptime
-        uptime_seconds = (datetime.utcnow() - START_TIME).total_seconds()
-        
-        # Get memory info
-        memory_info = process.memory_info()
-        
-        return {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
-            "uptime_seconds": round(uptime_seconds, 2),
-            "process": {
-                "pid": os.getpid(),
-                "cpu_percent": process.cpu_percent(interval=0.1),
-                "memory_mb": round(memory_info.rss / 1024 / 1024, 2),
-                "threads": process.num_threads(),
-            },
-            "system": {
-                "cpu_count": psutil.cpu_count(),
-                "cpu_percent": psutil.cpu_percent(interval=0.1),
-                "memory_percent": psutil.virtual_memory().percent,
-                "disk_percent": psutil.disk_usage('/').percent if os.name != 'nt' else psutil.disk_usage('C:\\').percent,
-            }
-        }
-    except Exception as e:
-        logger.error(f"Metrics collection failed: {e}", exc_info=True)
-        return {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
-            "error": str(e)
-        }
+    sample = system_sampler.latest() or system_sampler.collect()
+    uptime_seconds = (datetime.utcnow() - START_TIME).total_seconds()
+    response = {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "sampled_at": _iso(sample["timestamp"]),
+        "uptime_seconds": round(uptime_seconds, 2),
+        "process": sample["process"],
+        "system": sample["system"],
+        "sqlite": sample["sqlite"],
+    }
+    if history:
+        response["history"] = [
+            {"timestamp": _iso(s["timestamp"]), "process": s["process"], "system": s["system"], "sqlite": s["sqlite"]}
+            for s in system_sampler.history(history)
+        ]
+    return response
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics() -> PlainTextResponse:
+    """
+    Prometheus text-format metrics
+
+    Per-route request counters, latency and response size histograms, in-flight gauges
+    (app.middleware.metrics), connection pool usage per lane and the latest process / system /
+    SQLite sample (app.services.system_sampler). Async on purpose: it renders on the event loop,
+    where the counters are updated.
+    """
+    lines = request_metrics.render()
+    lanes = sorted(get_pool().stats().items())
+    for name, key, metric_type, help_text in (
+        ("sqlite_pool_connections_in_use", "in_use", "gauge", "Pooled connections checked out"),
+        ("sqlite_pool_connections_open", "open", "gauge", "Pooled connections opened"),
+        ("sqlite_pool_acquired_total", "acquired_total", "counter", "Connections handed out"),
+        ("sqlite_pool_waited_total", "waited_total", "counter", "Acquisitions that waited 1 ms or more"),
+        ("sqlite_pool_timeouts_total", "timeouts_total", "counter", "Acquisitions that timed out"),
+    ):
+        lines += format_metric(name, metric_type, help_text, (({"lane": lane}, stats[key]) for lane, stats in lanes))
+
+    sample = system_sampler.latest()
+    if sample is not None:
+        sqlite_stats = sample["sqlite"]
+        for name, value, help_text in (
+            ("process_cpu_percent", sample["process"]["cpu_percent"], "Process CPU over the last sample interval"),
+            ("process_resident_memory_bytes", int(sample["process"]["memory_mb"] * 1024 * 1024), "Resident set size"),
+            ("process_threads", sample["process"]["threads"], "OS threads"),
+            ("system_cpu_percent", sample["system"]["cpu_percent"], "Host CPU over the last sample interval"),
+            ("system_memory_percent", sample["system"]["memory_percent"], "Host memory in use"),
+            ("system_disk_percent", sample["system"]["disk_percent"], "Database volume in use"),
+            ("sqlite_up", int(sqlite_stats["ok"]), "Database probe succeeded in the last sample"),
+            ("sqlite_db_bytes", sqlite_stats.get("db_bytes"), "Database size (page_count * page_size)"),
+            ("sqlite_freelist_pages", sqlite_stats.get("freelist_count"), "Unused pages in the database file"),
+            ("sqlite_wal_bytes", sqlite_stats.get("wal_bytes"), "Size of the -wal file"),
+        ):
+            if value is not None:
+                lines += format_metric(name, "gauge", help_text, [({}, value)])
+        lines += format_metric("system_sample_timestamp_seconds", "gauge", "Time of the latest system sample (unix)", [({}, round(sample["timestamp"], 3))])
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
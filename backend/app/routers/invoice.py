@@ -3,18 +3,24 @@ Production-Grade Invoice Router
 Implements strict accounting rules with audit-safe transaction handling
 """
 from fastapi import APIRouter, Depends, HTTPException
-from app.db import get_db
+from app.db import get_read_db
+from app.core.write_queue import write_queue
 from app.models import InvoiceListItem, InvoiceCreate, InvoiceStats
-from app.errors import not_found, internal_error
+from app.errors import bad_request, not_found, internal_error
 from app.core.exceptions import (
     DomainError,
     map_error_code_to_http_status
 )
-from app.services.invoice import create_invoice as service_create_invoice
+from app.services.invoice import (
+    create_invoice as service_create_invoice,
+    reserve_invoice_numbers
+)
+from app.utils.date_utils import to_iso_date
+from datetime import date
 from typing import List, Optional
 import sqlite3
 import logging
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -71,13 +77,18 @@ class EnhancedInvoiceCreate(BaseModel):
     # Items with overrides
     items: Optional[List[InvoiceItemCreate]] = None
 
+class InvoiceNumberReservation(BaseModel):
+    count: int = Field(1, ge=1, le=1000)
+    # Financial year is taken from this date (default: today)
+    invoice_date: Optional[str] = None
+
 
 # ============================================================================
 # ENDPOINTS
 # ============================================================================
 
 @router.get("/stats", response_model=InvoiceStats)
-def get_invoice_stats(db: sqlite3.Connection = Depends(get_db)):
+def get_invoice_stats(db: sqlite3.Connection = Depends(get_read_db)):
     """Get Invoice Page Statistics"""
     try:
         total_row = db.execute("SELECT SUM(total_invoice_value) FROM gst_invoices").fetchone()
@@ -110,7 +121,7 @@ def list_invoices(
     po: Optional[int] = None, 
     dc: Optional[str] = None, 
     status: Optional[str] = None, 
-    db: sqlite3.Connection = Depends(get_db)
+    db: sqlite3.Connection = Depends(get_read_db)
 ):
     """List all Invoices, optionally filtered by PO, DC, or Status"""
     
@@ -124,12 +135,12 @@ def list_invoices(
     params = []
 
     if po:
-        query += " AND po_numbers LIKE ?"
-        params.append(f"%{po}%")
+        query += " AND invoice_number IN (SELECT invoice_number FROM gst_invoice_po_links WHERE po_number = ?)"
+        params.append(po)
     
     if dc:
-        query += " AND linked_dc_numbers LIKE ?"
-        params.append(f"%{dc}%")
+        query += " AND invoice_number IN (SELECT invoice_number FROM gst_invoice_dc_links WHERE dc_number = ?)"
+        params.append(dc)
 
     query += " ORDER BY created_at DESC"
     rows = db.execute(query, tuple(params)).fetchall()
@@ -138,7 +149,7 @@ def list_invoices(
 
 
 @router.get("/{invoice_number}")
-def get_invoice_detail(invoice_number: str, db: sqlite3.Connection = Depends(get_db)):
+def get_invoice_detail(invoice_number: str, db: sqlite3.Connection = Depends(get_read_db)):
     """Get Invoice detail with items and linked DCs"""
     
     invoice_row = db.execute("""
@@ -169,7 +180,7 @@ def get_invoice_detail(invoice_number: str, db: sqlite3.Connection = Depends(get
 
 
 @router.post("/")
-def create_invoice(request: EnhancedInvoiceCreate, db: sqlite3.Connection = Depends(get_db)):
+async def create_invoice(request: EnhancedInvoiceCreate):
     """
     Create Invoice from Delivery Challan
     
@@ -177,47 +188,54 @@ def create_invoice(request: EnhancedInvoiceCreate, db: sqlite3.Connection = Depe
     - 1 DC → 1 Invoice (enforced via INVARIANT DC-2)
     - Invoice items are 1-to-1 mapping from DC items
     - Backend recomputes all monetary values (INVARIANT INV-2)
-    - Transaction uses BEGIN IMMEDIATE for collision safety
+    - Runs on the single DB writer (BEGIN IMMEDIATE) for collision safety
     """
     
     # Convert Pydantic model to dict for service layer
     invoice_data = request.dict()
     
-    # Use service layer with transaction protection
+    # Runs as one unit on the single DB writer (BEGIN IMMEDIATE, group commit), see app.core.write_queue
     try:
-        # CRITICAL: Use BEGIN IMMEDIATE for SQLite concurrency protection
-        db.execute("BEGIN IMMEDIATE")
-        
-        try:
-            result = service_create_invoice(invoice_data, db)
-            db.commit()
-            
-            # Service returns ServiceResult - extract data
-            if result.success:
-                return result.data
-            else:
-                # Should not happen if service raises DomainError
-                raise HTTPException(
-                    status_code=500,
-                    detail=result.message or "Unknown error"
-                )
-                
-        except DomainError as e:
-            # Convert domain error to HTTP response
-            db.rollback()
-            status_code = map_error_code_to_http_status(e.error_code)
-            raise HTTPException(
-                status_code=status_code,
-                detail={
-                    "message": e.message,
-                    "error_code": e.error_code.value,
-                    "details": e.details
-                }
-            )
-        except Exception as e:
-            db.rollback()
-            raise
-            
+        result = await write_queue.run(lambda db: service_create_invoice(invoice_data, db))
+    except DomainError as e:
+        # Convert domain error to HTTP response
+        status_code = map_error_code_to_http_status(e.error_code)
+        raise HTTPException(
+            status_code=status_code,
+            detail={
+                "message": e.message,
+                "error_code": e.error_code.value,
+                "details": e.details
+            }
+        )
     except sqlite3.IntegrityError as e:
         logger.error(f"Invoice creation failed due to integrity error: {e}", exc_info=e)
         raise internal_error(f"Database integrity error: {str(e)}", e)
+
+    # Service returns ServiceResult - extract data
+    if result.success:
+        return result.data
+    # Should not happen if service raises DomainError
+    raise HTTPException(
+        status_code=500,
+        detail=result.message or "Unknown error"
+    )
+
+
+@router.post("/numbers")
+async def reserve_numbers(request: InvoiceNumberReservation):
+    """
+    Reserve consecutive invoice numbers INV/{FY}/{NNN} for bulk invoicing
+
+    The numbers are taken from the FY sequence on the single DB writer and are never handed out
+    again; pass them as invoice_number when creating the invoices.
+    """
+    day = None
+    if request.invoice_date:
+        invoice_iso = to_iso_date(request.invoice_date)
+        if not invoice_iso:
+            raise bad_request(f"Invalid invoice date: {request.invoice_date}")
+        day = date.fromisoformat(invoice_iso)
+
+    numbers = await write_queue.run(lambda db: reserve_invoice_numbers(db, request.count, day))
+    return {"invoice_numbers": numbers, "count": len(numbers)}
@@ -2,38 +2,72 @@
 Purchase Order Router
 CRUD operations and HTML upload/scraping
 """
-from fastapi import APIRouter, Depends, UploadFile, File
-from app.db import get_db
+from fastapi import APIRouter, Depends, UploadFile, File, Query, Response
+from fastapi.responses import StreamingResponse
+from app.db import get_db, get_read_db
 from app.models import POListItem, PODetail, POHeader, POItem, POStats
 from app.errors import not_found, bad_request, internal_error
-from typing import List
+from typing import List, Optional
 import sqlite3
+import json
 from bs4 import BeautifulSoup
 from app.services.po_scraper import extract_po_header, extract_items
 from app.services.ingest_po import POIngestionService
+from app.services.po_batch_ingest import po_batch_ingest_service
+from app.services.ingest_ledger import LedgerEntry, ingest_ledger
 
 from app.services.po_service import po_service
 
 router = APIRouter()
 
 @router.get("/stats", response_model=POStats)
-def get_po_stats(db: sqlite3.Connection = Depends(get_db)):
+def get_po_stats(db: sqlite3.Connection = Depends(get_read_db)):
     """Get PO Page Statistics"""
     return po_service.get_stats(db)
 
 @router.get("/", response_model=List[POListItem])
-def list_pos(db: sqlite3.Connection = Depends(get_db)):
-    """List all Purchase Orders with quantity details"""
-    return po_service.list_pos(db)
+def list_pos(
+    response: Response,
+    status: Optional[str] = None,
+    supplier: Optional[str] = None,
+    date_from: Optional[str] = Query(None, description="YYYY-MM-DD"),
+    date_to: Optional[str] = Query(None, description="YYYY-MM-DD"),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    db: sqlite3.Connection = Depends(get_read_db)
+):
+    """
+    List Purchase Orders with quantity details, newest first.
+    Without `limit` all matching POs are returned. With `limit`, the cursor for the
+    next page is sent in the X-Next-Cursor header (absent on the last page).
+    """
+    items = po_service.list_pos(
+        db, status=status, supplier=supplier, date_from=date_from, date_to=date_to,
+        cursor=cursor, limit=limit
+    )
+    if limit and len(items) == limit:
+        response.headers["X-Next-Cursor"] = po_service.encode_cursor(items[-1])
+    return items
+
+@router.get("/ingestions")
+def list_ingestions(
+    po_number: Optional[int] = None,
+    sha256: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: sqlite3.Connection = Depends(get_read_db)
+):
+    """Ingestion ledger: one entry per uploaded PO file (digest, PO, amendment, outcome), newest first"""
+    return ingest_ledger.list_entries(db, po_number=po_number, file_sha256=sha256, status=status, limit=limit)
 
 @router.get("/{po_number}", response_model=PODetail)
-def get_po_detail(po_number: int, db: sqlite3.Connection = Depends(get_db)):
-    """Get Purchase Order detail with items and deliveries"""
-    return po_service.get_po_detail(db, po_number)
+def get_po_detail(po_number: int, lots: bool = False, db: sqlite3.Connection = Depends(get_read_db)):
+    """Get Purchase Order detail with items and deliveries (lots=true adds per-lot dispatched/pending)"""
+    return po_service.get_po_detail(db, po_number, include_lots=lots)
 
 
 @router.get("/{po_number}/dc")
-def check_po_has_dc(po_number: int, db: sqlite3.Connection = Depends(get_db)):
+def check_po_has_dc(po_number: int, db: sqlite3.Connection = Depends(get_read_db)):
     """Check if PO has an associated Delivery Challan"""
     try:
         dc_row = db.execute("""
@@ -56,13 +90,33 @@ def check_po_has_dc(po_number: int, db: sqlite3.Connection = Depends(get_db)):
 
 @router.post("/upload")
 async def upload_po_html(file: UploadFile = File(...), db: sqlite3.Connection = Depends(get_db)):
-    """Upload and parse PO HTML file"""
+    """Upload and parse PO HTML file (identical re-uploads are answered from the ingestion ledger)"""
     
     if not file.filename.endswith('.html'):
         raise bad_request("Only HTML files are supported")
     
-    # Read and parse HTML
     content = await file.read()
+    digest = ingest_ledger.digest(content)
+
+    def fail(po_number, message: str):
+        # Keep the audit entry even though the request fails (get_db rolls back on errors)
+        db.rollback()
+        ingest_ledger.record(db, [LedgerEntry(digest, file.filename, len(content), po_number, "failed", message)])
+        db.commit()
+
+    previous = ingest_ledger.find_ingested(db, [digest]).get(digest)
+    if previous:
+        message = f"✅ File already ingested as PO {previous['po_number']} (Amendment {previous['amend_no']}), skipped"
+        ingest_ledger.record(db, [LedgerEntry(digest, file.filename, len(content), previous["po_number"], "duplicate", message)])
+        return {
+            "success": True,
+            "po_number": previous["po_number"],
+            "warnings": [message],
+            "changes": None,
+            "duplicate": True
+        }
+
+    # Read and parse HTML
     soup = BeautifulSoup(content, "lxml")
     
     # Extract data using existing scraper logic
@@ -70,83 +124,54 @@ async def upload_po_html(file: UploadFile = File(...), db: sqlite3.Connection =
     po_items = extract_items(soup)
     
     if not po_header.get("PURCHASE ORDER"):
+        fail(None, "Could not extract PO number from HTML")
         raise bad_request("Could not extract PO number from HTML")
     
     # Ingest into database
     ingestion_service = POIngestionService()
     try:
         # DB transaction is already active via get_db dependency
-        success, warnings = ingestion_service.ingest_po(db, po_header, po_items)
+        success, warnings, changes = ingestion_service.merge(db, po_header, po_items)
+        ingest_ledger.record(db, [LedgerEntry(digest, file.filename, len(content), po_header.get("PURCHASE ORDER"), changes["status"], warnings[0])])
         return {
             "success": success,
             "po_number": po_header.get("PURCHASE ORDER"),
-            "warnings": warnings
+            "warnings": warnings,
+            "changes": changes,
+            "duplicate": False
         }
     except Exception as e:
+        fail(po_header.get("PURCHASE ORDER"), str(e))
         raise internal_error(f"Failed to ingest PO: {str(e)}", e)
 
 @router.post("/upload/batch")
-async def upload_po_batch(files: List[UploadFile] = File(...), db: sqlite3.Connection = Depends(get_db)):
-    """Upload and parse multiple PO HTML files"""
-    
-    results = []
-    successful = 0
-    failed = 0
-    
-    ingestion_service = POIngestionService()
-    
-    for file in files:
-        result = {
-            "filename": file.filename,
-            "success": False,
-            "po_number": None,
-            "message": ""
-        }
-        
-        try:
-            # Validate file type
-            if not file.filename.endswith('.html'):
-                result["message"] = "Only HTML files are supported"
-                failed += 1
-                results.append(result)
-                continue
-            
-            # Read and parse HTML
-            content = await file.read()
-            soup = BeautifulSoup(content, "lxml")
-            
-            # Extract data
-            po_header = extract_po_header(soup)
-            po_items = extract_items(soup)
-            
-            if not po_header.get("PURCHASE ORDER"):
-                result["message"] = "Could not extract PO number from HTML"
-                failed += 1
-                results.append(result)
-                continue
-            
-            # Ingest into database
-            success, warnings = ingestion_service.ingest_po(db, po_header, po_items)
-            
-            
-            if success:
-                result["success"] = True
-                result["po_number"] = po_header.get("PURCHASE ORDER")
-                result["message"] = warnings[0] if warnings else f"Successfully ingested PO {po_header.get('PURCHASE ORDER')}"
-                successful += 1
-            else:
-                result["message"] = "Failed to ingest PO"
-                failed += 1
-                
-        except Exception as e:
-            result["message"] = f"Error: {str(e)}"
-            failed += 1
-        
-        results.append(result)
-    
+async def upload_po_batch(files: List[UploadFile] = File(...), stream: bool = Query(False)):
+    """
+    Upload and parse multiple PO HTML files
+    Files are parsed in worker processes and written in chunked bulk transactions
+    (see po_batch_ingest); files already in the ingestion ledger are skipped unparsed. With stream=true, per-file results are sent as NDJSON lines as they
+    complete, followed by a summary line.
+    """
+    uploads = [(file.filename, await file.read()) for file in files]
+
+    if stream:
+        async def result_lines():
+            successful = failed = 0
+            async for _, result in po_batch_ingest_service.ingest(uploads):
+                successful += result["success"]
+                failed += not result["success"]
+                yield json.dumps(result) + "\n"
+            yield json.dumps({"total": len(uploads), "successful": successful, "failed": failed}) + "\n"
+
+        return StreamingResponse(result_lines(), media_type="application/x-ndjson")
+
+    # Report in upload order
+    results = [result for _, result in sorted([item async for item in po_batch_ingest_service.ingest(uploads)], key=lambda item: item[0])]
+    successful = sum(1 for r in results if r["success"])
+
     return {
         "total": len(files),
         "successful": successful,
-        "failed": failed,
+        "failed": len(results) - successful,
         "results": results
     }
@@ -2,7 +2,7 @@
 PO Notes Templates Router
 """
 from fastapi import APIRouter, Depends, HTTPException
-from app.db import get_db
+from app.db import get_db, get_read_db
 from app.logging_config import log_business_event
 from pydantic import BaseModel
 from typing import List, Optional
@@ -27,7 +27,7 @@ class PONoteTemplateResponse(BaseModel):
 @router.get("/", response_model=List[PONoteTemplateResponse])
 def list_templates(
     active_only: bool = True,
-    db: sqlite3.Connection = Depends(get_db)
+    db: sqlite3.Connection = Depends(get_read_db)
 ):
     """List all PO notes templates"""
     
@@ -40,7 +40,7 @@ def list_templates(
     return [dict(row) for row in rows]
 
 @router.get("/{template_id}", response_model=PONoteTemplateResponse)
-def get_template(template_id: str, db: sqlite3.Connection = Depends(get_db)):
+def get_template(template_id: str, db: sqlite3.Connection = Depends(get_read_db)):
     """Get a specific template"""
     
     row = db.execute(
@@ -2,8 +2,9 @@
 Reconciliation Router - Quantity Tracking
 """
 from fastapi import APIRouter, Depends
-from app.db import get_db
+from app.db import get_db, get_read_db
 from app.errors import not_found
+from app.services.rollup_service import rollup_service
 from typing import Optional
 import sqlite3
 import logging
@@ -13,7 +14,7 @@ router = APIRouter()
 
 
 @router.get("/po/{po_number}")
-def reconcile_po(po_number: int, db: sqlite3.Connection = Depends(get_db)):
+def reconcile_po(po_number: int, db: sqlite3.Connection = Depends(get_read_db)):
     """
     Get reconciliation data for a PO
     Shows ordered vs dispatched vs pending for each item
@@ -27,16 +28,16 @@ def reconcile_po(po_number: int, db: sqlite3.Connection = Depends(get_db)):
             poi.material_description,
             poi.unit,
             poi.ord_qty,
-            COALESCE(SUM(dci.dispatch_qty), 0) as dispatched_qty,
-            MAX(0, poi.ord_qty - COALESCE(SUM(dci.dispatch_qty), 0)) as pending_qty,
+            COALESCE(SUM(r.dispatched_qty), 0) as dispatched_qty,
+            MAX(0, poi.ord_qty - COALESCE(SUM(r.dispatched_qty), 0)) as pending_qty,
             CASE
-                WHEN COALESCE(SUM(dci.dispatch_qty), 0) = 0 THEN 'not_started'
-                WHEN COALESCE(SUM(dci.dispatch_qty), 0) < poi.ord_qty THEN 'partial'
-                WHEN COALESCE(SUM(dci.dispatch_qty), 0) = poi.ord_qty THEN 'complete'
-                WHEN COALESCE(SUM(dci.dispatch_qty), 0) > poi.ord_qty THEN 'over_dispatched'
+                WHEN COALESCE(SUM(r.dispatched_qty), 0) = 0 THEN 'not_started'
+                WHEN COALESCE(SUM(r.dispatched_qty), 0) < poi.ord_qty THEN 'partial'
+                WHEN COALESCE(SUM(r.dispatched_qty), 0) = poi.ord_qty THEN 'complete'
+                WHEN COALESCE(SUM(r.dispatched_qty), 0) > poi.ord_qty THEN 'over_dispatched'
             END as status
         FROM purchase_order_items poi
-        LEFT JOIN delivery_challan_items dci ON poi.id = dci.po_item_id
+        LEFT JOIN po_item_rollup r ON r.po_item_id = poi.id
         WHERE poi.po_number = ?
         GROUP BY poi.id
         ORDER BY poi.po_item_no
@@ -71,7 +72,7 @@ def reconcile_po(po_number: int, db: sqlite3.Connection = Depends(get_db)):
 
 
 @router.get("/po/{po_number}/lots")
-def reconcile_po_lots(po_number: int, db: sqlite3.Connection = Depends(get_db)):
+def reconcile_po_lots(po_number: int, db: sqlite3.Connection = Depends(get_read_db)):
     """
     Get lot-wise reconciliation data for a PO
     Returns breakdown by po_item_id + lot_no with remaining quantities
@@ -117,7 +118,7 @@ def reconcile_po_lots(po_number: int, db: sqlite3.Connection = Depends(get_db)):
 
 
 @router.get("/item/{po_item_id}")
-def reconcile_item(po_item_id: str, db: sqlite3.Connection = Depends(get_db)):
+def reconcile_item(po_item_id: str, db: sqlite3.Connection = Depends(get_read_db)):
     """Get detailed reconciliation for a specific PO item"""
     
     item = db.execute("""
@@ -143,7 +144,7 @@ def reconcile_item(po_item_id: str, db: sqlite3.Connection = Depends(get_db)):
         FROM delivery_challan_items dci
         JOIN delivery_challans dc ON dci.dc_number = dc.dc_number
         WHERE dci.po_item_id = ?
-        ORDER BY dc.dc_date
+        ORDER BY dc.dc_date_iso
     """, (po_item_id,)).fetchall()
     
     total_dispatched = sum(d["dispatch_qty"] or 0 for d in dispatches)
@@ -156,3 +157,15 @@ def reconcile_item(po_item_id: str, db: sqlite3.Connection = Depends(get_db)):
         "dispatch_history": [dict(d) for d in dispatches]
     }
 
+
+@router.get("/rollup/check")
+def check_rollup(db: sqlite3.Connection = Depends(get_read_db)):
+    """Compare po_item_rollup against a full aggregation of PO, DC and invoice items"""
+    return rollup_service.check(db)
+
+
+@router.post("/rollup/rebuild")
+def rebuild_rollup(db: sqlite3.Connection = Depends(get_db)):
+    """Recompute po_item_rollup from the source tables"""
+    count = rollup_service.rebuild(db)
+    return {"success": True, "items_rebuilt": count}
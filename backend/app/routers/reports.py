@@ -3,7 +3,7 @@ Reports Router
 Provides various business reports via ReportsService
 """
 from fastapi import APIRouter, Depends, Query
-from app.db import get_db
+from app.db import get_read_db
 from typing import Optional
 import sqlite3
 from datetime import datetime
@@ -15,14 +15,14 @@ router = APIRouter()
 @router.get("/po-dc-invoice-reconciliation")
 def po_dc_invoice_reconciliation(
     po_number: Optional[int] = None,
-    db: sqlite3.Connection = Depends(get_db)
+    db: sqlite3.Connection = Depends(get_read_db)
 ):
     """PO-DC-Invoice Reconciliation Report"""
     return reports_service.get_reconciliation_report(db, po_number)
 
 
 @router.get("/dc-without-invoice")
-def dc_without_invoice(db: sqlite3.Connection = Depends(get_db)):
+def dc_without_invoice(db: sqlite3.Connection = Depends(get_read_db)):
     """DCs that haven't been invoiced yet"""
     return reports_service.get_pending_dcs(db)
 
@@ -31,14 +31,14 @@ def dc_without_invoice(db: sqlite3.Connection = Depends(get_db)):
 def invoice_summary(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
-    db: sqlite3.Connection = Depends(get_db)
+    db: sqlite3.Connection = Depends(get_read_db)
 ):
     """Invoice Summary Report with GST breakdown"""
     return reports_service.get_invoice_summary(db, start_date, end_date)
 
 
 @router.get("/supplier-summary")
-def supplier_summary(db: sqlite3.Connection = Depends(get_db)):
+def supplier_summary(db: sqlite3.Connection = Depends(get_read_db)):
     """Supplier-wise PO summary"""
     return reports_service.get_supplier_summary(db)
 
@@ -46,14 +46,14 @@ def supplier_summary(db: sqlite3.Connection = Depends(get_db)):
 @router.get("/monthly-summary")
 def monthly_summary(
     year: int = Query(default=datetime.now().year),
-    db: sqlite3.Connection = Depends(get_db)
+    db: sqlite3.Connection = Depends(get_read_db)
 ):
     """Monthly summary of POs, DCs, and Invoices"""
     return reports_service.get_monthly_summary(db, year)
 
 
 @router.get("/insight-strip")
-def insight_strip(db: sqlite3.Connection = Depends(get_db)):
+def insight_strip(db: sqlite3.Connection = Depends(get_read_db)):
     """Generate high-impact insights for the dashboard"""
     return reports_service.get_dashboard_insights(db)
 
@@ -61,7 +61,7 @@ def insight_strip(db: sqlite3.Connection = Depends(get_db)):
 @router.get("/trends")
 def trends(
     range: str = "year",
-    db: sqlite3.Connection = Depends(get_db)
+    db: sqlite3.Connection = Depends(get_read_db)
 ):
     """Get sales vs dispatch vs invoice trends"""
     return reports_service.get_trends(db, range)
@@ -70,7 +70,7 @@ def trends(
 @router.get("/smart-table")
 def smart_table(
     filter: Optional[str] = None,
-    db: sqlite3.Connection = Depends(get_db)
+    db: sqlite3.Connection = Depends(get_read_db)
 ):
     """Unified Smart Table Data"""
     return reports_service.get_smart_table(db, filter)
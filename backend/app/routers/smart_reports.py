@@ -3,7 +3,13 @@ Smart Reports API Endpoints
 Provides aggregated data for AI-driven reports
 """
 from fastapi import APIRouter, Depends, Query, HTTPException
-from app.db import get_db
+from fastapi.responses import StreamingResponse, FileResponse
+from app.db import get_db, get_read_db
+from app.errors import bad_request, not_found, conflict
+from app.services.daily_facts_service import daily_facts_service
+from app.services.export_service import export_service, EXPORT_FORMATS
+from app.services.export_job_service import export_job_service
+from app.utils.date_utils import period_start, to_iso_date
 from typing import Optional, Literal
 import sqlite3
 from datetime import datetime, timedelta
@@ -13,68 +19,30 @@ router = APIRouter()
 
 @router.get("/kpis")
 def get_kpis(
-    period: Literal["month", "quarter", "year"] = "month",
-    db: sqlite3.Connection = Depends(get_db)
+    period: Literal["month", "quarter", "year", "fy"] = "month",
+    db: sqlite3.Connection = Depends(get_read_db)
 ):
     """
     Get all KPIs - Returns ONLY numbers
     """
     try:
-        # Calculate date range
-        today = datetime.now()
-        if period == "month":
-            start_date = today.replace(day=1)
-        elif period == "quarter":
-            quarter_month = ((today.month - 1) // 3) * 3 + 1
-            start_date = today.replace(month=quarter_month, day=1)
-        else:  # year
-            start_date = today.replace(month=1, day=1)
-        
-        start_date_str = start_date.strftime('%Y-%m-%d')
-        
-        # 1. Efficiency % = (total_dispatched / total_ordered) * 100
-        eff_query = """
-            SELECT 
-                COALESCE(SUM(poi.ord_qty), 0) as total_ordered,
-                COALESCE(SUM(dci.dispatch_qty), 0) as total_dispatched
-            FROM purchase_order_items poi
-            LEFT JOIN delivery_challan_items dci ON poi.id = dci.po_item_id
-            JOIN purchase_orders po ON poi.po_number = po.po_number
-            WHERE po.po_date >= ?
-        """
-        eff_row = db.execute(eff_query, (start_date_str,)).fetchone()
-        total_ordered = float(eff_row[0] or 0)
-        total_dispatched = float(eff_row[1] or 0)
+        start_date_str = period_start(period)
+
+        # 1-3. Efficiency, sales and pending from daily_facts (POs dated in the period)
+        facts = daily_facts_service.totals(db, start_date_str)
+        total_ordered = float(facts["po_ordered_qty"])
+        total_dispatched = float(facts["po_dispatched_qty"])
         efficiency_pct = round((total_dispatched / total_ordered * 100), 1) if total_ordered > 0 else 0.0
-        
-        # 2. Sales Total = SUM(invoice_amount)
-        sales_query = """
-            SELECT COALESCE(SUM(total_invoice_value), 0) as total_sales
-            FROM gst_invoices
-            WHERE invoice_date >= ?
-        """
-        sales_row = db.execute(sales_query, (start_date_str,)).fetchone()
-        sales_total = float(sales_row[0] or 0)
-        
-        # 3. Pending Qty = SUM(ordered - dispatched)
-        pending_query = """
-            SELECT 
-                COALESCE(SUM(poi.ord_qty), 0) as total_ordered,
-                COALESCE(SUM(dci.dispatch_qty), 0) as total_dispatched
-            FROM purchase_order_items poi
-            LEFT JOIN delivery_challan_items dci ON poi.id = dci.po_item_id
-            JOIN purchase_orders po ON poi.po_number = po.po_number
-            WHERE po.po_date >= ?
-        """
-        pending_row = db.execute(pending_query, (start_date_str,)).fetchone()
-        pending_qty = int((pending_row[0] or 0) - (pending_row[1] or 0))
+        sales_total = float(facts["invoiced_value"])
+        pending_qty = int(total_ordered - total_dispatched)
         
         # 4. Avg Lag (Days) = AVG(invoice_date - dc_date)
         lag_query = """
-            SELECT AVG(julianday(i.invoice_date) - julianday(dc.dc_date)) as avg_lag
+            SELECT AVG(julianday(i.invoice_date_iso) - julianday(dc.dc_date_iso)) as avg_lag
             FROM gst_invoices i
-            JOIN delivery_challans dc ON i.linked_dc_numbers = dc.dc_number
-            WHERE i.invoice_date >= ?
+            JOIN gst_invoice_dc_links link ON link.invoice_number = i.invoice_number
+            JOIN delivery_challans dc ON dc.dc_number = link.dc_number
+            WHERE i.invoice_date_iso >= ?
               AND i.invoice_date IS NOT NULL
               AND dc.dc_date IS NOT NULL
         """
@@ -83,11 +51,10 @@ def get_kpis(
         
         # 5a. Uninvoiced DCs
         uninvoiced_query = """
-            SELECT COUNT(DISTINCT dc.dc_number)
+            SELECT COUNT(*)
             FROM delivery_challans dc
-            LEFT JOIN gst_invoices i ON dc.dc_number = i.linked_dc_numbers
-            WHERE i.invoice_number IS NULL
-              AND dc.dc_date >= ?
+            WHERE NOT EXISTS (SELECT 1 FROM gst_invoice_dc_links link WHERE link.dc_number = dc.dc_number)
+              AND dc.dc_date_iso >= ?
         """
         uninvoiced_row = db.execute(uninvoiced_query, (start_date_str,)).fetchone()
         uninvoiced_dcs = int(uninvoiced_row[0] or 0)
@@ -96,14 +63,14 @@ def get_kpis(
         overdue_query = """
             SELECT COUNT(DISTINCT po.po_number)
             FROM purchase_orders po
-            WHERE po.po_date >= ?
-              AND julianday('now') - julianday(po.po_date) > 30
+            WHERE po.po_date_iso >= ?
+              AND julianday('now') - julianday(po.po_date_iso) > 30
               AND EXISTS (
                   SELECT 1 FROM purchase_order_items poi
-                  LEFT JOIN delivery_challan_items dci ON poi.id = dci.po_item_id
+                  LEFT JOIN po_item_rollup r ON r.po_item_id = poi.id
                   WHERE poi.po_number = po.po_number
                   GROUP BY poi.id
-                  HAVING COALESCE(SUM(poi.ord_qty), 0) > COALESCE(SUM(dci.dispatch_qty), 0)
+                  HAVING COALESCE(SUM(poi.ord_qty), 0) > COALESCE(SUM(r.dispatched_qty), 0)
               )
         """
         overdue_row = db.execute(overdue_query, (start_date_str,)).fetchone()
@@ -128,45 +95,36 @@ def get_kpis(
 
 @router.get("/summary")
 def get_summary(
-    range: Literal["month", "quarter", "year"] = "month",
+    range: Literal["month", "quarter", "year", "fy"] = "month",
     metric: str = "sales",
-    db: sqlite3.Connection = Depends(get_db)
+    db: sqlite3.Connection = Depends(get_read_db)
 ):
     """
     Get aggregated summary metrics
     """
-    # Calculate date range
     today = datetime.now()
-    if range == "month":
-        start_date = today.replace(day=1)
-    elif range == "quarter":
-        quarter_month = ((today.month - 1) // 3) * 3 + 1
-        start_date = today.replace(month=quarter_month, day=1)
-    else:  # year
-        start_date = today.replace(month=1, day=1)
+    start_date_str = period_start(range, today)
     
     if metric == "sales":
-        query = """
-            SELECT 
-                COUNT(DISTINCT i.invoice_number) as total_invoices,
-                SUM(i.total_amount) as total_revenue,
-                AVG(i.total_amount) as avg_invoice_value,
-                COUNT(DISTINCT po.po_number) as unique_pos
-            FROM invoices i
-            LEFT JOIN delivery_challans dc ON i.dc_number = dc.dc_number
-            LEFT JOIN purchase_orders po ON dc.po_number = po.po_number
-            WHERE i.invoice_date >= ?
-        """
-        result = db.execute(query, (start_date.strftime('%Y-%m-%d'),)).fetchone()
+        facts = daily_facts_service.totals(db, start_date_str)
+        total_invoices = int(facts["invoice_count"])
+        total_revenue = float(facts["invoiced_value"])
+        
+        unique_pos = db.execute("""
+            SELECT COUNT(DISTINCT pl.po_number)
+            FROM gst_invoices i
+            JOIN gst_invoice_po_links pl ON pl.invoice_number = i.invoice_number
+            WHERE i.invoice_date_iso >= ?
+        """, (start_date_str,)).fetchone()[0]
         
         return {
             "period": range,
             "metric": "sales",
-            "total_invoices": result[0] or 0,
-            "total_revenue": float(result[1] or 0),
-            "avg_invoice_value": float(result[2] or 0),
-            "unique_pos": result[3] or 0,
-            "start_date": start_date.strftime('%Y-%m-%d'),
+            "total_invoices": total_invoices,
+            "total_revenue": total_revenue,
+            "avg_invoice_value": total_revenue / total_invoices if total_invoices else 0.0,
+            "unique_pos": unique_pos or 0,
+            "start_date": start_date_str,
             "end_date": today.strftime('%Y-%m-%d')
         }
     
@@ -176,7 +134,7 @@ def get_summary(
 def get_fulfillment(
     range: Literal["month", "quarter", "year"] = "month",
     po_number: Optional[int] = None,
-    db: sqlite3.Connection = Depends(get_db)
+    db: sqlite3.Connection = Depends(get_read_db)
 ):
     """
     PO vs Delivered vs Pending analysis
@@ -195,13 +153,13 @@ def get_fulfillment(
             po.po_number,
             po.supplier_name,
             SUM(poi.ord_qty) as total_ordered,
-            COALESCE(SUM(dci.dispatch_qty), 0) as total_dispatched,
-            SUM(poi.ord_qty) - COALESCE(SUM(dci.dispatch_qty), 0) as pending,
-            CAST((COALESCE(SUM(dci.dispatch_qty), 0) * 100.0 / SUM(poi.ord_qty)) AS INTEGER) as fulfillment_pct
+            COALESCE(SUM(r.dispatched_qty), 0) as total_dispatched,
+            SUM(poi.ord_qty) - COALESCE(SUM(r.dispatched_qty), 0) as pending,
+            CAST((COALESCE(SUM(r.dispatched_qty), 0) * 100.0 / SUM(poi.ord_qty)) AS INTEGER) as fulfillment_pct
         FROM purchase_orders po
         JOIN purchase_order_items poi ON po.po_number = poi.po_number
-        LEFT JOIN delivery_challan_items dci ON poi.id = dci.po_item_id
-        WHERE po.po_date >= ?
+        LEFT JOIN po_item_rollup r ON r.po_item_id = poi.id
+        WHERE po.po_date_iso >= ?
     """
     
     params = [start_date.strftime('%Y-%m-%d')]
@@ -230,7 +188,7 @@ def get_fulfillment(
     }
 
 @router.get("/pending")
-def get_pending(db: sqlite3.Connection = Depends(get_db)):
+def get_pending(db: sqlite3.Connection = Depends(get_read_db)):
     """
     Get all pending dispatch items
     """
@@ -240,13 +198,13 @@ def get_pending(db: sqlite3.Connection = Depends(get_db)):
             poi.po_item_no,
             poi.material_description,
             poi.ord_qty,
-            COALESCE(SUM(dci.dispatch_qty), 0) as dispatched,
-            poi.ord_qty - COALESCE(SUM(dci.dispatch_qty), 0) as pending,
-            CAST((julianday('now') - julianday(po.po_date)) AS INTEGER) as age_days,
+            COALESCE(SUM(r.dispatched_qty), 0) as dispatched,
+            poi.ord_qty - COALESCE(SUM(r.dispatched_qty), 0) as pending,
+            CAST((julianday('now') - julianday(po.po_date_iso)) AS INTEGER) as age_days,
             po.supplier_name
         FROM purchase_orders po
         JOIN purchase_order_items poi ON po.po_number = poi.po_number
-        LEFT JOIN delivery_challan_items dci ON poi.id = dci.po_item_id
+        LEFT JOIN po_item_rollup r ON r.po_item_id = poi.id
         GROUP BY po.po_number, poi.po_item_no
         HAVING pending > 0
         ORDER BY age_days DESC, pending DESC
@@ -273,7 +231,7 @@ def get_pending(db: sqlite3.Connection = Depends(get_db)):
     }
 
 @router.get("/item-wise")
-def get_item_wise(db: sqlite3.Connection = Depends(get_db)):
+def get_item_wise(db: sqlite3.Connection = Depends(get_read_db)):
     """
     Item-wise analysis
     """
@@ -283,11 +241,11 @@ def get_item_wise(db: sqlite3.Connection = Depends(get_db)):
             poi.material_code,
             COUNT(DISTINCT po.po_number) as po_count,
             SUM(poi.ord_qty) as total_ordered,
-            COALESCE(SUM(dci.dispatch_qty), 0) as total_dispatched,
-            SUM(poi.ord_qty) - COALESCE(SUM(dci.dispatch_qty), 0) as pending
+            COALESCE(SUM(r.dispatched_qty), 0) as total_dispatched,
+            SUM(poi.ord_qty) - COALESCE(SUM(r.dispatched_qty), 0) as pending
         FROM purchase_order_items poi
         JOIN purchase_orders po ON poi.po_number = po.po_number
-        LEFT JOIN delivery_challan_items dci ON poi.id = dci.po_item_id
+        LEFT JOIN po_item_rollup r ON r.po_item_id = poi.id
         GROUP BY poi.material_description, poi.material_code
         ORDER BY total_ordered DESC
         LIMIT 50
@@ -310,20 +268,45 @@ def get_item_wise(db: sqlite3.Connection = Depends(get_db)):
     }
 
 @router.get("/exports")
-def get_exports(db: sqlite3.Connection = Depends(get_db)):
+def get_exports(limit: int = Query(50, ge=1, le=200), db: sqlite3.Connection = Depends(get_read_db)):
+    """
+    Get recent report exports (newest first) with status and progress
+    """
+    return {"exports": export_job_service.list_recent(db, limit)}
+
+@router.get("/exports/{export_id}")
+def get_export(export_id: str, db: sqlite3.Connection = Depends(get_read_db)):
+    """
+    Poll one export job
     """
-    Get recent report exports
-    TODO: Implement real exports tracking table
+    job = export_job_service.get(db, export_id)
+    if not job:
+        raise not_found(f"Export {export_id} not found", "Export")
+    return job
+
+@router.get("/exports/{export_id}/download")
+def download_export(export_id: str, db: sqlite3.Connection = Depends(get_db)):
+    """
+    Download a completed export from disk
     """
-    # Return empty until exports table is implemented
-    return {"exports": []}
+    job = export_job_service.get(db, export_id)
+    if not job:
+        raise not_found(f"Export {export_id} not found", "Export")
+    if job["status"] in ("queued", "running"):
+        raise conflict(f"Export {export_id} is still {job['status']}")
+
+    path = export_job_service.artifact(db, export_id)
+    if path is None:
+        raise not_found(f"Export {export_id} has no file ({job['status']})", "Export")
+
+    return FileResponse(path, media_type=EXPORT_FORMATS[job["format"]], filename=job["file_name"])
 
 @router.get("/date-summary")
 def get_date_summary(
     entity: Literal["po", "challan", "invoice"],
     start_date: str,
     end_date: str,
-    db: sqlite3.Connection = Depends(get_db)
+    db: sqlite3.Connection = Depends(get_read_db)
 ):
     """
     Get date-wise summary for PO/Challan/Invoice
@@ -343,27 +326,25 @@ def get_date_summary(
     """
     try:
         if entity == "po":
-            # PO Summary: Filter by po_date
-            # Database stores dates as DD/MM/YYYY, need to convert for comparison
+            # PO Summary: Filter by po_date (indexed ISO shadow column, po_date itself is DD/MM/YYYY)
             query = """
                 SELECT 
                     po.po_number,
                     po.po_date,
                     COALESCE(SUM(poi.ord_qty), 0) as total_ordered,
-                    COALESCE(SUM(dci.dispatch_qty), 0) as total_dispatched,
-                    COALESCE(SUM(poi.ord_qty), 0) - COALESCE(SUM(dci.dispatch_qty), 0) as pending_qty,
+                    COALESCE(SUM(r.dispatched_qty), 0) as total_dispatched,
+                    COALESCE(SUM(poi.ord_qty), 0) - COALESCE(SUM(r.dispatched_qty), 0) as pending_qty,
                     CASE 
-                        WHEN COALESCE(SUM(dci.dispatch_qty), 0) = 0 THEN 'Not Started'
-                        WHEN COALESCE(SUM(dci.dispatch_qty), 0) >= COALESCE(SUM(poi.ord_qty), 0) THEN 'Completed'
+                        WHEN COALESCE(SUM(r.dispatched_qty), 0) = 0 THEN 'Not Started'
+                        WHEN COALESCE(SUM(r.dispatched_qty), 0) >= COALESCE(SUM(poi.ord_qty), 0) THEN 'Completed'
                         ELSE 'In Progress'
                     END as status
                 FROM purchase_orders po
                 LEFT JOIN purchase_order_items poi ON po.po_number = poi.po_number
-                LEFT JOIN delivery_challan_items dci ON poi.id = dci.po_item_id
-                WHERE date(substr(po.po_date, 7, 4) || '-' || substr(po.po_date, 4, 2) || '-' || substr(po.po_date, 1, 2)) 
-                      BETWEEN date(?) AND date(?)
+                LEFT JOIN po_item_rollup r ON r.po_item_id = poi.id
+                WHERE po.po_date_iso BETWEEN ? AND ?
                 GROUP BY po.po_number, po.po_date
-                ORDER BY date(substr(po.po_date, 7, 4) || '-' || substr(po.po_date, 4, 2) || '-' || substr(po.po_date, 1, 2)) DESC
+                ORDER BY po.po_date_iso DESC
             """
             rows = db.execute(query, (start_date, end_date)).fetchall()
             
@@ -397,7 +378,6 @@ def get_date_summary(
             
         elif entity == "challan":
             # Challan Summary: Filter by dc_date
-            # Database stores dates as YYYY-MM-DD (no conversion needed)
             query = """
                 SELECT 
                     dc.dc_number,
@@ -405,15 +385,14 @@ def get_date_summary(
                     dc.po_number,
                     COALESCE(SUM(dci.dispatch_qty), 0) as dispatched_qty,
                     CASE 
-                        WHEN i.invoice_number IS NOT NULL THEN 'Invoiced'
+                        WHEN EXISTS (SELECT 1 FROM gst_invoice_dc_links link WHERE link.dc_number = dc.dc_number) THEN 'Invoiced'
                         ELSE 'Not Invoiced'
                     END as invoice_status
                 FROM delivery_challans dc
                 LEFT JOIN delivery_challan_items dci ON dc.dc_number = dci.dc_number
-                LEFT JOIN gst_invoices i ON dc.dc_number = i.linked_dc_numbers
-                WHERE dc.dc_date BETWEEN ? AND ?
-                GROUP BY dc.dc_number, dc.dc_date, dc.po_number, i.invoice_number
-                ORDER BY dc.dc_date DESC
+                WHERE dc.dc_date_iso BETWEEN ? AND ?
+                GROUP BY dc.dc_number, dc.dc_date, dc.po_number
+                ORDER BY dc.dc_date_iso DESC
             """
             rows = db.execute(query, (start_date, end_date)).fetchall()
             
@@ -444,7 +423,6 @@ def get_date_summary(
             
         elif entity == "invoice":
             # Invoice Summary: Filter by invoice_date
-            # Database stores dates as YYYY-MM-DD (no conversion needed)
             query = """
                 SELECT 
                     i.invoice_number,
@@ -452,8 +430,8 @@ def get_date_summary(
                     i.linked_dc_numbers,
                     COALESCE(i.total_invoice_value, 0) as invoice_value
                 FROM gst_invoices i
-                WHERE i.invoice_date BETWEEN ? AND ?
-                ORDER BY i.invoice_date DESC
+                WHERE i.invoice_date_iso BETWEEN ? AND ?
+                ORDER BY i.invoice_date_iso DESC
             """
             rows = db.execute(query, (start_date, end_date)).fetchall()
             
@@ -494,219 +472,54 @@ def export_date_summary(
     entity: Literal["po", "challan", "invoice"],
     start_date: str,
     end_date: str,
-    db: sqlite3.Connection = Depends(get_db)
+    format: Literal["xlsx", "csv"] = "xlsx"
 ):
     """
-    Export date-wise summary to Excel.
+    Export date-wise summary to Excel (or CSV), streamed in chunks.
     For 'invoice', generates the legacy 'SALE SUMMARY' format.
     """
-    from fastapi.responses import StreamingResponse
-    from io import BytesIO
-    from openpyxl import Workbook
-    from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-    
-    try:
-        wb = Workbook()
-        ws = wb.active
-        ws.title = f"{entity.upper()} Summary"
-        
-        # Styles
-        border_style = Border(
-            left=Side(style='thin'), 
-            right=Side(style='thin'), 
-            top=Side(style='thin'), 
-            bottom=Side(style='thin')
-        )
-        bold_font = Font(bold=True)
-        center_align = Alignment(horizontal="center", vertical="center", wrap_text=True)
-        
-        if entity == "invoice":
-            # --- SALE SUMMARY FORMAT ---
-            
-            # 1. Fetch Data with Items
-            query = """
-                SELECT 
-                    i.invoice_number,
-                    i.invoice_date,
-                    i.linked_dc_numbers,
-                    po.supplier_name, -- Consignee (Party Name)
-                    po.po_number,
-                    ii.description,
-                    ii.quantity,
-                    ii.amount, -- Using amount as taxable/assessable value for now
-                    i.total_invoice_value -- Final Total
-                FROM gst_invoices i
-                LEFT JOIN gst_invoice_items ii ON i.invoice_number = ii.invoice_number
-                LEFT JOIN delivery_challans dc ON i.linked_dc_numbers = dc.dc_number
-                LEFT JOIN purchase_orders po ON dc.po_number = po.po_number
-                WHERE i.invoice_date BETWEEN ? AND ?
-                ORDER BY i.invoice_date DESC, i.invoice_number
-            """
-            rows = db.execute(query, (start_date, end_date)).fetchall()
-
-            # 2. Header Section (Company Details)
-            # Fetch company name from POs (assuming we are the supplier for all)
-            company_row = db.execute("SELECT supplier_name FROM purchase_orders WHERE supplier_name IS NOT NULL LIMIT 1").fetchone()
-            company_name = company_row[0] if company_row else "SENSOVISION SYSTEMS"
-
-            ws.merge_cells('A1:O1') # Company Name
-            ws['A1'] = company_name
-            ws['A1'].font = Font(bold=True, size=16, color="000000")
-            ws['A1'].alignment = center_align
-            
-            ws.merge_cells('A2:O2') # Title
-            ws['A2'] = "SALE SUMMARY"
-            ws['A2'].font = Font(bold=True, size=12, underline="single")
-            ws['A2'].alignment = center_align
-
-            # 3. Column Headers
-            headers = [
-                "S. No.", "Inv No. & Dt", "DC No.", "Name of Party", 
-                "PO & Item Description", "Qty", "Inv Ass. Value", 
-                "E.D. 10 %", "ED Cess 2 %", "ED Cess1 %", "Sub Total", 
-                "VAT 13%", "CST 2 %", "Other Additons", "Total"
-            ]
-            
-            ws.append(headers) # This appends to the next open row (which is 3)
-            header_row_idx = 3
-            
-            for col_idx, header in enumerate(headers, 1):
-                cell = ws.cell(row=header_row_idx, column=col_idx)
-                cell.font = bold_font
-                cell.alignment = center_align
-                cell.border = border_style
-                # Set column widths roughly
-                ws.column_dimensions[cell.column_letter].width = 15
-            
-            ws.column_dimensions['D'].width = 25 # Party Name
-            ws.column_dimensions['E'].width = 30 # Description
+    start_date = to_iso_date(start_date)
+    end_date = to_iso_date(end_date)
+    if not start_date or not end_date:
+        raise bad_request("start_date and end_date must be valid dates (YYYY-MM-DD)")
 
-            # 4. Data Rows
-            current_row = 4
-            s_no = 1
-            
-            for row in rows:
-                # Unpack
-                inv_no = row[0]
-                inv_date_str = row[1] 
-                # Format date to DD/MM/YYYY
-                try:
-                    inv_date_obj = datetime.strptime(inv_date_str, '%Y-%m-%d')
-                    inv_date = inv_date_obj.strftime('%d/%m/%Y')
-                except:
-                    inv_date = inv_date_str
-
-                dc_no = row[2]
-                party_name = row[3] or "N/A"
-                po_no = row[4] or ""
-                desc = row[5] or ""
-                qty = row[6] or 0
-                taxable_val = float(row[7] or 0)
-                final_total = float(row[8] or 0)
-                
-                # Combine PO & Desc if needed? User image shows "PO & Item Description"
-                full_desc = f"{desc}\n(PO: {po_no})" if po_no else desc
-
-                # Legacy Tax placeholders (Defaults as 0 per user requirement implicitly)
-                ed_val = 0.0
-                ed_cess_val = 0.0
-                ed_cess1_val = 0.0
-                sub_total = taxable_val # + taxes if they existed
-                vat_val = 0.0
-                cst_val = 0.0
-                other_add = 0.0
-                
-                # Use final_total from DB for the last column, ensuring it matches
-                # If we were calculating: total = sub_total + vat + cst + others
-                
-                data_row = [
-                    s_no,
-                    f"{inv_no}\n{inv_date}",
-                    dc_no,
-                    party_name,
-                    full_desc,
-                    qty,
-                    taxable_val,
-                    ed_val,
-                    ed_cess_val,
-                    ed_cess1_val,
-                    sub_total,
-                    vat_val,
-                    cst_val,
-                    other_add,
-                    final_total
-                ]
-                
-                ws.append(data_row)
-                
-                # Styling for this row
-                for col_idx in range(1, 16):
-                    cell = ws.cell(row=current_row, column=col_idx)
-                    cell.border = border_style
-                    cell.alignment = Alignment(vertical="center", wrap_text=True)
-                    if col_idx in [7, 8, 9, 10, 11, 12, 13, 14, 15]: # Number columns
-                        cell.number_format = '0.00'
-                
-                current_row += 1
-                s_no += 1
-        
-        else:
-            # Fallback for 'po' and 'challan' (reuse previous simple logic or keep it minimal)
-            # For brevity in this tool call, I'll just create a simple dump for them
-            summary_data = get_date_summary(entity, start_date, end_date, db)
-            
-            # Simple header
-            headers = [k.replace('_', ' ').title() for k in summary_data["rows"][0].keys()] if summary_data["rows"] else []
-            ws.append(headers)
-            
-            for row in summary_data["rows"]:
-                ws.append(list(row.values()))
-
-        # Buffer
-        excel_file = BytesIO()
-        wb.save(excel_file)
-        excel_file.seek(0)
-        
-        filename = f"{entity}_summary_{start_date}_to_{end_date}.xlsx"
-        
-        return StreamingResponse(
-            excel_file,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
-            
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
+    filename = export_service.filename(entity, start_date, end_date, format)
+    return StreamingResponse(
+        export_service.stream_date_summary(entity, start_date, end_date, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
 
 from pydantic import BaseModel
 
 class GenerateReportRequest(BaseModel):
-    report_type: str
-    format: Literal["pdf", "xlsx", "docx"] = "pdf"
+    report_type: Literal["po", "challan", "invoice"]
+    start_date: str
+    end_date: str
+    format: Literal["xlsx", "csv"] = "xlsx"
 
-@router.post("/generate")
-async def generate_report(
+@router.post("/generate", status_code=202)
+def generate_report(
     request: GenerateReportRequest,
     db: sqlite3.Connection = Depends(get_db)
 ):
     """
-    Generate a report file
+    Queue a date-summary export for background rendering.
+    Poll /exports/{id} for progress and fetch /exports/{id}/download when completed;
+    an identical recent request returns the existing job.
     """
-    # This will be implemented with actual file generation
-    # For now, return success
-    return {
-        "success": True,
-        "report_type": request.report_type,
-        "format": request.format,
-        "file_path": f"/exports/{request.report_type}_{datetime.now().strftime('%Y%m%d')}.{request.format}",
-        "message": f"Report '{request.report_type}' generated successfully"
-    }
+    start_date = to_iso_date(request.start_date)
+    end_date = to_iso_date(request.end_date)
+    if not start_date or not end_date:
+        raise bad_request("start_date and end_date must be valid dates (YYYY-MM-DD)")
+
+    return export_job_service.submit(
+        db, request.report_type, request.format, {"start_date": start_date, "end_date": end_date}
+    )
 
 
 @router.get("/insight-strip")
-def get_insights(db: sqlite3.Connection = Depends(get_db)):
+def get_insights(db: sqlite3.Connection = Depends(get_read_db)):
     """
     Get deterministic insights for the dashboard morning briefing.
     Returns a list of actionable insights sorted by priority.
@@ -729,10 +542,9 @@ def get_insights(db: sqlite3.Connection = Depends(get_db)):
             
         # 2. Uninvoiced Challans (High Priority)
         uninvoiced = db.execute("""
-            SELECT COUNT(DISTINCT dc.dc_number)
+            SELECT COUNT(*)
             FROM delivery_challans dc
-            LEFT JOIN gst_invoices i ON dc.dc_number = i.linked_dc_numbers
-            WHERE i.invoice_number IS NULL
+            WHERE NOT EXISTS (SELECT 1 FROM gst_invoice_dc_links link WHERE link.dc_number = dc.dc_number)
         """).fetchone()[0]
         
         if uninvoiced > 0:
@@ -746,9 +558,9 @@ def get_insights(db: sqlite3.Connection = Depends(get_db)):
         pending_items = db.execute("""
             SELECT COUNT(poi.id)
             FROM purchase_order_items poi
-            LEFT JOIN delivery_challan_items dci ON poi.id = dci.po_item_id
+            LEFT JOIN po_item_rollup r ON r.po_item_id = poi.id
             GROUP BY poi.id
-            HAVING COALESCE(SUM(poi.ord_qty), 0) > COALESCE(SUM(dci.dispatch_qty), 0)
+            HAVING COALESCE(SUM(poi.ord_qty), 0) > COALESCE(SUM(r.dispatched_qty), 0)
         """).fetchall()
         
         pending_count = len(pending_items)
@@ -762,7 +574,7 @@ def get_insights(db: sqlite3.Connection = Depends(get_db)):
         # 4. Sales Milestone (Positive Reinforcement)
         sales_today = db.execute("""
             SELECT SUM(total_invoice_value) FROM gst_invoices 
-            WHERE date(invoice_date) = date('now')
+            WHERE invoice_date_iso = date('now')
         """).fetchone()[0] or 0
         
         if sales_today > 0:
@@ -0,0 +1,180 @@
+"""
+Alert Service
+Set-based, incremental evaluation of the alert rules.
+
+Each rule is one INSERT ... SELECT over its candidate entities with an anti-join against
+open alerts (backed by the partial unique index idx_alerts_open_unique). Candidates come
+from alert_changes, a trigger-maintained change log holding at most one row per entity; a
+run consumes the log up to its current high-water mark, so cost tracks the number of changed
+entities rather than table sizes, and the log stays bounded between runs.
+DC ageing has no write to log, so DCs whose date crossed the 7-day cutoff since the last
+run are added via the dc_date_iso index.
+"""
+import sqlite3
+import logging
+from typing import List, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+DC_INVOICE_GRACE_DAYS = 7
+
+# Random (version 4) UUID built in SQL so rules can insert set-wise
+_UUID_SQL = """
+    lower(hex(randomblob(4))) || '-' || lower(hex(randomblob(2))) || '-4' ||
+    substr(lower(hex(randomblob(2))), 2) || '-' ||
+    substr('89ab', 1 + (abs(random()) % 4), 1) || substr(lower(hex(randomblob(2))), 2) || '-' ||
+    lower(hex(randomblob(6)))
+"""
+
+# Candidate entity sets: everything, or only entities logged since the watermark
+_CHANGED_POS_SQL = """
+    SELECT CAST(entity_id AS INTEGER) FROM alert_changes
+    WHERE entity_type = 'PO' AND id > :last_change_id AND id <= :high_water
+"""
+_CHANGED_DCS_SQL = """
+    SELECT entity_id FROM alert_changes
+    WHERE entity_type = 'DC' AND id > :last_change_id AND id <= :high_water
+"""
+_ALL_POS_SQL = "SELECT po_number FROM purchase_orders"
+_ALL_DCS_SQL = "SELECT dc_number FROM delivery_challans"
+# DCs that became old enough for DC_NOT_INVOICED since the previous run
+_AGED_DCS_SQL = """
+    SELECT dc_number FROM delivery_challans
+    WHERE dc_date_iso >= :last_dc_cutoff AND dc_date_iso < :dc_cutoff
+"""
+
+
+def _open_alert_absent(alert_type: str, entity_type: str, entity_id_sql: str) -> str:
+    """Anti-join fragment: no unacknowledged alert of this type for the entity"""
+    return f"""
+        NOT EXISTS (
+            SELECT 1 FROM alerts a
+            WHERE a.alert_type = '{alert_type}' AND a.entity_type = '{entity_type}'
+              AND a.entity_id = {entity_id_sql} AND a.is_acknowledged = 0
+        )
+    """
+
+
+class AlertService:
+    """Generate alerts from business rules"""
+
+    def generate(self, db: sqlite3.Connection, full: bool = False) -> Dict[str, Any]:
+        """
+        Evaluate all rules and insert new alerts.
+        Incremental by default; `full` (or a first run) re-evaluates every PO and DC.
+        Caller controls the transaction.
+        """
+        state = db.execute("SELECT last_change_id, last_dc_cutoff FROM alert_engine_state WHERE id = 1").fetchone()
+        high_water = db.execute("SELECT COALESCE(MAX(id), 0) FROM alert_changes").fetchone()[0]
+        full = full or state["last_dc_cutoff"] is None
+
+        params = {
+            "last_change_id": state["last_change_id"],
+            "high_water": high_water,
+            "last_dc_cutoff": state["last_dc_cutoff"],
+            "dc_cutoff": db.execute("SELECT date('now', ?)", (f"-{DC_INVOICE_GRACE_DAYS} days",)).fetchone()[0],
+        }
+
+        if full:
+            po_candidates = _ALL_POS_SQL
+            dc_candidates = _ALL_DCS_SQL
+            aged_dc_candidates = _ALL_DCS_SQL
+        else:
+            po_candidates = _CHANGED_POS_SQL
+            dc_candidates = _CHANGED_DCS_SQL
+            aged_dc_candidates = f"{_CHANGED_DCS_SQL} UNION {_AGED_DCS_SQL}"
+
+        alerts_created: List[str] = []
+        alerts_created += self._fully_dispatched_not_invoiced(db, po_candidates, params)
+        alerts_created += self._dc_not_invoiced(db, aged_dc_candidates, params)
+        alerts_created += self._dc_without_po(db, dc_candidates, params)
+
+        changes_processed = db.execute("""
+            DELETE FROM alert_changes WHERE id <= ?
+        """, (high_water,)).rowcount
+        db.execute("""
+            UPDATE alert_engine_state
+            SET last_change_id = ?, last_dc_cutoff = ?, last_run_at = CURRENT_TIMESTAMP
+            WHERE id = 1
+        """, (high_water, params["dc_cutoff"]))
+
+        logger.info(
+            f"Alert generation ({'full' if full else 'incremental'}): "
+            f"{len(alerts_created)} created, {changes_processed} changes processed"
+        )
+        return {
+            "alerts_created": alerts_created,
+            "changes_processed": changes_processed,
+            "full": full
+        }
+
+    def _fully_dispatched_not_invoiced(self, db: sqlite3.Connection, candidates: str, params: Dict[str, Any]) -> List[str]:
+        """PO fully dispatched but not invoiced"""
+        rows = db.execute(f"""
+            INSERT INTO alerts (id, alert_type, entity_type, entity_id, message, severity)
+            SELECT
+                {_UUID_SQL},
+                'FULLY_DISPATCHED_NOT_INVOICED',
+                'PO',
+                CAST(po.po_number AS TEXT),
+                'PO ' || po.po_number || ' (' || COALESCE(po.supplier_name, '-') || ') is fully dispatched but not yet invoiced',
+                'warning'
+            FROM purchase_orders po
+            JOIN (
+                SELECT po_number, SUM(ordered_qty) AS total_ordered, SUM(dispatched_qty) AS total_dispatched
+                FROM po_item_rollup
+                WHERE po_number IN ({candidates})
+                GROUP BY po_number
+            ) q ON q.po_number = po.po_number
+            WHERE q.total_ordered = q.total_dispatched
+              AND NOT EXISTS (
+                  SELECT 1 FROM gst_invoice_po_links pl WHERE pl.po_number = po.po_number
+              )
+              AND {_open_alert_absent('FULLY_DISPATCHED_NOT_INVOICED', 'PO', 'CAST(po.po_number AS TEXT)')}
+            RETURNING id
+        """, params).fetchall()
+        return [row[0] for row in rows]
+
+    def _dc_not_invoiced(self, db: sqlite3.Connection, candidates: str, params: Dict[str, Any]) -> List[str]:
+        """DC without invoice after the grace period"""
+        rows = db.execute(f"""
+            INSERT INTO alerts (id, alert_type, entity_type, entity_id, message, severity)
+            SELECT
+                {_UUID_SQL},
+                'DC_NOT_INVOICED',
+                'DC',
+                dc.dc_number,
+                'DC ' || dc.dc_number || ' (' || COALESCE(dc.consignee_name, '-') || ') created '
+                    || dc.dc_date || ' but not yet invoiced',
+                'warning'
+            FROM delivery_challans dc
+            WHERE dc.dc_number IN ({candidates})
+              AND dc.dc_date_iso < :dc_cutoff
+              AND NOT EXISTS (SELECT 1 FROM gst_invoice_dc_links link WHERE link.dc_number = dc.dc_number)
+              AND {_open_alert_absent('DC_NOT_INVOICED', 'DC', 'dc.dc_number')}
+            RETURNING id
+        """, params).fetchall()
+        return [row[0] for row in rows]
+
+    def _dc_without_po(self, db: sqlite3.Connection, candidates: str, params: Dict[str, Any]) -> List[str]:
+        """DC created without PO"""
+        rows = db.execute(f"""
+            INSERT INTO alerts (id, alert_type, entity_type, entity_id, message, severity)
+            SELECT
+                {_UUID_SQL},
+                'DC_WITHOUT_PO',
+                'DC',
+                dc.dc_number,
+                'DC ' || dc.dc_number || ' (' || COALESCE(dc.consignee_name, '-') || ') created without PO link',
+                'info'
+            FROM delivery_challans dc
+            WHERE dc.dc_number IN ({candidates})
+              AND dc.po_number IS NULL
+              AND {_open_alert_absent('DC_WITHOUT_PO', 'DC', 'dc.dc_number')}
+            RETURNING id
+        """, params).fetchall()
+        return [row[0] for row in rows]
+
+
+# Singleton instance
+alert_service = AlertService()
@@ -1,21 +1,28 @@
 """
 Context Manager - Manages conversation state and history
-Stores session data in Redis for fast access
+Sessions live in a pluggable store (app.services.session_store): a bounded in-memory LRU by
+default, or a shared SQLite file with SESSION_STORE=sqlite for multi-worker deployments.
+Blocking stores (SQLite) are called through the threadpool so the event loop never waits on them.
 """
 import json
 import logging
 from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
 from dataclasses import dataclass, asdict
+from pathlib import Path
 import asyncio
 
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.services.session_store import SessionStore, MemorySessionStore, SQLiteSessionStore
+
 logger = logging.getLogger(__name__)
 
-# In-memory storage (will be Redis in production)
-_sessions: Dict[str, 'ConversationContext'] = {}
+BACKEND_DIR = Path(__file__).parent.parent.parent
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     """Single message in conversation"""
     role: str  # 'user' or 'assistant'
@@ -35,56 +42,102 @@ class ConversationContext:
     ui_context: Optional[Dict[str, Any]] = None
     created_at: Optional[str] = None
     updated_at: Optional[str] = None
-    
+
     def __post_init__(self):
         if not self.created_at:
             self.created_at = datetime.utcnow().isoformat()
+        if not self.updated_at:
+            self.updated_at = datetime.utcnow().isoformat()
+
+    def touch(self):
         self.updated_at = datetime.utcnow().isoformat()
 
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ConversationContext":
+        return cls(**{**data, "history": [Message(**m) for m in data.get("history", [])]})
+
+    def approx_size(self) -> int:
+        """Rough payload size in bytes (message text + JSON of entities / UI context)"""
+        text = sum(len(m.content) + len(m.timestamp) for m in self.history)
+        return text + len(json.dumps([self.entities, self.ui_context], default=str))
+
+
+def create_session_store() -> SessionStore:
+    """Session store selected by settings.SESSION_STORE"""
+    if settings.SESSION_STORE == "sqlite":
+        db_path = Path(settings.SESSION_DB_PATH)
+        if not db_path.is_absolute():
+            db_path = BACKEND_DIR / db_path
+        return SQLiteSessionStore(
+            db_path,
+            ConversationContext.from_dict,
+            max_sessions=settings.SESSION_MAX_SESSIONS,
+            ttl_seconds=settings.SESSION_TTL_SECONDS,
+            busy_timeout_ms=settings.DB_BUSY_TIMEOUT_MS
+        )
+    if settings.SESSION_STORE != "memory":
+        logger.warning(f"Unknown SESSION_STORE '{settings.SESSION_STORE}', using memory")
+    return MemorySessionStore(max_sessions=settings.SESSION_MAX_SESSIONS, ttl_seconds=settings.SESSION_TTL_SECONDS)
+
 
 class ContextManager:
     """Manages conversation contexts"""
-    
-    def __init__(self, max_history: int = 10, ttl_hours: int = 24):
+
+    def __init__(self, max_history: int = 10, store: Optional[SessionStore] = None):
         self.max_history = max_history
-        self.ttl_hours = ttl_hours
-    
+        self._store = store
+        self._sweeper: Optional[asyncio.Task] = None
+
+    @property
+    def store(self) -> SessionStore:
+        # Created on first use, after settings / .env are loaded
+        if self._store is None:
+            self._store = create_session_store()
+        return self._store
+
+    async def _call(self, method: str, *args):
+        """Call a store method, off the event loop when the store blocks"""
+        store = self.store
+        if store.blocking:
+            return await run_in_threadpool(getattr(store, method), *args)
+        return getattr(store, method)(*args)
+
+    async def _save(self, context: ConversationContext):
+        context.touch()
+        await self._call("put", context.session_id, context)
+
     async def get_context(self, session_id: str) -> ConversationContext:
         """
         Get or create conversation context
-        
+
         Args:
             session_id: Unique session identifier
-            
+
         Returns:
             ConversationContext instance
         """
-        
-        # Check in-memory storage
-        if session_id in _sessions:
-            context = _sessions[session_id]
-            
-            # Check if expired
-            created = datetime.fromisoformat(context.created_at)
-            if datetime.utcnow() - created > timedelta(hours=self.ttl_hours):
-                logger.info(f"Session {session_id} expired, creating new")
-                del _sessions[session_id]
-            else:
-                logger.debug(f"Retrieved context for session {session_id}")
-                return context
-        
+
+        # Expired sessions are dropped by the store and come back as None
+        context = await self._call("get", session_id)
+        if context is not None:
+            logger.debug(f"Retrieved context for session {session_id}")
+            return context
+
         # Create new context
         context = ConversationContext(
             session_id=session_id,
             history=[],
             entities={}
         )
-        
-        _sessions[session_id] = context
+
+        await self._call("put", session_id, context)
         logger.info(f"Created new context for session {session_id}")
-        
+
         return context
-    
+
     async def add_message(
         self,
         session_id: str,
@@ -94,101 +147,100 @@ class ContextManager:
     ):
         """
         Add message to conversation history
-        
+
         Args:
             session_id: Session identifier
             role: 'user' or 'assistant'
             content: Message content
             metadata: Optional metadata
         """
-        
+
         context = await self.get_context(session_id)
-        
+
         message = Message(
             role=role,
             content=content,
             timestamp=datetime.utcnow().isoformat(),
             metadata=metadata
         )
-        
+
         context.history.append(message)
-        
+
         # Prune history if too long
         if len(context.history) > self.max_history * 2:  # Keep user+assistant pairs
             context.history = context.history[-self.max_history * 2:]
-        
-        context.updated_at = datetime.utcnow().isoformat()
-        
+
+        await self._save(context)
+
         logger.debug(
             f"Added {role} message to session {session_id}",
             extra={"message_length": len(content)}
         )
-    
+
     async def update_entities(self, session_id: str, entities: Dict[str, Any]):
         """
         Update tracked entities
-        
+
         Args:
             session_id: Session identifier
             entities: Entity updates (merged with existing)
         """
-        
+
         context = await self.get_context(session_id)
         context.entities.update(entities)
-        context.updated_at = datetime.utcnow().isoformat()
-        
+        await self._save(context)
+
         logger.debug(
             f"Updated entities for session {session_id}",
             extra={"entities": list(entities.keys())}
         )
-    
+
     async def set_intent(self, session_id: str, intent: str):
         """Set current intent"""
         context = await self.get_context(session_id)
         context.current_intent = intent
-        context.updated_at = datetime.utcnow().isoformat()
-    
+        await self._save(context)
+
     async def set_last_action(self, session_id: str, action: str):
         """Set last executed action"""
         context = await self.get_context(session_id)
         context.last_action = action
-        context.updated_at = datetime.utcnow().isoformat()
-    
+        await self._save(context)
+
     async def update_ui_context(self, session_id: str, ui_context: Dict[str, Any]):
         """Update UI context (current page, active entities, etc.)"""
         context = await self.get_context(session_id)
         context.ui_context = ui_context
-        context.updated_at = datetime.utcnow().isoformat()
-    
+        await self._save(context)
+
     async def get_messages_for_llm(self, session_id: str) -> List[Dict[str, str]]:
         """
         Get conversation history formatted for LLM
-        
+
         Returns:
             List of message dicts with 'role' and 'content'
         """
-        
+
         context = await self.get_context(session_id)
-        
+
         messages = []
         for msg in context.history[-self.max_history * 2:]:  # Last N exchanges
             messages.append({
                 "role": msg.role,
                 "content": msg.content
             })
-        
+
         return messages
-    
+
     async def clear_context(self, session_id: str):
         """Clear conversation context"""
-        if session_id in _sessions:
-            del _sessions[session_id]
+        if await self._call("delete", session_id):
             logger.info(f"Cleared context for session {session_id}")
-    
+
     async def get_context_summary(self, session_id: str) -> Dict[str, Any]:
         """
         Get summary of conversation context
-        
+
         Returns:
             {
                 "session_id": "...",
@@ -200,9 +252,9 @@ class ContextManager:
                 "updated_at": "..."
             }
         """
-        
+
         context = await self.get_context(session_id)
-        
+
         return {
             "session_id": context.session_id,
             "message_count": len(context.history),
@@ -213,34 +265,48 @@ class ContextManager:
             "created_at": context.created_at,
             "updated_at": context.updated_at
         }
-    
-    async def cleanup_expired(self):
+
+    async def cleanup_expired(self) -> int:
         """Remove expired sessions"""
-        expired = []
-        cutoff = datetime.utcnow() - timedelta(hours=self.ttl_hours)
-        
-        for session_id, context in _sessions.items():
-            created = datetime.fromisoformat(context.created_at)
-            if created < cutoff:
-                expired.append(session_id)
-        
-        for session_id in expired:
-            del _sessions[session_id]
-        
-        if expired:
-            logger.info(f"Cleaned up {len(expired)} expired sessions")
+        removed = await self._call("sweep")
+        if removed:
+            logger.info(f"Cleaned up {removed} expired sessions")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Session count, size estimate and eviction counters of the store"""
+        return {
+            "ttl_seconds": self.store.ttl_seconds,
+            "sweeper_running": self._sweeper is not None and not self._sweeper.done(),
+            **self.store.stats()
+        }
 
+    def start_sweeper(self, interval_seconds: float = settings.SESSION_SWEEP_SECONDS):
+        """Schedule periodic cleanup on the running event loop (application startup)"""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_loop(interval_seconds))
 
-# Global instance
-context_manager = ContextManager()
+    async def stop_sweeper(self):
+        """Cancel the sweeper and close the store (application shutdown)"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+        if self._store is not None:
+            self._store.close()
+            self._store = None
 
+    async def _sweep_loop(self, interval_seconds: float):
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.cleanup_expired()
+            except Exception as e:
+                logger.error(f"Session cleanup failed: {e}", exc_info=True)
 
-# Background task to cleanup expired sessions
-async def cleanup_task():
-    """Background task to cleanup expired sessions every hour"""
-    while True:
-        await asyncio.sleep(3600)  # 1 hour
-        try:
-            await context_manager.cleanup_expired()
-        except Exception as e:
-            logger.error(f"Cleanup task failed: {e}", exc_info=True)
+
+# Global instance
+context_manager = ContextManager()
@@ -0,0 +1,149 @@
+"""
+Daily Facts Service
+Period totals and monthly series from the trigger-maintained daily_facts table.
+
+daily_facts holds one row per day (see migrations/010_daily_facts.sql), so a month / quarter /
+year / FY KPI sums at most ~366 rows however much history the database holds. check / rebuild
+compare against and recompute from the source tables, e.g. after bulk edits with triggers off.
+
+CLI:
+    python -m app.services.daily_facts_service check
+    python -m app.services.daily_facts_service rebuild
+"""
+import sqlite3
+import logging
+from typing import List, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+FACT_COLUMNS = (
+    "po_count", "ordered_value", "po_ordered_qty", "po_dispatched_qty",
+    "dc_count", "dispatched_qty", "invoice_count", "invoiced_value",
+)
+
+# Source-of-truth aggregation the facts must match
+_EXPECTED_SQL = """
+    SELECT day,
+           SUM(po_count) AS po_count, SUM(ordered_value) AS ordered_value,
+           SUM(po_ordered_qty) AS po_ordered_qty, SUM(po_dispatched_qty) AS po_dispatched_qty,
+           SUM(dc_count) AS dc_count, SUM(dispatched_qty) AS dispatched_qty,
+           SUM(invoice_count) AS invoice_count, SUM(invoiced_value) AS invoiced_value
+    FROM (
+        SELECT po.po_date_iso AS day, 1 AS po_count, COALESCE(po.po_value, 0) AS ordered_value,
+               COALESCE((SELECT SUM(ordered_qty) FROM po_item_rollup r WHERE r.po_number = po.po_number), 0) AS po_ordered_qty,
+               COALESCE((SELECT SUM(dispatched_qty) FROM po_item_rollup r WHERE r.po_number = po.po_number), 0) AS po_dispatched_qty,
+               0 AS dc_count, 0 AS dispatched_qty, 0 AS invoice_count, 0 AS invoiced_value
+        FROM purchase_orders po WHERE po.po_date_iso IS NOT NULL
+        UNION ALL
+        SELECT dc.dc_date_iso, 0, 0, 0, 0, 1,
+               COALESCE((SELECT SUM(dispatch_qty) FROM delivery_challan_items dci WHERE dci.dc_number = dc.dc_number), 0),
+               0, 0
+        FROM delivery_challans dc WHERE dc.dc_date_iso IS NOT NULL
+        UNION ALL
+        SELECT invoice_date_iso, 0, 0, 0, 0, 0, 0, 1, COALESCE(total_invoice_value, 0)
+        FROM gst_invoices WHERE invoice_date_iso IS NOT NULL
+    )
+    GROUP BY day
+"""
+
+# Tolerance for REAL sums accumulated by deltas
+_EPSILON = 1e-6
+
+
+class DailyFactsService:
+    """Read, check and rebuild daily_facts"""
+
+    def totals(self, db: sqlite3.Connection, start_date: str, end_date: Optional[str] = None) -> Dict[str, Any]:
+        """Sum of every fact column for days in [start_date, end_date] (end open if None)"""
+        query = f"""
+            SELECT {', '.join(f'COALESCE(SUM({c}), 0) AS {c}' for c in FACT_COLUMNS)}
+            FROM daily_facts
+            WHERE day >= ?
+        """
+        params: List[Any] = [start_date]
+        if end_date:
+            query += " AND day <= ?"
+            params.append(end_date)
+        return dict(db.execute(query, params).fetchone())
+
+    def monthly(self, db: sqlite3.Connection, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        """Per-month sums (month = 'MM') for days in [start_date, end_date)"""
+        rows = db.execute(f"""
+            SELECT substr(day, 6, 2) AS month, {', '.join(f'SUM({c}) AS {c}' for c in FACT_COLUMNS)}
+            FROM daily_facts
+            WHERE day >= ? AND day < ?
+            GROUP BY month
+            ORDER BY month
+        """, (start_date, end_date)).fetchall()
+        return [dict(row) for row in rows]
+
+    def check(self, db: sqlite3.Connection) -> Dict[str, Any]:
+        """
+        Compare daily_facts against a full aggregation of the source tables.
+        Days whose facts are all zero count as absent.
+        Returns {"consistent": bool, "days_checked": int, "mismatches": [...]}.
+        """
+        expected = {row["day"]: dict(row) for row in db.execute(_EXPECTED_SQL)}
+        actual = {row["day"]: dict(row) for row in db.execute("SELECT * FROM daily_facts")}
+
+        mismatches = []
+        for day in sorted(set(expected) | set(actual)):
+            exp = expected.get(day) or {}
+            act = actual.get(day) or {}
+            diff = {
+                c: {"expected": exp.get(c, 0), "actual": act.get(c, 0)}
+                for c in FACT_COLUMNS
+                if abs((exp.get(c) or 0) - (act.get(c) or 0)) > _EPSILON
+            }
+            if diff:
+                mismatches.append({"day": day, "columns": diff})
+
+        if mismatches:
+            logger.warning(f"daily_facts inconsistent: {len(mismatches)} days differ")
+
+        return {
+            "consistent": not mismatches,
+            "days_checked": len(set(expected) | set(actual)),
+            "mismatches": mismatches
+        }
+
+    def rebuild(self, db: sqlite3.Connection) -> int:
+        """
+        Recompute every day from the source tables.
+        Caller controls the transaction. Returns the number of days written.
+        """
+        db.execute("DELETE FROM daily_facts")
+        cursor = db.execute(f"""
+            INSERT INTO daily_facts (day, {', '.join(FACT_COLUMNS)})
+            {_EXPECTED_SQL}
+        """)
+        logger.info(f"daily_facts rebuilt: {cursor.rowcount} days")
+        return cursor.rowcount
+
+
+# Singleton instance
+daily_facts_service = DailyFactsService()
+
+
+if __name__ == "__main__":
+    import sys
+    from app.db import get_connection, db_transaction
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "check"
+    conn = get_connection()
+    try:
+        if command == "rebuild":
+            with db_transaction(conn):
+                count = daily_facts_service.rebuild(conn)
+            print(f"✅ Rebuilt daily_facts ({count} days)")
+        else:
+            result = daily_facts_service.check(conn)
+            if result["consistent"]:
+                print(f"✅ daily_facts consistent ({result['days_checked']} days)")
+            else:
+                print(f"❌ {len(result['mismatches'])} inconsistent days:")
+                for mismatch in result["mismatches"][:50]:
+                    print(f"   {mismatch}")
+                sys.exit(1)
+    finally:
+        conn.close()
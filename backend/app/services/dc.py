@@ -16,6 +16,7 @@ from app.core.exceptions import (
     BusinessRuleViolation
 )
 from app.models import DCCreate
+from app.utils.date_utils import to_iso_date
 
 logger = logging.getLogger(__name__)
 
@@ -156,12 +157,12 @@ def create_dc(dc: DCCreate, items: List[dict], db: sqlite3.Connection) -> Servic
         # Insert DC header
         db.execute("""
             INSERT INTO delivery_challans
-            (dc_number, dc_date, po_number, department_no, consignee_name, consignee_gstin,
+            (dc_number, dc_date, dc_date_iso, po_number, department_no, consignee_name, consignee_gstin,
              consignee_address, inspection_company, eway_bill_no, vehicle_no, lr_no,
              transporter, mode_of_transport, remarks)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """, (
-            dc.dc_number, dc.dc_date, dc.po_number, dc.department_no, dc.consignee_name,
+            dc.dc_number, dc.dc_date, to_iso_date(dc.dc_date), dc.po_number, dc.department_no, dc.consignee_name,
             dc.consignee_gstin, dc.consignee_address, dc.inspection_company, dc.eway_bill_no,
             dc.vehicle_no, dc.lr_no, dc.transporter, dc.mode_of_transport, dc.remarks
         ))
@@ -238,12 +239,12 @@ def update_dc(dc_number: str, dc: DCCreate, items: List[dict], db: sqlite3.Conne
         # Update Header
         db.execute("""
             UPDATE delivery_challans SET
-            dc_date = ?, po_number = ?, department_no = ?, consignee_name = ?, consignee_gstin = ?,
+            dc_date = ?, dc_date_iso = ?, po_number = ?, department_no = ?, consignee_name = ?, consignee_gstin = ?,
             consignee_address = ?, inspection_company = ?, eway_bill_no = ?, vehicle_no = ?, lr_no = ?,
             transporter = ?, mode_of_transport = ?, remarks = ?
             WHERE dc_number = ?
         """, (
-            dc.dc_date, dc.po_number, dc.department_no, dc.consignee_name,
+            dc.dc_date, to_iso_date(dc.dc_date), dc.po_number, dc.department_no, dc.consignee_name,
             dc.consignee_gstin, dc.consignee_address, dc.inspection_company, dc.eway_bill_no,
             dc.vehicle_no, dc.lr_no, dc.transporter, dc.mode_of_transport, dc.remarks, dc_number
         ))
@@ -0,0 +1,267 @@
+"""
+Export Job Service
+Asynchronous report exports rendered to disk by a background worker pool.
+
+A request inserts a row into `exports` (migrations/011_exports.sql) and hands the job id to a
+thread pool. The worker streams the report (app.services.export_service) into a .part file on a
+reader-lane connection, publishing progress with short writer-lane updates, then renames it into
+place. Requests whose content key (report type + format + parameters) matches a queued, running
+or recently completed job get that job back instead of a new render.
+
+Completed artifacts expire after EXPORT_RETENTION_HOURS; above EXPORT_MAX_TOTAL_MB the least
+recently downloaded ones are evicted first.
+"""
+import os
+import json
+import time
+import uuid
+import hashlib
+import sqlite3
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.db import ConnectionPool, get_pool
+from app.services.export_service import export_service
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DIR = Path(__file__).parent.parent.parent / "exports"
+
+# Minimum seconds between progress writes for one job
+PROGRESS_INTERVAL_SECONDS = 1.0
+
+_ACTIVE_STATUSES = ("queued", "running")
+
+
+def _job_dict(row: sqlite3.Row) -> Dict[str, Any]:
+    job = dict(row)
+    job["params"] = json.loads(job["params"])
+    job.pop("file_path", None)
+    total = job.get("rows_total")
+    if job["status"] == "completed":
+        job["progress_pct"] = 100.0
+    elif total:
+        job["progress_pct"] = round(min(job["rows_written"] / total, 1.0) * 100, 1)
+    else:
+        job["progress_pct"] = 0.0
+    return job
+
+
+class ExportJobService:
+    """Queue, render, track and evict export jobs"""
+
+    def __init__(
+        self,
+        pool: Optional[ConnectionPool] = None,
+        export_dir: Path = EXPORT_DIR,
+        workers: int = settings.EXPORT_WORKERS,
+    ):
+        self._pool = pool
+        self.export_dir = Path(export_dir)
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def pool(self) -> ConnectionPool:
+        return self._pool or get_pool()
+
+    def content_key(self, report_type: str, fmt: str, params: Dict[str, Any]) -> str:
+        """Stable hash identifying what a job renders"""
+        payload = json.dumps({"report_type": report_type, "format": fmt, "params": params}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # ---- requests -------------------------------------------------------------------------
+
+    def submit(self, db: sqlite3.Connection, report_type: str, fmt: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Queue a date-summary export (report_type = po | challan | invoice), or return the matching
+        job from the freshness window. Commits so the worker sees the row, then dispatches it.
+        """
+        key = self.content_key(report_type, fmt, params)
+        existing = db.execute("""
+            SELECT * FROM exports
+            WHERE content_key = ?
+              AND (status IN ('queued', 'running')
+                   OR (status = 'completed' AND completed_at >= datetime('now', ?)))
+            ORDER BY created_at DESC
+            LIMIT 1
+        """, (key, f"-{int(settings.EXPORT_FRESHNESS_SECONDS)} seconds")).fetchone()
+
+        if existing and (existing["status"] != "completed" or Path(existing["file_path"]).exists()):
+            logger.info(f"Export {existing['id']} reused for identical request ({report_type}, {fmt})")
+            return {**_job_dict(existing), "deduplicated": True}
+
+        job_id = str(uuid.uuid4())
+        row = db.execute("""
+            INSERT INTO exports (id, content_key, report_type, format, params, file_name)
+            VALUES (?, ?, ?, ?, ?, ?)
+            RETURNING *
+        """, (
+            job_id, key, report_type, fmt, json.dumps(params, sort_keys=True),
+            export_service.filename(report_type, params["start_date"], params["end_date"], fmt)
+        )).fetchone()
+        job = _job_dict(row)
+        db.commit()
+
+        self._get_executor().submit(self._run, job_id)
+        logger.info(f"Export {job_id} queued ({report_type}, {fmt})")
+        return {**job, "deduplicated": False}
+
+    def get(self, db: sqlite3.Connection, job_id: str) -> Optional[Dict[str, Any]]:
+        row = db.execute("SELECT * FROM exports WHERE id = ?", (job_id,)).fetchone()
+        return _job_dict(row) if row else None
+
+    def list_recent(self, db: sqlite3.Connection, limit: int = 50) -> List[Dict[str, Any]]:
+        rows = db.execute("""
+            SELECT * FROM exports ORDER BY created_at DESC, rowid DESC LIMIT ?
+        """, (limit,)).fetchall()
+        return [_job_dict(row) for row in rows]
+
+    def artifact(self, db: sqlite3.Connection, job_id: str) -> Optional[Path]:
+        """Path of a completed job's file (None if missing / not completed); records the access"""
+        row = db.execute("""
+            SELECT file_path FROM exports WHERE id = ? AND status = 'completed'
+        """, (job_id,)).fetchone()
+        if not row or not row["file_path"] or not Path(row["file_path"]).exists():
+            return None
+        db.execute("UPDATE exports SET last_accessed_at = CURRENT_TIMESTAMP WHERE id = ?", (job_id,))
+        return Path(row["file_path"])
+
+    # ---- worker ---------------------------------------------------------------------------
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="export")
+            return self._executor
+
+    def _write(self, query: str, params: tuple = ()) -> Optional[sqlite3.Row]:
+        """Short writer-lane statement, committed immediately"""
+        with self.pool.connection(readonly=False) as db:
+            try:
+                row = db.execute(query, params).fetchone()
+                db.commit()
+                return row
+            except Exception:
+                db.rollback()
+                raise
+
+    def _run(self, job_id: str) -> None:
+        job = self._write("""
+            UPDATE exports SET status = 'running', started_at = CURRENT_TIMESTAMP
+            WHERE id = ? AND status = 'queued'
+            RETURNING *
+        """, (job_id,))
+        if job is None:
+            return
+
+        params = json.loads(job["params"])
+        args = (job["report_type"], params["start_date"], params["end_date"])
+        self.export_dir.mkdir(parents=True, exist_ok=True)
+        final_path = self.export_dir / f"{job_id}.{job['format']}"
+        part_path = final_path.with_name(final_path.name + ".part")
+
+        last_progress = time.monotonic()
+
+        def progress(rows_written: int) -> None:
+            nonlocal last_progress
+            if time.monotonic() - last_progress >= PROGRESS_INTERVAL_SECONDS:
+                last_progress = time.monotonic()
+                self._write("UPDATE exports SET rows_written = ? WHERE id = ?", (rows_written, job_id))
+
+        try:
+            with self.pool.connection(readonly=True) as db:
+                rows_total = export_service.count_rows(db, *args)
+                self._write("UPDATE exports SET rows_total = ? WHERE id = ?", (rows_total, job_id))
+
+                with open(part_path, "wb") as f:
+                    for chunk in export_service.render_date_summary(db, *args, job["format"], progress=progress):
+                        f.write(chunk)
+
+            os.replace(part_path, final_path)
+            self._write("""
+                UPDATE exports
+                SET status = 'completed', rows_written = rows_total, file_path = ?, file_size = ?,
+                    completed_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, (str(final_path), final_path.stat().st_size, job_id))
+            logger.info(f"Export {job_id} completed ({final_path.stat().st_size} bytes)")
+        except Exception as e:
+            logger.error(f"Export {job_id} failed: {e}", exc_info=True)
+            part_path.unlink(missing_ok=True)
+            self._write("""
+                UPDATE exports SET status = 'failed', error = ?, completed_at = CURRENT_TIMESTAMP WHERE id = ?
+            """, (str(e), job_id))
+            return
+
+        try:
+            self.evict()
+        except Exception as e:
+            logger.warning(f"Export eviction failed: {e}")
+
+    # ---- lifecycle ------------------------------------------------------------------------
+
+    def evict(self) -> int:
+        """
+        Expire artifacts past the retention period, then least recently used ones beyond the
+        size cap. Returns the number of artifacts removed.
+        """
+        with self.pool.connection(readonly=False) as db:
+            completed = db.execute("""
+                SELECT id, file_path, file_size,
+                       completed_at < datetime('now', ?) AS past_retention
+                FROM exports
+                WHERE status = 'completed'
+                ORDER BY COALESCE(last_accessed_at, completed_at) DESC
+            """, (f"-{int(settings.EXPORT_RETENTION_HOURS)} hours",)).fetchall()
+
+            budget = settings.EXPORT_MAX_TOTAL_MB * 1024 * 1024
+            kept_bytes = 0
+            evicted = []
+            for row in completed:
+                if not row["past_retention"] and kept_bytes + (row["file_size"] or 0) <= budget:
+                    kept_bytes += row["file_size"] or 0
+                    continue
+                evicted.append(row["id"])
+                if row["file_path"]:
+                    Path(row["file_path"]).unlink(missing_ok=True)
+
+            if evicted:
+                db.executemany("""
+                    UPDATE exports SET status = 'expired', file_path = NULL WHERE id = ?
+                """, [(job_id,) for job_id in evicted])
+                db.commit()
+                logger.info(f"Evicted {len(evicted)} export artifacts")
+            return len(evicted)
+
+    def recover(self) -> int:
+        """Startup: fail jobs a previous process left queued / running and drop their partial files"""
+        with self.pool.connection(readonly=False) as db:
+            count = db.execute(f"""
+                UPDATE exports SET status = 'failed', error = 'Interrupted by server restart',
+                                   completed_at = CURRENT_TIMESTAMP
+                WHERE status IN ({', '.join('?' * len(_ACTIVE_STATUSES))})
+            """, _ACTIVE_STATUSES).rowcount
+            db.commit()
+        if self.export_dir.exists():
+            for part in self.export_dir.glob("*.part"):
+                part.unlink(missing_ok=True)
+        if count:
+            logger.warning(f"Marked {count} interrupted export jobs as failed")
+        return count
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stop the worker pool; without `wait`, queued jobs are dropped (recover() fails them on next start)"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=not wait)
+                self._executor = None
+
+
+# Singleton instance
+export_job_service = ExportJobService()
@@ -0,0 +1,238 @@
+"""
+Export Service
+Streams date-wise PO / Challan / Invoice summaries as XLSX or CSV.
+
+Rows are pulled from the cursor in batches and serialized straight into output chunks
+(app.utils.export_stream), so memory stays flat regardless of the date range.
+"""
+import sqlite3
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from app.db import get_pool
+from app.utils.export_stream import (
+    stream_xlsx, stream_csv, styled, Cell,
+    XLSX_MEDIA_TYPE, CSV_MEDIA_TYPE,
+    STYLE_TITLE, STYLE_SUBTITLE, STYLE_HEADER, STYLE_TEXT, STYLE_NUMBER
+)
+
+logger = logging.getLogger(__name__)
+
+EXPORT_BATCH_SIZE = 500
+
+EXPORT_FORMATS = {
+    "xlsx": XLSX_MEDIA_TYPE,
+    "csv": CSV_MEDIA_TYPE,
+}
+
+DEFAULT_COMPANY_NAME = "SENSOVISION SYSTEMS"
+
+# One row per PO / DC; quantities come from the trigger-maintained rollup
+_PO_QUERY = """
+    SELECT
+        po.po_number,
+        po.po_date,
+        COALESCE(SUM(r.ordered_qty), 0) as total_ordered,
+        COALESCE(SUM(r.dispatched_qty), 0) as total_dispatched,
+        COALESCE(SUM(r.ordered_qty), 0) - COALESCE(SUM(r.dispatched_qty), 0) as pending_qty,
+        CASE
+            WHEN COALESCE(SUM(r.dispatched_qty), 0) = 0 THEN 'Not Started'
+            WHEN COALESCE(SUM(r.dispatched_qty), 0) >= COALESCE(SUM(r.ordered_qty), 0) THEN 'Completed'
+            ELSE 'In Progress'
+        END as status
+    FROM purchase_orders po
+    LEFT JOIN po_item_rollup r ON r.po_number = po.po_number
+    WHERE po.po_date_iso BETWEEN ? AND ?
+    GROUP BY po.po_number
+    ORDER BY po.po_date_iso DESC
+"""
+
+_CHALLAN_QUERY = """
+    SELECT
+        dc.dc_number,
+        dc.dc_date,
+        dc.po_number,
+        COALESCE((SELECT SUM(dci.dispatch_qty) FROM delivery_challan_items dci WHERE dci.dc_number = dc.dc_number), 0) as dispatched_qty,
+        CASE
+            WHEN EXISTS (SELECT 1 FROM gst_invoice_dc_links link WHERE link.dc_number = dc.dc_number) THEN 'Invoiced'
+            ELSE 'Not Invoiced'
+        END as invoice_status
+    FROM delivery_challans dc
+    WHERE dc.dc_date_iso BETWEEN ? AND ?
+    ORDER BY dc.dc_date_iso DESC
+"""
+
+# One row per invoice item (legacy SALE SUMMARY layout)
+_SALE_SUMMARY_QUERY = """
+    SELECT
+        i.invoice_number,
+        i.invoice_date_iso,
+        i.linked_dc_numbers,
+        po.supplier_name,
+        po.po_number,
+        ii.description,
+        ii.quantity,
+        ii.taxable_value,
+        i.total_invoice_value
+    FROM gst_invoices i
+    LEFT JOIN gst_invoice_items ii ON i.invoice_number = ii.invoice_number
+    LEFT JOIN purchase_orders po ON po.po_number = (
+        SELECT MIN(pl.po_number) FROM gst_invoice_po_links pl WHERE pl.invoice_number = i.invoice_number
+    )
+    WHERE i.invoice_date_iso BETWEEN ? AND ?
+    ORDER BY i.invoice_date_iso DESC, i.invoice_number
+"""
+
+_SIMPLE_LAYOUTS = {
+    "po": {
+        "query": _PO_QUERY,
+        "headers": ["Po Number", "Po Date", "Total Ordered", "Total Dispatched", "Pending Qty", "Status"],
+        "styles": [STYLE_TEXT, STYLE_TEXT, STYLE_NUMBER, STYLE_NUMBER, STYLE_NUMBER, STYLE_TEXT],
+    },
+    "challan": {
+        "query": _CHALLAN_QUERY,
+        "headers": ["Dc Number", "Dc Date", "Po Number", "Dispatched Qty", "Invoice Status"],
+        "styles": [STYLE_TEXT, STYLE_TEXT, STYLE_TEXT, STYLE_NUMBER, STYLE_TEXT],
+    },
+}
+
+SALE_SUMMARY_HEADERS = [
+    "S. No.", "Inv No. & Dt", "DC No.", "Name of Party",
+    "PO & Item Description", "Qty", "Inv Ass. Value",
+    "E.D. 10 %", "ED Cess 2 %", "ED Cess1 %", "Sub Total",
+    "VAT 13%", "CST 2 %", "Other Additons", "Total"
+]
+_SALE_SUMMARY_STYLES = [STYLE_TEXT] * 6 + [STYLE_NUMBER] * 9
+_SALE_SUMMARY_WIDTHS = [15, 15, 15, 25, 30] + [15] * 10
+
+
+ProgressCallback = Callable[[int], None]
+
+
+def _iter_rows(
+    db: sqlite3.Connection, query: str, params: Sequence[Any], progress: Optional[ProgressCallback] = None
+) -> Iterator[sqlite3.Row]:
+    """Iterate a query in EXPORT_BATCH_SIZE batches, reporting rows fetched so far after each batch"""
+    cursor = db.execute(query, params)
+    fetched = 0
+    try:
+        while True:
+            batch = cursor.fetchmany(EXPORT_BATCH_SIZE)
+            if not batch:
+                return
+            yield from batch
+            fetched += len(batch)
+            if progress:
+                progress(fetched)
+    finally:
+        cursor.close()
+
+
+def _display_date(iso_date: str) -> str:
+    """YYYY-MM-DD -> DD/MM/YYYY (other values pass through)"""
+    try:
+        return datetime.strptime(iso_date, '%Y-%m-%d').strftime('%d/%m/%Y')
+    except (TypeError, ValueError):
+        return iso_date or ""
+
+
+class ExportService:
+    """Date-summary exports rendered as byte streams"""
+
+    def filename(self, entity: str, start_date: str, end_date: str, fmt: str) -> str:
+        return f"{entity}_summary_{start_date}_to_{end_date}.{fmt}"
+
+    def count_rows(self, db: sqlite3.Connection, entity: str, start_date: str, end_date: str) -> int:
+        """Number of data rows the export will contain"""
+        query = _SALE_SUMMARY_QUERY if entity == "invoice" else _SIMPLE_LAYOUTS[entity]["query"]
+        return db.execute(f"SELECT COUNT(*) FROM ({query})", (start_date, end_date)).fetchone()[0]
+
+    def stream_date_summary(self, entity: str, start_date: str, end_date: str, fmt: str = "xlsx") -> Iterator[bytes]:
+        """
+        Render with a reader-lane connection borrowed for the life of the stream
+        (request-scoped dependencies may be released before a streaming body finishes).
+        """
+        with get_pool().connection(readonly=True) as db:
+            yield from self.render_date_summary(db, entity, start_date, end_date, fmt)
+
+    def render_date_summary(
+        self, db: sqlite3.Connection, entity: str, start_date: str, end_date: str, fmt: str = "xlsx",
+        progress: Optional[ProgressCallback] = None
+    ) -> Iterator[bytes]:
+        """
+        Yield the export for entity (po | challan | invoice) as chunks of XLSX or CSV bytes.
+        `progress` is called with the number of data rows fetched so far.
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+
+        if entity == "invoice":
+            rows = self._sale_summary_rows(db, start_date, end_date, with_title=(fmt == "xlsx"), progress=progress)
+            if fmt == "csv":
+                return stream_csv(rows)
+            return stream_xlsx(
+                rows,
+                sheet_title="INVOICE Summary",
+                column_widths=_SALE_SUMMARY_WIDTHS,
+                merged_cells=["A1:O1", "A2:O2"]
+            )
+
+        layout = _SIMPLE_LAYOUTS.get(entity)
+        if layout is None:
+            raise ValueError(f"Invalid entity type: {entity}")
+
+        rows = self._simple_rows(db, layout, start_date, end_date, progress)
+        if fmt == "csv":
+            return stream_csv(rows)
+        return stream_xlsx(
+            rows,
+            sheet_title=f"{entity.upper()} Summary",
+            column_widths=[15] * len(layout["headers"])
+        )
+
+    def _simple_rows(
+        self, db: sqlite3.Connection, layout: Dict[str, Any], start_date: str, end_date: str,
+        progress: Optional[ProgressCallback] = None
+    ) -> Iterator[List[Any]]:
+        yield styled(layout["headers"], [STYLE_HEADER] * len(layout["headers"]))
+        for row in _iter_rows(db, layout["query"], (start_date, end_date), progress):
+            yield styled(tuple(row), layout["styles"])
+
+    def _sale_summary_rows(
+        self, db: sqlite3.Connection, start_date: str, end_date: str, with_title: bool,
+        progress: Optional[ProgressCallback] = None
+    ) -> Iterator[List[Any]]:
+        if with_title:
+            # Company name from POs (we are the supplier on all of them)
+            company_row = db.execute(
+                "SELECT supplier_name FROM purchase_orders WHERE supplier_name IS NOT NULL LIMIT 1"
+            ).fetchone()
+            yield [Cell(company_row[0] if company_row else DEFAULT_COMPANY_NAME, STYLE_TITLE)]
+            yield [Cell("SALE SUMMARY", STYLE_SUBTITLE)]
+
+        yield styled(SALE_SUMMARY_HEADERS, [STYLE_HEADER] * len(SALE_SUMMARY_HEADERS))
+
+        for s_no, row in enumerate(_iter_rows(db, _SALE_SUMMARY_QUERY, (start_date, end_date), progress), 1):
+            po_no = row["po_number"] or ""
+            desc = row["description"] or ""
+            taxable_val = float(row["taxable_value"] or 0)
+
+            # Legacy excise / VAT / CST columns are kept at 0 for GST invoices
+            yield styled([
+                s_no,
+                f"{row['invoice_number']}\n{_display_date(row['invoice_date_iso'])}",
+                row["linked_dc_numbers"],
+                row["supplier_name"] or "N/A",
+                f"{desc}\n(PO: {po_no})" if po_no else desc,
+                row["quantity"] or 0,
+                taxable_val,
+                0.0, 0.0, 0.0,
+                taxable_val,
+                0.0, 0.0, 0.0,
+                float(row["total_invoice_value"] or 0)
+            ], _SALE_SUMMARY_STYLES)
+
+
+# Singleton instance
+export_service = ExportService()
@@ -0,0 +1,136 @@
+"""
+Shared HTTP clients for LLM providers
+One long-lived httpx.AsyncClient per provider, so voice turns reuse warm connections instead of
+paying DNS + TCP + TLS setup on every request.
+
+HTTP/2 is negotiated when the optional `h2` package is installed (httpx[http2]); otherwise the
+clients fall back to HTTP/1.1 keep-alive. Response hooks count requests and new connections per
+provider so reuse can be checked at /api/health/http-pool.
+"""
+import logging
+import weakref
+from collections import Counter
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Unary request timeouts per provider (streams override the read timeout)
+PROVIDER_TIMEOUTS = {
+    "groq": httpx.Timeout(30.0, connect=5.0),
+    "openrouter": httpx.Timeout(30.0, connect=5.0),
+    "google": httpx.Timeout(30.0, connect=5.0),
+    "ollama": httpx.Timeout(60.0, connect=2.0),
+}
+DEFAULT_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+
+STREAM_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+
+class _ProviderStats:
+    """Request / connection counters for one provider client"""
+
+    def __init__(self):
+        self.requests = 0
+        self.connections_opened = 0
+        self.errors = 0
+        self.http_versions: Counter = Counter()
+        # Network streams seen so far; a response on an unseen stream means a new connection
+        self._streams: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+    def record(self, response: httpx.Response) -> None:
+        self.requests += 1
+        self.http_versions[response.http_version] += 1
+        if response.status_code >= 500:
+            self.errors += 1
+
+        stream = response.extensions.get("network_stream")
+        if stream is None:
+            return
+        try:
+            if stream not in self._streams:
+                self._streams.add(stream)
+                self.connections_opened += 1
+        except TypeError:
+            # Stream type without weakref support: count every response as a new connection
+            self.connections_opened += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        reused = max(self.requests - self.connections_opened, 0)
+        return {
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "reused_requests": reused,
+            "reuse_ratio": round(reused / self.requests, 3) if self.requests else 0.0,
+            "server_errors": self.errors,
+            "http_versions": dict(self.http_versions),
+        }
+
+
+class HTTPClientPool:
+    """Lazily created, long-lived AsyncClient per provider"""
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self._transport = transport  # tests inject httpx.MockTransport
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._stats: Dict[str, _ProviderStats] = {}
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_SECONDS,
+        )
+
+    def client(self, provider: str) -> httpx.AsyncClient:
+        """The shared client for a provider (created on first use)"""
+        client = self._clients.get(provider)
+        if client is None or client.is_closed:
+            stats = self._stats.setdefault(provider, _ProviderStats())
+
+            async def on_response(response: httpx.Response) -> None:
+                stats.record(response)
+
+            client = httpx.AsyncClient(
+                timeout=PROVIDER_TIMEOUTS.get(provider, DEFAULT_TIMEOUT),
+                limits=self._limits(),
+                http2=settings.LLM_HTTP2 and HTTP2_AVAILABLE,
+                transport=self._transport,
+                event_hooks={"response": [on_response]},
+            )
+            self._clients[provider] = client
+            logger.info(
+                f"HTTP client created for {provider} "
+                f"(http2={'on' if settings.LLM_HTTP2 and HTTP2_AVAILABLE else 'off'})"
+            )
+        return client
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "http2_available": HTTP2_AVAILABLE,
+            "providers": {
+                provider: {
+                    "open": provider in self._clients and not self._clients[provider].is_closed,
+                    **stats.to_dict()
+                }
+                for provider, stats in self._stats.items()
+            }
+        }
+
+    async def aclose(self) -> None:
+        """Close every client (application shutdown)"""
+        clients, self._clients = self._clients, {}
+        for provider, client in clients.items():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Closing HTTP client for {provider} failed: {e}")
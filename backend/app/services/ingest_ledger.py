@@ -0,0 +1,93 @@
+"""
+PO Ingestion Ledger
+Records every uploaded PO file in po_ingest_ledger (migrations/014_po_ingest_ledger.sql).
+
+Files are identified by the SHA-256 of their raw bytes. A digest counts as already ingested while
+the PO it produced still carries the same content hash: once the PO is amended by another file or
+deleted, uploading the older file again goes through the normal parse + merge path.
+"""
+import hashlib
+import sqlite3
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+# Outcomes after which the stored PO holds this file's content
+_WRITTEN_STATUSES = ("created", "updated", "unchanged", "duplicate")
+
+_INSERT_SQL = """
+    INSERT INTO po_ingest_ledger
+    (file_sha256, file_name, file_size, po_number, amend_no, content_hash, status, message, source)
+    VALUES (?, ?, ?, ?,
+            (SELECT amend_no FROM purchase_orders WHERE po_number = ?),
+            (SELECT content_hash FROM purchase_orders WHERE po_number = ?),
+            ?, ?, ?)
+"""
+
+
+class LedgerEntry(NamedTuple):
+    """One upload outcome to record"""
+    file_sha256: str
+    file_name: Optional[str]
+    file_size: int
+    po_number: Optional[int]
+    status: str  # created | updated | unchanged | duplicate | superseded | failed
+    message: str
+    source: str = "upload"
+
+
+class IngestLedger:
+    """Dedupe lookups and audit records for uploaded PO files"""
+
+    @staticmethod
+    def digest(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    def find_ingested(self, db: sqlite3.Connection, digests: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        {digest: {"po_number", "amend_no"}} for the digests whose PO still holds the content
+        they produced
+        """
+        digests = list(dict.fromkeys(digests))
+        found = {}
+        for i in range(0, len(digests), 500):
+            chunk = digests[i:i + 500]
+            rows = db.execute(f"""
+                SELECT l.file_sha256, p.po_number, p.amend_no
+                FROM po_ingest_ledger l
+                JOIN purchase_orders p ON p.po_number = l.po_number AND p.content_hash = l.content_hash
+                WHERE l.file_sha256 IN ({', '.join('?' * len(chunk))})
+            """, chunk).fetchall()
+            found.update({row[0]: {"po_number": row[1], "amend_no": row[2]} for row in rows})
+        return found
+
+    def record(self, db: sqlite3.Connection, entries: List[LedgerEntry]) -> None:
+        """Append entries; amend_no / content_hash are read from the PO as written (caller commits)"""
+        db.executemany(_INSERT_SQL, [
+            (
+                e.file_sha256, e.file_name, e.file_size, e.po_number,
+                *(2 * [e.po_number if e.status in _WRITTEN_STATUSES else None]),
+                e.status, e.message, e.source
+            )
+            for e in entries
+        ])
+
+    def list_entries(
+        self,
+        db: sqlite3.Connection,
+        po_number: Optional[int] = None,
+        file_sha256: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Ledger rows, newest first"""
+        conditions, params = [], []
+        for column, value in (("po_number", po_number), ("file_sha256", file_sha256), ("status", status)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = db.execute(f"SELECT * FROM po_ingest_ledger {where} ORDER BY id DESC LIMIT ?", (*params, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+
+# Singleton instance
+ingest_ledger = IngestLedger()
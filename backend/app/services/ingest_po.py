@@ -1,159 +1,205 @@
 """
 PO Ingestion Service - Writes scraper output to database
 Normalizes data into items and deliveries tables
+
+ingest_po writes one PO; ingest_many writes a chunk of parsed POs with one executemany per
+table (used by the batch upload pipeline, app.services.po_batch_ingest).
+
+Re-uploaded POs (amendments) are merged rather than replaced: items are matched by
+(po_number, po_item_no) and deliveries by lot_no, so only changed rows are touched and item ids
+referenced by delivery challans survive. A PO whose content hash matches the stored one is
+skipped without any write.
 """
+import json
 import uuid
+import hashlib
 import sqlite3
-from typing import Dict, List, Tuple
-from app.utils.date_utils import normalize_date
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from app.utils.date_utils import normalize_date, to_iso_date
 from app.utils.number_utils import to_int, to_float
+from app.services.search_service import search_service
+
+_HEADER_COLUMNS = (
+    "po_number", "po_date", "po_date_iso", "supplier_name", "supplier_gstin", "supplier_code", "supplier_phone",
+    "supplier_fax", "supplier_email", "department_no", "enquiry_no", "enquiry_date", "quotation_ref",
+    "quotation_date", "rc_no", "order_type", "po_status", "tin_no", "ecc_no", "mpct_no", "po_value", "fob_value",
+    "ex_rate", "currency", "net_po_value", "amend_no", "amend_1_date", "amend_2_date", "inspection_by",
+    "inspection_at", "issuer_name", "issuer_designation", "issuer_phone", "remarks"
+)
+
+# Merged columns (the match keys po_item_no / lot_no excluded; hsn_code and delivered_qty are ours, not the PO's)
+_ITEM_COLUMNS = ("material_code", "material_description", "drg_no", "mtrl_cat", "unit", "po_rate", "ord_qty", "rcd_qty", "item_value")
+_DELIVERY_COLUMNS = ("dely_qty", "dely_date", "dely_date_iso", "entry_allow_date", "dest_code")
+
+_UPSERT_PO_SQL = """
+    INSERT INTO purchase_orders 
+    (po_number, po_date, po_date_iso, supplier_name, supplier_gstin, supplier_code, supplier_phone, supplier_fax, supplier_email, department_no,
+     enquiry_no, enquiry_date, quotation_ref, quotation_date, rc_no, order_type, po_status,
+     tin_no, ecc_no, mpct_no, po_value, fob_value, ex_rate, currency, net_po_value,
+     amend_no, amend_1_date, amend_2_date,
+     inspection_by, inspection_at, issuer_name, issuer_designation, issuer_phone, remarks, content_hash)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(po_number) DO UPDATE SET
+        po_date=excluded.po_date, po_date_iso=excluded.po_date_iso, supplier_name=excluded.supplier_name, supplier_gstin=excluded.supplier_gstin,
+        supplier_code=excluded.supplier_code, supplier_phone=excluded.supplier_phone, supplier_fax=excluded.supplier_fax,
+        supplier_email=excluded.supplier_email,
+        department_no=excluded.department_no, enquiry_no=excluded.enquiry_no, enquiry_date=excluded.enquiry_date,
+        quotation_ref=excluded.quotation_ref, quotation_date=excluded.quotation_date, rc_no=excluded.rc_no,
+        order_type=excluded.order_type, po_status=excluded.po_status, tin_no=excluded.tin_no, ecc_no=excluded.ecc_no,
+        mpct_no=excluded.mpct_no, po_value=excluded.po_value, fob_value=excluded.fob_value, ex_rate=excluded.ex_rate,
+        currency=excluded.currency, net_po_value=excluded.net_po_value, amend_no=excluded.amend_no,
+        amend_1_date=excluded.amend_1_date, amend_2_date=excluded.amend_2_date, inspection_by=excluded.inspection_by,
+        inspection_at=excluded.inspection_at, issuer_name=excluded.issuer_name, issuer_designation=excluded.issuer_designation,
+        issuer_phone=excluded.issuer_phone, remarks=excluded.remarks, content_hash=excluded.content_hash,
+        updated_at=CURRENT_TIMESTAMP
+"""
+
+_INSERT_ITEM_SQL = """
+    INSERT INTO purchase_order_items
+    (id, po_number, po_item_no, material_code, material_description, drg_no, mtrl_cat,
+     unit, po_rate, ord_qty, rcd_qty, item_value, hsn_code, delivered_qty, pending_qty)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, ?)
+"""
+
+# delivered_qty comes from dispatched DCs and is kept across amendments
+_UPDATE_ITEM_SQL = f"""
+    UPDATE purchase_order_items
+    SET {', '.join(f'{c} = ?' for c in _ITEM_COLUMNS)}, pending_qty = ? - COALESCE(delivered_qty, 0)
+    WHERE id = ?
+"""
+
+_INSERT_DELIVERY_SQL = """
+    INSERT INTO purchase_order_deliveries
+    (id, po_item_id, lot_no, dely_qty, dely_date, dely_date_iso, entry_allow_date, dest_code)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_UPDATE_DELIVERY_SQL = f"""
+    UPDATE purchase_order_deliveries
+    SET {', '.join(f'{c} = ?' for c in _DELIVERY_COLUMNS)}
+    WHERE id = ?
+"""
+
+
+class PreparedPO(NamedTuple):
+    """Scraper output converted to row tuples, ready for executemany"""
+    po_number: int
+    header: tuple                        # _HEADER_COLUMNS values
+    items: Dict[Any, tuple]              # po_item_no -> _ITEM_COLUMNS values
+    deliveries: Dict[Any, List[tuple]]   # po_item_no -> [(lot_no, *_DELIVERY_COLUMNS values)]
+    content_hash: str
+
+    @property
+    def delivery_count(self) -> int:
+        return sum(len(rows) for rows in self.deliveries.values())
+
+
+def _fetch_in(db: sqlite3.Connection, query: str, keys: List) -> List[tuple]:
+    """Run query ('... IN ({marks})') over keys in chunks, well below SQLite's bound-parameter limit"""
+    rows = []
+    for i in range(0, len(keys), 500):
+        chunk = keys[i:i + 500]
+        rows.extend(db.execute(query.format(marks=', '.join('?' * len(chunk))), chunk).fetchall())
+    return rows
+
+
+def _same(old: Any, new: Any) -> bool:
+    """Equality tolerant of column affinity (123 read back as '123', 5.0 as 5)"""
+    return old == new or (old is not None and new is not None and str(old) == str(new))
+
+
+def _same_row(old: tuple, new: tuple) -> bool:
+    return all(_same(a, b) for a, b in zip(old, new))
+
+
+def _new_diff(po_number: int, status: str, previous_amend_no: Optional[int] = None) -> Dict[str, Any]:
+    return {
+        "po_number": po_number,
+        "status": status,  # created | updated | unchanged
+        "previous_amend_no": previous_amend_no,
+        "header": [],  # changed header columns
+        "items": {"added": [], "updated": [], "removed": [], "kept": []},  # po_item_no lists
+        "deliveries": {"added": 0, "updated": 0, "removed": 0}
+    }
+
 
 class POIngestionService:
     """Handles PO data ingestion from scraper to database"""
-    
-    def ingest_po(self, db: sqlite3.Connection, po_header: Dict, po_items: List[Dict]) -> Tuple[bool, List[str]]:
+
+    def prepare(self, po_header: Dict, po_items: List[Dict]) -> PreparedPO:
         """
-        Ingest PO from scraper output
-        Normalizes data: unique items + delivery schedules
-        
-        Args:
-            db: Active database connection (must be in a transaction if needed)
-            po_header: Dictionary containing PO header details
-            po_items: List of dictionaries containing PO item details
-            
-        Returns: (success, warnings)
-        
-        Note: This service assumes an active connection. It must never create or manage DB connections.
+        Normalize scraper output into header / item / delivery rows
+        Items are grouped by PO_ITM: one item row per PO_ITM, one delivery row per schedule line
         """
-        warnings = []
-        
-        try:
-            # Extract PO number
-            po_number = to_int(po_header.get('PURCHASE ORDER'))
-            if not po_number:
-                raise ValueError("PO number is required")
-            
-            # Check if PO exists
-            # Security Note: Using DB transaction from caller guarantees consistency
-            existing = db.execute(
-                "SELECT po_number, amend_no FROM purchase_orders WHERE po_number = ?",
-                (po_number,)
-            ).fetchone()
-            
-            if existing:
-                warnings.append(f"⚠️ PO {po_number} already exists (Amendment {existing['amend_no']}). Updating...")
-            
-            # Prepare header data
-            header_data = {
-                'po_number': po_number,
-                'po_date': normalize_date(po_header.get('PO DATE')),
-                'supplier_name': po_header.get('SUPP NAME M/S'),
-                'supplier_gstin': None,  # Internal data, not in PO
-                'supplier_code': po_header.get('SUPP CODE'),
-                'supplier_phone': po_header.get('PHONE'),
-                'supplier_fax': po_header.get('FAX'),
-                'supplier_email': po_header.get('EMAIL') or po_header.get('WEBSITE'), # Fallback
-                'department_no': to_int(po_header.get('DVN')),
-                
-                # Ref
-                'enquiry_no': po_header.get('ENQUIRY'),
-                'enquiry_date': normalize_date(po_header.get('ENQ DATE')),
-                'quotation_ref': po_header.get('QUOTATION'),
-                'quotation_date': normalize_date(po_header.get('QUOT-DATE')),
-                'rc_no': po_header.get('RC NO'),
-                'order_type': po_header.get('ORD-TYPE'),
-                'po_status': po_header.get('PO STATUS'),
-                
-                # Fin
-                'tin_no': po_header.get('TIN NO'),
-                'ecc_no': po_header.get('ECC NO'),
-                'mpct_no': po_header.get('MPCT NO'),
-                'po_value': to_float(po_header.get('PO-VALUE')),
-                'fob_value': to_float(po_header.get('FOB VALUE')),
-                'ex_rate': to_float(po_header.get('EX RATE')),
-                'currency': po_header.get('CURRENCY'),
-                'net_po_value': to_float(po_header.get('NET PO VAL')),
-                
-                # Amend
-                'amend_no': to_int(po_header.get('AMEND NO')) or 0,
-                'amend_1_date': None,  # Not in PO
-                'amend_2_date': None,  # Not in PO
-                
-                # Insp & Issuer
-                'inspection_by': po_header.get('INSPECTION BY'),
-                'inspection_at': po_header.get('INSPECTION AT BHEL'),
-                'issuer_name': po_header.get('NAME'),
-                'issuer_designation': po_header.get('DESIGNATION'),
-                'issuer_phone': po_header.get('PHONE NO'),
-                
-                'remarks': po_header.get('REMARKS')
-            }
-            
-            # Upsert PO header
-            db.execute("""
-                INSERT INTO purchase_orders 
-                (po_number, po_date, supplier_name, supplier_gstin, supplier_code, supplier_phone, supplier_fax, supplier_email, department_no,
-                 enquiry_no, enquiry_date, quotation_ref, quotation_date, rc_no, order_type, po_status,
-                 tin_no, ecc_no, mpct_no, po_value, fob_value, ex_rate, currency, net_po_value,
-                 amend_no, amend_1_date, amend_2_date,
-                 inspection_by, inspection_at, issuer_name, issuer_designation, issuer_phone, remarks)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(po_number) DO UPDATE SET
-                    po_date=excluded.po_date, supplier_name=excluded.supplier_name, supplier_gstin=excluded.supplier_gstin,
-                    supplier_code=excluded.supplier_code, supplier_phone=excluded.supplier_phone, supplier_fax=excluded.supplier_fax,
-                    department_no=excluded.department_no, enquiry_no=excluded.enquiry_no, enquiry_date=excluded.enquiry_date,
-                    quotation_ref=excluded.quotation_ref, quotation_date=excluded.quotation_date, rc_no=excluded.rc_no,
-                    order_type=excluded.order_type, po_status=excluded.po_status, tin_no=excluded.tin_no, ecc_no=excluded.ecc_no,
-                    mpct_no=excluded.mpct_no, po_value=excluded.po_value, fob_value=excluded.fob_value, ex_rate=excluded.ex_rate,
-                    currency=excluded.currency, net_po_value=excluded.net_po_value, amend_no=excluded.amend_no,
-                    amend_1_date=excluded.amend_1_date, amend_2_date=excluded.amend_2_date, inspection_by=excluded.inspection_by,
-                    inspection_at=excluded.inspection_at, issuer_name=excluded.issuer_name, issuer_designation=excluded.issuer_designation,
-                    issuer_phone=excluded.issuer_phone, remarks=excluded.remarks, updated_at=CURRENT_TIMESTAMP
-            """, tuple(header_data.values()))
-            
-            # Delete existing items and deliveries if updating
-            # This is safe because we are in a transaction
-            if existing:
-                db.execute("DELETE FROM purchase_order_items WHERE po_number = ?", (po_number,))
-                # Cascade delete handles deliveries if configured, but let's be explicit if needed. 
-                # Assuming FK constraints are ON and ON DELETE CASCADE is set (checked db.py, PRAGMA foreign_keys = ON is set)
-            
-            # Group items by PO_ITM to eliminate repetition
-            items_grouped = {}
-            for item in po_items:
-                po_item_no = to_int(item.get('PO ITM'))
-                
-                if po_item_no not in items_grouped:
-                    items_grouped[po_item_no] = {
-                        'item': item,
-                        'deliveries': []
-                    }
-                
-                items_grouped[po_item_no]['deliveries'].append(item)
-            
-            # Insert unique items and their deliveries
-            for po_item_no, data in items_grouped.items():
-                item = data['item']
-                item_id = str(uuid.uuid4())
-                
+        # Extract PO number
+        po_number = to_int(po_header.get('PURCHASE ORDER'))
+        if not po_number:
+            raise ValueError("PO number is required")
+
+        # Prepare header data
+        header_data = {
+            'po_number': po_number,
+            'po_date': normalize_date(po_header.get('PO DATE')),
+            'po_date_iso': to_iso_date(po_header.get('PO DATE')),
+            'supplier_name': po_header.get('SUPP NAME M/S'),
+            'supplier_gstin': None,  # Internal data, not in PO
+            'supplier_code': po_header.get('SUPP CODE'),
+            'supplier_phone': po_header.get('PHONE'),
+            'supplier_fax': po_header.get('FAX'),
+            'supplier_email': po_header.get('EMAIL') or po_header.get('WEBSITE'), # Fallback
+            'department_no': to_int(po_header.get('DVN')),
+
+            # Ref
+            'enquiry_no': po_header.get('ENQUIRY'),
+            'enquiry_date': normalize_date(po_header.get('ENQ DATE')),
+            'quotation_ref': po_header.get('QUOTATION'),
+            'quotation_date': normalize_date(po_header.get('QUOT-DATE')),
+            'rc_no': po_header.get('RC NO'),
+            'order_type': po_header.get('ORD-TYPE'),
+            'po_status': po_header.get('PO STATUS'),
+
+            # Fin
+            'tin_no': po_header.get('TIN NO'),
+            'ecc_no': po_header.get('ECC NO'),
+            'mpct_no': po_header.get('MPCT NO'),
+            'po_value': to_float(po_header.get('PO-VALUE')),
+            'fob_value': to_float(po_header.get('FOB VALUE')),
+            'ex_rate': to_float(po_header.get('EX RATE')),
+            'currency': po_header.get('CURRENCY'),
+            'net_po_value': to_float(po_header.get('NET PO VAL')),
+
+            # Amend
+            'amend_no': to_int(po_header.get('AMEND NO')) or 0,
+            'amend_1_date': None,  # Not in PO
+            'amend_2_date': None,  # Not in PO
+
+            # Insp & Issuer
+            'inspection_by': po_header.get('INSPECTION BY'),
+            'inspection_at': po_header.get('INSPECTION AT BHEL'),
+            'issuer_name': po_header.get('NAME'),
+            'issuer_designation': po_header.get('DESIGNATION'),
+            'issuer_phone': po_header.get('PHONE NO'),
+
+            'remarks': po_header.get('REMARKS')
+        }
+
+
+        # Group items by PO_ITM to eliminate repetition
+        item_rows: Dict[Any, tuple] = {}
+        delivery_rows: Dict[Any, List[tuple]] = {}
+        for item in po_items:
+            po_item_no = to_int(item.get('PO ITM'))
+
+            if po_item_no not in item_rows:
                 # Standardized variable names
                 ordered_quantity = to_float(item.get('ORD QTY')) or 0
                 item_value = to_float(item.get('ITEM VALUE')) or 0
                 received_quantity = to_float(item.get('RCD QTY')) or 0 # Keeping rcd_qty in DB, mapped to received_quantity var
                 description = item.get('DESCRIPTION') or ""
                 drg_no = item.get('DRG') or ""
-                
-                # Insert item
+
                 # Note: DB columns (ord_qty, rcd_qty) remain unchanged as per backward compatibility rules
-                db.execute("""
-                    INSERT INTO purchase_order_items
-                    (id, po_number, po_item_no, material_code, material_description, drg_no, mtrl_cat,
-                     unit, po_rate, ord_qty, rcd_qty, item_value, hsn_code, delivered_qty, pending_qty)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, ?)
-                """, (
-                    item_id,
-                    po_number,
-                    po_item_no,
+                item_rows[po_item_no] = (
                     item.get('MATERIAL CODE'),
                     description,
                     drg_no,
@@ -162,38 +208,253 @@ class POIngestionService:
                     to_float(item.get('PO RATE')),
                     ordered_quantity,
                     received_quantity,
-                    item_value,
-                    None,  # HSN not in scraper
-                    ordered_quantity  # pending_qty = ordered_quantity initially
-                ))
-                
-                # Insert deliveries
-                for delivery in data['deliveries']:
-                    delivery_id = str(uuid.uuid4())
-                    
-                    delivered_quantity = to_float(delivery.get('DELY QTY'))
-                    
-                    db.execute("""
-                        INSERT INTO purchase_order_deliveries
-                        (id, po_item_id, lot_no, dely_qty, dely_date, entry_allow_date, dest_code)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        delivery_id,
-                        item_id,
-                        to_int(delivery.get('LOT NO')),
-                        delivered_quantity,
-                        normalize_date(delivery.get('DELY DATE')),
-                        normalize_date(delivery.get('ENTRY ALLOW DATE')),
-                        to_int(delivery.get('DEST CODE'))
-                    ))
-            
-            # Remove commit/rollback, controlled by caller
-            warnings.insert(0, f"✅ Successfully ingested PO {po_number} with {len(items_grouped)} unique items and {len(po_items)} delivery schedules")
-            return True, warnings
-            
+                    item_value
+                )
+                delivery_rows[po_item_no] = []
+
+            delivery_rows[po_item_no].append((
+                to_int(item.get('LOT NO')),
+                to_float(item.get('DELY QTY')),
+                normalize_date(item.get('DELY DATE')),
+                to_iso_date(item.get('DELY DATE')),
+                normalize_date(item.get('ENTRY ALLOW DATE')),
+                to_int(item.get('DEST CODE'))
+            ))
+
+        header = tuple(header_data[column] for column in _HEADER_COLUMNS)
+        canonical = json.dumps([header, list(item_rows.items()), list(delivery_rows.items())], default=str)
+        content_hash = hashlib.sha256(canonical.encode()).hexdigest()
+        return PreparedPO(po_number, header, item_rows, delivery_rows, content_hash)
+
+    def write(self, db: sqlite3.Connection, prepared: List[PreparedPO]) -> Dict[int, Dict[str, Any]]:
+        """
+        Upsert prepared POs (distinct PO numbers) with one executemany per statement.
+
+        New POs are inserted. For existing POs, items are matched on po_item_no and deliveries on
+        lot_no (repeated lots pair up in stored order): changed rows are updated in place, new
+        ones inserted and missing ones deleted. Items that delivery challans still reference are
+        kept instead of deleted. POs whose content hash is unchanged are not written at all.
+        Returns {po_number: diff} (see _new_diff).
+        """
+        if not prepared:
+            return {}
+
+        existing = {
+            row[0]: row for row in _fetch_in(
+                db,
+                f"SELECT po_number, content_hash, {', '.join(_HEADER_COLUMNS)} FROM purchase_orders WHERE po_number IN ({{marks}})",
+                [p.po_number for p in prepared]
+            )
+        }
+        amend_col = 2 + _HEADER_COLUMNS.index("amend_no")
+
+        diffs: Dict[int, Dict[str, Any]] = {}
+        changed: List[PreparedPO] = []
+        for p in prepared:
+            old = existing.get(p.po_number)
+            if old is None:
+                diff = _new_diff(p.po_number, "created")
+                diff["items"]["added"] = list(p.items)
+                diff["deliveries"]["added"] = p.delivery_count
+            elif old[1] == p.content_hash:
+                diffs[p.po_number] = _new_diff(p.po_number, "unchanged", old[amend_col])
+                continue
+            else:
+                diff = _new_diff(p.po_number, "updated", old[amend_col])
+                diff["header"] = [c for c, a, b in zip(_HEADER_COLUMNS, old[2:], p.header) if not _same(a, b)]
+            diffs[p.po_number] = diff
+            changed.append(p)
+
+        if not changed:
+            return diffs
+        db.executemany(_UPSERT_PO_SQL, [p.header + (p.content_hash,) for p in changed])
+
+        # Stored items / deliveries of the POs being amended
+        old_items: Dict[Tuple[int, Any], Tuple[str, tuple]] = {}
+        old_deliveries: Dict[str, Dict[Any, List[Tuple[str, tuple]]]] = {}
+        amended = [p.po_number for p in changed if diffs[p.po_number]["status"] == "updated"]
+        if amended:
+            for row in _fetch_in(
+                db,
+                f"SELECT id, po_number, po_item_no, {', '.join(_ITEM_COLUMNS)} FROM purchase_order_items WHERE po_number IN ({{marks}})",
+                amended
+            ):
+                old_items[(row[1], row[2])] = (row[0], tuple(row[3:]))
+            for row in _fetch_in(
+                db,
+                f"""SELECT d.id, d.po_item_id, d.lot_no, {', '.join('d.' + c for c in _DELIVERY_COLUMNS)}
+                    FROM purchase_order_deliveries d JOIN purchase_order_items i ON i.id = d.po_item_id
+                    WHERE i.po_number IN ({{marks}}) ORDER BY d.rowid""",
+                amended
+            ):
+                old_deliveries.setdefault(row[1], {}).setdefault(row[2], []).append((row[0], tuple(row[3:])))
+
+        by_po = {p.po_number: p for p in changed}
+        removed_items = [(key, item_id) for key, (item_id, _) in old_items.items() if key[1] not in by_po[key[0]].items]
+        referenced = set()
+        if removed_items:
+            referenced = {row[0] for row in _fetch_in(
+                db,
+                "SELECT DISTINCT po_item_id FROM delivery_challan_items WHERE po_item_id IN ({marks})",
+                [item_id for _, item_id in removed_items]
+            )}
+
+        item_inserts, item_updates, item_deletes = [], [], []
+        delivery_inserts, delivery_updates, delivery_deletes = [], [], []
+        for p in changed:
+            items, deliveries = diffs[p.po_number]["items"], diffs[p.po_number]["deliveries"]
+            for po_item_no, fields in p.items.items():
+                old = old_items.get((p.po_number, po_item_no))
+                if old is None:
+                    item_id = str(uuid.uuid4())
+                    # pending_qty = ordered_quantity initially
+                    item_inserts.append((item_id, p.po_number, po_item_no, *fields, None, fields[6]))
+                    if diffs[p.po_number]["status"] == "updated":
+                        items["added"].append(po_item_no)
+                    old_lots = {}
+                else:
+                    item_id, old_fields = old
+                    if not _same_row(old_fields, fields):
+                        item_updates.append((*fields, fields[6], item_id))
+                        items["updated"].append(po_item_no)
+                    old_lots = old_deliveries.get(item_id, {})
+
+                new_lots: Dict[Any, List[tuple]] = {}
+                for row in p.deliveries[po_item_no]:
+                    new_lots.setdefault(row[0], []).append(row)
+                for lot_no in {**new_lots, **old_lots}:
+                    olds, news = old_lots.get(lot_no, []), new_lots.get(lot_no, [])
+                    for (delivery_id, old_fields), row in zip(olds, news):
+                        if not _same_row(old_fields, row[1:]):
+                            delivery_updates.append((*row[1:], delivery_id))
+                            deliveries["updated"] += 1
+                    for row in news[len(olds):]:
+                        delivery_inserts.append((str(uuid.uuid4()), item_id, *row))
+                    delivery_deletes.extend((delivery_id,) for delivery_id, _ in olds[len(news):])
+                    if diffs[p.po_number]["status"] == "updated":
+                        deliveries["added"] += max(len(news) - len(olds), 0)
+                        deliveries["removed"] += max(len(olds) - len(news), 0)
+
+        for (po_number, po_item_no), item_id in removed_items:
+            items = diffs[po_number]["items"]
+            if item_id in referenced:
+                items["kept"].append(po_item_no)
+                continue
+            # Deliveries go with the item (ON DELETE CASCADE)
+            item_deletes.append((item_id,))
+            items["removed"].append(po_item_no)
+            diffs[po_number]["deliveries"]["removed"] += sum(len(rows) for rows in old_deliveries.get(item_id, {}).values())
+
+        db.executemany("DELETE FROM purchase_order_deliveries WHERE id = ?", delivery_deletes)
+        db.executemany("DELETE FROM purchase_order_items WHERE id = ?", item_deletes)
+        db.executemany(_UPDATE_ITEM_SQL, item_updates)
+        db.executemany(_INSERT_ITEM_SQL, item_inserts)
+        db.executemany(_UPDATE_DELIVERY_SQL, delivery_updates)
+        db.executemany(_INSERT_DELIVERY_SQL, delivery_inserts)
+        # Search details from the items, once per PO
+        search_service.refresh_po_details(db, [p.po_number for p in changed])
+        return diffs
+
+    def _result(self, prepared: PreparedPO, diff: Dict[str, Any]) -> Tuple[bool, List[str], Dict[str, Any]]:
+        po_number = prepared.po_number
+        if diff["status"] == "unchanged":
+            return True, [f"✅ PO {po_number} unchanged (Amendment {diff['previous_amend_no']}), skipped"], diff
+
+        warnings = [f"✅ Successfully ingested PO {po_number} with {len(prepared.items)} unique items and {prepared.delivery_count} delivery schedules"]
+        if diff["status"] == "updated":
+            items, deliveries = diff["items"], diff["deliveries"]
+            warnings.append(f"⚠️ PO {po_number} already exists (Amendment {diff['previous_amend_no']}). Updating...")
+            warnings.append(
+                f"Items: {len(items['added'])} added, {len(items['updated'])} updated, {len(items['removed'])} removed; "
+                f"deliveries: {deliveries['added']} added, {deliveries['updated']} updated, {deliveries['removed']} removed"
+            )
+            if items["kept"]:
+                warnings.append(
+                    f"⚠️ Items {', '.join(str(n) for n in items['kept'])} are no longer on PO {po_number} "
+                    f"but were kept because delivery challans reference them"
+                )
+        return True, warnings, diff
+
+    def merge(self, db: sqlite3.Connection, po_header: Dict, po_items: List[Dict]) -> Tuple[bool, List[str], Dict[str, Any]]:
+        """
+        Ingest PO from scraper output, merging into the stored version if there is one
+
+        Returns: (success, warnings, diff) - diff as described in _new_diff
+        """
+        try:
+            prepared = self.prepare(po_header, po_items)
+            # Security Note: Using DB transaction from caller guarantees consistency
+            diffs = self.write(db, [prepared])
+            return self._result(prepared, diffs[prepared.po_number])
+
         except Exception as e:
             # Let caller handle rollback
             raise ValueError(f"Error ingesting PO: {str(e)}")
 
+    def ingest_po(self, db: sqlite3.Connection, po_header: Dict, po_items: List[Dict]) -> Tuple[bool, List[str]]:
+        """
+        Ingest PO from scraper output
+        Normalizes data: unique items + delivery schedules
+        
+        Args:
+            db: Active database connection (must be in a transaction if needed)
+            po_header: Dictionary containing PO header details
+            po_items: List of dictionaries containing PO item details
+            
+        Returns: (success, warnings)
+        
+        Note: This service assumes an active connection. It must never create or manage DB connections.
+        """
+        success, warnings, _ = self.merge(db, po_header, po_items)
+        return success, warnings
+
+    def ingest_many(
+        self, db: sqlite3.Connection, parsed: List[Tuple[Dict, List[Dict]]]
+    ) -> List[Tuple[bool, List[str], Optional[Dict[str, Any]]]]:
+        """
+        Ingest a chunk of parsed POs ([(po_header, po_items), ...]) in bulk.
+        Returns one (success, warnings, diff) per input, in order; failures carry the error as
+        warning and no diff.
+
+        The chunk is written under a savepoint. If the bulk write fails, it is rolled back and
+        the POs are retried one by one, so a single bad PO does not sink the rest. A PO number
+        repeated within the chunk is written once, from its last occurrence (as sequential
+        ingestion would leave it). Commit / rollback of the outer transaction stays with the caller.
+        """
+        results: List[Optional[Tuple[bool, List[str], Optional[Dict[str, Any]]]]] = [None] * len(parsed)
+        latest: Dict[int, Tuple[int, PreparedPO]] = {}
+
+        for idx, (po_header, po_items) in enumerate(parsed):
+            try:
+                prepared = self.prepare(po_header, po_items)
+            except Exception as e:
+                results[idx] = (False, [f"Error ingesting PO: {str(e)}"], None)
+                continue
+            if prepared.po_number in latest:
+                results[latest[prepared.po_number][0]] = (True, [f"✅ PO {prepared.po_number} superseded by a later file in this batch"], None)
+            latest[prepared.po_number] = (idx, prepared)
+
+        batch = list(latest.values())
+        if not db.in_transaction:
+            # Otherwise RELEASE of the outermost savepoint would commit on the caller's behalf
+            db.execute("BEGIN")
+        db.execute("SAVEPOINT po_batch")
+        try:
+            diffs = self.write(db, [prepared for _, prepared in batch])
+            for idx, prepared in batch:
+                results[idx] = self._result(prepared, diffs[prepared.po_number])
+        except sqlite3.Error:
+            db.execute("ROLLBACK TO po_batch")
+            for idx, prepared in batch:
+                db.execute("SAVEPOINT po_single")
+                try:
+                    results[idx] = self._result(prepared, self.write(db, [prepared])[prepared.po_number])
+                except sqlite3.Error as e:
+                    db.execute("ROLLBACK TO po_single")
+                    results[idx] = (False, [f"Error ingesting PO: {str(e)}"], None)
+                db.execute("RELEASE po_single")
+        db.execute("RELEASE po_batch")
+        return results
+
 # Singleton instance
 po_ingestion_service = POIngestionService()
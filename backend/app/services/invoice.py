@@ -7,7 +7,7 @@ import sqlite3
 import uuid
 import logging
 from typing import List, Dict, Optional
-from datetime import datetime
+from datetime import date, datetime
 from app.core.result import ServiceResult
 from app.core.exceptions import (
     ErrorCode,
@@ -15,42 +15,67 @@ from app.core.exceptions import (
     ResourceNotFoundError,
     ConflictError
 )
+from app.utils.date_utils import to_iso_date
 
 logger = logging.getLogger(__name__)
 
 
-def generate_invoice_number(db: sqlite3.Connection) -> str:
+_INVOICE_PREFIX = "INV"
+
+# Takes `count` numbers from the FY counter in one statement, creating the row on first use
+_RESERVE_SQL = """
+    INSERT INTO invoice_sequences (fy, last_number) VALUES (?, ?)
+    ON CONFLICT(fy) DO UPDATE SET
+        last_number = last_number + excluded.last_number,
+        updated_at = CURRENT_TIMESTAMP
+    RETURNING last_number
+"""
+
+# Moves the FY counter past a manually entered number, so it is never handed out again
+_ADVANCE_SQL = """
+    INSERT INTO invoice_sequences (fy, last_number) VALUES (?, ?)
+    ON CONFLICT(fy) DO UPDATE SET
+        last_number = MAX(last_number, excluded.last_number),
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+
+def financial_year(day: Optional[date] = None) -> str:
+    """Indian financial year (Apr-Mar) of a date, e.g. 2025-26"""
+    day = day or datetime.now().date()
+    start = day.year if day.month >= 4 else day.year - 1
+    return f"{start}-{str(start + 1)[2:]}"
+
+
+def format_invoice_number(fy: str, number: int) -> str:
+    return f"{_INVOICE_PREFIX}/{fy}/{number:03d}"
+
+
+def reserve_invoice_numbers(db: sqlite3.Connection, count: int = 1, day: Optional[date] = None) -> List[str]:
+    """
+    Reserve `count` consecutive invoice numbers INV/{FY}/{NNN} of the date's financial year
+    MUST be called inside the write transaction: the numbers are only taken if it commits
+    """
+    if count < 1:
+        raise ValidationError("At least one invoice number must be reserved")
+    fy = financial_year(day)
+    last = db.execute(_RESERVE_SQL, (fy, count)).fetchone()[0]
+    return [format_invoice_number(fy, n) for n in range(last - count + 1, last + 1)]
+
+
+def generate_invoice_number(db: sqlite3.Connection, day: Optional[date] = None) -> str:
     """
     Generate collision-safe invoice number: INV/{FY}/{XXX}
     MUST be called inside BEGIN IMMEDIATE transaction
     """
-    today = datetime.now()
-    
-    # Calculate financial year (Apr-Mar)
-    if today.month >= 4:
-        fy = f"{today.year}-{str(today.year + 1)[2:]}"
-    else:
-        fy = f"{today.year - 1}-{str(today.year)[2:]}"
-    
-    # Get last invoice number for this FY
-    last_row = db.execute("""
-        SELECT invoice_number 
-        FROM gst_invoices 
-        WHERE invoice_number LIKE ? 
-        ORDER BY invoice_number DESC 
-        LIMIT 1
-    """, (f"INV/{fy}/%",)).fetchone()
-    
-    if last_row:
-        try:
-            last_num = int(last_row[0].split('/')[-1])
-            new_num = last_num + 1
-        except (ValueError, IndexError):
-            new_num = 1
-    else:
-        new_num = 1
-    
-    return f"INV/{fy}/{new_num:03d}"
+    return reserve_invoice_numbers(db, 1, day)[0]
+
+
+def advance_invoice_sequence(db: sqlite3.Connection, invoice_number: str) -> None:
+    """Keep the FY counter ahead of a manually entered INV/{FY}/{NNN} number (other formats are ignored)"""
+    parts = invoice_number.split("/")
+    if len(parts) == 3 and parts[0] == _INVOICE_PREFIX and parts[1] and parts[2].isdigit():
+        db.execute(_ADVANCE_SQL, (parts[1], int(parts[2])))
 
 
 def calculate_tax(taxable_value: float, cgst_rate: float = 9.0, sgst_rate: float = 9.0) -> dict:
@@ -82,9 +107,6 @@ def validate_invoice_header(invoice_data: dict) -> None:
     
     if not invoice_data.get("buyer_name") or invoice_data["buyer_name"].strip() == "":
         raise ValidationError("Buyer name is required")
-    
-    if not invoice_data.get("invoice_number") or invoice_data["invoice_number"].strip() == "":
-        raise ValidationError("Invoice number is required")
 
 
 def check_dc_already_invoiced(dc_number: str, db: sqlite3.Connection) -> Optional[str]:
@@ -160,10 +182,17 @@ def create_invoice(invoice_data: dict, db: sqlite3.Connection) -> ServiceResult[
     """
     try:
         dc_number = invoice_data["dc_number"]
-        invoice_number = invoice_data["invoice_number"]
         
         # Validate header
         validate_invoice_header(invoice_data)
+
+        # Number from the FY sequence unless one was entered (rolled back with the transaction)
+        invoice_number = (invoice_data.get("invoice_number") or "").strip()
+        if invoice_number:
+            advance_invoice_sequence(db, invoice_number)
+        else:
+            invoice_iso = to_iso_date(invoice_data["invoice_date"])
+            invoice_number = generate_invoice_number(db, date.fromisoformat(invoice_iso) if invoice_iso else None)
         
         # INVARIANT: INV-4 - Invoice must reference at least one valid DC
         dc_row = db.execute("""
@@ -256,6 +285,7 @@ def create_invoice(invoice_data: dict, db: sqlite3.Connection) -> ServiceResult[
             tax_calc = calculate_tax(taxable_value)
             
             invoice_items.append({
+                'po_item_id': dc_item['po_item_id'],
                 'po_sl_no': dc_item['lot_no'] or '',
                 'description': dc_item['description'] or '',
                 'hsn_sac': dc_item['hsn_code'] or '',
@@ -280,7 +310,7 @@ def create_invoice(invoice_data: dict, db: sqlite3.Connection) -> ServiceResult[
         # Insert invoice header
         db.execute("""
             INSERT INTO gst_invoices (
-                invoice_number, invoice_date,
+                invoice_number, invoice_date, invoice_date_iso,
                 linked_dc_numbers, po_numbers,
                 buyer_name, buyer_address, buyer_gstin, buyer_state, buyer_state_code,
                 customer_gstin, place_of_supply,
@@ -290,9 +320,9 @@ def create_invoice(invoice_data: dict, db: sqlite3.Connection) -> ServiceResult[
                 despatch_doc_no, srv_no, srv_date,
                 taxable_value, cgst, sgst, igst, total_invoice_value,
                 remarks
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """, (
-            invoice_number, invoice_data["invoice_date"],
+            invoice_number, invoice_data["invoice_date"], to_iso_date(invoice_data["invoice_date"]),
             dc_number, str(dc_dict.get('po_number', '')),
             invoice_data["buyer_name"], invoice_data.get("buyer_address"), invoice_data.get("buyer_gstin"),
             invoice_data.get("buyer_state"), invoice_data.get("buyer_state_code"),
@@ -311,13 +341,13 @@ def create_invoice(invoice_data: dict, db: sqlite3.Connection) -> ServiceResult[
         for item in invoice_items:
             db.execute("""
                 INSERT INTO gst_invoice_items (
-                    invoice_number, po_sl_no, description, hsn_sac,
+                    invoice_number, po_item_id, po_sl_no, description, hsn_sac,
                     quantity, unit, rate, taxable_value,
                     cgst_rate, cgst_amount, sgst_rate, sgst_amount,
                     igst_rate, igst_amount, total_amount
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (
-                invoice_number, item['po_sl_no'], item['description'], item['hsn_sac'],
+                invoice_number, item['po_item_id'], item['po_sl_no'], item['description'], item['hsn_sac'],
                 item['quantity'], item['unit'], item['rate'], item['taxable_value'],
                 item['cgst_rate'], item['cgst_amount'], item['sgst_rate'], item['sgst_amount'],
                 item['igst_rate'], item['igst_amount'], item['total_amount']
@@ -329,6 +359,13 @@ def create_invoice(invoice_data: dict, db: sqlite3.Connection) -> ServiceResult[
             INSERT INTO gst_invoice_dc_links (id, invoice_number, dc_number)
             VALUES (?, ?, ?)
         """, (link_id, invoice_number, dc_number))
+
+        # Create PO link
+        if dc_dict.get('po_number') is not None:
+            db.execute("""
+                INSERT OR IGNORE INTO gst_invoice_po_links (invoice_number, po_number)
+                VALUES (?, ?)
+            """, (invoice_number, dc_dict['po_number']))
         
         logger.info(f"Successfully created invoice {invoice_number} from DC {dc_number} with {len(invoice_items)} items")
         
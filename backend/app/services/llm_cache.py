@@ -0,0 +1,232 @@
+"""
+LLM Response Cache
+Persistent, SQLite-backed cache for LLM answers (migrations/012_llm_cache.sql).
+
+Entries are keyed on provider, model, the normalized messages, the generation parameters and
+a fingerprint of the data the prompt was built from. Each entry records the `data_version` it
+was computed at; triggers bump that counter on every write to the PO / DC / invoice tables, so
+an answer is never served once the figures behind it may have changed. Entries also expire
+after LLM_CACHE_TTL_SECONDS, and beyond LLM_CACHE_MAX_ENTRIES the least recently used ones are
+evicted.
+
+Lookups are plain SELECTs on the reader lane, run in the threadpool: a cache check never waits
+for the writer connection (held by uploads, batch ingestion or the write queue) on the event loop.
+Hits are remembered in memory and written (hits / last_used_at) with the next store, before the
+LRU eviction; stale entries are overwritten by that store or removed by eviction.
+
+Hit / miss counters are exposed at /api/health/llm-cache.
+"""
+import re
+import json
+import hashlib
+import sqlite3
+import logging
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db import ConnectionPool, PoolTimeoutError, get_pool
+
+logger = logging.getLogger(__name__)
+
+# Generation parameters that change the answer (everything else in kwargs is ignored for the key)
+_KEY_PARAMS = ("model", "temperature", "max_tokens", "functions")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_messages(messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Role + content only, with whitespace collapsed (formatting-only prompt changes share a key)"""
+    return [
+        {"role": m["role"], "content": _WHITESPACE.sub(" ", str(m.get("content") or "")).strip()}
+        for m in messages
+    ]
+
+
+def fingerprint(data: Any) -> str:
+    """Stable hash of the aggregates a prompt is built from"""
+    payload = json.dumps(data, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Read-through cache in front of LLMClient.chat"""
+
+    def __init__(self, pool: Optional[ConnectionPool] = None):
+        self._pool = pool
+        self._lock = threading.Lock()
+        self.counters: Counter = Counter()
+        # cache_key -> hits not yet written to llm_cache
+        self._pending_hits: Counter = Counter()
+
+    @property
+    def pool(self) -> ConnectionPool:
+        return self._pool or get_pool()
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += n
+
+    def key(
+        self, provider: str, model: str, messages: List[Dict[str, str]],
+        data_fingerprint: Optional[str] = None, params: Optional[Dict[str, Any]] = None
+    ) -> str:
+        payload = json.dumps({
+            "provider": provider,
+            "model": model,
+            "messages": normalize_messages(messages),
+            "fingerprint": data_fingerprint,
+            "params": {k: v for k, v in (params or {}).items() if k in _KEY_PARAMS and v is not None},
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # ---- storage --------------------------------------------------------------------------
+
+    def data_version(self, db: sqlite3.Connection) -> int:
+        row = db.execute("SELECT version FROM data_version WHERE id = 1").fetchone()
+        return row[0] if row else 0
+
+    def get(self, db: sqlite3.Connection, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Cached response, or None for missing / expired / outdated entries (read-only)"""
+        row = db.execute("""
+            SELECT response, data_version, expires_at <= datetime('now') AS expired
+            FROM llm_cache WHERE cache_key = ?
+        """, (cache_key,)).fetchone()
+        if row is None:
+            self._count("misses")
+            return None
+
+        if row["expired"] or row["data_version"] != self.data_version(db):
+            self._count("stale")
+            self._count("misses")
+            return None
+
+        with self._lock:
+            self._pending_hits[cache_key] += 1
+        self._count("hits")
+        return json.loads(row["response"])
+
+    def flush_hits(self, db: sqlite3.Connection) -> None:
+        """Write the hits recorded since the last flush (hits / last_used_at, for LRU eviction)"""
+        with self._lock:
+            pending, self._pending_hits = self._pending_hits, Counter()
+        if pending:
+            db.executemany("""
+                UPDATE llm_cache SET hits = hits + ?, last_used_at = CURRENT_TIMESTAMP WHERE cache_key = ?
+            """, [(n, cache_key) for cache_key, n in pending.items()])
+
+    def put(self, db: sqlite3.Connection, cache_key: str, provider: str, model: str, response: Dict[str, Any]) -> None:
+        db.execute("""
+            INSERT INTO llm_cache (cache_key, provider, model, response, data_version, expires_at)
+            VALUES (?, ?, ?, ?, ?, datetime('now', ?))
+            ON CONFLICT(cache_key) DO UPDATE SET
+                provider = excluded.provider,
+                model = excluded.model,
+                response = excluded.response,
+                data_version = excluded.data_version,
+                created_at = CURRENT_TIMESTAMP,
+                expires_at = excluded.expires_at,
+                last_used_at = CURRENT_TIMESTAMP,
+                hits = 0
+        """, (
+            cache_key, provider, model, json.dumps(response, default=str), self.data_version(db),
+            f"+{int(settings.LLM_CACHE_TTL_SECONDS)} seconds"
+        ))
+        self._count("stores")
+
+    def evict(self, db: sqlite3.Connection) -> int:
+        """Drop expired / outdated entries, then least recently used ones beyond the size cap"""
+        self.flush_hits(db)
+        removed = db.execute("""
+            DELETE FROM llm_cache
+            WHERE expires_at <= datetime('now')
+               OR data_version != (SELECT version FROM data_version WHERE id = 1)
+        """).rowcount
+        removed += db.execute("""
+            DELETE FROM llm_cache WHERE cache_key IN (
+                SELECT cache_key FROM llm_cache
+                ORDER BY last_used_at DESC, created_at DESC
+                LIMIT -1 OFFSET ?
+            )
+        """, (settings.LLM_CACHE_MAX_ENTRIES,)).rowcount
+        if removed:
+            self._count("evictions", removed)
+        return removed
+
+    def invalidate(self, db: sqlite3.Connection) -> int:
+        """Drop every entry (e.g. after a bulk import that bypassed the triggers)"""
+        removed = db.execute("DELETE FROM llm_cache").rowcount
+        self._count("invalidations")
+        logger.info(f"LLM cache invalidated ({removed} entries)")
+        return removed
+
+    def stats(self, db: sqlite3.Connection) -> Dict[str, Any]:
+        row = db.execute("SELECT COUNT(*) AS entries, COALESCE(SUM(hits), 0) AS stored_hits FROM llm_cache").fetchone()
+        with self._lock:
+            counters = dict(self.counters)
+        lookups = counters.get("hits", 0) + counters.get("misses", 0)
+        return {
+            "enabled": settings.LLM_CACHE_ENABLED,
+            "entries": row["entries"],
+            "max_entries": settings.LLM_CACHE_MAX_ENTRIES,
+            "ttl_seconds": settings.LLM_CACHE_TTL_SECONDS,
+            "data_version": self.data_version(db),
+            "hit_ratio": round(counters.get("hits", 0) / lookups, 3) if lookups else 0.0,
+            "lifetime_entry_hits": row["stored_hits"],
+            **{name: counters.get(name, 0) for name in ("hits", "misses", "stale", "stores", "evictions", "invalidations")},
+        }
+
+    # ---- read-through ---------------------------------------------------------------------
+
+    async def chat(
+        self,
+        client,
+        messages: List[Dict[str, str]],
+        provider: Optional[str] = None,
+        data_fingerprint: Optional[str] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        LLMClient.chat with the cache in front. A hit returns the stored response with
+        `cached: True`. Cache failures never fail the call; they fall through to the provider.
+        Routed calls (provider=None) share entries per preferred provider.
+        """
+        if not settings.LLM_CACHE_ENABLED:
+            return await client.chat(messages, provider=provider, **kwargs)
+
+        key_provider = provider or f"routed:{settings.LLM_PROVIDER}"
+        model = kwargs.get("model") or client.model_for(provider)
+        cache_key = self.key(key_provider, model, messages, data_fingerprint, kwargs)
+
+        try:
+            cached = await run_in_threadpool(self._lookup, cache_key)
+            if cached is not None:
+                return {**cached, "cached": True}
+        except (sqlite3.Error, PoolTimeoutError) as e:
+            logger.warning(f"LLM cache lookup failed: {e}")
+
+        response = await client.chat(messages, provider=provider, **kwargs)
+
+        try:
+            await run_in_threadpool(self._store, cache_key, key_provider, model, response)
+        except (sqlite3.Error, PoolTimeoutError) as e:
+            logger.warning(f"LLM cache store failed: {e}")
+
+        return {**response, "cached": False}
+
+    def _lookup(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        with self.pool.connection(readonly=True) as db:
+            return self.get(db, cache_key)
+
+    def _store(self, cache_key: str, provider: str, model: str, response: Dict[str, Any]) -> None:
+        with self.pool.connection(readonly=False) as db:
+            self.put(db, cache_key, provider, model, response)
+            self.evict(db)
+            db.commit()
+
+
+# Singleton instance
+llm_cache = LLMCache()
@@ -2,13 +2,15 @@
 LLM Client - Unified interface for Groq and OpenRouter
 Handles STT (Whisper), Chat (Llama 3.1), and intelligent routing
 """
-import httpx
 import os
 import json
 import logging
 from typing import Dict, List, Any, Optional, AsyncGenerator
 from datetime import datetime
 
+from app.services.http_clients import HTTPClientPool, STREAM_TIMEOUT
+from app.services.provider_router import ProviderRouter
+
 logger = logging.getLogger(__name__)
 
 # API Configuration - Will be read in __init__ after .env is loaded
@@ -59,9 +61,14 @@ class LLMClient:
         self.google_api_key = os.getenv("GOOGLE_API_KEY") # Add to settings later if needed
         self.google_model = os.getenv("GOOGLE_MODEL", "gemini-2.0-flash-exp")
 
-        self.groq_base_url = "https://api.groq.com/openai/v1"
-        self.openrouter_base_url = "https://openrouter.ai/api/v1"
-        self.google_base_url = "https://generativelanguage.googleapis.com/v1beta/models"
+        self.groq_base_url = os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1")
+        self.openrouter_base_url = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+        self.google_base_url = os.getenv("GOOGLE_BASE_URL", "https://generativelanguage.googleapis.com/v1beta/models")
+
+        # Long-lived per-provider clients (keep-alive / HTTP/2), closed on app shutdown
+        self._http = HTTPClientPool()
+        # Latency / error aware selection across providers for provider=None calls
+        self.router = ProviderRouter(self._chat_provider, self._stream_provider, self.is_configured)
 
         logger.info(
             f"LLMClient initialized | "
@@ -69,6 +76,14 @@ class LLMClient:
             f"OPENROUTER={'✅' if self.openrouter_api_key else '❌'}"
         )
 
+    def http_stats(self) -> Dict[str, Any]:
+        """Per-provider request and connection-reuse counters"""
+        return self._http.stats()
+
+    async def aclose(self):
+        """Close the shared provider clients"""
+        await self._http.aclose()
+
     async def speech_to_text(self, audio_file: bytes, filename: str = "audio.webm") -> Dict[str, Any]:
         """
         Convert speech to text using Groq Whisper
@@ -90,48 +105,70 @@ class LLMClient:
         start_time = datetime.now()
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                files = {"file": (filename, audio_file, "audio/webm")}
-                data = {
-                    "model": "whisper-large-v3",
-                    "language": "en",
-                    "response_format": "json"
-                }
-                
-                response = await client.post(
-                    f"{self.groq_base_url}/audio/transcriptions",
-                    headers={"Authorization": f"Bearer {self.groq_api_key}"},
-                    files=files,
-                    data=data
-                )
+            client = self._http.client("groq")
+            files = {"file": (filename, audio_file, "audio/webm")}
+            data = {
+                "model": "whisper-large-v3",
+                "language": "en",
+                "response_format": "json"
+            }
                 
-                response.raise_for_status()
-                result = response.json()
+            response = await client.post(
+                f"{self.groq_base_url}/audio/transcriptions",
+                headers={"Authorization": f"Bearer {self.groq_api_key}"},
+                files=files,
+                data=data
+            )
                 
-                duration = (datetime.now() - start_time).total_seconds()
+            response.raise_for_status()
+            result = response.json()
                 
-                logger.info(
-                    f"STT completed in {duration:.2f}s",
-                    extra={
-                        "text_length": len(result.get("text", "")),
-                        "duration_s": duration
-                    }
-                )
+            duration = (datetime.now() - start_time).total_seconds()
                 
-                return {
-                    "text": result.get("text", ""),
-                    "duration": duration,
-                    "language": result.get("language", "en")
+            logger.info(
+                f"STT completed in {duration:.2f}s",
+                extra={
+                    "text_length": len(result.get("text", "")),
+                    "duration_s": duration
                 }
+            )
+                
+            return {
+                "text": result.get("text", ""),
+                "duration": duration,
+                "language": result.get("language", "en")
+            }
                 
         except Exception as e:
             logger.error(f"STT failed: {e}", exc_info=True)
             raise
 
+    def is_configured(self, provider: str) -> bool:
+        """Whether a provider has credentials (Ollama: an explicit OLLAMA_BASE_URL)"""
+        if provider == "groq":
+            return bool(self.groq_api_key)
+        if provider == "openrouter":
+            return bool(self.openrouter_api_key)
+        if provider == "google":
+            return bool(self.google_api_key)
+        if provider == "ollama":
+            return "OLLAMA_BASE_URL" in os.environ
+        return False
+
+    def model_for(self, provider: Optional[str]) -> str:
+        """Default model of a provider (None = the preferred provider of routed calls)"""
+        from app.core.config import settings
+        provider = provider or settings.LLM_PROVIDER
+        return getattr(self, f"{provider}_model", "unknown")
+
+    def router_metrics(self) -> Dict[str, Any]:
+        """Routing decisions, latency percentiles and breaker states per provider"""
+        return self.router.metrics()
+
     async def chat(
         self,
         messages: List[Dict[str, str]],
-        provider: str = "groq",
+        provider: Optional[str] = None,
         functions: Optional[List[Dict]] = None,
         **kwargs
     ) -> Dict[str, Any]:
@@ -140,16 +177,29 @@ class LLMClient:
         
         Args:
             messages: List of message dicts with 'role' and 'content'
-            provider: 'groq', 'openrouter', 'ollama', or 'google'
+            provider: 'groq', 'openrouter', 'ollama', or 'google'; None routes across
+                      providers (preferring settings.LLM_PROVIDER, see provider_router)
             functions: Optional function definitions for function calling
             
         Returns:
             {
                 "content": "response text",
-                "function_call": {...} if applicable
+                "function_call": {...} if applicable,
+                "provider": "groq"  (routed calls only)
             }
         """
-        
+        if provider is None:
+            return await self.router.chat(messages, functions=functions, **kwargs)
+        return await self._chat_provider(provider, messages, functions=functions, **kwargs)
+
+    async def _chat_provider(
+        self,
+        provider: str,
+        messages: List[Dict[str, str]],
+        functions: Optional[List[Dict]] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Chat with one specific provider"""
         if provider == "groq":
             return await self._chat_groq(messages, functions, **kwargs)
         elif provider == "openrouter":
@@ -202,28 +252,28 @@ class LLMClient:
         }
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f"{self.google_base_url}/{self.google_model}:generateContent?key={self.google_api_key}",
-                    json=payload
-                )
+            client = self._http.client("google")
+            response = await client.post(
+                f"{self.google_base_url}/{kwargs.get('model') or self.google_model}:generateContent?key={self.google_api_key}",
+                json=payload
+            )
                 
-                response.raise_for_status()
-                result = response.json()
+            response.raise_for_status()
+            result = response.json()
                 
-                # Extract text from Gemini response structure
-                # candidates[0].content.parts[0].text
-                try:
-                    content = result["candidates"][0]["content"]["parts"][0]["text"]
-                    finish_reason = result["candidates"][0].get("finishReason")
-                except (KeyError, IndexError):
-                    logger.error(f"Unexpected Gemini response format: {result}")
-                    raise ValueError("Failed to parse Gemini response")
-
-                return {
-                    "content": content,
-                    "finish_reason": finish_reason
-                }
+            # Extract text from Gemini response structure
+            # candidates[0].content.parts[0].text
+            try:
+                content = result["candidates"][0]["content"]["parts"][0]["text"]
+                finish_reason = result["candidates"][0].get("finishReason")
+            except (KeyError, IndexError):
+                logger.error(f"Unexpected Gemini response format: {result}")
+                raise ValueError("Failed to parse Gemini response")
+
+            return {
+                "content": content,
+                "finish_reason": finish_reason
+            }
                 
         except Exception as e:
             logger.error(f"Google chat failed: {e}", exc_info=True)
@@ -246,7 +296,7 @@ class LLMClient:
             messages = [{"role": "system", "content": SYSTEM_PROMPT}] + messages
         
         payload = {
-            "model": self.groq_model,
+            "model": kwargs.get("model") or self.groq_model,
             "messages": messages,
             "temperature": kwargs.get("temperature", 0.7),
             "max_tokens": kwargs.get("max_tokens", 1024),
@@ -257,27 +307,27 @@ class LLMClient:
             payload["tool_choice"] = "auto"
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f"{self.groq_base_url}/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.groq_api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json=payload
-                )
+            client = self._http.client("groq")
+            response = await client.post(
+                f"{self.groq_base_url}/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {self.groq_api_key}",
+                    "Content-Type": "application/json"
+                },
+                json=payload
+            )
                 
-                response.raise_for_status()
-                result = response.json()
+            response.raise_for_status()
+            result = response.json()
                 
-                choice = result["choices"][0]
-                message = choice["message"]
+            choice = result["choices"][0]
+            message = choice["message"]
                 
-                return {
-                    "content": message.get("content", ""),
-                    "function_call": message.get("tool_calls", [None])[0] if message.get("tool_calls") else None,
-                    "finish_reason": choice.get("finish_reason")
-                }
+            return {
+                "content": message.get("content", ""),
+                "function_call": message.get("tool_calls", [None])[0] if message.get("tool_calls") else None,
+                "finish_reason": choice.get("finish_reason")
+            }
                 
         except Exception as e:
             logger.error(f"Groq chat failed: {e}", exc_info=True)
@@ -298,35 +348,35 @@ class LLMClient:
             messages = [{"role": "system", "content": SYSTEM_PROMPT}] + messages
         
         payload = {
-            "model": self.openrouter_model,
+            "model": kwargs.get("model") or self.openrouter_model,
             "messages": messages,
             "temperature": kwargs.get("temperature", 0.7),
             "max_tokens": kwargs.get("max_tokens", 1024),
         }
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f"{self.openrouter_base_url}/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.openrouter_api_key}",
-                        "Content-Type": "application/json",
-                        "HTTP-Referer": "https://senstsales.local",
-                        "X-Title": "SenstoSales ERP"
-                    },
-                    json=payload
-                )
+            client = self._http.client("openrouter")
+            response = await client.post(
+                f"{self.openrouter_base_url}/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {self.openrouter_api_key}",
+                    "Content-Type": "application/json",
+                    "HTTP-Referer": "https://senstsales.local",
+                    "X-Title": "SenstoSales ERP"
+                },
+                json=payload
+            )
                 
-                response.raise_for_status()
-                result = response.json()
+            response.raise_for_status()
+            result = response.json()
                 
-                choice = result["choices"][0]
-                message = choice["message"]
+            choice = result["choices"][0]
+            message = choice["message"]
                 
-                return {
-                    "content": message.get("content", ""),
-                    "finish_reason": choice.get("finish_reason")
-                }
+            return {
+                "content": message.get("content", ""),
+                "finish_reason": choice.get("finish_reason")
+            }
                 
         except Exception as e:
             logger.error(f"OpenRouter chat failed: {e}", exc_info=True)
@@ -344,7 +394,7 @@ class LLMClient:
             messages = [{"role": "system", "content": SYSTEM_PROMPT}] + messages
 
         payload = {
-            "model": self.ollama_model,
+            "model": kwargs.get("model") or self.ollama_model,
             "messages": messages,
             "stream": False,
             "options": {
@@ -357,21 +407,21 @@ class LLMClient:
             payload["format"] = "json"
 
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    f"{self.ollama_base_url}/chat",
-                    json=payload
-                )
+            client = self._http.client("ollama")
+            response = await client.post(
+                f"{self.ollama_base_url}/chat",
+                json=payload
+            )
                 
-                response.raise_for_status()
-                result = response.json()
+            response.raise_for_status()
+            result = response.json()
                 
-                message = result.get("message", {})
+            message = result.get("message", {})
                 
-                return {
-                    "content": message.get("content", ""),
-                    "finish_reason": "stop" if result.get("done") else None
-                }
+            return {
+                "content": message.get("content", ""),
+                "finish_reason": "stop" if result.get("done") else None
+            }
                 
         except Exception as e:
             logger.error(f"Ollama chat failed: {e}", exc_info=True)
@@ -380,13 +430,26 @@ class LLMClient:
     async def stream(
         self,
         messages: List[Dict[str, str]],
-        provider: str = "groq",
+        provider: Optional[str] = None,
         **kwargs
     ) -> AsyncGenerator[str, None]:
         """
-        Stream chat completion responses
+        Stream chat completion responses (provider None routes across providers)
         """
-        
+        if provider is None:
+            async for chunk in self.router.stream(messages, **kwargs):
+                yield chunk
+        else:
+            async for chunk in self._stream_provider(provider, messages, **kwargs):
+                yield chunk
+
+    async def _stream_provider(
+        self,
+        provider: str,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> AsyncGenerator[str, None]:
+        """Stream from one specific provider"""
         if provider == "groq":
             async for chunk in self._stream_groq(messages, **kwargs):
                 yield chunk
@@ -396,6 +459,8 @@ class LLMClient:
         elif provider == "ollama":
             async for chunk in self._stream_ollama(messages, **kwargs):
                 yield chunk
+        else:
+            raise ValueError(f"Streaming not supported for provider: {provider}")
 
     async def _stream_groq(
         self,
@@ -412,7 +477,7 @@ class LLMClient:
             messages = [{"role": "system", "content": SYSTEM_PROMPT}] + messages
         
         payload = {
-            "model": self.groq_model,
+            "model": kwargs.get("model") or self.groq_model,
             "messages": messages,
             "temperature": kwargs.get("temperature", 0.7),
             "max_tokens": kwargs.get("max_tokens", 1024),
@@ -420,31 +485,32 @@ class LLMClient:
         }
         
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                async with client.stream(
-                    "POST",
-                    f"{self.groq_base_url}/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.groq_api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json=payload
-                ) as response:
-                    response.raise_for_status()
+            client = self._http.client("groq")
+            async with client.stream(
+                "POST",
+                f"{self.groq_base_url}/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {self.groq_api_key}",
+                    "Content-Type": "application/json"
+                },
+                json=payload,
+                timeout=STREAM_TIMEOUT
+            ) as response:
+                response.raise_for_status()
                     
-                    async for line in response.aiter_lines():
-                        if line.startswith("data: "):
-                            data = line[6:]
-                            if data == "[DONE]":
-                                break
+                async for line in response.aiter_lines():
+                    if line.startswith("data: "):
+                        data = line[6:]
+                        if data == "[DONE]":
+                            break
                             
-                            try:
-                                chunk = json.loads(data)
-                                delta = chunk["choices"][0]["delta"]
-                                if "content" in delta:
-                                    yield delta["content"]
-                            except json.JSONDecodeError:
-                                continue
+                        try:
+                            chunk = json.loads(data)
+                            delta = chunk["choices"][0]["delta"]
+                            if "content" in delta:
+                                yield delta["content"]
+                        except json.JSONDecodeError:
+                            continue
                                 
         except Exception as e:
             logger.error(f"Groq streaming failed: {e}", exc_info=True)
@@ -465,7 +531,7 @@ class LLMClient:
             messages = [{"role": "system", "content": SYSTEM_PROMPT}] + messages
         
         payload = {
-            "model": self.openrouter_model,
+            "model": kwargs.get("model") or self.openrouter_model,
             "messages": messages,
             "temperature": kwargs.get("temperature", 0.7),
             "max_tokens": kwargs.get("max_tokens", 1024),
@@ -473,33 +539,34 @@ class LLMClient:
         }
         
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                async with client.stream(
-                    "POST",
-                    f"{self.openrouter_base_url}/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.openrouter_api_key}",
-                        "Content-Type": "application/json",
-                        "HTTP-Referer": "https://senstsales.local",
-                        "X-Title": "SenstoSales ERP"
-                    },
-                    json=payload
-                ) as response:
-                    response.raise_for_status()
+            client = self._http.client("openrouter")
+            async with client.stream(
+                "POST",
+                f"{self.openrouter_base_url}/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {self.openrouter_api_key}",
+                    "Content-Type": "application/json",
+                    "HTTP-Referer": "https://senstsales.local",
+                    "X-Title": "SenstoSales ERP"
+                },
+                json=payload,
+                timeout=STREAM_TIMEOUT
+            ) as response:
+                response.raise_for_status()
                     
-                    async for line in response.aiter_lines():
-                        if line.startswith("data: "):
-                            data = line[6:]
-                            if data == "[DONE]":
-                                break
+                async for line in response.aiter_lines():
+                    if line.startswith("data: "):
+                        data = line[6:]
+                        if data == "[DONE]":
+                            break
                             
-                            try:
-                                chunk = json.loads(data)
-                                delta = chunk["choices"][0]["delta"]
-                                if "content" in delta:
-                                    yield delta["content"]
-                            except json.JSONDecodeError:
-                                continue
+                        try:
+                            chunk = json.loads(data)
+                            delta = chunk["choices"][0]["delta"]
+                            if "content" in delta:
+                                yield delta["content"]
+                        except json.JSONDecodeError:
+                            continue
                                 
         except Exception as e:
             logger.error(f"OpenRouter streaming failed: {e}", exc_info=True)
@@ -517,7 +584,7 @@ class LLMClient:
             messages = [{"role": "system", "content": SYSTEM_PROMPT}] + messages
         
         payload = {
-            "model": self.ollama_model,
+            "model": kwargs.get("model") or self.ollama_model,
             "messages": messages,
             "stream": True,
              "options": {
@@ -526,31 +593,32 @@ class LLMClient:
         }
         
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                async with client.stream(
-                    "POST",
-                    f"{self.ollama_base_url}/chat",
-                    json=payload
-                ) as response:
-                    response.raise_for_status()
+            client = self._http.client("ollama")
+            async with client.stream(
+                "POST",
+                f"{self.ollama_base_url}/chat",
+                json=payload,
+                timeout=STREAM_TIMEOUT
+            ) as response:
+                response.raise_for_status()
                     
-                    async for line in response.aiter_lines():
-                        if not line:
-                            continue
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
                             
-                        try:
-                            # Ollama returns full JSON object per line
-                            chunk = json.loads(line)
+                    try:
+                        # Ollama returns full JSON object per line
+                        chunk = json.loads(line)
                             
-                            if chunk.get("done"):
-                                break
+                        if chunk.get("done"):
+                            break
                                 
-                            content = chunk.get("message", {}).get("content", "")
-                            if content:
-                                yield content
+                        content = chunk.get("message", {}).get("content", "")
+                        if content:
+                            yield content
                                 
-                        except json.JSONDecodeError:
-                            continue
+                    except json.JSONDecodeError:
+                        continue
                                 
         except Exception as e:
             logger.error(f"Ollama streaming failed: {e}", exc_info=True)
@@ -577,3 +645,20 @@ def reset_llm_client():
     """Reset the LLM client instance (useful for tests and hot reloads)"""
     global _llm_client_instance
     _llm_client_instance = None
+
+async def close_llm_client():
+    """Close the shared HTTP clients of the global instance, if one was created (app shutdown)"""
+    if _llm_client_instance is not None:
+        await _llm_client_instance.aclose()
+
+def llm_router_metrics() -> Dict[str, Any]:
+    """Router metrics of the global instance without creating it"""
+    if _llm_client_instance is None:
+        return {"providers": {}}
+    return _llm_client_instance.router_metrics()
+
+def llm_http_stats() -> Dict[str, Any]:
+    """HTTP pool stats of the global instance without creating it"""
+    if _llm_client_instance is None:
+        return {"providers": {}}
+    return _llm_client_instance.http_stats()
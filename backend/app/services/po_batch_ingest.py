@@ -0,0 +1,196 @@
+"""
+Batch PO Ingestion
+Pipeline behind /api/po/upload/batch.
+
+HTML parsing (BeautifulSoup + lxml) is CPU-bound and independent per file, so it runs in a
+process pool instead of on the event loop. Parsed POs are written in upload order (a PO number
+uploaded twice ends up as its last file, like sequential ingestion) in chunks of
+INGEST_WRITE_CHUNK: each chunk is one short writer-lane transaction using
+POIngestionService.ingest_many, so other writes interleave between chunks. Per-file results are
+yielded as soon as their chunk is committed.
+
+Files whose bytes were already ingested (app.services.ingest_ledger) are answered before parsing.
+Every file's outcome is recorded in the ledger with the chunk that follows it.
+"""
+import os
+import asyncio
+import multiprocessing
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db import ConnectionPool, get_pool
+from app.services.ingest_ledger import LedgerEntry, ingest_ledger
+from app.services.ingest_po import POIngestionService
+from app.services.po_scraper import parse_po_html
+
+logger = logging.getLogger(__name__)
+
+
+def _file_result(
+    filename: str, success: bool = False, po_number: Any = None, message: str = "",
+    changes: Optional[Dict[str, Any]] = None, duplicate: bool = False
+) -> Dict[str, Any]:
+    return {
+        "filename": filename, "success": success, "po_number": po_number, "message": message,
+        "changes": changes, "duplicate": duplicate
+    }
+
+
+def _ledger_status(result: Dict[str, Any]) -> str:
+    if result["duplicate"]:
+        return "duplicate"
+    if not result["success"]:
+        return "failed"
+    return result["changes"]["status"] if result["changes"] else "superseded"
+
+
+class POBatchIngestService:
+    """Parse uploads in worker processes, write them in chunked bulk transactions"""
+
+    def __init__(self, pool: Optional[ConnectionPool] = None, workers: Optional[int] = None, chunk_size: Optional[int] = None):
+        self._pool = pool
+        self.workers = workers or settings.INGEST_PARSE_WORKERS or os.cpu_count() or 1
+        self.chunk_size = chunk_size or settings.INGEST_WRITE_CHUNK
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.ingestion_service = POIngestionService()
+
+    @property
+    def pool(self) -> ConnectionPool:
+        return self._pool or get_pool()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that already runs threads (pool, uvicorn) can deadlock children
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def _write_chunk(
+        self,
+        chunk: List[Tuple[int, str, Dict, List[Dict]]],
+        files: Dict[int, Tuple[str, int]],
+        answered: List[Tuple[int, Dict[str, Any]]],
+        source: str = "batch"
+    ) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        One writer transaction for a chunk of parsed POs; returns their (upload index, file result).
+        Ledger entries for the chunk, and for files already answered without a write, are added in
+        the same transaction. files maps upload index -> (sha256, size).
+        """
+        def ledger_entries(results):
+            return [
+                LedgerEntry(files[idx][0], result["filename"], files[idx][1], result["po_number"],
+                            _ledger_status(result), result["message"], source)
+                for idx, result in answered + results
+            ]
+
+        with self.pool.connection(readonly=False) as db:
+            try:
+                outcomes = self.ingestion_service.ingest_many(db, [(header, items) for _, _, header, items in chunk])
+                results = []
+                for (idx, filename, header, _), (success, warnings, diff) in zip(chunk, outcomes):
+                    po_number = header.get("PURCHASE ORDER")
+                    if success:
+                        message = warnings[0] if warnings else f"Successfully ingested PO {po_number}"
+                        results.append((idx, _file_result(filename, True, po_number, message, diff)))
+                    else:
+                        results.append((idx, _file_result(filename, message=f"Error: {warnings[0]}" if warnings else "Failed to ingest PO")))
+                ingest_ledger.record(db, ledger_entries(results))
+                db.commit()
+                return results
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Batch ingestion chunk failed: {e}", exc_info=True)
+                results = [
+                    (idx, _file_result(filename, po_number=header.get("PURCHASE ORDER"), message=f"Error: {str(e)}"))
+                    for idx, filename, header, _ in chunk
+                ]
+
+            try:
+                ingest_ledger.record(db, ledger_entries(results))
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Batch ingestion ledger write failed: {e}", exc_info=True)
+        return results
+
+    def _find_ingested(self, digests: List[str]) -> Dict[str, Dict[str, Any]]:
+        with self.pool.connection(readonly=True) as db:
+            return ingest_ledger.find_ingested(db, digests)
+
+    async def ingest(self, files: List[Tuple[str, bytes]], source: str = "batch") -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Yield (upload index, file result) per (filename, content), as soon as the file is known
+        to be a duplicate, fails to parse or its chunk commits. source is recorded in the ledger.
+        """
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+
+        digests = {idx: (ingest_ledger.digest(content), len(content)) for idx, (_, content) in enumerate(files)}
+        ingested = await run_in_threadpool(self._find_ingested, [digest for digest, _ in digests.values()])
+
+        pending: Dict[asyncio.Future, Tuple[int, str]] = {}
+        ready: Dict[int, Optional[Tuple[str, Dict, List[Dict]]]] = {}
+        answered: List[Tuple[int, Dict[str, Any]]] = []  # results still to be recorded in the ledger
+        for idx, (filename, content) in enumerate(files):
+            if not filename.endswith('.html'):
+                result = _file_result(filename, message="Only HTML files are supported")
+            elif digests[idx][0] in ingested:
+                previous = ingested[digests[idx][0]]
+                result = _file_result(
+                    filename, True, previous["po_number"],
+                    f"✅ File already ingested as PO {previous['po_number']} (Amendment {previous['amend_no']}), skipped",
+                    duplicate=True
+                )
+            else:
+                pending[loop.run_in_executor(executor, parse_po_html, content)] = (idx, filename)
+                continue
+            ready[idx] = None
+            answered.append((idx, result))
+            yield idx, result
+
+        next_idx = 0
+        chunk: List[Tuple[int, str, Dict, List[Dict]]] = []
+        while pending or chunk or answered:
+            if pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    idx, filename = pending.pop(future)
+                    try:
+                        header, items = future.result()
+                    except Exception as e:
+                        result = _file_result(filename, message=f"Error: {str(e)}")
+                    else:
+                        if header.get("PURCHASE ORDER"):
+                            ready[idx] = (filename, header, items)
+                            continue
+                        result = _file_result(filename, message="Could not extract PO number from HTML")
+                    ready[idx] = None
+                    answered.append((idx, result))
+                    yield idx, result
+
+            # Move the contiguous parsed prefix into the write chunk, keeping upload order
+            while next_idx in ready:
+                parsed = ready.pop(next_idx)
+                if parsed is not None:
+                    chunk.append((next_idx, *parsed))
+                next_idx += 1
+
+            if (chunk or answered) and (len(chunk) >= self.chunk_size or not pending):
+                written = await run_in_threadpool(self._write_chunk, chunk, digests, answered, source)
+                chunk, answered = [], []
+                for item in written:
+                    yield item
+
+    def shutdown(self) -> None:
+        """Stop the parser processes (application shutdown)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Singleton instance
+po_batch_ingest_service = POBatchIngestService()
@@ -0,0 +1,270 @@
+"""
+PO Drop-Folder Watcher
+Long-running ingestion of PO HTML files dropped into INGEST_WATCH_DIR.
+
+The folder is polled with one os.scandir per interval. A file is picked up once its size and
+mtime are unchanged between two scans and it is at least INGEST_WATCH_SETTLE_SECONDS old, so
+files still being copied in are left alone (temporary / hidden names are ignored outright).
+Ready files go through the batch upload pipeline (app.services.po_batch_ingest: parser
+processes, chunked writes, ingestion ledger) in micro-batches bounded by file count and bytes,
+oldest first, and are then moved to done/ or failed/ inside the folder.
+
+Backpressure: the next micro-batch is read only after the previous one is written, and
+none is started while the pool's writer lane is fully in use, so interactive writes go first.
+
+Runs inside the API (set INGEST_WATCH_DIR) or standalone:
+    python -m app.services.po_folder_watcher <dir> [--once]
+"""
+import os
+import sys
+import time
+import asyncio
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db import ConnectionPool, get_pool
+from app.services.po_batch_ingest import POBatchIngestService, po_batch_ingest_service
+
+logger = logging.getLogger(__name__)
+
+DONE_DIR = "done"
+FAILED_DIR = "failed"
+
+
+class POFolderWatcher:
+    """Poll a folder for PO HTML files and ingest them in micro-batches"""
+
+    def __init__(
+        self,
+        watch_dir: Optional[str] = None,
+        batch_service: Optional[POBatchIngestService] = None,
+        pool: Optional[ConnectionPool] = None,
+        poll_seconds: Optional[float] = None,
+        settle_seconds: Optional[float] = None,
+        batch_files: Optional[int] = None,
+        batch_mb: Optional[float] = None,
+    ):
+        self._watch_dir = watch_dir
+        self.batch_service = batch_service or po_batch_ingest_service
+        self._pool = pool
+        self.poll_seconds = settings.INGEST_WATCH_POLL_SECONDS if poll_seconds is None else poll_seconds
+        self.settle_seconds = settings.INGEST_WATCH_SETTLE_SECONDS if settle_seconds is None else settle_seconds
+        self.batch_files = batch_files or settings.INGEST_WATCH_BATCH_FILES
+        self.batch_bytes = int((batch_mb or settings.INGEST_WATCH_BATCH_MB) * 1024 * 1024)
+        self._task: Optional[asyncio.Task] = None
+        # name -> (size, mtime_ns) at the last scan
+        self._tracked: Dict[str, Tuple[int, int]] = {}
+
+        # Metrics
+        self.started_at: Optional[float] = None
+        self.files_done = 0
+        self.files_failed = 0
+        self.files_duplicate = 0
+        self.bytes_total = 0
+        self.batches = 0
+        self.busy_seconds = 0.0
+        self.backlog = 0
+        self.backpressure_waits = 0
+        self.errors = 0
+        self.last_batch: Optional[Dict[str, Any]] = None
+
+    @property
+    def watch_dir(self) -> Optional[Path]:
+        path = self._watch_dir if self._watch_dir is not None else settings.INGEST_WATCH_DIR
+        return Path(path) if path else None
+
+    @property
+    def pool(self) -> ConnectionPool:
+        return self._pool or get_pool()
+
+    def scan(self) -> List[Tuple[Path, int]]:
+        """Settled files as (path, size), oldest first; updates the tracked signatures"""
+        now = time.time()
+        tracked, ready = {}, []
+        with os.scandir(self.watch_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith(".") or not entry.name.endswith(".html") or not entry.is_file():
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                signature = (stat.st_size, stat.st_mtime_ns)
+                tracked[entry.name] = signature
+                if self._tracked.get(entry.name) == signature and now - stat.st_mtime >= self.settle_seconds:
+                    ready.append((stat.st_mtime_ns, entry.name, Path(entry.path), stat.st_size))
+        self._tracked = tracked
+        ready.sort()
+        return [(path, size) for _, _, path, size in ready]
+
+    def _writer_busy(self) -> bool:
+        writers = self.pool.stats()["writers"]
+        return writers["in_use"] >= writers["size"]
+
+    def _take_batch(self, ready: List[Tuple[Path, int]]) -> List[Tuple[Path, bytes]]:
+        """Read the next micro-batch (at least one file, then within the file / byte bounds)"""
+        batch, total = [], 0
+        for path, size in ready:
+            if batch and (len(batch) >= self.batch_files or total + size > self.batch_bytes):
+                break
+            try:
+                batch.append((path, path.read_bytes()))
+            except FileNotFoundError:
+                continue
+            total += size
+        return batch
+
+    def _move(self, path: Path, folder: str) -> None:
+        target_dir = path.parent / folder
+        target_dir.mkdir(exist_ok=True)
+        target = target_dir / path.name
+        counter = 1
+        while target.exists():
+            target = target_dir / f"{path.stem}.{counter}{path.suffix}"
+            counter += 1
+        try:
+            os.replace(path, target)
+        except FileNotFoundError:
+            pass
+        self._tracked.pop(path.name, None)
+
+    async def run_once(self) -> int:
+        """Ingest one micro-batch; returns the number of files taken (0 = nothing to do now)"""
+        if self._writer_busy():
+            self.backpressure_waits += 1
+            return 0
+        ready = await run_in_threadpool(self.scan)
+        if not ready:
+            self.backlog = 0
+            return 0
+
+        start = time.perf_counter()
+        batch = await run_in_threadpool(self._take_batch, ready)
+        self.backlog = len(ready) - len(batch)
+        if not batch:
+            return 0
+
+        counts = {"done": 0, "failed": 0, "duplicate": 0}
+        uploads = [(path.name, content) for path, content in batch]
+        async for idx, result in self.batch_service.ingest(uploads, source="watch"):
+            path = batch[idx][0]
+            if result["success"]:
+                counts["done"] += 1
+                counts["duplicate"] += result["duplicate"]
+            else:
+                counts["failed"] += 1
+                logger.warning(f"PO file {path.name} failed: {result['message']}")
+            await run_in_threadpool(self._move, path, DONE_DIR if result["success"] else FAILED_DIR)
+
+        elapsed = time.perf_counter() - start
+        batch_bytes = sum(len(content) for _, content in batch)
+        self.files_done += counts["done"]
+        self.files_failed += counts["failed"]
+        self.files_duplicate += counts["duplicate"]
+        self.bytes_total += batch_bytes
+        self.batches += 1
+        self.busy_seconds += elapsed
+        self.last_batch = {
+            "files": len(batch),
+            "bytes": batch_bytes,
+            "seconds": round(elapsed, 3),
+            "files_per_sec": round(len(batch) / elapsed, 1) if elapsed else None,
+            **counts
+        }
+        logger.info(f"Drop folder batch: {len(batch)} files in {elapsed:.2f}s ({counts}), backlog {self.backlog}")
+        return len(batch)
+
+    async def run(self, once: bool = False) -> None:
+        """Poll until cancelled; with once=True, return when the folder has been drained"""
+        self.watch_dir.mkdir(parents=True, exist_ok=True)
+        self.started_at = time.time()
+        logger.info(f"Watching {self.watch_dir} for PO HTML files")
+        while True:
+            try:
+                taken = await self.run_once()
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Drop folder ingestion failed: {e}", exc_info=True)
+                taken = 0
+            if taken:
+                continue  # Drain the backlog without waiting
+            if once and not self._tracked:
+                return
+            await asyncio.sleep(self.poll_seconds)
+
+    def start(self) -> bool:
+        """Schedule the watcher on the running event loop if a folder is configured (application startup)"""
+        if self.watch_dir is None:
+            return False
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+        return True
+
+    async def stop(self) -> None:
+        """Cancel the watcher (application shutdown); files of an interrupted batch stay in the folder"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        processed = self.files_done + self.files_failed
+        return {
+            "watch_dir": str(self.watch_dir) if self.watch_dir else None,
+            "running": self._task is not None and not self._task.done(),
+            "uptime_seconds": round(time.time() - self.started_at, 1) if self.started_at else None,
+            "files_done": self.files_done,
+            "files_failed": self.files_failed,
+            "files_duplicate": self.files_duplicate,
+            "bytes_total": self.bytes_total,
+            "batches": self.batches,
+            "files_per_sec": round(processed / self.busy_seconds, 1) if self.busy_seconds else None,
+            "backlog": self.backlog,
+            "settling": max(len(self._tracked) - self.backlog, 0),
+            "backpressure_waits": self.backpressure_waits,
+            "errors": self.errors,
+            "last_batch": self.last_batch,
+        }
+
+
+# Singleton instance
+po_folder_watcher = POFolderWatcher()
+
+
+def main(argv: List[str]) -> int:
+    """Standalone worker: apply migrations, then watch (or with --once, drain) the folder"""
+    from app.core.logging_config import setup_logging
+    from app.db import get_connection, apply_pending_migrations, close_pool
+
+    args = [a for a in argv if not a.startswith("--")]
+    if not args and not settings.INGEST_WATCH_DIR:
+        print("usage: python -m app.services.po_folder_watcher <dir> [--once]")
+        return 2
+    setup_logging(log_level="INFO", use_json=False)
+    conn = get_connection()
+    try:
+        apply_pending_migrations(conn)
+    finally:
+        conn.close()
+
+    watcher = POFolderWatcher(watch_dir=args[0] if args else None)
+    try:
+        asyncio.run(watcher.run(once="--once" in argv))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.batch_service.shutdown()
+        close_pool()
+        logger.info(f"Drop folder watcher stopped: {watcher.stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -69,92 +69,126 @@ def normalize_date(val):
 # --------------------------------------------------
 # Header Extraction
 # --------------------------------------------------
-def extract_po_header(soup):
-    tables = soup.find_all("table")
-    header = {}
+# (key, label regex, where the value sits when it is not inline), in output order
+HEADER_FIELDS = [
+    # Inline fields
+    ("TIN NO", r"TIN\s+NO", "below"),
+    ("ECC NO", r"ECC\s+NO", "below"),
+    ("MPCT NO", r"MPCT\s+NO", "below"),
+    ("PHONE", r"PHONE", "below"),
+    ("FAX", r"FAX", "below"),
+    ("EMAIL", r"EMAIL", "below"),
+    ("WEBSITE", r"WEBSITE", "below"),
+    # Below-cell fields
+    ("PURCHASE ORDER", r"^PURCHASE\s+ORDER$", "below"),
+    ("PO DATE", r"PO\s+DATE", "below"),
+    ("ENQUIRY", r"^ENQUIRY$", "below"),  # Made more specific - exact match only
+    ("SUPP CODE", r"SUPP\s+CODE", "below"),
+    ("ORD-TYPE", r"ORD-TYPE", "below"),
+    ("DVN", r"DVN", "below"),
+    ("QUOTATION", r"QUOTATION", "below"),
+    ("QUOT-DATE", r"QUOT-DATE", "below"),
+    ("PO STATUS", r"PO\s+STATUS", "below"),
+    ("AMEND NO", r"AMEND\s+NO", "below"),
+    ("PO-VALUE", r"PO-VALUE", "below"),
+    ("RC NO", r"RC\s+NO", "below"),
+    ("EX RATE", r"EX\s+RATE", "below"),
+    ("CURRENCY", r"CURRENCY", "below"),
+    ("FOB VALUE", r"FOB\s+VALUE", "below"),
+    ("NET PO VAL", r"NET\s+PO\s+VAL", "below"),
+    ("ENQ DATE", r"ENQ\s+DATE", "below"),
+    ("REMARKS", r"REMARKS", "below"),
+    ("TOTAL VALUE", r"TOTAL\s+VALUE", "below"),
+    ("SUPP NAME M/S", r"^SUPP\s+NAME\s+M/S$", "below"),
+    # Adjacent-only fields
+    ("INSPECTION BY", r"INSPECTION\s+BY", "adjacent"),
+    ("NAME", r"^NAME$", "adjacent"),
+    ("DESIGNATION", r"DESIGNATION", "adjacent"),
+    ("PHONE NO", r"^PHONE\s+NO$", "adjacent"),
+]
+
+RX_LABELS = {key: re.compile(rx, re.IGNORECASE) for key, rx, _ in HEADER_FIELDS}
+RX_INLINE = {key: re.compile(rf"{rx}[:\.]?\s*(.+)", re.IGNORECASE) for key, rx, _ in HEADER_FIELDS}
+# Prefilter: a cell matching none of the labels is only ever a value
+RX_ANY_LABEL = re.compile("|".join(f"(?:{rx})" for _, rx, _ in HEADER_FIELDS), re.IGNORECASE)
 
-    def find_value(label_rx, prefer="below"):
-        for table in tables:
-            rows = table.find_all("tr")
-            for r_idx, row in enumerate(rows):
-                cells = row.find_all("td")
-                for c_idx, cell in enumerate(cells):
-                    cell_text = clean(cell.get_text())
 
-                    if not re.search(label_rx, cell_text, re.IGNORECASE):
+class CellIndex:
+    """
+    Cleaned text of every table cell, built in one walk of the document.
+
+    grids[t][r][c] is cell c of row r of table t with the same membership as
+    table.find_all("tr") / row.find_all("td") (nested tables included), so lookups
+    match a per-label scan of the tables. `labels` holds each label's matching cell
+    positions in document order.
+    """
+
+    def __init__(self, soup):
+        self.grids = []
+        rows_of = {}
+        cells_of = {}
+
+        for el in soup.find_all(["table", "tr", "td"]):
+            if el.name == "table":
+                rows_of[id(el)] = rows = []
+                self.grids.append(rows)
+            elif el.name == "tr":
+                cells_of[id(el)] = cells = []
+                for parent in el.parents:
+                    if parent.name == "table":
+                        rows_of[id(parent)].append(cells)
+            else:
+                text = clean(el.get_text())
+                for parent in el.parents:
+                    if parent.name == "tr":
+                        cells_of[id(parent)].append(text)
+
+        self.labels = {key: [] for key in RX_LABELS}
+        for t_idx, rows in enumerate(self.grids):
+            for r_idx, cells in enumerate(rows):
+                for c_idx, text in enumerate(cells):
+                    if not RX_ANY_LABEL.search(text):
                         continue
+                    for key, rx in RX_LABELS.items():
+                        if rx.search(text):
+                            self.labels[key].append((t_idx, r_idx, c_idx))
+
+    def find_value(self, key, prefer="below"):
+        """Value of a label: inline after it, else the adjacent cell (if preferred), else the cell below"""
+        for t_idx, r_idx, c_idx in self.labels[key]:
+            rows = self.grids[t_idx]
+            cells = rows[r_idx]
+
+            inline = RX_INLINE[key].search(cells[c_idx])
+            if inline and has_value(inline.group(1)):
+                return clean(inline.group(1))
 
-                    inline = re.search(
-                        rf"{label_rx}[:\.]?\s*(.+)",
-                        cell_text,
-                        re.IGNORECASE
-                    )
-                    if inline and has_value(inline.group(1)):
-                        return clean(inline.group(1))
-
-                    if prefer == "adjacent" and c_idx + 1 < len(cells):
-                        val = clean(cells[c_idx + 1].get_text())
-                        if has_value(val):
-                            return val
-
-                    if r_idx + 1 < len(rows):
-                        below_cells = rows[r_idx + 1].find_all("td")
-                        if c_idx < len(below_cells):
-                            val = clean(below_cells[c_idx].get_text())
-                            if has_value(val) and not RX_LABEL_ONLY.match(val):
-                                return val
+            if prefer == "adjacent" and c_idx + 1 < len(cells):
+                val = cells[c_idx + 1]
+                if has_value(val):
+                    return val
+
+            if r_idx + 1 < len(rows):
+                below_cells = rows[r_idx + 1]
+                if c_idx < len(below_cells):
+                    val = below_cells[c_idx]
+                    if has_value(val) and not RX_LABEL_ONLY.match(val):
+                        return val
         return ""
 
-    # Inline fields
-    for k, rx in {
-        "TIN NO": r"TIN\s+NO",
-        "ECC NO": r"ECC\s+NO",
-        "MPCT NO": r"MPCT\s+NO",
-        "PHONE": r"PHONE",
-        "FAX": r"FAX",
-        "EMAIL": r"EMAIL",
-        "WEBSITE": r"WEBSITE"
-    }.items():
-        header[k] = find_value(rx)
 
-    # Below-cell fields
-    for k, rx in {
-        "PURCHASE ORDER": r"^PURCHASE\s+ORDER$",
-        "PO DATE": r"PO\s+DATE",
-        "ENQUIRY": r"^ENQUIRY$",  # Made more specific - exact match only
-        "SUPP CODE": r"SUPP\s+CODE",
-        "ORD-TYPE": r"ORD-TYPE",
-        "DVN": r"DVN",
-        "QUOTATION": r"QUOTATION",
-        "QUOT-DATE": r"QUOT-DATE",
-        "PO STATUS": r"PO\s+STATUS",
-        "AMEND NO": r"AMEND\s+NO",
-        "PO-VALUE": r"PO-VALUE",
-        "RC NO": r"RC\s+NO",
-        "EX RATE": r"EX\s+RATE",
-        "CURRENCY": r"CURRENCY",
-        "FOB VALUE": r"FOB\s+VALUE",
-        "NET PO VAL": r"NET\s+PO\s+VAL",
-        "ENQ DATE": r"ENQ\s+DATE",
-        "REMARKS": r"REMARKS",
-        "TOTAL VALUE": r"TOTAL\s+VALUE",
-        "SUPP NAME M/S": r"^SUPP\s+NAME\s+M/S$"
-    }.items():
-        header[k] = find_value(rx, prefer="below")
-    
+def extract_po_header(soup):
+    tables = soup.find_all("table")
+    index = CellIndex(soup)
+    header = {}
+
+    for key, _, prefer in HEADER_FIELDS:
+        header[key] = index.find_value(key, prefer)
+
     # Validate ENQUIRY - reject if too long (likely grabbed "Important Note" text)
     if header.get("ENQUIRY") and len(str(header["ENQUIRY"])) > 50:
         header["ENQUIRY"] = ""  # Clear invalid data
 
-    # Adjacent-only fields
-    for k, rx in {
-        "INSPECTION BY": r"INSPECTION\s+BY",
-        "NAME": r"^NAME$",
-        "DESIGNATION": r"DESIGNATION",
-        "PHONE NO": r"^PHONE\s+NO$"
-    }.items():
-        header[k] = find_value(rx, prefer="adjacent")
-
     # DRG
     header["DRG"] = ""
     for table in tables:
@@ -178,6 +212,11 @@ def extract_po_header(soup):
 
     return header
 
+def parse_po_html(content):
+    """Header and items of one PO document (module-level so worker processes can run it)"""
+    soup = BeautifulSoup(content, "lxml")
+    return extract_po_header(soup), extract_items(soup)
+
 # --------------------------------------------------
 # Item Extraction
 # --------------------------------------------------
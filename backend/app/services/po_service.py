@@ -5,9 +5,11 @@ Separates concerns from the API router.
 """
 import sqlite3
 import logging
-from typing import List, Optional, Dict, Any
+import json
+import base64
+from typing import List, Optional, Dict, Any, Tuple
 from app.models import POListItem, PODetail, POHeader, POItem, POStats
-from app.errors import not_found
+from app.errors import not_found, bad_request
 
 logger = logging.getLogger(__name__)
 
@@ -43,46 +45,97 @@ class POService:
                 total_value_change=0.0
             )
 
-    def list_pos(self, db: sqlite3.Connection) -> List[POListItem]:
+    def list_pos(
+        self,
+        db: sqlite3.Connection,
+        status: Optional[str] = None,
+        supplier: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[POListItem]:
         """
-        List all Purchase Orders with aggregated quantity details.
+        List Purchase Orders with aggregated quantity details.
         Calculates ordered, dispatched, and pending quantities.
+
+        One statement: the page of POs is selected first, then quantities (from
+        po_item_rollup) and linked DCs are aggregated with GROUP BY for that page only.
+        Pagination is keyset on (created_at, po_number) DESC - pass the cursor from
+        `encode_cursor(last_item)` to continue. date_from / date_to are YYYY-MM-DD.
         """
-        rows = db.execute("""
-            SELECT po_number, po_date, supplier_name, po_value, amend_no, po_status, created_at
-            FROM purchase_orders
-            ORDER BY created_at DESC
-        """).fetchall()
-        
+        where = []
+        params: List[Any] = []
+
+        if status:
+            if status == "New":
+                where.append("(po_status = ? OR po_status IS NULL)")
+            else:
+                where.append("po_status = ?")
+            params.append(status)
+
+        if supplier:
+            where.append("supplier_name LIKE ?")
+            params.append(f"%{supplier}%")
+
+        # po_date is stored as DD/MM/YYYY; range filters use the indexed ISO column
+        if date_from:
+            where.append("po_date_iso >= ?")
+            params.append(date_from)
+        if date_to:
+            where.append("po_date_iso <= ?")
+            params.append(date_to)
+
+        if cursor:
+            created_at, po_number = self.decode_cursor(cursor)
+            where.append("(created_at, po_number) < (?, ?)")
+            params.extend([created_at, po_number])
+
+        where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+        params.append(limit if limit else -1)
+
+        rows = db.execute(f"""
+            WITH page AS (
+                SELECT po_number, po_date, supplier_name, po_value, amend_no, po_status, created_at
+                FROM purchase_orders
+                {where_sql}
+                ORDER BY created_at DESC, po_number DESC
+                LIMIT ?
+            ),
+            quantities AS (
+                SELECT po_number, SUM(ordered_qty) AS total_ordered, SUM(dispatched_qty) AS total_dispatched
+                FROM po_item_rollup
+                WHERE po_number IN (SELECT po_number FROM page)
+                GROUP BY po_number
+            ),
+            dcs AS (
+                SELECT po_number, group_concat(dc_number, ', ') AS linked_dc_numbers
+                FROM (
+                    SELECT po_number, dc_number FROM delivery_challans
+                    WHERE po_number IN (SELECT po_number FROM page)
+                    ORDER BY po_number, rowid
+                )
+                GROUP BY po_number
+            )
+            SELECT page.*,
+                   COALESCE(quantities.total_ordered, 0) AS total_ordered,
+                   COALESCE(quantities.total_dispatched, 0) AS total_dispatched,
+                   dcs.linked_dc_numbers
+            FROM page
+            LEFT JOIN quantities ON quantities.po_number = page.po_number
+            LEFT JOIN dcs ON dcs.po_number = page.po_number
+            ORDER BY page.created_at DESC, page.po_number DESC
+        """, params).fetchall()
+
         results = []
         for row in rows:
-            po_num = row['po_number']
-            
-            # Calculate Total Ordered Quantity
-            ordered_row = db.execute("""
-                SELECT SUM(ord_qty) FROM purchase_order_items WHERE po_number = ?
-            """, (po_num,)).fetchone()
-            total_ordered = ordered_row[0] if ordered_row and ordered_row[0] else 0.0
-
-            # Calculate Total Dispatched Quantity
-            # Link via PO Items to get specific dispatches for this PO
-            dispatched_row = db.execute("""
-                SELECT SUM(dci.dispatch_qty) 
-                FROM delivery_challan_items dci
-                JOIN purchase_order_items poi ON dci.po_item_id = poi.id
-                WHERE poi.po_number = ?
-            """, (po_num,)).fetchone()
-            total_dispatched = dispatched_row[0] if dispatched_row and dispatched_row[0] else 0.0
+            total_ordered = row["total_ordered"] or 0.0
+            total_dispatched = row["total_dispatched"] or 0.0
 
             # Calculate Pending (Derived)
             # Rule 3: pending_quantity is derived only, never persisted.
             total_pending = max(0, total_ordered - total_dispatched)
 
-            # Fetch linked DC numbers for reference
-            dc_rows = db.execute("SELECT dc_number FROM delivery_challans WHERE po_number = ?", (po_num,)).fetchall()
-            dc_nums = [r['dc_number'] for r in dc_rows]
-            linked_dcs_str = ", ".join(dc_nums) if dc_nums else None
-
             results.append(POListItem(
                 po_number=row["po_number"],
                 po_date=row["po_date"],
@@ -90,86 +143,110 @@ class POService:
                 po_value=row["po_value"],
                 amend_no=row["amend_no"],
                 po_status=row["po_status"] or "New",
-                linked_dc_numbers=linked_dcs_str,
+                linked_dc_numbers=row["linked_dc_numbers"],
                 total_ordered_quantity=total_ordered,
                 total_dispatched_quantity=total_dispatched,
                 total_pending_quantity=total_pending,
                 created_at=row["created_at"]
             ))
-        
+
         return results
 
-    def get_po_detail(self, db: sqlite3.Connection, po_number: int) -> PODetail:
+    @staticmethod
+    def encode_cursor(item: POListItem) -> str:
+        """Opaque keyset cursor pointing just past `item`"""
+        raw = json.dumps([item.created_at, item.po_number])
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[str, int]:
+        try:
+            created_at, po_number = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return created_at, int(po_number)
+        except (ValueError, TypeError) as e:
+            raise bad_request(f"Invalid cursor: {cursor}") from e
+
+    def get_po_detail(self, db: sqlite3.Connection, po_number: int, include_lots: bool = False) -> PODetail:
         """
         Get full Purchase Order detail with items and delivery schedules.
+
+        Items (with their po_item_rollup quantities) and deliveries are loaded with one
+        query each for the whole PO and assembled in memory. With `include_lots`, every
+        delivery lot also carries its dispatched and pending quantity (DC items matched
+        on lot_no), which costs one more grouped query.
         """
         # Get header
         header_row = db.execute("""
             SELECT * FROM purchase_orders WHERE po_number = ?
         """, (po_number,)).fetchone()
-        
+
         if not header_row:
             raise not_found(f"Purchase Order {po_number} not found", "PO")
-        
+
         header = POHeader(**dict(header_row))
-        
+
         # Get items
         # Aliasing columns to match updated POItem model (Standardized Naming)
         item_rows = db.execute("""
-            SELECT id, po_item_no, material_code, material_description, drg_no, mtrl_cat,
-                   unit, po_rate, ord_qty as ordered_quantity, rcd_qty as received_quantity, item_value, hsn_code
-            FROM purchase_order_items
-            WHERE po_number = ?
+            SELECT poi.id, po_item_no, material_code, material_description, drg_no, mtrl_cat,
+                   unit, po_rate, ord_qty as ordered_quantity, rcd_qty as received_quantity, item_value, hsn_code,
+                   COALESCE(r.dispatched_qty, 0) as dispatched_quantity
+            FROM purchase_order_items poi
+            LEFT JOIN po_item_rollup r ON r.po_item_id = poi.id
+            WHERE poi.po_number = ?
             ORDER BY po_item_no
         """, (po_number,)).fetchall()
-        
-        # For each item, get deliveries
+
+        # Get deliveries for all items of this PO
+        # Aliasing columns to match updated PODelivery model
+        delivery_rows = db.execute("""
+            SELECT pod.po_item_id, pod.id, pod.lot_no, pod.dely_qty as delivered_quantity,
+                   pod.dely_date, pod.entry_allow_date, pod.dest_code
+            FROM purchase_order_deliveries pod
+            JOIN purchase_order_items poi ON pod.po_item_id = poi.id
+            WHERE poi.po_number = ?
+            ORDER BY pod.po_item_id, pod.lot_no
+        """, (po_number,)).fetchall()
+
+        deliveries_by_item: Dict[str, List[Dict[str, Any]]] = {}
+        for row in delivery_rows:
+            delivery = dict(row)
+            deliveries_by_item.setdefault(delivery.pop('po_item_id'), []).append(delivery)
+
+        # Lot-level dispatch is not in the rollup; aggregate DC items only when asked
+        dispatched_by_lot: Dict[Tuple[str, Optional[int]], float] = {}
+        if include_lots:
+            dispatched_rows = db.execute("""
+                SELECT dci.po_item_id, dci.lot_no, SUM(dci.dispatch_qty) as dispatched
+                FROM delivery_challan_items dci
+                JOIN purchase_order_items poi ON dci.po_item_id = poi.id
+                WHERE poi.po_number = ?
+                GROUP BY dci.po_item_id, dci.lot_no
+            """, (po_number,)).fetchall()
+            for row in dispatched_rows:
+                dispatched_by_lot[(row['po_item_id'], row['lot_no'])] = row['dispatched'] or 0
+
         items_with_deliveries = []
         for item_row in item_rows:
             item_dict = dict(item_row)
             item_id = item_dict['id']
-            
-            # Get deliveries for this item
-            # Aliasing columns to match updated PODelivery model
-            delivery_rows = db.execute("""
-                SELECT id, lot_no, dely_qty as delivered_quantity, dely_date, entry_allow_date, dest_code
-                FROM purchase_order_deliveries
-                WHERE po_item_id = ?
-                ORDER BY lot_no
-            """, (item_id,)).fetchall()
-            
-            deliveries = [dict(d) for d in delivery_rows]
-            
-            # Create POItem with deliveries
-            # Pending quantity calculation per item could be added here if needed by UI, 
-            # currently UI might calculate it or usage might be minimal. 
-            # model has pending_quantity field, assume explicit calc or default.
-            # Logic: pending = ordered - dispatched. Dispatched is in DC items.
-            # If detailed pending is needed per line item, we need to query DC items again.
-            # For now, let's keep it simple as per original router logic which didn't seem to calc per-item pending in detail view?
-            # Wait, router logic (Step 33) DID NOT calc per-item pending in get_po_detail. 
-            # It just returned items.
-            # However, POItem model has `pending_quantity`.
-            # I will calculate it to be better than before.
-            
-            # Calculate per-item dispatched
-            dispatched_res = db.execute("""
-                SELECT COALESCE(SUM(dispatch_qty), 0) FROM delivery_challan_items WHERE po_item_id = ?
-            """, (item_id,)).fetchone()
-            item_dispatched = dispatched_res[0] if dispatched_res else 0.0
-            
-            item_ordered = item_dict.get('ordered_quantity', 0)
+
+            deliveries = deliveries_by_item.get(item_id, [])
+            if include_lots:
+                for delivery in deliveries:
+                    lot_dispatched = dispatched_by_lot.get((item_id, delivery['lot_no']), 0)
+                    delivery['dispatched_quantity'] = lot_dispatched
+                    delivery['pending_quantity'] = max(0, (delivery['delivered_quantity'] or 0) - lot_dispatched)
+
+            # Pending = ordered - dispatched (dispatched comes from po_item_rollup)
+            item_dispatched = item_dict.pop('dispatched_quantity')
+            item_ordered = item_dict.get('ordered_quantity') or 0
             item_dict['pending_quantity'] = max(0, item_ordered - item_dispatched)
-            item_dict['delivered_quantity'] = item_dispatched # "delivered" in model often used for "dispatched" in this context? 
-            # Wait, model has `delivered_quantity` (Standardized from `delivered_qty`).
-            # In `purchase_order_items` table, `delivered_qty` column exists (defaults to 0).
-            # But we should probably use real dispatched count from DCs if that's the source of truth for "delivered" in a simplified flow?
-            # Router didn't touch it. I will leave it as is to avoid changing behavior too much. 
-            # Just pending_quantity is useful.
-            
+            item_dict['delivered_quantity'] = item_dispatched
+
             item_with_deliveries = {**item_dict, 'deliveries': deliveries}
             items_with_deliveries.append(POItem(**item_with_deliveries))
-        
+
         return PODetail(header=header, items=items_with_deliveries)
 
 # Singleton instance
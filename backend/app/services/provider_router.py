@@ -0,0 +1,295 @@
+"""
+LLM Provider Router
+Chooses which provider serves a chat / stream call from live latency and error statistics.
+
+- Each provider keeps a rolling window of recent calls (latency + outcome) for p50 / p95 and
+  error rate, and a circuit breaker that opens after LLM_BREAKER_FAILURES consecutive failures.
+  An open breaker is skipped until LLM_BREAKER_COOLDOWN_SECONDS pass; then one trial call
+  (half-open) decides whether it closes again, and the provider is skipped while it runs.
+  Breakers are claimed when an attempt starts, so hedges / failovers respect them too; with
+  every breaker open, calls fail fast with AIserviceError.
+- Candidates: the preferred provider first, then the other configured providers by p95.
+  A failed attempt fails over to the next candidate.
+- Hedging (LLM_HEDGE_ENABLED): if the first attempt has not answered after LLM_HEDGE_AFTER_MS,
+  the next candidate is fired as well and the first good answer wins; the other is cancelled.
+  Streams are not hedged, but fail over as long as no chunk has been yielded.
+
+Decisions and per-provider statistics are exposed at /api/health/llm-router.
+"""
+import asyncio
+import logging
+import math
+import time
+from collections import Counter, deque
+from typing import Any, AsyncGenerator, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.exceptions import AIserviceError
+
+logger = logging.getLogger(__name__)
+
+PROVIDERS = ("groq", "openrouter", "google", "ollama")
+STREAMING_PROVIDERS = ("groq", "openrouter", "ollama")
+
+# Calls kept per provider for percentiles / error rate
+WINDOW_SIZE = 100
+
+
+def _percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+class CircuitBreaker:
+    """closed -> open after consecutive failures -> half_open after cooldown -> closed / open"""
+
+    def __init__(self, failure_threshold: int, cooldown_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+
+    def available(self) -> bool:
+        """Whether a call may be sent now (without claiming the half-open trial)"""
+        if self.state == "open":
+            return time.monotonic() - self.opened_at >= self.cooldown_seconds
+        return self.state == "closed"
+
+    def acquire(self) -> bool:
+        """Claim permission for a call; an expired open breaker admits exactly one trial call"""
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown_seconds:
+            self.state = "half_open"
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            if self.state != "open":
+                self.trips += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """A claimed call was cancelled before finishing: give the trial slot back"""
+        if self.state == "half_open":
+            self.state = "open"
+
+
+class ProviderStats:
+    """Rolling latency / outcome window for one provider"""
+
+    def __init__(self, window: int = WINDOW_SIZE):
+        self.samples: Deque[Tuple[float, bool]] = deque(maxlen=window)
+        self.calls = 0
+        self.failures = 0
+
+    def record(self, latency_s: float, ok: bool) -> None:
+        self.samples.append((latency_s, ok))
+        self.calls += 1
+        if not ok:
+            self.failures += 1
+
+    def p95(self) -> Optional[float]:
+        return _percentile(sorted(lat for lat, ok in self.samples if ok), 95)
+
+    def to_dict(self) -> Dict[str, Any]:
+        latencies = sorted(lat for lat, ok in self.samples if ok)
+        p50, p95 = _percentile(latencies, 50), _percentile(latencies, 95)
+        errors = sum(1 for _, ok in self.samples if not ok)
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "window": len(self.samples),
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "error_rate": round(errors / len(self.samples), 3) if self.samples else 0.0,
+        }
+
+
+class ProviderRouter:
+    """
+    Routes calls across providers. `call` is the single-provider chat coroutine and
+    `stream` the single-provider stream generator (LLMClient dispatch methods);
+    `configured` tells which providers have credentials / endpoints.
+    """
+
+    def __init__(
+        self,
+        call: Callable[..., Awaitable[Dict[str, Any]]],
+        stream: Callable[..., AsyncGenerator[str, None]],
+        configured: Callable[[str], bool],
+    ):
+        self._call = call
+        self._stream = stream
+        self._configured = configured
+        self.stats = {p: ProviderStats() for p in PROVIDERS}
+        self.breakers = {
+            p: CircuitBreaker(settings.LLM_BREAKER_FAILURES, settings.LLM_BREAKER_COOLDOWN_SECONDS)
+            for p in PROVIDERS
+        }
+        self.decisions: Counter = Counter()
+
+    def candidates(self, preferred: Optional[str] = None) -> List[str]:
+        """
+        Providers to try, in order: preferred, then configured ones by p95 (unmeasured last),
+        leaving out open breakers (empty when all are open)
+        """
+        preferred = preferred or settings.LLM_PROVIDER
+        others = [p for p in PROVIDERS if p != preferred and self._configured(p)]
+        others.sort(key=lambda p: (self.stats[p].p95() is None, self.stats[p].p95() or 0.0))
+        ordered = [preferred] + others if preferred in PROVIDERS else others
+
+        available = [p for p in ordered if self.breakers[p].available()]
+        skipped = len(ordered) - len(available)
+        if skipped:
+            self.decisions["skipped_open_breaker"] += skipped
+        return available
+
+    def _claim(self, queue: List[str]) -> Optional[str]:
+        """Pop candidates until one whose breaker admits a call now (half-open: the single trial)"""
+        while queue:
+            provider = queue.pop(0)
+            if self.breakers[provider].acquire():
+                return provider
+            self.decisions["skipped_open_breaker"] += 1
+        return None
+
+    async def _attempt(self, provider: str, messages: List[Dict[str, str]], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """One call on a provider whose breaker was claimed by _claim"""
+        breaker = self.breakers[provider]
+        start = time.monotonic()
+        try:
+            result = await self._call(provider, messages, **kwargs)
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception:
+            self.stats[provider].record(time.monotonic() - start, False)
+            breaker.record_failure()
+            raise
+        self.stats[provider].record(time.monotonic() - start, True)
+        breaker.record_success()
+        return result
+
+    async def chat(self, messages: List[Dict[str, str]], preferred: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """First good answer across candidates (failover, optional hedge); adds result['provider']"""
+        queue = self.candidates(preferred)
+        pending: Dict[asyncio.Task, str] = {}
+        errors: Dict[str, str] = {}
+
+        def launch(reason: str) -> bool:
+            provider = self._claim(queue)
+            if provider is None:
+                return False
+            self.decisions[reason] += 1
+            pending[asyncio.ensure_future(self._attempt(provider, messages, kwargs))] = provider
+            return True
+
+        if not launch("primary"):
+            self.decisions["all_failed"] += 1
+            raise AIserviceError("no provider available (circuit breakers open)", "router")
+        first_provider = next(iter(pending.values()))
+        hedge_at = time.monotonic() + settings.LLM_HEDGE_AFTER_MS / 1000 if settings.LLM_HEDGE_ENABLED else None
+        hedged = False
+
+        try:
+            while pending:
+                timeout = None
+                if hedge_at is not None and not hedged and queue:
+                    timeout = max(hedge_at - time.monotonic(), 0)
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    hedged = True
+                    launch("hedge")
+                    continue
+
+                for task in done:
+                    provider = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        errors[provider] = str(e)
+                        logger.warning(f"LLM provider {provider} failed: {e}")
+                        continue
+                    if hedged:
+                        self.decisions["hedge_won" if provider != first_provider else "primary_won_hedge"] += 1
+                    return {**result, "provider": provider}
+
+                if not pending and queue:
+                    launch("failover")
+        finally:
+            for task in pending:
+                task.cancel()
+
+        self.decisions["all_failed"] += 1
+        raise AIserviceError("; ".join(f"{p}: {e}" for p, e in errors.items()) or "no provider available", "router")
+
+    async def stream(self, messages: List[Dict[str, str]], preferred: Optional[str] = None, **kwargs) -> AsyncGenerator[str, None]:
+        """Stream from the best candidate, failing over until the first chunk has been yielded"""
+        errors: Dict[str, str] = {}
+        candidates = [p for p in self.candidates(preferred) if p in STREAMING_PROVIDERS]
+        attempts = 0
+        for provider in candidates:
+            breaker = self.breakers[provider]
+            if not breaker.acquire():
+                self.decisions["skipped_open_breaker"] += 1
+                continue
+            self.decisions["primary" if attempts == 0 else "failover"] += 1
+            attempts += 1
+            start = time.monotonic()
+            started = False
+            try:
+                async for chunk in self._stream(provider, messages, **kwargs):
+                    if not started:
+                        # Time to first chunk is what the voice agent waits on
+                        started = True
+                        self.stats[provider].record(time.monotonic() - start, True)
+                        breaker.record_success()
+                    yield chunk
+                if not started:
+                    self.stats[provider].record(time.monotonic() - start, True)
+                    breaker.record_success()
+                return
+            except (asyncio.CancelledError, GeneratorExit):
+                breaker.release()
+                raise
+            except Exception as e:
+                breaker.record_failure()
+                if started:
+                    # The attempt's sample was recorded at the first chunk
+                    raise
+                self.stats[provider].record(time.monotonic() - start, False)
+                errors[provider] = str(e)
+                logger.warning(f"LLM provider {provider} stream failed: {e}")
+
+        self.decisions["all_failed"] += 1
+        raise AIserviceError("; ".join(f"{p}: {e}" for p, e in errors.items()) or "no provider available", "router")
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "preferred": settings.LLM_PROVIDER,
+            "hedging": {"enabled": settings.LLM_HEDGE_ENABLED, "after_ms": settings.LLM_HEDGE_AFTER_MS},
+            "decisions": dict(self.decisions),
+            "providers": {
+                p: {
+                    "configured": self._configured(p),
+                    "breaker": self.breakers[p].state,
+                    "breaker_trips": self.breakers[p].trips,
+                    **self.stats[p].to_dict()
+                }
+                for p in PROVIDERS
+            }
+        }
@@ -2,6 +2,7 @@ from typing import List, Dict, Any, Optional
 import sqlite3
 import logging
 from datetime import datetime
+from app.services.daily_facts_service import daily_facts_service
 
 logger = logging.getLogger(__name__)
 
@@ -22,11 +23,11 @@ class ReportsService:
                 poi.material_code,
                 poi.material_description,
                 poi.ord_qty,
-                COALESCE(SUM(dci.dispatch_qty), 0) as dispatched_qty,
-                poi.ord_qty - COALESCE(SUM(dci.dispatch_qty), 0) as pending_qty
+                COALESCE(SUM(r.dispatched_qty), 0) as dispatched_qty,
+                poi.ord_qty - COALESCE(SUM(r.dispatched_qty), 0) as pending_qty
             FROM purchase_orders po
             JOIN purchase_order_items poi ON po.po_number = poi.po_number
-            LEFT JOIN delivery_challan_items dci ON poi.id = dci.po_item_id
+            LEFT JOIN po_item_rollup r ON r.po_item_id = poi.id
         """
         
         params = []
@@ -36,7 +37,7 @@ class ReportsService:
             
         query += """
             GROUP BY po.po_number, poi.po_item_no
-            ORDER BY po.po_date DESC, poi.po_item_no
+            ORDER BY po.po_date_iso DESC, poi.po_item_no
         """
         
         rows = db.execute(query, params).fetchall()
@@ -54,7 +55,7 @@ class ReportsService:
             FROM delivery_challans dc
             LEFT JOIN gst_invoice_dc_links link ON dc.dc_number = link.dc_number
             WHERE link.id IS NULL
-            ORDER BY dc.dc_date DESC
+            ORDER BY dc.dc_date_iso DESC
         """).fetchall()
         return [dict(row) for row in rows]
 
@@ -68,10 +69,10 @@ class ReportsService:
         params = []
         
         if start_date:
-            conditions.append("invoice_date >= ?")
+            conditions.append("invoice_date_iso >= ?")
             params.append(start_date)
         if end_date:
-            conditions.append("invoice_date <= ?")
+            conditions.append("invoice_date_iso <= ?")
             params.append(end_date)
             
         if conditions:
@@ -91,7 +92,7 @@ class ReportsService:
                 total_invoice_value,
                 created_at
             {base_query}
-            ORDER BY invoice_date DESC
+            ORDER BY invoice_date_iso DESC
         """
         invoices = [dict(row) for row in db.execute(list_query, params).fetchall()]
         
@@ -125,7 +126,7 @@ class ReportsService:
                 supplier_name,
                 COUNT(po_number) as po_count,
                 SUM(po_value) as total_po_value,
-                MAX(po_date) as last_po_date
+                MAX(po_date_iso) as last_po_date
             FROM purchase_orders
             WHERE supplier_name IS NOT NULL
             GROUP BY supplier_name
@@ -134,43 +135,22 @@ class ReportsService:
         return [dict(row) for row in rows]
 
     def get_monthly_summary(self, db: sqlite3.Connection, year: int) -> Dict[str, Any]:
-        """Aggregate stats by month"""
-        # POs
-        pos = db.execute("""
-            SELECT strftime('%m', po_date) as month, COUNT(*) as count, SUM(po_value) as total_value
-            FROM purchase_orders
-            WHERE strftime('%Y', po_date) = ?
-            GROUP BY month ORDER BY month
-        """, (str(year),)).fetchall()
-        
-        # DCs
-        dcs = db.execute("""
-            SELECT strftime('%m', dc_date) as month, COUNT(*) as count
-            FROM delivery_challans
-            WHERE strftime('%Y', dc_date) = ?
-            GROUP BY month ORDER BY month
-        """, (str(year),)).fetchall()
-        
-        # Invoices
-        invoices = db.execute("""
-            SELECT strftime('%m', invoice_date) as month, COUNT(*) as count, SUM(total_invoice_value) as total_value
-            FROM gst_invoices
-            WHERE strftime('%Y', invoice_date) = ?
-            GROUP BY month ORDER BY month
-        """, (str(year),)).fetchall()
+        """Aggregate stats by month (summed from daily_facts, at most 366 rows)"""
+        months = daily_facts_service.monthly(db, f"{year}-01-01", f"{year + 1}-01-01")
 
-        # In a real service, we might want to merge these into a single list of objects
-        # But keeping format consistent with original for now.
-        # Actually the original returned None? No, it seemed truncated in the `view_file`.
-        # Oh, the original implementation in `reports.py` returns NOTHING (implicit None) for `monthly_summary`?
-        # Let me check `view_file` output Step 568...
-        # Line 192 ends the query execution, then function ends at 194. It returns None!
-        # That's a BUG in the original code! I must fix it.
-        
         return {
-            "pos": [dict(row) for row in pos],
-            "dcs": [dict(row) for row in dcs],
-            "invoices": [dict(row) for row in invoices]
+            "pos": [
+                {"month": m["month"], "count": m["po_count"], "total_value": m["ordered_value"]}
+                for m in months if m["po_count"]
+            ],
+            "dcs": [
+                {"month": m["month"], "count": m["dc_count"]}
+                for m in months if m["dc_count"]
+            ],
+            "invoices": [
+                {"month": m["month"], "count": m["invoice_count"], "total_value": m["invoiced_value"]}
+                for m in months if m["invoice_count"]
+            ]
         }
 
     def get_dashboard_insights(self, db: sqlite3.Connection) -> List[Dict[str, Any]]:
@@ -181,9 +161,9 @@ class ReportsService:
             SELECT COUNT(*) 
             FROM purchase_orders po
             JOIN purchase_order_items poi ON po.po_number = poi.po_number
-            LEFT JOIN delivery_challan_items dci ON poi.id = dci.po_item_id
-            WHERE (poi.ord_qty - COALESCE(dci.dispatch_qty, 0)) > 0
-            AND date(po.po_date) < date('now', '-14 days')
+            LEFT JOIN po_item_rollup r ON r.po_item_id = poi.id
+            WHERE (poi.ord_qty - COALESCE(r.dispatched_qty, 0)) > 0
+            AND po.po_date_iso < date('now', '-14 days')
         """).fetchone()[0]
         
         if pending_old > 0:
@@ -218,25 +198,16 @@ class ReportsService:
 
     def get_trends(self, db: sqlite3.Connection, range_type: str = "year") -> List[Dict[str, Any]]:
         year = datetime.now().year
-        # CTE for months
-        data = db.execute("""
-            WITH months AS (
-                SELECT '01' as m UNION SELECT '02' UNION SELECT '03' UNION SELECT '04'
-                UNION SELECT '05' UNION SELECT '06' UNION SELECT '07' UNION SELECT '08'
-                UNION SELECT '09' UNION SELECT '10' UNION SELECT '11' UNION SELECT '12'
-            )
-            SELECT 
-                m.m as month,
-                COALESCE(SUM(po.po_value), 0) as ordered_value,
-                COALESCE(SUM(inv.total_invoice_value), 0) as invoiced_value
-            FROM months m
-            LEFT JOIN purchase_orders po ON strftime('%m', po.po_date) = m.m AND strftime('%Y', po.po_date) = ?
-            LEFT JOIN gst_invoices inv ON strftime('%m', inv.invoice_date) = m.m AND strftime('%Y', inv.invoice_date) = ?
-            GROUP BY m.m
-            ORDER BY m.m
-        """, (str(year), str(year))).fetchall()
-        
-        return [dict(row) for row in data]
+        by_month = {m["month"]: m for m in daily_facts_service.monthly(db, f"{year}-01-01", f"{year + 1}-01-01")}
+
+        return [
+            {
+                "month": f"{month:02d}",
+                "ordered_value": by_month.get(f"{month:02d}", {}).get("ordered_value", 0),
+                "invoiced_value": by_month.get(f"{month:02d}", {}).get("invoiced_value", 0)
+            }
+            for month in range(1, 13)
+        ]
 
     def get_smart_table(self, db: sqlite3.Connection, filter_text: Optional[str] = None) -> List[Dict[str, Any]]:
         query = """
@@ -246,16 +217,16 @@ class ReportsService:
                 poi.po_item_no,
                 poi.material_description,
                 poi.ord_qty,
-                COALESCE(SUM(dci.dispatch_qty), 0) as dispatched_qty,
-                (poi.ord_qty - COALESCE(SUM(dci.dispatch_qty), 0)) as pending_qty,
-                CAST((julianday('now') - julianday(po.po_date)) AS INTEGER) as age_days,
+                COALESCE(SUM(r.dispatched_qty), 0) as dispatched_qty,
+                (poi.ord_qty - COALESCE(SUM(r.dispatched_qty), 0)) as pending_qty,
+                CAST((julianday('now') - julianday(po.po_date_iso)) AS INTEGER) as age_days,
                 CASE 
-                    WHEN (poi.ord_qty - COALESCE(SUM(dci.dispatch_qty), 0)) > 0 THEN 'Pending'
+                    WHEN (poi.ord_qty - COALESCE(SUM(r.dispatched_qty), 0)) > 0 THEN 'Pending'
                     ELSE 'Completed'
                 END as status
             FROM purchase_orders po
             JOIN purchase_order_items poi ON po.po_number = poi.po_number
-            LEFT JOIN delivery_challan_items dci ON poi.id = dci.po_item_id
+            LEFT JOIN po_item_rollup r ON r.po_item_id = poi.id
         """
         
         # Filtering logic could be added here if filter_text is passed
@@ -263,7 +234,7 @@ class ReportsService:
         
         query += """
             GROUP BY po.po_number, poi.po_item_no
-            ORDER BY po.po_date DESC, poi.po_item_no
+            ORDER BY po.po_date_iso DESC, poi.po_item_no
         """
         
         rows = db.execute(query).fetchall()
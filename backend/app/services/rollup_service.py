@@ -0,0 +1,131 @@
+"""
+PO Item Rollup Service
+Consistency checks and rebuilds for the trigger-maintained po_item_rollup table.
+
+po_item_rollup holds ordered / dispatched / invoiced quantity per PO item (pending is a
+generated column). Triggers keep it exact on every write; this module exists to verify
+that and to repair it after bulk edits made with triggers disabled or restored backups.
+
+CLI:
+    python -m app.services.rollup_service check
+    python -m app.services.rollup_service rebuild
+"""
+import sqlite3
+import logging
+from typing import List, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+# Source-of-truth aggregation the rollup must match
+_EXPECTED_SQL = """
+    SELECT
+        poi.id AS po_item_id,
+        poi.po_number,
+        COALESCE(poi.ord_qty, 0) AS ordered_qty,
+        COALESCE(d.qty, 0) AS dispatched_qty,
+        COALESCE(i.qty, 0) AS invoiced_qty
+    FROM purchase_order_items poi
+    LEFT JOIN (
+        SELECT po_item_id, SUM(dispatch_qty) AS qty FROM delivery_challan_items GROUP BY po_item_id
+    ) d ON d.po_item_id = poi.id
+    LEFT JOIN (
+        SELECT po_item_id, SUM(quantity) AS qty FROM gst_invoice_items
+        WHERE po_item_id IS NOT NULL GROUP BY po_item_id
+    ) i ON i.po_item_id = poi.id
+"""
+
+# Tolerance for REAL sums computed in a different order
+_EPSILON = 1e-6
+
+
+class RollupService:
+    """Check and rebuild po_item_rollup"""
+
+    def check(self, db: sqlite3.Connection) -> Dict[str, Any]:
+        """
+        Compare the rollup against a full aggregation of the source tables.
+        Returns {"consistent": bool, "items_checked": int, "mismatches": [...]}.
+        """
+        rows = db.execute(f"""
+            WITH expected AS ({_EXPECTED_SQL})
+            SELECT
+                e.po_item_id, e.po_number,
+                e.ordered_qty AS expected_ordered, r.ordered_qty AS rollup_ordered,
+                e.dispatched_qty AS expected_dispatched, r.dispatched_qty AS rollup_dispatched,
+                e.invoiced_qty AS expected_invoiced, r.invoiced_qty AS rollup_invoiced
+            FROM expected e
+            LEFT JOIN po_item_rollup r ON r.po_item_id = e.po_item_id
+            WHERE r.po_item_id IS NULL
+               OR e.po_number IS NOT r.po_number
+               OR abs(e.ordered_qty - r.ordered_qty) > ?
+               OR abs(e.dispatched_qty - r.dispatched_qty) > ?
+               OR abs(e.invoiced_qty - r.invoiced_qty) > ?
+            UNION ALL
+            SELECT
+                r.po_item_id, r.po_number,
+                NULL, r.ordered_qty, NULL, r.dispatched_qty, NULL, r.invoiced_qty
+            FROM po_item_rollup r
+            WHERE NOT EXISTS (SELECT 1 FROM purchase_order_items poi WHERE poi.id = r.po_item_id)
+        """, (_EPSILON, _EPSILON, _EPSILON)).fetchall()
+
+        items_checked = db.execute("SELECT COUNT(*) FROM purchase_order_items").fetchone()[0]
+        mismatches: List[Dict[str, Any]] = []
+        for row in rows:
+            mismatch = dict(row)
+            if row["rollup_ordered"] is None:
+                mismatch["problem"] = "missing_rollup_row"
+            elif row["expected_ordered"] is None:
+                mismatch["problem"] = "orphan_rollup_row"
+            else:
+                mismatch["problem"] = "quantity_mismatch"
+            mismatches.append(mismatch)
+
+        if mismatches:
+            logger.warning(f"po_item_rollup inconsistent: {len(mismatches)} of {items_checked} items differ")
+
+        return {
+            "consistent": not mismatches,
+            "items_checked": items_checked,
+            "mismatches": mismatches
+        }
+
+    def rebuild(self, db: sqlite3.Connection) -> int:
+        """
+        Recompute every rollup row from the source tables.
+        Caller controls the transaction. Returns the number of rows written.
+        """
+        db.execute("DELETE FROM po_item_rollup")
+        cursor = db.execute(f"""
+            INSERT INTO po_item_rollup (po_item_id, po_number, ordered_qty, dispatched_qty, invoiced_qty)
+            {_EXPECTED_SQL}
+        """)
+        logger.info(f"po_item_rollup rebuilt: {cursor.rowcount} items")
+        return cursor.rowcount
+
+
+# Singleton instance
+rollup_service = RollupService()
+
+
+if __name__ == "__main__":
+    import sys
+    from app.db import get_connection, db_transaction
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "check"
+    conn = get_connection()
+    try:
+        if command == "rebuild":
+            with db_transaction(conn):
+                count = rollup_service.rebuild(conn)
+            print(f"✅ Rebuilt po_item_rollup ({count} items)")
+        else:
+            result = rollup_service.check(conn)
+            if result["consistent"]:
+                print(f"✅ po_item_rollup consistent ({result['items_checked']} items)")
+            else:
+                print(f"❌ {len(result['mismatches'])} inconsistent items:")
+                for mismatch in result["mismatches"][:50]:
+                    print(f"   {mismatch}")
+                sys.exit(1)
+    finally:
+        conn.close()
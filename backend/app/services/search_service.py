@@ -0,0 +1,173 @@
+"""
+Search Service
+Global search over POs, DCs and invoices backed by the search_index FTS5 table.
+
+search_index uses the trigram tokenizer, so any substring of three or more characters is
+an index lookup (no LIKE '%q%' scans). Shorter queries can't be served by trigrams and fall
+back to a prefix match on document numbers, which the number index covers.
+
+Source-table triggers keep the documents current, except PO item text: the PO ingestion
+service calls refresh_po_details once per written PO (per-item triggers were O(N^2) per PO).
+"""
+import sqlite3
+import logging
+from typing import List, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Minimum term length the trigram tokenizer can match
+MIN_TRIGRAM_LENGTH = 3
+
+# bm25 column weights: number, party, details (FTS5 rank function for ORDER BY rank)
+_BM25_WEIGHTS = (10.0, 5.0, 1.0)
+_RANK_FUNCTION = f"bm25({', '.join(str(w) for w in _BM25_WEIGHTS)})"
+
+# PO documents: supplier code plus every item's material code / description
+_REFRESH_PO_DETAILS_SQL = """
+    UPDATE search_documents SET details = fresh.details
+    FROM (
+        SELECT CAST(po.po_number AS TEXT) AS entity_id,
+               TRIM(COALESCE(po.supplier_code, '') || ' ' || COALESCE((
+                   SELECT group_concat(COALESCE(material_code, '') || ' ' || COALESCE(material_description, ''), ' ')
+                   FROM purchase_order_items WHERE po_number = po.po_number
+               ), '')) AS details
+        FROM purchase_orders po
+        WHERE po.po_number IN ({marks})
+    ) AS fresh
+    WHERE search_documents.entity_type = 'PO'
+      AND search_documents.entity_id = fresh.entity_id
+      AND search_documents.details IS NOT fresh.details
+"""
+
+_TYPE_FILTERS = {"po": "PO", "dc": "DC", "invoice": "INVOICE"}
+
+_TYPE_LABELS = {"PO": "Purchase Order", "DC": "Delivery Challan", "INVOICE": "GST Invoice"}
+
+
+def _to_result(row: sqlite3.Row) -> Dict[str, Any]:
+    result = dict(row)
+    result["type_label"] = _TYPE_LABELS[result["type"]]
+    return result
+
+
+def build_match_query(terms: List[str]) -> str:
+    """Quote each term as an FTS5 string so user input is never parsed as query syntax"""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+class SearchService:
+    """Ranked cross-entity search"""
+
+    def search(
+        self,
+        db: sqlite3.Connection,
+        q: str,
+        type_filter: Optional[str] = None,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """
+        Search POs, DCs and invoices.
+        Every term of three or more characters must match (AND); results are ordered by
+        bm25 over all matches, with matches in the document number weighted highest.
+        `snippet` marks the matched text with <mark></mark> (computed for returned rows only).
+        """
+        terms = q.split()
+        long_terms = [t for t in terms if len(t) >= MIN_TRIGRAM_LENGTH]
+        entity_type = _TYPE_FILTERS.get((type_filter or "").lower())
+
+        if not long_terms:
+            return self._search_number_prefix(db, q.strip(), entity_type, limit)
+
+        match = build_match_query(long_terms)
+        where = ["search_index MATCH ?", "rank MATCH ?"]
+        params: List[Any] = [match, _RANK_FUNCTION]
+        if entity_type:
+            where.append("d.entity_type = ?")
+            params.append(entity_type)
+        # Short terms alongside long ones narrow the trigram hits
+        for term in terms:
+            if len(term) < MIN_TRIGRAM_LENGTH:
+                where.append("(d.number LIKE ? OR d.party LIKE ? OR d.details LIKE ?)")
+                params.extend([f"%{term}%"] * 3)
+        params.extend([limit, match])
+
+        # Top matches by rank first; snippet() then runs only for those rows
+        rows = db.execute(f"""
+            WITH top AS (
+                SELECT search_index.rowid AS doc_id, rank
+                FROM search_index
+                JOIN search_documents d ON d.id = search_index.rowid
+                WHERE {' AND '.join(where)}
+                ORDER BY rank
+                LIMIT ?
+            )
+            SELECT
+                d.entity_id as id,
+                d.entity_type as type,
+                d.number,
+                d.doc_date as date,
+                d.party,
+                d.value,
+                snippet(search_index, -1, '<mark>', '</mark>', '…', 12) as snippet,
+                top.rank
+            FROM top
+            JOIN search_index ON search_index.rowid = top.doc_id
+            JOIN search_documents d ON d.id = top.doc_id
+            WHERE search_index MATCH ?
+            ORDER BY top.rank
+        """, params).fetchall()
+
+        return [_to_result(row) for row in rows]
+
+    def _search_number_prefix(
+        self,
+        db: sqlite3.Connection,
+        prefix: str,
+        entity_type: Optional[str],
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """1-2 character queries: documents whose number starts with the prefix"""
+        if not prefix:
+            return []
+
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query = """
+            SELECT
+                entity_id as id,
+                entity_type as type,
+                number,
+                doc_date as date,
+                party,
+                value,
+                NULL as snippet,
+                NULL as rank
+            FROM search_documents
+            WHERE number LIKE ? ESCAPE '\\'
+        """
+        params: List[Any] = [f"{escaped}%"]
+        if entity_type:
+            query += " AND entity_type = ?"
+            params.append(entity_type)
+        query += " ORDER BY number LIMIT ?"
+        params.append(limit)
+
+        return [_to_result(row) for row in db.execute(query, params).fetchall()]
+
+    def refresh_po_details(self, db: sqlite3.Connection, po_numbers: List[int]) -> None:
+        """
+        Rebuild the details of these POs' documents from their items, once per PO
+        (call after writing items; unchanged documents are not rewritten in the index)
+        """
+        po_numbers = list(po_numbers)
+        for i in range(0, len(po_numbers), 500):
+            chunk = po_numbers[i:i + 500]
+            db.execute(_REFRESH_PO_DETAILS_SQL.format(marks=", ".join("?" * len(chunk))), chunk)
+
+    def rebuild(self, db: sqlite3.Connection) -> None:
+        """Rebuild the FTS index from search_documents (e.g. after a restore)"""
+        db.execute("INSERT INTO search_index (search_index) VALUES ('rebuild')")
+        logger.info("search_index rebuilt")
+
+
+# Singleton instance
+search_service = SearchService()
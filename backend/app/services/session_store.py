@@ -0,0 +1,228 @@
+"""
+Session Stores - Backends for voice conversation contexts (app.services.context_manager)
+
+- MemorySessionStore: per-process dict kept in LRU order and capped at SESSION_MAX_SESSIONS;
+  the least recently used session is dropped when a new one would exceed the cap.
+- SQLiteSessionStore: contexts serialized to a WAL-mode SQLite file (SESSION_DB_PATH), so
+  sessions survive restarts and are shared by all uvicorn workers on the host. The size cap
+  is enforced by sweeps (least recently updated first).
+
+Both expire sessions idle for longer than the TTL, on access and in periodic sweeps
+(ContextManager.start_sweeper). SQLite store calls wait on the file lock (busy_timeout), so
+ContextManager runs them in the threadpool instead of on the event loop. Counts and size estimates are exposed at /api/health/sessions.
+"""
+import json
+import sqlite3
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _is_expired(updated_at: Optional[str], ttl_seconds: float, now: Optional[datetime] = None) -> bool:
+    if not updated_at:
+        return False
+    now = now or datetime.utcnow()
+    return now - datetime.fromisoformat(updated_at) > timedelta(seconds=ttl_seconds)
+
+
+class SessionStore(ABC):
+    """Storage for conversation contexts, keyed by session id"""
+
+    backend = "abstract"
+    # True when calls do blocking I/O; ContextManager then runs them in the threadpool
+    blocking = False
+
+    def __init__(self, max_sessions: int, ttl_seconds: float):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.evictions = 0
+        self.expirations = 0
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[Any]:
+        """Stored context, or None if missing / expired (expired ones are removed)"""
+
+    @abstractmethod
+    def put(self, session_id: str, context: Any) -> None:
+        """Insert or replace a context"""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> bool:
+        """Remove a context; True if it existed"""
+
+    @abstractmethod
+    def sweep(self) -> int:
+        """Remove expired contexts (and any over the size cap); returns how many were removed"""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Session count, size estimate and eviction counters"""
+
+    def close(self) -> None:
+        pass
+
+
+class MemorySessionStore(SessionStore):
+    """LRU-ordered in-process store; values are ConversationContext objects"""
+
+    backend = "memory"
+
+    def __init__(self, max_sessions: int, ttl_seconds: float):
+        super().__init__(max_sessions, ttl_seconds)
+        self._sessions: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[Any]:
+        with self._lock:
+            context = self._sessions.get(session_id)
+            if context is None:
+                return None
+            if _is_expired(context.updated_at, self.ttl_seconds):
+                del self._sessions[session_id]
+                self.expirations += 1
+                return None
+            self._sessions.move_to_end(session_id)
+            return context
+
+    def put(self, session_id: str, context: Any) -> None:
+        with self._lock:
+            self._sessions[session_id] = context
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                evicted, _ = self._sessions.popitem(last=False)
+                self.evictions += 1
+                logger.debug(f"Session {evicted} evicted (store full)")
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def sweep(self) -> int:
+        now = datetime.utcnow()
+        with self._lock:
+            expired = [
+                session_id for session_id, context in self._sessions.items()
+                if _is_expired(context.updated_at, self.ttl_seconds, now)
+            ]
+            for session_id in expired:
+                del self._sessions[session_id]
+            self.expirations += len(expired)
+        return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            contexts = list(self._sessions.values())
+        return {
+            "backend": self.backend,
+            "sessions": len(contexts),
+            "max_sessions": self.max_sessions,
+            "messages": sum(len(c.history) for c in contexts),
+            "approx_bytes": sum(c.approx_size() for c in contexts),
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Contexts stored as JSON rows in a dedicated SQLite file. WAL lets worker processes read
+    while one of them writes; each call is a single short statement on a shared connection.
+    """
+
+    backend = "sqlite"
+    blocking = True
+
+    def __init__(
+        self,
+        db_path: Path,
+        factory: Callable[[Dict[str, Any]], Any],
+        max_sessions: int,
+        ttl_seconds: float,
+        busy_timeout_ms: int = 5000
+    ):
+        super().__init__(max_sessions, ttl_seconds)
+        self._factory = factory  # dict -> context (ConversationContext.from_dict)
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS voice_sessions (
+                session_id TEXT PRIMARY KEY,
+                context TEXT NOT NULL,  -- JSON
+                updated_at TEXT NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_voice_sessions_updated ON voice_sessions(updated_at)")
+
+    def _cutoff(self) -> str:
+        return (datetime.utcnow() - timedelta(seconds=self.ttl_seconds)).isoformat()
+
+    def get(self, session_id: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT context, updated_at FROM voice_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < self._cutoff():
+                self._conn.execute("DELETE FROM voice_sessions WHERE session_id = ?", (session_id,))
+                self.expirations += 1
+                return None
+        return self._factory(json.loads(row[0]))
+
+    def put(self, session_id: str, context: Any) -> None:
+        data = context.to_dict()
+        with self._lock:
+            self._conn.execute("""
+                INSERT INTO voice_sessions (session_id, context, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(session_id) DO UPDATE SET context = excluded.context, updated_at = excluded.updated_at
+            """, (session_id, json.dumps(data, default=str), data.get("updated_at") or datetime.utcnow().isoformat()))
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute("DELETE FROM voice_sessions WHERE session_id = ?", (session_id,)).rowcount > 0
+
+    def sweep(self) -> int:
+        with self._lock:
+            expired = self._conn.execute(
+                "DELETE FROM voice_sessions WHERE updated_at < ?", (self._cutoff(),)
+            ).rowcount
+            evicted = self._conn.execute("""
+                DELETE FROM voice_sessions WHERE session_id IN (
+                    SELECT session_id FROM voice_sessions ORDER BY updated_at DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_sessions,)).rowcount
+            self.expirations += expired
+            self.evictions += evicted
+        return expired + evicted
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, payload = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(context)), 0) FROM voice_sessions"
+            ).fetchone()
+            page_count = self._conn.execute("PRAGMA page_count").fetchone()[0]
+            page_size = self._conn.execute("PRAGMA page_size").fetchone()[0]
+        return {
+            "backend": self.backend,
+            "sessions": count,
+            "max_sessions": self.max_sessions,
+            "approx_bytes": payload,
+            "file_bytes": page_count * page_size,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,152 @@
+"""
+System Sampler
+Background collection of process, host and SQLite statistics for the health endpoints.
+
+Every SYSTEM_SAMPLE_SECONDS a sample is taken in the threadpool and appended to a ring buffer of
+SYSTEM_SAMPLE_HISTORY entries; /api/health/metrics, /api/health/ready and /api/metrics only read
+the latest sample (and the history), so scrapes never block on psutil or the database.
+
+CPU percentages are non-blocking (interval=None): each covers the time since the previous sample.
+SQLite figures come from one short read on the reader lane (page_count / freelist_count /
+page_size) plus the size of the -wal file. SQLite's page-cache hit counters (sqlite3_db_status)
+are not reachable from Python's sqlite3 module, so the configured cache_size is reported instead.
+"""
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+import psutil
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db import ConnectionPool, get_pool
+
+logger = logging.getLogger(__name__)
+
+# Directory that must be writable for the service to be ready (relative to the working directory)
+LOGS_DIR = "logs"
+
+
+class SystemSampler:
+    """Periodic process / system / SQLite samples kept in a ring buffer"""
+
+    def __init__(
+        self,
+        pool: Optional[ConnectionPool] = None,
+        interval_seconds: Optional[float] = None,
+        history: Optional[int] = None,
+    ):
+        self._pool = pool
+        self.interval_seconds = interval_seconds or settings.SYSTEM_SAMPLE_SECONDS
+        self.samples: deque = deque(maxlen=history or settings.SYSTEM_SAMPLE_HISTORY)
+        self.errors = 0
+        self._process = psutil.Process(os.getpid())
+        self._task: Optional[asyncio.Task] = None
+        # First non-blocking call only sets the baseline
+        self._process.cpu_percent(interval=None)
+        psutil.cpu_percent(interval=None)
+
+    @property
+    def pool(self) -> ConnectionPool:
+        return self._pool or get_pool()
+
+    def _sqlite_stats(self) -> Dict[str, Any]:
+        pool = self.pool
+        try:
+            with pool.connection(readonly=True) as db:
+                page_size = db.execute("PRAGMA page_size").fetchone()[0]
+                page_count = db.execute("PRAGMA page_count").fetchone()[0]
+                freelist = db.execute("PRAGMA freelist_count").fetchone()[0]
+                cache_size = db.execute("PRAGMA cache_size").fetchone()[0]
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+        try:
+            wal_bytes = os.stat(f"{pool.db_path}-wal").st_size
+        except FileNotFoundError:
+            wal_bytes = 0
+        return {
+            "ok": True,
+            "page_size": page_size,
+            "page_count": page_count,
+            "freelist_count": freelist,
+            "db_bytes": page_size * page_count,
+            "wal_bytes": wal_bytes,
+            # Negative cache_size is in KiB, positive in pages
+            "cache_size_kb": -cache_size if cache_size < 0 else cache_size * page_size // 1024,
+        }
+
+    def collect(self) -> Dict[str, Any]:
+        """Take one sample and append it to the history (blocking; runs in the threadpool)"""
+        with self._process.oneshot():
+            memory = self._process.memory_info()
+            process = {
+                "pid": self._process.pid,
+                "cpu_percent": self._process.cpu_percent(interval=None),
+                "memory_mb": round(memory.rss / 1024 / 1024, 2),
+                "threads": self._process.num_threads(),
+            }
+        sqlite = self._sqlite_stats()
+        sample = {
+            "timestamp": time.time(),
+            "process": process,
+            "system": {
+                "cpu_count": psutil.cpu_count(),
+                "cpu_percent": psutil.cpu_percent(interval=None),
+                "memory_percent": psutil.virtual_memory().percent,
+                "disk_percent": psutil.disk_usage(str(self.pool.db_path.parent)).percent,
+            },
+            "sqlite": sqlite,
+            "logs_writable": os.path.isdir(LOGS_DIR) and os.access(LOGS_DIR, os.W_OK),
+        }
+        if not sqlite["ok"]:
+            logger.warning(f"System sample: database probe failed: {sqlite['error']}")
+        self.samples.append(sample)
+        return sample
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """Most recent sample, or None before the first one"""
+        return self.samples[-1] if self.samples else None
+
+    def history(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Samples oldest first (the last `limit` of them)"""
+        samples = list(self.samples)
+        return samples[-limit:] if limit else samples
+
+    def is_stale(self, sample: Dict[str, Any]) -> bool:
+        """True when the sampler has missed several intervals (event loop or threadpool stuck)"""
+        return time.time() - sample["timestamp"] > 3 * self.interval_seconds + 5
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await run_in_threadpool(self.collect)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"System sample failed: {e}", exc_info=True)
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        """Schedule sampling on the running event loop (application startup)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Cancel sampling (application shutdown)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+
+# Singleton instance
+system_sampler = SystemSampler()
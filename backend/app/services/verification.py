@@ -8,7 +8,9 @@ from difflib import get_close_matches
 
 logger = logging.getLogger(__name__)
 
-from app.db import DATABASE_PATH
+from contextlib import contextmanager
+
+from app.db import DATABASE_PATH, get_pool
 
 logger = logging.getLogger(__name__)
 
@@ -16,8 +18,18 @@ class VerificationService:
     def __init__(self, db_path: str = None):
         self.db_path = db_path or str(DATABASE_PATH)
 
+    @contextmanager
     def _get_db(self):
-        return sqlite3.connect(self.db_path)
+        """Read-only connection: pooled reader for the app DB, plain connection otherwise"""
+        if self.db_path == str(DATABASE_PATH):
+            with get_pool().connection(readonly=True) as conn:
+                yield conn
+            return
+        conn = sqlite3.connect(self.db_path)
+        try:
+            yield conn
+        finally:
+            conn.close()
 
     async def verify_create_dc(self, po_number: str, items: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -58,27 +70,19 @@ class VerificationService:
             
             # 2. Fetch PO Items with remaining quantities
             po_items_rows = conn.execute("""
-                SELECT id, material_description, ord_qty
-                FROM purchase_order_items
-                WHERE po_number = ?
+                SELECT poi.id, poi.material_description, poi.ord_qty,
+                       COALESCE(r.dispatched_qty, 0) as dispatched_qty
+                FROM purchase_order_items poi
+                LEFT JOIN po_item_rollup r ON r.po_item_id = poi.id
+                WHERE poi.po_number = ?
             """, (po_number,)).fetchall()
             
             po_items_map = {} # normalized desc -> item
             for row in po_items_rows:
-                # Calculate remaining qty (naive implementation, should use DC sum)
-                # For now using total ordered as upper bound, or fetching delivery status
+                # Remaining qty = ordered - already dispatched (from po_item_rollup)
                 item_id = row["id"]
                 desc = row["material_description"]
-                
-                # Fetch delivery status (already dispatched)
-                dispatched_row = conn.execute("""
-                    SELECT COALESCE(SUM(dispatch_qty), 0)
-                    FROM delivery_challan_items
-                    WHERE po_item_id = ?
-                """, (item_id,)).fetchone()
-                dispatched = dispatched_row[0] if dispatched_row else 0
-                
-                remaining = row["ord_qty"] - dispatched
+                remaining = row["ord_qty"] - row["dispatched_qty"]
                 po_items_map[desc.lower()] = {
                     "id": item_id,
                     "description": desc,
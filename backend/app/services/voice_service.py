@@ -2,14 +2,14 @@ from typing import Dict, Any, Optional, List, AsyncGenerator
 import logging
 import uuid
 import json
-import os
 import sqlite3
 from datetime import datetime
 
 from app.services.llm_client import get_llm_client
+from app.services.llm_cache import llm_cache
 from app.services.context_manager import context_manager
 from app.services.reference_resolver import resolve_references, extract_entities
-from app.core.config import settings
+from app.db import get_pool
 from app.core.result import ServiceResult
 from app.core.exceptions import BusinessRuleViolation
 
@@ -60,8 +60,8 @@ class VoiceService:
         history.append({"role": "user", "content": resolved_message})
         
         # 5. LLM Execution
-        provider = os.getenv("LLM_PROVIDER", "groq") # Still allowed to override via env, or use settings? 
-        # Using env var directly for provider choice is fine as it's often a runtime toggle.
+        # None = routed across providers, preferring settings.LLM_PROVIDER (see provider_router)
+        provider = None
         
         llm_client = get_llm_client()
         
@@ -73,8 +73,10 @@ class VoiceService:
     async def _unary_response(self, llm_client, history, provider, session_id, resolved_message) -> Dict[str, Any]:
         """Handle non-streaming response"""
         try:
-            response = await llm_client.chat(
-                messages=history,
+            # Identical conversations over unchanged data reuse the cached answer
+            response = await llm_cache.chat(
+                llm_client,
+                history,
                 provider=provider,
                 temperature=0.7
             )
@@ -154,8 +156,7 @@ class VoiceService:
             # But for async internal calls, we often need to manage it.
             # Using a context manager pattern for safety.
             
-            with sqlite3.connect(settings.DATABASE_URL.replace("sqlite:///", "")) as db:
-                db.row_factory = sqlite3.Row
+            with get_pool().connection(readonly=True) as db:
                 
                 if query_type == "kpi":
                     # We reuse reports_service logic but need to adapt it since reports_service expects a text range?
@@ -176,10 +177,10 @@ class VoiceService:
                         # Maps to "Show me pending items"
                         # Use logic similar to get_pending in smart_reports router
                          query = """
-                            SELECT po.po_number, poi.material_description, (poi.ord_qty - COALESCE(SUM(dci.dispatch_qty), 0)) as pending
+                            SELECT po.po_number, poi.material_description, (poi.ord_qty - COALESCE(SUM(r.dispatched_qty), 0)) as pending
                             FROM purchase_orders po
                             JOIN purchase_order_items poi ON po.po_number = poi.po_number
-                            LEFT JOIN delivery_challan_items dci ON poi.id = dci.po_item_id
+                            LEFT JOIN po_item_rollup r ON r.po_item_id = poi.id
                             GROUP BY poi.id
                             HAVING pending > 0
                             ORDER BY pending DESC LIMIT 5
@@ -198,7 +199,7 @@ class VoiceService:
 
                     elif query_type == "get_summary":
                         # Maps to "How are sales?"
-                        sales = db.execute("SELECT SUM(total_invoice_value) FROM gst_invoices WHERE strftime('%Y-%m', invoice_date) = strftime('%Y-%m', 'now')").fetchone()[0] or 0
+                        sales = db.execute("SELECT SUM(total_invoice_value) FROM gst_invoices WHERE invoice_date_iso >= date('now', 'start of month')").fetchone()[0] or 0
                         return {
                             "type": "widget",
                             "widget_type": "kpi",
@@ -32,3 +32,49 @@ def normalize_date(val):
             return ""
 
     return ""
+
+
+def to_iso_date(val):
+    """
+    Canonical sortable form of a date (YYYY-MM-DD) for the *_iso columns.
+    Accepts ISO dates/timestamps as well as everything normalize_date understands.
+    Returns None when the value cannot be parsed.
+    """
+    if not val:
+        return None
+
+    s = str(val).strip()
+
+    # yyyy-mm-dd (optionally followed by a time part)
+    m = re.match(r'(\d{4})-(\d{1,2})-(\d{1,2})', s)
+    if m:
+        y, mth, d = m.groups()
+    else:
+        normalized = normalize_date(s)
+        if not normalized:
+            return None
+        d, mth, y = normalized.split("/")
+
+    try:
+        return datetime(int(y), int(mth), int(d)).strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def period_start(period, today=None):
+    """
+    First day of the current reporting period as YYYY-MM-DD.
+    period: month, quarter, year (calendar) or fy (Indian financial year, April-March).
+    """
+    today = today or datetime.now()
+    if period == "month":
+        start = today.replace(day=1)
+    elif period == "quarter":
+        quarter_month = ((today.month - 1) // 3) * 3 + 1
+        start = today.replace(month=quarter_month, day=1)
+    elif period == "fy":
+        fy_year = today.year if today.month >= 4 else today.year - 1
+        start = today.replace(year=fy_year, month=4, day=1)
+    else:  # year
+        start = today.replace(month=1, day=1)
+    return start.strftime("%Y-%m-%d")
@@ -0,0 +1,214 @@
+"""
+Streaming spreadsheet writers
+Turn a lazy iterable of rows into an iterator of byte chunks (XLSX or CSV) with bounded memory.
+
+The XLSX writer emits the minimal SpreadsheetML package directly: rows are serialized as they
+arrive into a zip stream that is drained every `chunk_size` bytes, strings are written inline
+(no shared-string table to hold in memory) and all cells reference a fixed set of shared styles.
+"""
+import csv
+import io
+import re
+import zipfile
+from typing import Any, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+from xml.sax.saxutils import escape
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CSV_MEDIA_TYPE = "text/csv"
+
+# Shared cell styles (indexes into cellXfs of _STYLES_XML)
+STYLE_DEFAULT = 0
+STYLE_TITLE = 1     # bold 16pt, centered
+STYLE_SUBTITLE = 2  # bold 12pt underlined, centered
+STYLE_HEADER = 3    # bold, bordered, centered, wrapped
+STYLE_TEXT = 4      # bordered, wrapped
+STYLE_NUMBER = 5    # bordered, 0.00
+
+
+class Cell(NamedTuple):
+    """A value with an explicit shared style; plain values use STYLE_DEFAULT"""
+    value: Any
+    style: int
+
+
+def styled(values: Sequence[Any], styles: Sequence[int]) -> List[Cell]:
+    """Pair a row of values with per-column styles"""
+    return [Cell(value, style) for value, style in zip(values, styles)]
+
+
+_CONTENT_TYPES_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>
+<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>
+</Types>"""
+
+_ROOT_RELS_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
+</Relationships>"""
+
+_WORKBOOK_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>
+</workbook>"""
+
+_WORKBOOK_RELS_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>
+<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>
+</Relationships>"""
+
+_STYLES_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<fonts count="4">
+<font><sz val="11"/><name val="Calibri"/></font>
+<font><b/><sz val="11"/><name val="Calibri"/></font>
+<font><b/><sz val="16"/><color rgb="FF000000"/><name val="Calibri"/></font>
+<font><b/><u/><sz val="12"/><name val="Calibri"/></font>
+</fonts>
+<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>
+<borders count="2">
+<border><left/><right/><top/><bottom/><diagonal/></border>
+<border><left style="thin"/><right style="thin"/><top style="thin"/><bottom style="thin"/><diagonal/></border>
+</borders>
+<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>
+<cellXfs count="6">
+<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>
+<xf numFmtId="0" fontId="2" fillId="0" borderId="0" xfId="0" applyFont="1" applyAlignment="1"><alignment horizontal="center" vertical="center" wrapText="1"/></xf>
+<xf numFmtId="0" fontId="3" fillId="0" borderId="0" xfId="0" applyFont="1" applyAlignment="1"><alignment horizontal="center" vertical="center" wrapText="1"/></xf>
+<xf numFmtId="0" fontId="1" fillId="0" borderId="1" xfId="0" applyFont="1" applyBorder="1" applyAlignment="1"><alignment horizontal="center" vertical="center" wrapText="1"/></xf>
+<xf numFmtId="0" fontId="0" fillId="0" borderId="1" xfId="0" applyBorder="1" applyAlignment="1"><alignment vertical="center" wrapText="1"/></xf>
+<xf numFmtId="2" fontId="0" fillId="0" borderId="1" xfId="0" applyNumberFormat="1" applyBorder="1" applyAlignment="1"><alignment vertical="center"/></xf>
+</cellXfs>
+<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>
+</styleSheet>"""
+
+_SHEET_OPEN = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+)
+
+# Characters XML 1.0 cannot carry
+_ILLEGAL_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_INVALID_SHEET_CHARS = re.compile(r"[\[\]:*?/\\]")
+
+
+def column_letter(index: int) -> str:
+    """1-based column index -> 'A', 'B', ..., 'AA'"""
+    letters = ""
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+class _ChunkSink:
+    """Write-only, non-seekable file object that collects bytes until drained"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self.size = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self.size = 0
+        return data
+
+
+def _cell_xml(ref: str, value: Any, style: int) -> str:
+    style_attr = f' s="{style}"' if style else ""
+    if value is None or value == "":
+        return f'<c r="{ref}"{style_attr}/>' if style else ""
+    if isinstance(value, bool):
+        return f'<c r="{ref}"{style_attr} t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f'<c r="{ref}"{style_attr}><v>{value!r}</v></c>'
+    text = escape(_ILLEGAL_XML_CHARS.sub("", str(value)))
+    return f'<c r="{ref}"{style_attr} t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def stream_xlsx(
+    rows: Iterable[Sequence[Any]],
+    sheet_title: str = "Sheet1",
+    column_widths: Optional[Sequence[float]] = None,
+    merged_cells: Optional[Sequence[str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    Serialize rows to a single-sheet XLSX workbook, yielding chunks of roughly `chunk_size` bytes.
+    Each row item is a plain value or a Cell(value, style). Merged ranges (e.g. 'A1:O1') are
+    declared up front because they are written after the sheet data.
+    """
+    sink = _ChunkSink()
+    sheet_name = _INVALID_SHEET_CHARS.sub(" ", sheet_title)[:31] or "Sheet1"
+
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _CONTENT_TYPES_XML)
+        zf.writestr("_rels/.rels", _ROOT_RELS_XML)
+        zf.writestr("xl/workbook.xml", _WORKBOOK_XML.format(name=escape(sheet_name, {'"': "&quot;"})))
+        zf.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS_XML)
+        zf.writestr("xl/styles.xml", _STYLES_XML)
+
+        with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            header = _SHEET_OPEN
+            if column_widths:
+                header += "<cols>" + "".join(
+                    f'<col min="{i}" max="{i}" width="{width}" customWidth="1"/>'
+                    for i, width in enumerate(column_widths, 1)
+                ) + "</cols>"
+            sheet.write((header + "<sheetData>").encode("utf-8"))
+
+            letters: List[str] = []
+            for row_idx, row in enumerate(rows, 1):
+                if len(row) > len(letters):
+                    letters = [column_letter(i) for i in range(1, len(row) + 1)]
+                parts = [f'<row r="{row_idx}">']
+                for col_idx, item in enumerate(row):
+                    value, style = item if isinstance(item, Cell) else (item, STYLE_DEFAULT)
+                    parts.append(_cell_xml(f"{letters[col_idx]}{row_idx}", value, style))
+                parts.append("</row>")
+                sheet.write("".join(parts).encode("utf-8"))
+
+                if sink.size >= chunk_size:
+                    yield sink.drain()
+
+            footer = "</sheetData>"
+            if merged_cells:
+                footer += f'<mergeCells count="{len(merged_cells)}">' + "".join(
+                    f'<mergeCell ref="{ref}"/>' for ref in merged_cells
+                ) + "</mergeCells>"
+            sheet.write((footer + "</worksheet>").encode("utf-8"))
+
+    yield sink.drain()
+
+
+def stream_csv(rows: Iterable[Sequence[Any]], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Serialize rows to UTF-8 CSV (with BOM so Excel detects the encoding), yielding chunks"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+
+    for row in rows:
+        writer.writerow([item.value if isinstance(item, Cell) else item for item in row])
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
@@ -0,0 +1,192 @@
+import unittest
+import sqlite3
+import sys
+import os
+
+# Add backend to path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.alert_service import AlertService
+
+SCHEMA_SQL = """
+CREATE TABLE purchase_orders (
+    po_number INTEGER PRIMARY KEY,
+    supplier_name TEXT
+);
+
+CREATE TABLE purchase_order_items (
+    id TEXT PRIMARY KEY,
+    po_number INTEGER NOT NULL REFERENCES purchase_orders(po_number) ON DELETE CASCADE,
+    material_description TEXT,
+    ord_qty NUMERIC
+);
+
+CREATE TABLE delivery_challans (
+    dc_number TEXT PRIMARY KEY,
+    dc_date DATE NOT NULL,
+    dc_date_iso TEXT,
+    po_number INTEGER REFERENCES purchase_orders(po_number) ON DELETE CASCADE,
+    consignee_name TEXT
+);
+
+CREATE TABLE delivery_challan_items (
+    id TEXT PRIMARY KEY,
+    dc_number TEXT NOT NULL REFERENCES delivery_challans(dc_number) ON DELETE CASCADE,
+    po_item_id TEXT NOT NULL REFERENCES purchase_order_items(id) ON DELETE CASCADE,
+    dispatch_qty NUMERIC NOT NULL,
+    lot_no INTEGER
+);
+
+CREATE TABLE gst_invoices (
+    invoice_number TEXT PRIMARY KEY,
+    linked_dc_numbers TEXT,
+    po_numbers TEXT
+);
+
+CREATE TABLE gst_invoice_dc_links (
+    id TEXT PRIMARY KEY,
+    invoice_number TEXT NOT NULL REFERENCES gst_invoices(invoice_number) ON DELETE CASCADE,
+    dc_number TEXT NOT NULL REFERENCES delivery_challans(dc_number) ON DELETE CASCADE
+);
+
+CREATE TABLE gst_invoice_items (
+    id TEXT PRIMARY KEY,
+    invoice_number TEXT NOT NULL,
+    po_sl_no TEXT,
+    description TEXT,
+    quantity NUMERIC
+);
+
+CREATE TABLE alerts (
+    id TEXT PRIMARY KEY,
+    alert_type TEXT NOT NULL,
+    entity_type TEXT NOT NULL,
+    entity_id TEXT NOT NULL,
+    message TEXT NOT NULL,
+    severity TEXT DEFAULT 'info' CHECK(severity IN ('info', 'warning', 'error')),
+    is_acknowledged BOOLEAN DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    acknowledged_at TIMESTAMP
+);
+
+CREATE TABLE schema_version (
+    version INTEGER PRIMARY KEY,
+    description TEXT
+);
+"""
+
+SEED_SQL = """
+INSERT INTO purchase_orders (po_number, supplier_name) VALUES (1001, 'Acme'), (1002, 'Bharat');
+INSERT INTO purchase_order_items (id, po_number, ord_qty) VALUES ('i1', 1001, 10), ('i2', 1002, 5);
+INSERT INTO delivery_challans (dc_number, dc_date, dc_date_iso, po_number, consignee_name) VALUES
+    ('DC-OLD', '2020-01-01', '2020-01-01', 1001, 'BHEL'),
+    ('DC-NEW', date('now'), date('now'), 1002, 'BHEL');
+INSERT INTO delivery_challan_items (id, dc_number, po_item_id, dispatch_qty) VALUES
+    ('x1', 'DC-OLD', 'i1', 10), ('x2', 'DC-NEW', 'i2', 2);
+"""
+
+MIGRATIONS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'migrations'))
+
+
+class TestAlertService(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA_SQL)
+        for name in ("006_po_item_rollup.sql", "008_alert_engine.sql", "009_invoice_po_links.sql",
+                     "017_alert_changes_dedupe.sql"):
+            with open(os.path.join(MIGRATIONS_DIR, name)) as f:
+                self.conn.executescript(f.read())
+        self.conn.executescript(SEED_SQL)
+        self.service = AlertService()
+
+    def tearDown(self):
+        self.conn.close()
+
+    def open_alerts(self):
+        return sorted(
+            (r["alert_type"], r["entity_id"])
+            for r in self.conn.execute("SELECT * FROM alerts WHERE is_acknowledged = 0")
+        )
+
+    def test_first_run_is_full_and_rerun_is_idempotent(self):
+        result = self.service.generate(self.conn)
+        self.assertTrue(result["full"])
+        self.assertEqual(self.open_alerts(), [
+            ("DC_NOT_INVOICED", "DC-OLD"),
+            ("FULLY_DISPATCHED_NOT_INVOICED", "1001"),
+        ])
+        message = self.conn.execute("SELECT message FROM alerts WHERE entity_id = '1001'").fetchone()[0]
+        self.assertEqual(message, "PO 1001 (Acme) is fully dispatched but not yet invoiced")
+
+        again = self.service.generate(self.conn)
+        self.assertFalse(again["full"])
+        self.assertEqual(again["alerts_created"], [])
+        self.assertEqual(again["changes_processed"], 0)
+
+        full = self.service.generate(self.conn, full=True)
+        self.assertEqual(full["alerts_created"], [])
+
+    def test_incremental_run_only_sees_changed_entities(self):
+        self.service.generate(self.conn)
+
+        # Acknowledged alerts are not re-raised while the entity is unchanged
+        self.conn.execute("UPDATE alerts SET is_acknowledged = 1")
+        self.assertEqual(self.service.generate(self.conn)["alerts_created"], [])
+
+        # Completing PO 1002 logs a change and raises its alert
+        self.conn.execute("UPDATE delivery_challan_items SET dispatch_qty = 5 WHERE id = 'x2'")
+        result = self.service.generate(self.conn)
+        self.assertEqual(len(result["alerts_created"]), 1)
+        self.assertGreater(result["changes_processed"], 0)
+        self.assertEqual(self.open_alerts(), [("FULLY_DISPATCHED_NOT_INVOICED", "1002")])
+
+        # Invoiced POs are skipped; deleting the invoice makes the PO a candidate again
+        self.conn.execute("UPDATE alerts SET is_acknowledged = 1")
+        self.conn.execute("UPDATE delivery_challan_items SET dispatch_qty = 10 WHERE id = 'x1'")
+        self.conn.execute("INSERT INTO gst_invoices (invoice_number, po_numbers) VALUES ('INV-1', '1001')")
+        self.conn.execute("INSERT INTO gst_invoice_po_links (invoice_number, po_number) VALUES ('INV-1', 1001)")
+        self.assertEqual(self.service.generate(self.conn)["alerts_created"], [])
+        self.conn.execute("DELETE FROM gst_invoices WHERE invoice_number = 'INV-1'")
+        self.service.generate(self.conn)
+        self.assertEqual(self.open_alerts(), [("FULLY_DISPATCHED_NOT_INVOICED", "1001")])
+
+    def test_dc_rules_and_ageing(self):
+        self.conn.execute("INSERT INTO delivery_challans (dc_number, dc_date, dc_date_iso, consignee_name) VALUES ('DC-ORPHAN', date('now'), date('now'), 'X')")
+        self.service.generate(self.conn)
+        self.assertIn(("DC_WITHOUT_PO", "DC-ORPHAN"), self.open_alerts())
+        self.assertNotIn(("DC_NOT_INVOICED", "DC-NEW"), self.open_alerts())
+
+        # DC-NEW ages past the grace period without any write to it
+        self.conn.execute("UPDATE alert_engine_state SET last_dc_cutoff = date('now', '-30 days')")
+        self.conn.execute("UPDATE delivery_challans SET dc_date_iso = date('now', '-10 days') WHERE dc_number = 'DC-NEW'")
+        self.conn.execute("DELETE FROM alert_changes")
+        self.service.generate(self.conn)
+        self.assertIn(("DC_NOT_INVOICED", "DC-NEW"), self.open_alerts())
+
+    def test_change_log_keeps_one_row_per_entity(self):
+        self.service.generate(self.conn)
+        for qty in range(1, 50):
+            self.conn.execute("UPDATE delivery_challan_items SET dispatch_qty = ? WHERE id = 'x2'", (qty % 5 + 1,))
+            self.conn.execute("UPDATE delivery_challans SET dc_date_iso = date('now', ?) WHERE dc_number = 'DC-NEW'", (f"-{qty % 3} days",))
+        rows = self.conn.execute("SELECT entity_type, entity_id FROM alert_changes ORDER BY entity_type").fetchall()
+        self.assertEqual([tuple(r) for r in rows], [("DC", "DC-NEW"), ("PO", "1002")])
+
+        # The surviving rows are still pending for the next run
+        self.conn.execute("UPDATE delivery_challan_items SET dispatch_qty = 5 WHERE id = 'x2'")
+        result = self.service.generate(self.conn)
+        self.assertEqual(result["changes_processed"], 2)
+        self.assertIn(("FULLY_DISPATCHED_NOT_INVOICED", "1002"), self.open_alerts())
+
+    def test_open_alerts_are_unique(self):
+        self.service.generate(self.conn)
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.conn.execute("""
+                INSERT INTO alerts (id, alert_type, entity_type, entity_id, message)
+                VALUES ('dup', 'DC_NOT_INVOICED', 'DC', 'DC-OLD', 'x')
+            """)
+
+
+if __name__ == '__main__':
+    unittest.main()
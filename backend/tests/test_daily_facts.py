@@ -0,0 +1,156 @@
+import unittest
+import sqlite3
+import sys
+import os
+
+# Add backend to path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.daily_facts_service import DailyFactsService
+
+SCHEMA_SQL = """
+CREATE TABLE purchase_orders (
+    po_number INTEGER PRIMARY KEY,
+    po_date_iso TEXT,
+    po_value NUMERIC
+);
+
+CREATE TABLE purchase_order_items (
+    id TEXT PRIMARY KEY,
+    po_number INTEGER NOT NULL REFERENCES purchase_orders(po_number) ON DELETE CASCADE,
+    material_description TEXT,
+    ord_qty NUMERIC
+);
+
+CREATE TABLE delivery_challans (
+    dc_number TEXT PRIMARY KEY,
+    dc_date_iso TEXT,
+    po_number INTEGER REFERENCES purchase_orders(po_number) ON DELETE CASCADE
+);
+
+CREATE TABLE delivery_challan_items (
+    id TEXT PRIMARY KEY,
+    dc_number TEXT NOT NULL REFERENCES delivery_challans(dc_number) ON DELETE CASCADE,
+    po_item_id TEXT NOT NULL REFERENCES purchase_order_items(id) ON DELETE CASCADE,
+    dispatch_qty NUMERIC NOT NULL,
+    lot_no INTEGER
+);
+
+CREATE TABLE gst_invoices (
+    invoice_number TEXT PRIMARY KEY,
+    invoice_date_iso TEXT,
+    total_invoice_value NUMERIC,
+    linked_dc_numbers TEXT
+);
+
+CREATE TABLE gst_invoice_dc_links (
+    invoice_number TEXT NOT NULL,
+    dc_number TEXT NOT NULL
+);
+
+CREATE TABLE gst_invoice_items (
+    id TEXT PRIMARY KEY,
+    invoice_number TEXT NOT NULL,
+    po_sl_no TEXT,
+    description TEXT,
+    quantity NUMERIC
+);
+
+CREATE TABLE schema_version (
+    version INTEGER PRIMARY KEY,
+    description TEXT
+);
+"""
+
+SEED_SQL = """
+INSERT INTO purchase_orders (po_number, po_date_iso, po_value) VALUES
+    (1001, '2024-01-05', 1000), (1002, '2024-02-10', 500);
+INSERT INTO purchase_order_items (id, po_number, ord_qty) VALUES
+    ('i1', 1001, 100), ('i2', 1001, 50), ('i3', 1002, 30);
+INSERT INTO delivery_challans (dc_number, dc_date_iso, po_number) VALUES
+    ('DC-1', '2024-02-01', 1001), ('DC-2', '2024-02-15', 1002);
+INSERT INTO delivery_challan_items (id, dc_number, po_item_id, dispatch_qty) VALUES
+    ('x1', 'DC-1', 'i1', 60), ('x2', 'DC-1', 'i2', 10), ('x3', 'DC-2', 'i3', 30);
+INSERT INTO gst_invoices (invoice_number, invoice_date_iso, total_invoice_value) VALUES
+    ('INV-1', '2024-02-20', 826);
+"""
+
+MIGRATIONS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'migrations'))
+
+
+class TestDailyFacts(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA_SQL)
+        # PO 1001 exists before the migration (backfill), the rest arrives through triggers
+        self.conn.execute("INSERT INTO purchase_orders (po_number, po_date_iso, po_value) VALUES (900, '2023-12-31', 70)")
+        for name in ("006_po_item_rollup.sql", "010_daily_facts.sql"):
+            with open(os.path.join(MIGRATIONS_DIR, name)) as f:
+                self.conn.executescript(f.read())
+        self.conn.executescript(SEED_SQL)
+        self.service = DailyFactsService()
+
+    def tearDown(self):
+        self.conn.close()
+
+    def assertConsistent(self):
+        result = self.service.check(self.conn)
+        self.assertTrue(result["consistent"], result["mismatches"])
+
+    def test_insert_triggers_and_period_totals(self):
+        self.assertConsistent()
+
+        totals = self.service.totals(self.conn, "2024-01-01")
+        self.assertEqual(totals["po_count"], 2)
+        self.assertEqual(totals["ordered_value"], 1500)
+        self.assertEqual((totals["po_ordered_qty"], totals["po_dispatched_qty"]), (180, 100))
+        self.assertEqual((totals["dc_count"], totals["dispatched_qty"]), (2, 100))
+        self.assertEqual((totals["invoice_count"], totals["invoiced_value"]), (1, 826))
+
+        feb = self.service.totals(self.conn, "2024-02-01", "2024-02-29")
+        self.assertEqual((feb["po_count"], feb["po_ordered_qty"], feb["dispatched_qty"]), (1, 30, 100))
+
+        months = {m["month"]: m for m in self.service.monthly(self.conn, "2024-01-01", "2025-01-01")}
+        self.assertEqual(sorted(months), ["01", "02"])
+        self.assertEqual(months["01"]["po_dispatched_qty"], 70)
+
+    def test_updates_move_deltas_between_days(self):
+        self.conn.execute("UPDATE delivery_challan_items SET dispatch_qty = 80 WHERE id = 'x1'")
+        self.conn.execute("UPDATE purchase_order_items SET ord_qty = 120 WHERE id = 'i1'")
+        self.conn.execute("UPDATE purchase_orders SET po_date_iso = '2024-03-01', po_value = 1200 WHERE po_number = 1001")
+        self.conn.execute("UPDATE delivery_challans SET dc_date_iso = '2024-03-02' WHERE dc_number = 'DC-1'")
+        self.conn.execute("UPDATE gst_invoices SET total_invoice_value = 900 WHERE invoice_number = 'INV-1'")
+        self.assertConsistent()
+
+        march = self.service.totals(self.conn, "2024-03-01", "2024-03-31")
+        self.assertEqual((march["ordered_value"], march["po_ordered_qty"], march["po_dispatched_qty"]), (1200, 170, 90))
+        self.assertEqual(march["dispatched_qty"], 90)
+        self.assertEqual(self.service.totals(self.conn, "2024-01-01", "2024-01-31")["po_count"], 0)
+
+    def test_cascading_deletes(self):
+        self.conn.execute("DELETE FROM delivery_challans WHERE dc_number = 'DC-2'")
+        self.assertConsistent()
+        self.conn.execute("DELETE FROM purchase_orders WHERE po_number = 1001")  # cascades items and DC-1
+        self.assertConsistent()
+        self.conn.execute("DELETE FROM gst_invoices")
+        self.assertConsistent()
+
+        totals = self.service.totals(self.conn, "2024-01-01")
+        self.assertEqual(
+            {c: totals[c] for c in ("po_count", "po_ordered_qty", "dc_count", "dispatched_qty", "invoice_count")},
+            {"po_count": 1, "po_ordered_qty": 30, "dc_count": 0, "dispatched_qty": 0, "invoice_count": 0}
+        )
+
+    def test_check_and_rebuild(self):
+        self.conn.execute("UPDATE daily_facts SET invoiced_value = 1 WHERE day = '2024-02-20'")
+        result = self.service.check(self.conn)
+        self.assertEqual([m["day"] for m in result["mismatches"]], ["2024-02-20"])
+
+        self.service.rebuild(self.conn)
+        self.assertConsistent()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import sqlite3
+import sys
+import os
+import tempfile
+import threading
+import time
+
+# Add backend to path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.db import ConnectionPool, PoolTimeoutError
+
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "pool.db")
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, val TEXT)")
+        conn.commit()
+        conn.close()
+        self.pool = ConnectionPool(self.db_path, readers=2, writers=1, timeout=0.2, health_check_interval=0)
+
+    def tearDown(self):
+        self.pool.close()
+        self.tmpdir.cleanup()
+
+    def test_connections_are_reused_and_initialized_once(self):
+        conn = self.pool.acquire(readonly=False)
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        self.assertEqual(conn.execute("PRAGMA foreign_keys").fetchone()[0], 1)
+        self.pool.release(conn)
+
+        again = self.pool.acquire(readonly=False)
+        self.assertIs(again, conn)
+        self.pool.release(again)
+        self.assertEqual(self.pool.stats()["writers"]["open"], 1)
+
+    def test_reader_lane_is_query_only(self):
+        with self.pool.connection(readonly=True) as conn:
+            with self.assertRaises(sqlite3.OperationalError):
+                conn.execute("INSERT INTO t (val) VALUES ('x')")
+
+        with self.pool.connection(readonly=False) as conn:
+            conn.execute("INSERT INTO t (val) VALUES ('x')")
+            conn.commit()
+
+        with self.pool.connection(readonly=True) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM t").fetchone()[0], 1)
+
+    def test_release_rolls_back_open_transaction(self):
+        conn = self.pool.acquire(readonly=False)
+        conn.execute("INSERT INTO t (val) VALUES ('uncommitted')")
+        self.pool.release(conn)
+
+        with self.pool.connection(readonly=True) as reader:
+            self.assertEqual(reader.execute("SELECT COUNT(*) FROM t").fetchone()[0], 0)
+
+    def test_bounded_lane_times_out_and_records_wait(self):
+        held = self.pool.acquire(readonly=False)
+        with self.assertRaises(PoolTimeoutError):
+            self.pool.acquire(readonly=False)
+
+        # A waiter is served as soon as the connection is released
+        threading.Timer(0.05, self.pool.release, args=(held,)).start()
+        conn = self.pool.acquire(readonly=False)
+        self.pool.release(conn)
+
+        stats = self.pool.stats()["writers"]
+        self.assertEqual(stats["timeouts_total"], 1)
+        self.assertEqual(stats["acquired_total"], 2)
+        self.assertGreater(stats["wait_ms_max"], 0)
+        self.assertEqual(stats["in_use"], 0)
+
+    def test_broken_idle_connection_is_replaced(self):
+        conn = self.pool.acquire(readonly=True)
+        self.pool.release(conn)
+        conn.close()  # Simulate a connection that went bad while idle
+        time.sleep(0.01)
+
+        with self.pool.connection(readonly=True) as fresh:
+            self.assertIsNot(fresh, conn)
+            self.assertEqual(fresh.execute("SELECT 1").fetchone()[0], 1)
+        self.assertEqual(self.pool.stats()["readers"]["health_check_failures"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
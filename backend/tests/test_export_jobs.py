@@ -0,0 +1,122 @@
+import unittest
+import sqlite3
+import sys
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+# Add backend to path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.config import settings
+from app.db import ConnectionPool
+from app.services.export_job_service import ExportJobService
+from tests.test_export_stream import SCHEMA_SQL
+
+MIGRATION = os.path.join(os.path.dirname(__file__), '..', '..', 'migrations', '011_exports.sql')
+PARAMS = {"start_date": "2024-01-01", "end_date": "2024-12-31"}
+
+
+class TestExportJobs(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        db_path = Path(self.tmp.name) / "test.db"
+        conn = sqlite3.connect(db_path)
+        conn.executescript(SCHEMA_SQL)
+        conn.execute("CREATE TABLE schema_version (version INTEGER PRIMARY KEY, description TEXT)")
+        with open(MIGRATION) as f:
+            conn.executescript(f.read())
+        conn.close()
+
+        self.pool = ConnectionPool(db_path, readers=2, writers=1, timeout=5)
+        self.service = ExportJobService(pool=self.pool, export_dir=Path(self.tmp.name) / "exports", workers=1)
+
+    def tearDown(self):
+        self.service.shutdown(wait=True)
+        self.pool.close()
+        self.tmp.cleanup()
+
+    def submit(self, report_type="invoice", fmt="xlsx", params=PARAMS):
+        with self.pool.connection() as db:
+            return self.service.submit(db, report_type, fmt, params)
+
+    def wait(self):
+        self.service.shutdown(wait=True)
+
+    def get(self, job_id):
+        with self.pool.connection(readonly=True) as db:
+            return self.service.get(db, job_id)
+
+    def test_job_renders_to_disk(self):
+        job = self.submit()
+        self.assertEqual(job["status"], "queued")
+        self.wait()
+
+        done = self.get(job["id"])
+        self.assertEqual(done["status"], "completed")
+        self.assertEqual((done["rows_total"], done["rows_written"], done["progress_pct"]), (1, 1, 100.0))
+        self.assertEqual(done["file_name"], "invoice_summary_2024-01-01_to_2024-12-31.xlsx")
+
+        with self.pool.connection() as db:
+            path = self.service.artifact(db, job["id"])
+        self.assertTrue(path.exists())
+        self.assertEqual(path.stat().st_size, done["file_size"])
+        self.assertEqual(list(path.parent.glob("*.part")), [])
+
+    def test_identical_requests_are_deduplicated(self):
+        first = self.submit()
+        second = self.submit()
+        self.assertTrue(second["deduplicated"])
+        self.assertEqual(second["id"], first["id"])
+
+        self.wait()
+        self.assertEqual(self.submit()["id"], first["id"])
+        self.assertNotEqual(self.submit(fmt="csv")["id"], first["id"])
+
+        # Outside the freshness window a new job is rendered
+        with mock.patch.object(settings, "EXPORT_FRESHNESS_SECONDS", 0):
+            with self.pool.connection() as db:
+                db.execute("UPDATE exports SET completed_at = datetime('now', '-1 minute')")
+                db.commit()
+            self.assertFalse(self.submit()["deduplicated"])
+
+    def test_failed_job(self):
+        job = self.submit(params={"start_date": "2024-01-01", "end_date": "2024-12-31", "bad": 1})
+        with self.pool.connection() as db:
+            db.execute("DROP TABLE gst_invoice_items")
+            db.commit()
+        self.wait()
+        failed = self.get(job["id"])
+        self.assertEqual(failed["status"], "failed")
+        self.assertIn("gst_invoice_items", failed["error"])
+
+    def test_eviction(self):
+        old, recent = self.submit("po"), self.submit("po", params={"start_date": "2024-01-01", "end_date": "2024-06-30"})
+        self.wait()
+        with self.pool.connection() as db:
+            db.execute("UPDATE exports SET completed_at = datetime('now', '-2 days') WHERE id = ?", (old["id"],))
+            old_path = self.service.artifact(db, old["id"])
+            db.commit()
+
+        self.assertEqual(self.service.evict(), 1)
+        self.assertEqual(self.get(old["id"])["status"], "expired")
+        self.assertFalse(old_path.exists())
+
+        with mock.patch.object(settings, "EXPORT_MAX_TOTAL_MB", 0):
+            self.assertEqual(self.service.evict(), 1)
+        self.assertEqual(self.get(recent["id"])["status"], "expired")
+
+    def test_recover_fails_interrupted_jobs(self):
+        with self.pool.connection() as db:
+            db.execute("""
+                INSERT INTO exports (id, content_key, report_type, format, params, status)
+                VALUES ('stale', 'k', 'po', 'xlsx', '{}', 'running')
+            """)
+            db.commit()
+        self.assertEqual(self.service.recover(), 1)
+        self.assertEqual(self.get("stale")["status"], "failed")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import unittest
+import sqlite3
+import sys
+import os
+import io
+import csv
+from unittest import mock
+
+# Add backend to path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from openpyxl import load_workbook
+
+from app.utils.export_stream import stream_xlsx, stream_csv, styled, Cell, STYLE_HEADER, STYLE_NUMBER, STYLE_TITLE
+from app.services.export_service import ExportService, SALE_SUMMARY_HEADERS
+from app.routers import smart_reports
+
+SCHEMA_SQL = """
+CREATE TABLE purchase_orders (
+    po_number INTEGER PRIMARY KEY,
+    po_date TEXT,
+    po_date_iso TEXT,
+    supplier_name TEXT
+);
+
+CREATE TABLE po_item_rollup (
+    po_item_id TEXT PRIMARY KEY,
+    po_number INTEGER NOT NULL,
+    ordered_qty NUMERIC NOT NULL DEFAULT 0,
+    dispatched_qty NUMERIC NOT NULL DEFAULT 0
+);
+
+CREATE TABLE gst_invoices (
+    invoice_number TEXT PRIMARY KEY,
+    invoice_date_iso TEXT,
+    linked_dc_numbers TEXT,
+    total_invoice_value NUMERIC
+);
+
+CREATE TABLE gst_invoice_items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    invoice_number TEXT NOT NULL,
+    description TEXT,
+    quantity REAL,
+    taxable_value REAL
+);
+
+CREATE TABLE gst_invoice_po_links (
+    invoice_number TEXT NOT NULL,
+    po_number INTEGER NOT NULL,
+    PRIMARY KEY (invoice_number, po_number)
+);
+
+INSERT INTO purchase_orders VALUES (1001, '05/01/2024', '2024-01-05', 'ACME & Sons');
+INSERT INTO po_item_rollup VALUES ('i1', 1001, 10, 4), ('i2', 1001, 5, 5);
+INSERT INTO gst_invoices VALUES ('INV-1', '2024-02-20', 'DC-1', 1180);
+INSERT INTO gst_invoice_items (invoice_number, description, quantity, taxable_value)
+    VALUES ('INV-1', 'Widget <A>', 4, 1000);
+INSERT INTO gst_invoice_po_links VALUES ('INV-1', 1001);
+"""
+
+
+class TestExportStream(unittest.TestCase):
+    def test_xlsx_round_trip_and_chunking(self):
+        rows = (styled([i, f"row {i}", i * 1.5], [STYLE_NUMBER] * 3) for i in range(5000))
+        header = [[Cell("Title", STYLE_TITLE)], styled(["n", "name", "value"], [STYLE_HEADER] * 3)]
+
+        chunks = list(stream_xlsx(
+            iter(header + list(rows)), sheet_title="Test/Sheet", column_widths=[10, 20, 10],
+            merged_cells=["A1:C1"], chunk_size=4096
+        ))
+        self.assertGreater(len(chunks), 1)
+
+        ws = load_workbook(io.BytesIO(b"".join(chunks))).active
+        self.assertEqual(ws.title, "Test Sheet")
+        self.assertEqual(ws["A1"].value, "Title")
+        self.assertTrue(ws["A1"].font.bold)
+        self.assertIn("A1:C1", [str(r) for r in ws.merged_cells.ranges])
+        self.assertEqual(ws.max_row, 5002)
+        self.assertEqual((ws["A5002"].value, ws["B5002"].value, ws["C5002"].value), (4999, "row 4999", 7498.5))
+        self.assertEqual(ws["C3"].number_format, "0.00")
+
+    def test_csv(self):
+        data = b"".join(stream_csv([["a", "b"], styled([1, "x,y"], [STYLE_NUMBER] * 2)], chunk_size=1))
+        self.assertTrue(data.startswith("\ufeff".encode("utf-8")))
+        self.assertEqual(list(csv.reader(io.StringIO(data.decode("utf-8-sig")))), [["a", "b"], ["1", "x,y"]])
+
+
+class TestExportService(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA_SQL)
+        self.service = ExportService()
+
+    def tearDown(self):
+        self.conn.close()
+
+    def render(self, entity, fmt):
+        return b"".join(self.service.render_date_summary(self.conn, entity, "2024-01-01", "2024-12-31", fmt))
+
+    def test_sale_summary_xlsx(self):
+        ws = load_workbook(io.BytesIO(self.render("invoice", "xlsx"))).active
+        self.assertEqual(ws["A1"].value, "ACME & Sons")
+        self.assertEqual([c.value for c in ws[3]], SALE_SUMMARY_HEADERS)
+        row = [c.value for c in ws[4]]
+        self.assertEqual(row[1], "INV-1\n20/02/2024")
+        self.assertEqual(row[4], "Widget <A>\n(PO: 1001)")
+        self.assertEqual((row[5], row[6], row[10], row[14]), (4, 1000, 1000, 1180))
+
+    def test_po_csv(self):
+        rows = list(csv.reader(io.StringIO(self.render("po", "csv").decode("utf-8-sig"))))
+        self.assertEqual(rows[1], ["1001", "05/01/2024", "15", "9", "6", "In Progress"])
+
+    def test_invalid_format(self):
+        with self.assertRaises(ValueError):
+            self.service.render_date_summary(self.conn, "po", "2024-01-01", "2024-12-31", "pdf")
+
+
+class TestDateSummaryExportEndpoint(unittest.TestCase):
+    def setUp(self):
+        app = FastAPI()
+        app.include_router(smart_reports.router)
+        self.client = TestClient(app)
+
+    def test_dates_are_normalized(self):
+        with mock.patch.object(smart_reports.export_service, "stream_date_summary", return_value=iter([b"x"])) as stream:
+            response = self.client.get("/date-summary/export", params={
+                "entity": "po", "start_date": "01/04/2024", "end_date": "2025-03-31", "format": "csv"
+            })
+        self.assertEqual(response.status_code, 200)
+        stream.assert_called_once_with("po", "2024-04-01", "2025-03-31", "csv")
+        self.assertIn("po_summary_2024-04-01_to_2025-03-31.csv", response.headers["content-disposition"])
+
+    def test_invalid_date_is_400(self):
+        with mock.patch.object(smart_reports.export_service, "stream_date_summary") as stream:
+            response = self.client.get("/date-summary/export", params={
+                "entity": "po", "start_date": "2024-02-30", "end_date": "2025-03-31"
+            })
+        self.assertEqual(response.status_code, 400)
+        stream.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
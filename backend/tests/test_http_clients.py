@@ -0,0 +1,78 @@
+import unittest
+import asyncio
+import sys
+import os
+
+# Add backend to path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+
+from app.services.http_clients import HTTPClientPool
+from app.services.llm_client import LLMClient
+
+
+class FakeStream:
+    """Stands in for the httpcore network stream of one connection"""
+
+
+def make_transport(streams, requests):
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(
+            200,
+            json={"choices": [{"message": {"content": "ok"}, "finish_reason": "stop"}]},
+            extensions={"network_stream": streams[min(len(requests), len(streams)) - 1]},
+        )
+    return httpx.MockTransport(handler)
+
+
+class TestHTTPClientPool(unittest.TestCase):
+    def test_one_client_per_provider_and_reuse_stats(self):
+        async def run():
+            conn = FakeStream()
+            pool = HTTPClientPool(transport=make_transport([conn], []))
+            groq = pool.client("groq")
+            self.assertIs(pool.client("groq"), groq)
+            self.assertIsNot(pool.client("ollama"), groq)
+
+            for _ in range(3):
+                await groq.get("https://api.groq.com/ping")
+
+            stats = pool.stats()["providers"]
+            self.assertEqual(stats["groq"]["requests"], 3)
+            self.assertEqual(stats["groq"]["connections_opened"], 1)
+            self.assertAlmostEqual(stats["groq"]["reuse_ratio"], 0.667)
+            self.assertEqual(stats["ollama"]["requests"], 0)
+
+            await pool.aclose()
+            self.assertTrue(groq.is_closed)
+            self.assertFalse(pool.stats()["providers"]["groq"]["open"])
+            # A closed pool hands out a fresh client on next use
+            self.assertFalse(pool.client("groq").is_closed)
+            await pool.aclose()
+
+        asyncio.run(run())
+
+    def test_llm_client_reuses_shared_client(self):
+        async def run():
+            requests = []
+            llm = LLMClient()
+            llm.groq_api_key = "test-key"
+            llm._http = HTTPClientPool(transport=make_transport([FakeStream()], requests))
+
+            for _ in range(2):
+                result = await llm.chat([{"role": "user", "content": "hi"}], provider="groq")
+                self.assertEqual(result["content"], "ok")
+
+            self.assertEqual(len(requests), 2)
+            self.assertEqual(requests[0].headers["Authorization"], "Bearer test-key")
+            groq = llm.http_stats()["providers"]["groq"]
+            self.assertEqual((groq["requests"], groq["connections_opened"]), (2, 1))
+            await llm.aclose()
+
+        asyncio.run(run())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import asyncio
+import random
+import sqlite3
+import sys
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+# Add backend to path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.db import ConnectionPool
+from app.services import po_batch_ingest
+from app.services.ingest_ledger import IngestLedger, LedgerEntry
+from app.services.ingest_po import POIngestionService
+from app.services.po_batch_ingest import POBatchIngestService
+from tests.test_ingestion import SCHEMA_SQL
+from tests.test_po_scraper import make_po_html
+
+
+class TestIngestLedger(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA_SQL)
+        self.ledger = IngestLedger()
+        self.service = POIngestionService()
+
+    def tearDown(self):
+        self.conn.close()
+
+    def ingest(self, content: bytes, supplier: str):
+        digest = self.ledger.digest(content)
+        _, warnings, diff = self.service.merge(self.conn, {'PURCHASE ORDER': '77', 'SUPP NAME M/S': supplier}, [])
+        self.ledger.record(self.conn, [LedgerEntry(digest, "po.html", len(content), 77, diff["status"], warnings[0])])
+        return digest
+
+    def test_digest_current_until_po_changes(self):
+        first = self.ingest(b"<html>v1</html>", "A")
+        self.ledger.record(self.conn, [LedgerEntry(self.ledger.digest(b"bad"), "bad.html", 3, 77, "failed", "boom")])
+        self.assertEqual(self.ledger.find_ingested(self.conn, [first, self.ledger.digest(b"bad")]), {first: {"po_number": 77, "amend_no": 0}})
+
+        second = self.ingest(b"<html>v2</html>", "B")  # amendment from another file
+        self.assertEqual(set(self.ledger.find_ingested(self.conn, [first, second])), {second})
+
+        entries = self.ledger.list_entries(self.conn, po_number=77)
+        self.assertEqual([e["status"] for e in entries], ["updated", "failed", "created"])
+        self.assertIsNone(entries[1]["content_hash"])
+        self.assertEqual(len(self.ledger.list_entries(self.conn, status="failed")), 1)
+
+
+class TestBatchDedupe(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        db_path = Path(self.tmp.name) / "test.db"
+        conn = sqlite3.connect(db_path)
+        conn.executescript(SCHEMA_SQL)
+        conn.close()
+        self.pool = ConnectionPool(db_path, readers=1, writers=1, timeout=5)
+        self.service = POBatchIngestService(pool=self.pool, workers=1, chunk_size=2)
+
+    def tearDown(self):
+        self.service.shutdown()
+        self.pool.close()
+        self.tmp.cleanup()
+
+    def run_batch(self, uploads):
+        async def collect():
+            return [item async for item in self.service.ingest(uploads)]
+        return dict(asyncio.run(collect()))
+
+    def test_reupload_skips_parsing(self):
+        rng = random.Random(19)
+        uploads = [(f"po_{i}.html", make_po_html(rng).encode()) for i in range(3)] + [("notes.txt", b"x")]
+        first = self.run_batch(uploads)
+        self.assertFalse(any(result["duplicate"] for result in first.values()))
+
+        with mock.patch.object(po_batch_ingest, "parse_po_html", side_effect=AssertionError("parsed")):
+            again = self.run_batch(uploads[:3] + [("new.html", b"<html></html>")])
+
+        self.assertTrue(all(again[i]["duplicate"] and again[i]["success"] for i in range(3)))
+        self.assertEqual([again[i]["po_number"] for i in range(3)], [first[i]["po_number"] for i in range(3)])
+        self.assertFalse(again[3]["success"])  # not a duplicate, so it went to the (patched) parser
+
+        with self.pool.connection(readonly=True) as db:
+            statuses = [row[0] for row in db.execute("SELECT status FROM po_ingest_ledger ORDER BY id")]
+        self.assertEqual(sorted(statuses[:4]), ["created", "created", "created", "failed"])
+        self.assertEqual(sorted(statuses[4:]), ["duplicate", "duplicate", "duplicate", "failed"])
+
+
+if __name__ == '__main__':
+    unittest.main()
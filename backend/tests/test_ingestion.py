@@ -12,6 +12,7 @@ SCHEMA_SQL = """
 CREATE TABLE purchase_orders (
     po_number INTEGER PRIMARY KEY,
     po_date DATE,
+    po_date_iso TEXT,
     supplier_name TEXT,
     supplier_gstin TEXT,
     supplier_code TEXT,
@@ -43,6 +44,7 @@ CREATE TABLE purchase_orders (
     issuer_designation TEXT,
     issuer_phone TEXT,
     remarks TEXT,
+    content_hash TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -74,10 +76,41 @@ CREATE TABLE purchase_order_deliveries (
     lot_no INTEGER,
     dely_qty NUMERIC,
     dely_date DATE,
+    dely_date_iso TEXT,
     entry_allow_date DATE,
     dest_code INTEGER,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
+
+CREATE TABLE delivery_challan_items (
+    id TEXT PRIMARY KEY,
+    dc_number TEXT NOT NULL,
+    po_item_id TEXT NOT NULL REFERENCES purchase_order_items(id) ON DELETE CASCADE,
+    dispatch_qty NUMERIC NOT NULL,
+    lot_no INTEGER
+);
+
+CREATE TABLE po_ingest_ledger (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    file_sha256 TEXT NOT NULL,
+    file_name TEXT,
+    file_size INTEGER,
+    po_number INTEGER,
+    amend_no INTEGER,
+    content_hash TEXT,
+    status TEXT NOT NULL,
+    message TEXT,
+    source TEXT NOT NULL DEFAULT 'upload',
+    ingested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE search_documents (
+    id INTEGER PRIMARY KEY,
+    entity_type TEXT NOT NULL,
+    entity_id TEXT NOT NULL,
+    details TEXT,
+    UNIQUE (entity_type, entity_id)
+);
 """
 
 class TestPOIngestion(unittest.TestCase):
@@ -127,6 +160,7 @@ class TestPOIngestion(unittest.TestCase):
         row = cursor.fetchone()
         self.assertIsNotNone(row)
         self.assertEqual(row['supplier_name'], 'Test Supplier')
+        self.assertEqual(row['po_date_iso'], '2023-01-01')
 
         # Verify Items
         cursor = self.conn.execute("SELECT * FROM purchase_order_items WHERE po_number = 12345")
@@ -175,5 +209,78 @@ class TestPOIngestion(unittest.TestCase):
         self.assertEqual(len(rows), 1)
         self.assertEqual(rows[0]['po_item_no'], 20)
 
+
+def item(po_item_no, lot_no, ord_qty='100', dely_qty='50', rate='10.00'):
+    return {'PO ITM': po_item_no, 'MATERIAL CODE': f'MAT{po_item_no}', 'ORD QTY': ord_qty, 'PO RATE': rate,
+            'LOT NO': lot_no, 'DELY QTY': dely_qty, 'DELY DATE': '2023-02-01'}
+
+
+class TestPOAmendmentMerge(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA_SQL)
+        self.service = POIngestionService()
+        self.header = {'PURCHASE ORDER': '500', 'SUPP NAME M/S': 'Supplier', 'PO-VALUE': '1000.00', 'RC NO': 12}
+        self.service.ingest_po(self.conn, self.header, [item('10', '1'), item('10', '2'), item('20', '1'), item('30', '1')])
+
+    def tearDown(self):
+        self.conn.close()
+
+    def item_ids(self):
+        return {row['po_item_no']: row['id'] for row in self.conn.execute("SELECT po_item_no, id FROM purchase_order_items")}
+
+    def test_unchanged_po_skipped(self):
+        self.conn.execute("UPDATE purchase_orders SET updated_at = '2000-01-01'")
+        success, warnings, diff = self.service.merge(
+            self.conn, dict(self.header), [item('10', '1'), item('10', '2'), item('20', '1'), item('30', '1')]
+        )
+        self.assertTrue(success)
+        self.assertEqual(diff["status"], "unchanged")
+        self.assertIn("unchanged", warnings[0])
+        updated_at = self.conn.execute("SELECT updated_at FROM purchase_orders").fetchone()[0]
+        self.assertEqual(updated_at, '2000-01-01')
+
+    def test_amendment_touches_only_changed_rows(self):
+        before = self.item_ids()
+        self.conn.execute("UPDATE purchase_order_items SET delivered_qty = 30, pending_qty = 70, hsn_code = '8471' WHERE po_item_no IN (10, 20)")
+        kept_delivery = self.conn.execute("SELECT id FROM purchase_order_deliveries WHERE po_item_id = ? AND lot_no = 1", (before[10],)).fetchone()[0]
+
+        success, warnings, diff = self.service.merge(
+            self.conn, {**self.header, 'AMEND NO': '1'},
+            [item('10', '1'), item('10', '3', dely_qty='20'), item('20', '1', ord_qty='80'), item('40', '1')]
+        )
+
+        self.assertTrue(success)
+        self.assertEqual(diff["status"], "updated")
+        self.assertEqual(diff["header"], ["amend_no"])
+        self.assertEqual(diff["items"], {"added": [40], "updated": [20], "removed": [30], "kept": []})
+        self.assertEqual(diff["deliveries"], {"added": 2, "updated": 0, "removed": 2})
+        self.assertIn("already exists (Amendment 0)", warnings[1])
+
+        after = self.item_ids()
+        self.assertEqual((after[10], after[20]), (before[10], before[20]))
+        self.assertNotIn(30, after)
+        row = self.conn.execute("SELECT * FROM purchase_order_items WHERE po_item_no = 10").fetchone()
+        self.assertEqual((row['delivered_qty'], row['pending_qty'], row['hsn_code']), (30, 70, '8471'))
+        self.assertEqual(self.conn.execute("SELECT pending_qty FROM purchase_order_items WHERE po_item_no = 20").fetchone()[0], 50)
+        lots = [r[0] for r in self.conn.execute("SELECT id FROM purchase_order_deliveries WHERE po_item_id = ? ORDER BY lot_no", (after[10],))]
+        self.assertEqual(lots[0], kept_delivery)
+        self.assertEqual(len(lots), 2)
+
+    def test_item_referenced_by_dc_kept(self):
+        ids = self.item_ids()
+        self.conn.execute("INSERT INTO delivery_challan_items VALUES ('dci-1', 'DC-1', ?, 5, 1)", (ids[30],))
+
+        _, warnings, diff = self.service.merge(self.conn, self.header, [item('10', '1'), item('10', '2'), item('20', '1')])
+
+        self.assertEqual(diff["items"]["kept"], [30])
+        self.assertEqual(diff["items"]["removed"], [])
+        self.assertIn("delivery challans reference them", warnings[-1])
+        self.assertIn(30, self.item_ids())
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM delivery_challan_items").fetchone()[0], 1)
+
+
 if __name__ == '__main__':
     unittest.main()
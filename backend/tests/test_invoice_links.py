@@ -0,0 +1,60 @@
+import unittest
+import sqlite3
+import sys
+import os
+
+# Add backend to path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from tests.test_alerts import SCHEMA_SQL, MIGRATIONS_DIR
+
+SEED_SQL = """
+INSERT INTO purchase_orders (po_number, supplier_name) VALUES (1001, 'Acme'), (1002, 'Bharat'), (1003, 'Kirloskar');
+INSERT INTO delivery_challans (dc_number, dc_date, dc_date_iso, po_number) VALUES
+    ('DC-1', '2024-01-01', '2024-01-01', 1001),
+    ('DC-2', '2024-01-02', '2024-01-02', 1002),
+    ('DC-3', '2024-01-03', '2024-01-03', 1003);
+INSERT INTO gst_invoices (invoice_number, linked_dc_numbers, po_numbers) VALUES
+    ('INV-1', 'DC-1, DC-2', '1001, 1002'),
+    ('INV-2', 'DC-3', NULL),
+    ('INV-3', 'DC-MISSING', 'N/A');
+INSERT INTO gst_invoice_dc_links (id, invoice_number, dc_number) VALUES ('l1', 'INV-1', 'DC-1');
+"""
+
+
+class TestInvoiceLinkBackfill(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA_SQL)
+        self.conn.executescript(SEED_SQL)
+        for name in ("006_po_item_rollup.sql", "008_alert_engine.sql", "009_invoice_po_links.sql"):
+            with open(os.path.join(MIGRATIONS_DIR, name)) as f:
+                self.conn.executescript(f.read())
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_backfill_splits_text_columns(self):
+        dc_links = self.conn.execute(
+            "SELECT invoice_number, dc_number FROM gst_invoice_dc_links ORDER BY 1, 2"
+        ).fetchall()
+        self.assertEqual(dc_links, [("INV-1", "DC-1"), ("INV-1", "DC-2"), ("INV-2", "DC-3")])
+
+        po_links = self.conn.execute(
+            "SELECT invoice_number, po_number FROM gst_invoice_po_links ORDER BY 1, 2"
+        ).fetchall()
+        # INV-2 has no po_numbers text but reaches PO 1003 through its DC
+        self.assertEqual(po_links, [("INV-1", 1001), ("INV-1", 1002), ("INV-2", 1003)])
+
+    def test_po_filter_is_an_index_lookup(self):
+        plan = " ".join(row[3] for row in self.conn.execute("""
+            EXPLAIN QUERY PLAN
+            SELECT invoice_number FROM gst_invoices
+            WHERE invoice_number IN (SELECT invoice_number FROM gst_invoice_po_links WHERE po_number = ?)
+        """, (1001,)))
+        self.assertIn("idx_invoice_po_links_po", plan)
+
+
+if __name__ == '__main__':
+    unittest.main()
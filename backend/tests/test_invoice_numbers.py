@@ -0,0 +1,61 @@
+import unittest
+import sqlite3
+import sys
+import os
+from datetime import date
+
+# Add backend to path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from tests.test_alerts import SCHEMA_SQL, MIGRATIONS_DIR
+from app.core.exceptions import ValidationError
+from app.services.invoice import (
+    advance_invoice_sequence,
+    financial_year,
+    generate_invoice_number,
+    reserve_invoice_numbers
+)
+
+SEED_SQL = """
+INSERT INTO gst_invoices (invoice_number) VALUES
+    ('INV/2025-26/998'), ('INV/2025-26/999'), ('INV/2025-26/1000'),
+    ('INV/2024-25/007'), ('INV/2024-25/12A'), ('INV-20251218-6D80E5'), ('12345');
+"""
+
+FY_2025 = date(2025, 10, 1)
+
+
+class TestInvoiceSequences(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.executescript(SCHEMA_SQL)
+        self.conn.executescript(SEED_SQL)
+        with open(os.path.join(MIGRATIONS_DIR, "015_invoice_sequences.sql")) as f:
+            self.conn.executescript(f.read())
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_seeded_with_numeric_maximum(self):
+        rows = dict(self.conn.execute("SELECT fy, last_number FROM invoice_sequences"))
+        self.assertEqual(rows, {"2025-26": 1000, "2024-25": 7})
+        self.assertEqual(generate_invoice_number(self.conn, FY_2025), "INV/2025-26/1001")
+
+    def test_reserve_batches_and_financial_years(self):
+        self.assertEqual(financial_year(date(2026, 3, 31)), "2025-26")
+        self.assertEqual(financial_year(date(2026, 4, 1)), "2026-27")
+
+        self.assertEqual(reserve_invoice_numbers(self.conn, 3, FY_2025), ["INV/2025-26/1001", "INV/2025-26/1002", "INV/2025-26/1003"])
+        self.assertEqual(generate_invoice_number(self.conn, date(2026, 4, 1)), "INV/2026-27/001")
+        with self.assertRaises(ValidationError):
+            reserve_invoice_numbers(self.conn, 0, FY_2025)
+
+    def test_manual_numbers_advance_the_sequence(self):
+        advance_invoice_sequence(self.conn, "INV/2025-26/1500")
+        advance_invoice_sequence(self.conn, "INV/2025-26/20")  # lower: no effect
+        advance_invoice_sequence(self.conn, "MANUAL-7")
+        self.assertEqual(generate_invoice_number(self.conn, FY_2025), "INV/2025-26/1501")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+import unittest
+import asyncio
+import sqlite3
+import sys
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+# Add backend to path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.config import settings
+from app.db import ConnectionPool
+from app.services.llm_cache import LLMCache, fingerprint
+
+MIGRATION = os.path.join(os.path.dirname(__file__), '..', '..', 'migrations', '012_llm_cache.sql')
+
+SCHEMA_SQL = """
+CREATE TABLE schema_version (version INTEGER PRIMARY KEY, description TEXT);
+CREATE TABLE purchase_orders (po_number INTEGER PRIMARY KEY, po_date TEXT);
+CREATE TABLE purchase_order_items (id TEXT PRIMARY KEY, po_number INTEGER, ord_qty REAL);
+CREATE TABLE delivery_challans (dc_number TEXT PRIMARY KEY, po_number INTEGER);
+CREATE TABLE delivery_challan_items (id TEXT PRIMARY KEY, dc_number TEXT, dispatch_qty REAL);
+CREATE TABLE gst_invoices (invoice_number TEXT PRIMARY KEY, total_invoice_value REAL);
+CREATE TABLE gst_invoice_items (id INTEGER PRIMARY KEY, invoice_number TEXT, quantity REAL);
+"""
+
+MESSAGES = [{"role": "user", "content": "Summarize   pending POs"}]
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = 0
+
+    def model_for(self, provider):
+        return "test-model"
+
+    async def chat(self, messages, provider=None, **kwargs):
+        self.calls += 1
+        return {"content": f"answer {self.calls}", "finish_reason": "stop"}
+
+
+class TestLLMCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        db_path = Path(self.tmp.name) / "test.db"
+        conn = sqlite3.connect(db_path)
+        conn.executescript(SCHEMA_SQL)
+        with open(MIGRATION) as f:
+            conn.executescript(f.read())
+        conn.close()
+
+        self.pool = ConnectionPool(db_path, readers=1, writers=1, timeout=5)
+        self.cache = LLMCache(pool=self.pool)
+        self.client = FakeClient()
+
+    def tearDown(self):
+        self.pool.close()
+        self.tmp.cleanup()
+
+    def ask(self, messages=MESSAGES, **kwargs):
+        return asyncio.run(self.cache.chat(self.client, messages, provider="groq", **kwargs))
+
+    def execute(self, query, params=()):
+        with self.pool.connection() as db:
+            db.execute(query, params)
+            db.commit()
+
+    def test_hit_after_miss(self):
+        first = self.ask(data_fingerprint=fingerprint({"pending": 5}))
+        # Whitespace-only prompt differences share the entry
+        second = self.ask([{"role": "user", "content": "Summarize pending POs "}], data_fingerprint=fingerprint({"pending": 5}))
+
+        self.assertFalse(first["cached"])
+        self.assertTrue(second["cached"])
+        self.assertEqual(second["content"], "answer 1")
+        self.assertEqual(self.client.calls, 1)
+        with self.pool.connection(readonly=True) as db:
+            stats = self.cache.stats(db)
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 1, 1))
+
+    def test_key_covers_fingerprint_and_params(self):
+        self.ask(data_fingerprint=fingerprint({"pending": 5}))
+        self.ask(data_fingerprint=fingerprint({"pending": 6}))
+        self.ask(data_fingerprint=fingerprint({"pending": 5}), temperature=0.1)
+        self.assertEqual(self.client.calls, 3)
+
+    def test_data_change_invalidates(self):
+        self.ask()
+        for statement in (
+            "INSERT INTO gst_invoices VALUES ('INV/1', 100)",
+            "UPDATE gst_invoices SET total_invoice_value = 200",
+            "DELETE FROM gst_invoices",
+            "INSERT INTO purchase_order_items VALUES ('a', 1, 5)",
+        ):
+            self.execute(statement)
+            self.assertFalse(self.ask()["cached"], statement)
+            self.assertTrue(self.ask()["cached"], statement)
+
+        # Unrelated tables do not bump the version
+        self.execute("CREATE TABLE notes (id INTEGER)")
+        self.execute("INSERT INTO notes VALUES (1)")
+        self.assertTrue(self.ask()["cached"])
+
+    def test_ttl_expiry(self):
+        self.ask()
+        self.execute("UPDATE llm_cache SET expires_at = datetime('now', '-1 seconds')")
+        self.assertFalse(self.ask()["cached"])
+        self.assertEqual(self.client.calls, 2)
+
+    def test_lru_eviction(self):
+        with mock.patch.object(settings, "LLM_CACHE_MAX_ENTRIES", 2):
+            self.ask(data_fingerprint="a")
+            self.ask(data_fingerprint="b")
+            self.execute("UPDATE llm_cache SET last_used_at = datetime('now', '-1 hours')")
+            self.ask(data_fingerprint="a")  # hit: "a" becomes most recently used
+            self.ask(data_fingerprint="c")  # evicts "b"
+
+            self.assertTrue(self.ask(data_fingerprint="a")["cached"])
+            self.assertFalse(self.ask(data_fingerprint="b")["cached"])
+        self.assertEqual(self.client.calls, 4)
+
+    def test_busy_writer_does_not_block_or_fail(self):
+        self.ask(data_fingerprint="a")
+        self.pool.timeout = 0.1
+        writer = self.pool.acquire(readonly=False)  # e.g. an upload holding the writer lane
+        try:
+            self.assertTrue(self.ask(data_fingerprint="a")["cached"])  # lookup on the reader lane
+            self.assertFalse(self.ask(data_fingerprint="b")["cached"])  # store times out, answer still served
+        finally:
+            self.pool.release(writer)
+        self.assertFalse(self.ask(data_fingerprint="b")["cached"])
+        self.assertEqual(self.client.calls, 3)
+
+    def test_invalidate_and_disabled(self):
+        self.ask()
+        with self.pool.connection() as db:
+            self.assertEqual(self.cache.invalidate(db), 1)
+            db.commit()
+        self.assertFalse(self.ask()["cached"])
+
+        with mock.patch.object(settings, "LLM_CACHE_ENABLED", False):
+            response = self.ask()
+        self.assertNotIn("cached", response)
+        self.assertEqual(self.client.calls, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
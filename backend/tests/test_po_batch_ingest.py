@@ -0,0 +1,126 @@
+import unittest
+import asyncio
+import random
+import sqlite3
+import sys
+import os
+import tempfile
+from pathlib import Path
+
+# Add backend to path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.db import ConnectionPool
+from app.services.ingest_po import POIngestionService
+from app.services.po_batch_ingest import POBatchIngestService
+from tests.test_ingestion import SCHEMA_SQL
+from tests.test_po_scraper import make_po_html
+
+# Any write of PO 666 fails, to exercise per-PO fallback
+REJECT_TRIGGER = """
+CREATE TRIGGER reject_po_666 BEFORE INSERT ON purchase_orders
+WHEN NEW.po_number = 666
+BEGIN
+    SELECT RAISE(ABORT, 'PO 666 rejected');
+END;
+"""
+
+
+def po_header(po_number, supplier="Supplier"):
+    return {"PURCHASE ORDER": po_number, "SUPP NAME M/S": supplier}
+
+
+def po_items(*item_numbers):
+    return [{"PO ITM": n, "MATERIAL CODE": f"M{n}", "ORD QTY": "10", "LOT NO": "1", "DELY QTY": "10"} for n in item_numbers]
+
+
+class TestIngestMany(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA_SQL + REJECT_TRIGGER)
+        self.service = POIngestionService()
+
+    def tearDown(self):
+        self.conn.close()
+
+    def count(self, table):
+        return self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def test_bulk_write_with_update_and_duplicates(self):
+        self.service.ingest_po(self.conn, po_header(1), po_items(10, 20))
+
+        results = self.service.ingest_many(self.conn, [
+            (po_header(1, "Updated"), po_items(30)),
+            (po_header(2), po_items(10, 10, 20)),  # two schedule lines for item 10
+            (po_header(3, "First"), po_items(10)),
+            (po_header(3, "Second"), po_items(10, 20)),
+            ({"PURCHASE ORDER": None}, []),
+        ])
+
+        self.assertEqual([ok for ok, _, _ in results], [True, True, True, True, False])
+        self.assertIn("already exists", results[0][1][1])
+        self.assertIn("superseded", results[2][1][0])
+        self.assertEqual(results[0][2]["items"], {"added": [30], "updated": [], "removed": [10, 20], "kept": []})
+        self.assertEqual(results[1][2]["status"], "created")
+        self.assertIn("PO number is required", results[4][1][0])
+        self.assertTrue(self.conn.in_transaction)  # commit stays with the caller
+
+        self.assertEqual(self.count("purchase_orders"), 3)
+        self.assertEqual(self.count("purchase_order_items"), 1 + 2 + 2)
+        self.assertEqual(self.count("purchase_order_deliveries"), 1 + 3 + 2)
+        supplier = self.conn.execute("SELECT supplier_name FROM purchase_orders WHERE po_number = 3").fetchone()[0]
+        self.assertEqual(supplier, "Second")
+
+    def test_failed_po_isolated(self):
+        results = self.service.ingest_many(self.conn, [
+            (po_header(5), po_items(10)),
+            (po_header(666), po_items(10)),
+            (po_header(7), po_items(10)),
+        ])
+        self.assertEqual([ok for ok, _, _ in results], [True, False, True])
+        self.assertIn("PO 666 rejected", results[1][1][0])
+        self.assertEqual(self.count("purchase_orders"), 2)
+        self.assertEqual(self.count("purchase_order_items"), 2)
+
+
+class TestBatchPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        db_path = Path(self.tmp.name) / "test.db"
+        conn = sqlite3.connect(db_path)
+        conn.executescript(SCHEMA_SQL)
+        conn.close()
+        self.pool = ConnectionPool(db_path, readers=1, writers=1, timeout=5)
+        self.service = POBatchIngestService(pool=self.pool, workers=2, chunk_size=3)
+
+    def tearDown(self):
+        self.service.shutdown()
+        self.pool.close()
+        self.tmp.cleanup()
+
+    def run_batch(self, uploads):
+        async def collect():
+            return [item async for item in self.service.ingest(uploads)]
+        return dict(asyncio.run(collect()))
+
+    def test_parses_and_writes_all_files(self):
+        rng = random.Random(17)
+        uploads = [(f"po_{i}.html", make_po_html(rng).encode()) for i in range(8)]
+        uploads += [("notes.txt", b"not a PO"), ("empty.html", b"<html><body><p>nothing</p></body></html>")]
+
+        results = self.run_batch(uploads)
+
+        self.assertEqual(len(results), len(uploads))
+        self.assertTrue(all(results[i]["success"] for i in range(8)))
+        self.assertEqual(results[8]["message"], "Only HTML files are supported")
+        self.assertEqual(results[9]["message"], "Could not extract PO number from HTML")
+
+        with self.pool.connection(readonly=True) as db:
+            stored = {row[0] for row in db.execute("SELECT po_number FROM purchase_orders")}
+        self.assertEqual(stored, {results[i]["po_number"] for i in range(8)})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+# Add backend to path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.db import ConnectionPool
+from app.services.po_batch_ingest import POBatchIngestService
+from app.services.po_folder_watcher import POFolderWatcher
+from tests.test_ingestion import SCHEMA_SQL
+from tests.test_po_scraper import make_po_html
+
+
+class TestPOFolderWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        db_path = root / "test.db"
+        conn = sqlite3.connect(db_path)
+        conn.executescript(SCHEMA_SQL)
+        conn.close()
+        self.pool = ConnectionPool(db_path, readers=1, writers=1, timeout=5)
+        self.batch_service = POBatchIngestService(pool=self.pool, workers=1, chunk_size=2)
+        self.drop = root / "drop"
+        self.drop.mkdir()
+        self.watcher = POFolderWatcher(
+            watch_dir=str(self.drop), batch_service=self.batch_service, pool=self.pool,
+            poll_seconds=0.01, settle_seconds=0, batch_files=2
+        )
+
+    def tearDown(self):
+        self.batch_service.shutdown()
+        self.pool.close()
+        self.tmp.cleanup()
+
+    def test_scan_waits_for_stable_files(self):
+        path = self.drop / "po.html"
+        path.write_text("<html>")
+        (self.drop / "po.html.part").write_text("partial")
+        self.assertEqual(self.watcher.scan(), [])  # first sighting
+        with open(path, "a") as f:
+            f.write("</html>")
+        self.assertEqual(self.watcher.scan(), [])  # still growing
+        self.assertEqual(self.watcher.scan(), [(path, path.stat().st_size)])
+
+    def test_drains_folder_in_micro_batches(self):
+        rng = random.Random(20)
+        for i in range(4):
+            (self.drop / f"po_{i}.html").write_text(make_po_html(rng))
+        (self.drop / "broken.html").write_text("<html><body>no PO here</body></html>")
+
+        asyncio.run(self.watcher.run(once=True))
+
+        self.assertEqual(sorted(p.name for p in (self.drop / "done").iterdir()), [f"po_{i}.html" for i in range(4)])
+        self.assertEqual([p.name for p in (self.drop / "failed").iterdir()], ["broken.html"])
+        self.assertEqual([p.name for p in self.drop.glob("*.html")], [])
+        stats = self.watcher.stats()
+        self.assertEqual((stats["files_done"], stats["files_failed"], stats["batches"]), (4, 1, 3))
+        self.assertEqual(stats["backlog"], 0)
+        with self.pool.connection(readonly=True) as db:
+            self.assertEqual(db.execute("SELECT COUNT(*) FROM purchase_orders").fetchone()[0], 4)
+            self.assertEqual({row[0] for row in db.execute("SELECT source FROM po_ingest_ledger")}, {"watch"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import unittest
+import random
+import re
+import sys
+import os
+import time
+
+# Add backend to path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bs4 import BeautifulSoup
+
+from app.services.po_scraper import (
+    extract_po_header, extract_items, clean, has_value, to_int, to_float, normalize_date,
+    HEADER_FIELDS, RX_LABEL_ONLY, RX_DRG
+)
+
+
+def reference_extract_po_header(soup):
+    """The per-label table scan extract_po_header used before CellIndex (kept as the oracle)"""
+    tables = soup.find_all("table")
+    header = {}
+
+    def find_value(label_rx, prefer="below"):
+        for table in tables:
+            rows = table.find_all("tr")
+            for r_idx, row in enumerate(rows):
+                cells = row.find_all("td")
+                for c_idx, cell in enumerate(cells):
+                    cell_text = clean(cell.get_text())
+                    if not re.search(label_rx, cell_text, re.IGNORECASE):
+                        continue
+                    inline = re.search(rf"{label_rx}[:\.]?\s*(.+)", cell_text, re.IGNORECASE)
+                    if inline and has_value(inline.group(1)):
+                        return clean(inline.group(1))
+                    if prefer == "adjacent" and c_idx + 1 < len(cells):
+                        val = clean(cells[c_idx + 1].get_text())
+                        if has_value(val):
+                            return val
+                    if r_idx + 1 < len(rows):
+                        below_cells = rows[r_idx + 1].find_all("td")
+                        if c_idx < len(below_cells):
+                            val = clean(below_cells[c_idx].get_text())
+                            if has_value(val) and not RX_LABEL_ONLY.match(val):
+                                return val
+        return ""
+
+    for key, rx, prefer in HEADER_FIELDS:
+        header[key] = find_value(rx, prefer)
+    if header.get("ENQUIRY") and len(str(header["ENQUIRY"])) > 50:
+        header["ENQUIRY"] = ""
+
+    header["DRG"] = ""
+    for table in tables:
+        m = RX_DRG.search(table.get_text(" ", strip=True))
+        if m:
+            header["DRG"] = m.group(1)
+            break
+    for k in ["PURCHASE ORDER", "TIN NO", "RC NO", "DVN", "AMEND NO"]:
+        header[k] = to_int(header.get(k))
+    for k in ["PO-VALUE", "TOTAL VALUE", "NET PO VAL", "FOB VALUE", "EX RATE"]:
+        header[k] = to_float(header.get(k))
+    header["DRG"] = to_int(header.get("DRG"))
+    for k in ["PO DATE", "QUOT-DATE", "ENQ DATE"]:
+        header[k] = normalize_date(header.get(k))
+    return header
+
+
+def _row(cells):
+    return "<tr>" + "".join(f"<td>{c}</td>" for c in cells) + "</tr>"
+
+
+def make_po_html(rng: random.Random, filler_tables: int = 3) -> str:
+    """PO-like document: letterhead, label-over-value grids, nested tables, items, notes"""
+    po = rng.randint(1000000, 9999999)
+    day, month = rng.randint(1, 28), rng.randint(1, 12)
+    maybe = lambda value: value if rng.random() > 0.15 else "&nbsp;"
+
+    letterhead = "<table>" + _row([f"TIN NO : {rng.randint(10**9, 10**10)}", f"ECC NO:{maybe('AAB' + str(po))}"]) \
+        + _row([f"PHONE  {rng.randint(10**7, 10**8)}", "FAX", f"EMAIL purchase{po % 97}@example.com"]) \
+        + _row(["", "  0755-2501234 ", ""]) + _row([f"WEBSITE www.example{po % 7}.in"]) + "</table>"
+
+    labels = ["PURCHASE ORDER", "PO DATE", "ENQUIRY", "SUPP CODE", "ORD-TYPE", "DVN",
+              "QUOTATION", "QUOT-DATE", "PO STATUS", "AMEND NO"]
+    values = [str(po), f"{day:02d}/{month:02d}/20{rng.randint(20, 25)}",
+              maybe(f"ENQ/{rng.randint(1, 999)}"), f"S{rng.randint(100, 999)}", "LP",
+              str(rng.randint(1, 40)), maybe(f"Q-{rng.randint(1, 99)}"),
+              f"{day:02d}-{rng.choice(['JAN', 'MAR', 'OCT'])}-{rng.randint(20, 25)}",
+              rng.choice(["OPEN", "CLOSED", "NEW"]), str(rng.randint(0, 3))]
+    grid = "<table>" + _row(labels) + _row(values) + "</table>"
+
+    money = ["PO-VALUE", "RC NO", "EX RATE", "CURRENCY", "FOB VALUE", "NET PO VAL", "ENQ DATE"]
+    money_values = [f"{rng.uniform(1e3, 1e6):,.2f}", maybe(str(rng.randint(1, 500))), "1.00", "INR",
+                    f"{rng.uniform(1e3, 1e6):.2f}", f"{rng.uniform(1e3, 1e6):.2f}",
+                    f"{rng.randint(1, 28)}/{rng.randint(1, 12)}/24"]
+    nested = "<table>" + _row(money) + _row(money_values) \
+        + "<tr><td><table>" + _row(["REMARKS", "TOTAL VALUE"]) \
+        + _row([maybe("Supply as per DRG NO. 7654321 rev B"), f"{rng.uniform(1e3, 1e6):.2f}"]) \
+        + "</table></td><td>SUPP NAME M/S</td></tr>" + _row(["", f"SENSOVISION SYSTEMS {po % 3}"]) + "</table>"
+
+    people = "<table>" + _row(["INSPECTION BY", rng.choice(["SELF", "THIRD PARTY", ""])]) \
+        + _row(["NAME", maybe("R. Sharma")]) + _row(["DESIGNATION", "MANAGER (MM)"]) \
+        + _row(["PHONE NO", str(rng.randint(10**9, 10**10))]) + "</table>"
+
+    items = "<table>" + _row(["PO ITM", "MATERIAL CODE", "MTRL CAT", "UNIT", "PO RATE", "ORD QTY", "RCD QTY",
+                              "ITEM VALUE", "LOT NO", "DELY QTY", "DELY DATE", "ENTRY ALLOW DATE", "DEST CODE"])
+    for item in range(1, rng.randint(2, 6)):
+        items += _row([item * 10, f"M{rng.randint(10**6, 10**7)}", 1, "NOS", "125.50", 40, 0, "5020.00",
+                       1, 40, "01/02/2025", "15/02/2025", 101])
+    items += _row(["SENSOR ASSEMBLY, PRESSURE TRANSMITTER TYPE B WITH MOUNTING KIT"]) + "</table>"
+
+    filler = "".join(
+        "<table>" + "".join(_row([f"Note {i}.{j}: deliveries subject to inspection", "&nbsp;", str(j)])
+                            for j in range(rng.randint(5, 15))) + "</table>"
+        for i in range(filler_tables)
+    )
+    return f"<html><body>{letterhead}{grid}{nested}{people}{items}{filler}</body></html>"
+
+
+class TestPOHeaderIndex(unittest.TestCase):
+    def test_matches_reference_on_corpus(self):
+        rng = random.Random(16)
+        for _ in range(60):
+            soup = BeautifulSoup(make_po_html(rng), "lxml")
+            self.assertEqual(repr(extract_po_header(soup)), repr(reference_extract_po_header(soup)))
+
+    def test_extracted_fields(self):
+        html = make_po_html(random.Random(3))
+        header = extract_po_header(BeautifulSoup(html, "lxml"))
+        self.assertIsInstance(header["PURCHASE ORDER"], int)
+        self.assertEqual(header["ORD-TYPE"], "LP")
+        self.assertEqual(header["CURRENCY"], "")  # all-caps values read as labels (legacy rule)
+        self.assertEqual(header["FAX"], "0755-2501234")  # label-only cell: value below
+        self.assertEqual(header["DESIGNATION"], "MANAGER (MM)")
+        self.assertTrue(header["EMAIL"].startswith("purchase"))
+        self.assertEqual(list(header)[:3], ["TIN NO", "ECC NO", "MPCT NO"])
+        self.assertTrue(extract_items(BeautifulSoup(html, "lxml")))
+
+
+def benchmark(documents: int = 200):
+    """python tests/test_po_scraper.py --bench"""
+    rng = random.Random(0)
+    soups = [BeautifulSoup(make_po_html(rng, filler_tables=10), "lxml") for _ in range(documents)]
+    for name, fn in (("reference", reference_extract_po_header), ("indexed", extract_po_header)):
+        start = time.perf_counter()
+        for soup in soups:
+            fn(soup)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<10} {elapsed * 1000 / documents:8.2f} ms/PO")
+
+
+if __name__ == '__main__':
+    if "--bench" in sys.argv:
+        benchmark()
+    else:
+        unittest.main()
@@ -0,0 +1,184 @@
+import unittest
+import sqlite3
+import sys
+import os
+
+# Add backend to path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.po_service import POService
+
+SCHEMA_SQL = """
+CREATE TABLE purchase_orders (
+    po_number INTEGER PRIMARY KEY,
+    po_date DATE,
+    po_date_iso TEXT,
+    supplier_name TEXT,
+    po_value NUMERIC,
+    amend_no INTEGER DEFAULT 0,
+    po_status TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE purchase_order_items (
+    id TEXT PRIMARY KEY,
+    po_number INTEGER NOT NULL REFERENCES purchase_orders(po_number) ON DELETE CASCADE,
+    po_item_no INTEGER,
+    material_code TEXT,
+    material_description TEXT,
+    drg_no TEXT,
+    mtrl_cat INTEGER,
+    unit TEXT,
+    po_rate NUMERIC,
+    ord_qty NUMERIC,
+    rcd_qty NUMERIC DEFAULT 0,
+    item_value NUMERIC,
+    hsn_code TEXT,
+    UNIQUE(po_number, po_item_no)
+);
+
+CREATE TABLE purchase_order_deliveries (
+    id TEXT PRIMARY KEY,
+    po_item_id TEXT NOT NULL REFERENCES purchase_order_items(id) ON DELETE CASCADE,
+    lot_no INTEGER,
+    dely_qty NUMERIC,
+    dely_date DATE,
+    entry_allow_date DATE,
+    dest_code INTEGER
+);
+
+CREATE TABLE delivery_challans (
+    dc_number TEXT PRIMARY KEY,
+    dc_date DATE NOT NULL,
+    po_number INTEGER NOT NULL REFERENCES purchase_orders(po_number) ON DELETE CASCADE
+);
+
+CREATE TABLE delivery_challan_items (
+    id TEXT PRIMARY KEY,
+    dc_number TEXT NOT NULL REFERENCES delivery_challans(dc_number) ON DELETE CASCADE,
+    po_item_id TEXT NOT NULL REFERENCES purchase_order_items(id) ON DELETE CASCADE,
+    dispatch_qty NUMERIC NOT NULL,
+    lot_no INTEGER
+);
+
+CREATE TABLE gst_invoices (
+    invoice_number TEXT PRIMARY KEY,
+    linked_dc_numbers TEXT
+);
+
+CREATE TABLE gst_invoice_dc_links (
+    invoice_number TEXT NOT NULL,
+    dc_number TEXT NOT NULL
+);
+
+CREATE TABLE gst_invoice_items (
+    id TEXT PRIMARY KEY,
+    invoice_number TEXT NOT NULL,
+    po_sl_no TEXT,
+    description TEXT,
+    quantity NUMERIC
+);
+
+CREATE TABLE schema_version (
+    version INTEGER PRIMARY KEY,
+    description TEXT
+);
+"""
+
+ROLLUP_MIGRATION = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), '..', '..', 'migrations', '006_po_item_rollup.sql'))
+
+SEED_SQL = """
+INSERT INTO purchase_orders (po_number, po_date, po_date_iso, supplier_name, po_value, po_status, created_at) VALUES
+    (1001, '05/01/2024', '2024-01-05', 'Acme Castings', 1000, 'Active', '2024-01-05 10:00:00'),
+    (1002, '10/02/2024', '2024-02-10', 'Bharat Forge', 2000, NULL, '2024-02-10 10:00:00'),
+    (1003, '15/03/2024', '2024-03-15', 'Acme Castings', 3000, 'Active', '2024-03-15 10:00:00');
+
+INSERT INTO purchase_order_items (id, po_number, po_item_no, ord_qty) VALUES
+    ('i1', 1001, 10, 100), ('i2', 1001, 20, 50), ('i3', 1002, 10, 30);
+
+INSERT INTO purchase_order_deliveries (id, po_item_id, lot_no, dely_qty, dely_date) VALUES
+    ('d1', 'i1', 1, 60, '2024-02-01'), ('d2', 'i1', 2, 40, '2024-03-01'), ('d3', 'i2', 1, 50, '2024-02-01');
+
+INSERT INTO delivery_challans (dc_number, dc_date, po_number) VALUES
+    ('DC-1', '2024-01-20', 1001), ('DC-2', '2024-01-25', 1001);
+
+INSERT INTO delivery_challan_items (id, dc_number, po_item_id, dispatch_qty, lot_no) VALUES
+    ('x1', 'DC-1', 'i1', 60, 1), ('x2', 'DC-2', 'i1', 10, 2), ('x3', 'DC-2', 'i2', 20, 1);
+"""
+
+
+class TestPOService(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA_SQL)
+        with open(ROLLUP_MIGRATION) as f:
+            self.conn.executescript(f.read())
+        self.conn.executescript(SEED_SQL)
+        self.service = POService()
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_list_pos_aggregates(self):
+        items = self.service.list_pos(self.conn)
+        self.assertEqual([i.po_number for i in items], [1003, 1002, 1001])
+
+        po = items[2]
+        self.assertEqual(po.total_ordered_quantity, 150)
+        self.assertEqual(po.total_dispatched_quantity, 90)
+        self.assertEqual(po.total_pending_quantity, 60)
+        self.assertEqual(po.linked_dc_numbers, "DC-1, DC-2")
+
+        empty = items[0]
+        self.assertEqual(empty.total_ordered_quantity, 0.0)
+        self.assertIsNone(empty.linked_dc_numbers)
+        self.assertEqual(items[1].po_status, "New")
+
+    def test_list_pos_keyset_pagination(self):
+        first = self.service.list_pos(self.conn, limit=2)
+        self.assertEqual([i.po_number for i in first], [1003, 1002])
+
+        cursor = self.service.encode_cursor(first[-1])
+        second = self.service.list_pos(self.conn, limit=2, cursor=cursor)
+        self.assertEqual([i.po_number for i in second], [1001])
+
+    def test_list_pos_filters(self):
+        by_supplier = self.service.list_pos(self.conn, supplier="acme")
+        self.assertEqual([i.po_number for i in by_supplier], [1003, 1001])
+
+        by_status = self.service.list_pos(self.conn, status="New")
+        self.assertEqual([i.po_number for i in by_status], [1002])
+
+        by_date = self.service.list_pos(self.conn, date_from="2024-02-01", date_to="2024-02-29")
+        self.assertEqual([i.po_number for i in by_date], [1002])
+
+    def test_get_po_detail_batched(self):
+        statements = []
+        self.conn.set_trace_callback(statements.append)
+        detail = self.service.get_po_detail(self.conn, 1001)
+        self.conn.set_trace_callback(None)
+        self.assertEqual(len(statements), 3)  # header, items (with rollup), deliveries
+
+        first, second = detail.items
+        self.assertEqual(first.delivered_quantity, 70)
+        self.assertEqual(first.pending_quantity, 30)
+        self.assertEqual([d.lot_no for d in first.deliveries], [1, 2])
+        self.assertIsNone(first.deliveries[0].dispatched_quantity)
+        self.assertEqual(second.pending_quantity, 30)
+
+    def test_get_po_detail_lot_breakdown(self):
+        statements = []
+        self.conn.set_trace_callback(statements.append)
+        detail = self.service.get_po_detail(self.conn, 1001, include_lots=True)
+        self.conn.set_trace_callback(None)
+        self.assertEqual(len(statements), 4)  # + lot-level dispatched
+        lot1, lot2 = detail.items[0].deliveries
+        self.assertEqual((lot1.dispatched_quantity, lot1.pending_quantity), (60, 0))
+        self.assertEqual((lot2.dispatched_quantity, lot2.pending_quantity), (10, 30))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,209 @@
+import unittest
+import asyncio
+import json
+import sys
+import os
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest import mock
+
+# Add backend to path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.config import settings
+from app.core.exceptions import AIserviceError
+from app.services.llm_client import LLMClient
+
+
+class StubProvider:
+    """Local OpenAI-compatible /chat/completions server with configurable delay and status"""
+
+    def __init__(self, name):
+        self.name = name
+        self.delay = 0.0
+        self.status = 200
+        self.hits = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                stub.hits += 1
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                time.sleep(stub.delay)
+                if stub.status != 200:
+                    payload, content_type = b'{"error": "boom"}', "application/json"
+                elif body.get("stream"):
+                    payload = "".join(
+                        f"data: {json.dumps({'choices': [{'delta': {'content': part}}]})}\n\n"
+                        for part in (stub.name, "!")
+                    ).encode() + b"data: [DONE]\n\n"
+                    content_type = "text/event-stream"
+                else:
+                    payload = json.dumps({
+                        "choices": [{"message": {"content": stub.name}, "finish_reason": "stop"}]
+                    }).encode()
+                    content_type = "application/json"
+                self.send_response(stub.status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+class TestProviderRouter(unittest.TestCase):
+    def setUp(self):
+        self.groq = StubProvider("groq")
+        self.openrouter = StubProvider("openrouter")
+        self.llm = LLMClient()
+        self.llm.groq_api_key = self.llm.openrouter_api_key = "test-key"
+        self.llm.google_api_key = None
+        self.llm.groq_base_url = self.groq.url
+        self.llm.openrouter_base_url = self.openrouter.url
+        self.settings = mock.patch.multiple(
+            settings, LLM_PROVIDER="groq", LLM_HEDGE_ENABLED=False, LLM_HEDGE_AFTER_MS=100
+        )
+        self.settings.start()
+
+    def tearDown(self):
+        self.settings.stop()
+        asyncio.run(self.llm.aclose())
+        self.groq.close()
+        self.openrouter.close()
+
+    def chat(self):
+        async def run():
+            try:
+                return await self.llm.chat(MESSAGES)
+            finally:
+                await self.llm.aclose()
+        return asyncio.run(run())
+
+    def test_preferred_provider_and_latency_stats(self):
+        self.assertEqual(self.chat()["provider"], "groq")
+        self.assertEqual(self.openrouter.hits, 0)
+
+        metrics = self.llm.router_metrics()
+        self.assertEqual(metrics["decisions"], {"primary": 1})
+        self.assertEqual(metrics["providers"]["groq"]["calls"], 1)
+        self.assertIsNotNone(metrics["providers"]["groq"]["p95_ms"])
+        self.assertFalse(metrics["providers"]["google"]["configured"])
+
+    def test_failover_and_circuit_breaker(self):
+        self.groq.status = 500
+        for _ in range(settings.LLM_BREAKER_FAILURES):
+            self.assertEqual(self.chat()["provider"], "openrouter")
+
+        metrics = self.llm.router_metrics()
+        self.assertEqual(metrics["providers"]["groq"]["breaker"], "open")
+        self.assertEqual(metrics["providers"]["groq"]["error_rate"], 1.0)
+
+        # Open breaker: groq is not tried at all
+        hits = self.groq.hits
+        self.assertEqual(self.chat()["provider"], "openrouter")
+        self.assertEqual(self.groq.hits, hits)
+        self.assertEqual(self.llm.router_metrics()["decisions"]["skipped_open_breaker"], 1)
+
+        # After the cooldown one trial call closes the breaker again
+        self.groq.status = 200
+        self.llm.router.breakers["groq"].opened_at -= settings.LLM_BREAKER_COOLDOWN_SECONDS
+        self.assertEqual(self.chat()["provider"], "groq")
+        self.assertEqual(self.llm.router.breakers["groq"].state, "closed")
+
+    def trip(self, provider):
+        breaker = self.llm.router.breakers[provider]
+        for _ in range(settings.LLM_BREAKER_FAILURES):
+            breaker.record_failure()
+        return breaker
+
+    def test_half_open_admits_a_single_trial(self):
+        self.trip("groq").opened_at -= settings.LLM_BREAKER_COOLDOWN_SECONDS
+        self.groq.delay = 0.3
+
+        async def run():
+            try:
+                return await asyncio.gather(*(self.llm.chat(MESSAGES) for _ in range(3)))
+            finally:
+                await self.llm.aclose()
+
+        providers = sorted(result["provider"] for result in asyncio.run(run()))
+        self.assertEqual(providers, ["groq", "openrouter", "openrouter"])
+        self.assertEqual(self.groq.hits, 1)
+        self.assertEqual(self.llm.router.breakers["groq"].state, "closed")
+
+    def test_all_breakers_open_fails_fast(self):
+        self.trip("groq")
+        self.trip("openrouter")
+        with self.assertRaises(AIserviceError):
+            self.chat()
+        self.assertEqual(self.groq.hits + self.openrouter.hits, 0)
+        self.assertEqual(self.llm.router_metrics()["decisions"]["all_failed"], 1)
+
+    def test_hedged_request_takes_first_good_answer(self):
+        self.groq.delay = 1.0
+        with mock.patch.object(settings, "LLM_HEDGE_ENABLED", True):
+            start = time.monotonic()
+            result = self.chat()
+        self.assertEqual(result["provider"], "openrouter")
+        self.assertLess(time.monotonic() - start, 0.9)
+
+        decisions = self.llm.router_metrics()["decisions"]
+        self.assertEqual((decisions["hedge"], decisions["hedge_won"]), (1, 1))
+
+    def test_all_providers_failing(self):
+        self.groq.status = self.openrouter.status = 503
+        with self.assertRaises(AIserviceError):
+            self.chat()
+        self.assertEqual(self.llm.router_metrics()["decisions"]["all_failed"], 1)
+
+    def test_stream_fails_over_before_first_chunk(self):
+        self.groq.status = 500
+
+        async def run():
+            try:
+                return [chunk async for chunk in self.llm.stream(MESSAGES)]
+            finally:
+                await self.llm.aclose()
+
+        self.assertEqual(asyncio.run(run()), ["openrouter", "!"])
+        self.assertEqual(self.llm.router_metrics()["decisions"]["failover"], 1)
+
+    def test_mid_stream_failure_is_one_sample(self):
+        async def broken_stream(provider, messages, **kwargs):
+            yield "partial"
+            raise RuntimeError("connection reset")
+
+        self.llm.router._stream = broken_stream
+        received = []
+
+        async def run():
+            with self.assertRaises(RuntimeError):
+                async for chunk in self.llm.router.stream(MESSAGES):
+                    received.append(chunk)
+
+        asyncio.run(run())
+        self.assertEqual(received, ["partial"])
+        groq = self.llm.router_metrics()["providers"]["groq"]
+        self.assertEqual((groq["calls"], groq["failures"]), (1, 0))
+        self.assertEqual(self.llm.router.breakers["groq"].consecutive_failures, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import logging
+import sqlite3
+import sys
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+# Add backend to path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.query_stats import fingerprint, slow_query_log
+from app.db import ConnectionPool
+from app.middleware.metrics import RequestMetrics, RequestMetricsMiddleware
+
+
+class TestFingerprint(unittest.TestCase):
+    def test_literals_and_in_lists_collapse(self):
+        a = fingerprint("SELECT * FROM po  WHERE po_number IN (?, ?, ?) AND status = 'OPEN' -- list\n LIMIT 10")
+        b = fingerprint("SELECT * FROM po WHERE po_number IN (?,?) AND status = 'CLOSED' LIMIT 5")
+        self.assertEqual(a, b)
+        self.assertEqual(a, "SELECT * FROM po WHERE po_number IN (?...) AND status = ? LIMIT ?")
+        self.assertEqual(fingerprint("SELECT col1 FROM t2"), "SELECT col1 FROM t2")
+
+
+class TestRequestQueryAccounting(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.tmp = tempfile.TemporaryDirectory()
+        db_path = Path(self.tmp.name) / "test.db"
+        conn = sqlite3.connect(db_path)
+        conn.executescript("CREATE TABLE po (po_number INTEGER PRIMARY KEY, supplier TEXT); INSERT INTO po VALUES (1, 'A'), (2, 'B');")
+        conn.close()
+        self.pool = ConnectionPool(db_path, readers=2, writers=1, timeout=5)
+        # Open the reader up front: its PRAGMAs would otherwise count towards the first request
+        self.pool.release(self.pool.acquire(readonly=True))
+        slow_query_log.clear()
+
+        app = FastAPI()
+        app.add_middleware(RequestMetricsMiddleware, metrics=RequestMetrics())
+
+        @app.get("/pos")
+        def list_pos():
+            with self.pool.connection(readonly=True) as db:
+                numbers = [row[0] for row in db.execute("SELECT po_number FROM po")]
+                # N+1 on purpose
+                return [db.execute("SELECT supplier FROM po WHERE po_number = ?", (n,)).fetchone()[0] for n in numbers]
+
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        self.pool.close()
+        self.tmp.cleanup()
+        slow_query_log.clear()
+        logging.disable(logging.NOTSET)
+
+    def test_headers_count_request_queries(self):
+        response = self.client.get("/pos")
+        self.assertEqual(response.json(), ["A", "B"])
+        self.assertEqual(response.headers["x-db-queries"], "3")
+        self.assertTrue(response.headers["x-db-time"].endswith("ms"))
+        self.assertEqual(self.client.get("/pos").headers["x-db-queries"], "3")  # per request, not cumulative
+
+    def test_slow_query_log_tagged_with_request(self):
+        with mock.patch.object(settings, "DB_SLOW_QUERY_MS", 0):
+            response = self.client.get("/pos")
+
+        snapshot = slow_query_log.snapshot()
+        self.assertEqual(len(snapshot["recent"]), 3)
+        self.assertEqual({e["request_id"] for e in snapshot["recent"]}, {response.headers["x-request-id"]})
+        by_id = {f["fingerprint"]: f for f in snapshot["fingerprints"]}
+        lookup = by_id["SELECT supplier FROM po WHERE po_number = ?"]
+        self.assertEqual(lookup["count"], 2)
+        self.assertTrue(any("USING INTEGER PRIMARY KEY" in step for step in lookup["plan"]))
+        self.assertTrue(any("SCAN" in step for step in by_id["SELECT po_number FROM po"]["plan"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
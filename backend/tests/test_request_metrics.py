@@ -0,0 +1,80 @@
+import unittest
+import sys
+import os
+import logging
+
+# Add backend to path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.middleware.metrics import RequestMetrics, RequestMetricsMiddleware
+
+
+def make_app(metrics: RequestMetrics) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestMetricsMiddleware, metrics=metrics)
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: int):
+        return {"id": item_id}
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([f"chunk {i}\n" for i in range(3)]), media_type="text/plain")
+
+    @app.get("/boom")
+    def boom():
+        raise RuntimeError("boom")
+
+    router = APIRouter()
+
+    @router.get("/{po_number}/dc")
+    def po_dc(po_number: int):
+        return {"po_number": po_number}
+
+    app.include_router(router, prefix="/api/po")
+    return app
+
+
+class TestRequestMetrics(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.metrics = RequestMetrics()
+        self.client = TestClient(make_app(self.metrics), raise_server_exceptions=False)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_route_template_labels_and_histograms(self):
+        for item_id in (1, 2, 3):
+            response = self.client.get(f"/items/{item_id}")
+        self.client.get("/items/x")  # 422 on the same route
+        self.client.get("/nowhere")
+        self.client.get("/api/po/42/dc")
+
+        self.assertIn("x-request-id", response.headers)
+        self.assertTrue(response.headers["x-response-time"].endswith("ms"))
+        text = "\n".join(self.metrics.render())
+        self.assertIn('http_requests_total{method="GET",route="/items/{item_id}",status="200"} 3', text)
+        self.assertIn('http_requests_total{method="GET",route="/items/{item_id}",status="422"} 1', text)
+        self.assertIn('http_requests_total{method="GET",route="<unmatched>",status="404"} 1', text)
+        self.assertIn('http_request_duration_seconds_count{method="GET",route="/items/{item_id}"} 4', text)
+        self.assertIn('http_request_duration_seconds_bucket{method="GET",route="/items/{item_id}",le="+Inf"} 4', text)
+        self.assertIn('http_requests_total{method="GET",route="/api/po/{po_number}/dc",status="200"} 1', text)
+        self.assertIn('http_requests_in_flight{method="GET"} 0', text)
+
+    def test_streaming_passthrough_and_errors(self):
+        response = self.client.get("/stream")
+        self.assertEqual(response.text, "chunk 0\nchunk 1\nchunk 2\n")
+        self.assertEqual(self.client.get("/boom").status_code, 500)
+
+        stats = self.metrics.routes[("GET", "/stream")]
+        self.assertEqual(stats.size.total, len(response.content))
+        self.assertEqual(self.metrics.routes[("GET", "/boom")].statuses, {500: 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import sqlite3
+import sys
+import os
+
+# Add backend to path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.rollup_service import RollupService
+from tests.test_po_service import SCHEMA_SQL, SEED_SQL, ROLLUP_MIGRATION
+
+
+class TestPOItemRollup(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA_SQL)
+        with open(ROLLUP_MIGRATION) as f:
+            self.conn.executescript(f.read())
+        self.conn.executescript(SEED_SQL)
+        self.service = RollupService()
+
+    def tearDown(self):
+        self.conn.close()
+
+    def rollup(self, po_item_id):
+        return self.conn.execute(
+            "SELECT ordered_qty, dispatched_qty, invoiced_qty, pending_qty FROM po_item_rollup WHERE po_item_id = ?",
+            (po_item_id,)
+        ).fetchone()
+
+    def test_triggers_track_dc_items(self):
+        self.assertEqual(tuple(self.rollup('i1')), (100, 70, 0, 30))
+
+        self.conn.execute("UPDATE delivery_challan_items SET dispatch_qty = 40 WHERE id = 'x1'")
+        self.assertEqual(self.rollup('i1')['dispatched_qty'], 50)
+
+        self.conn.execute("UPDATE delivery_challan_items SET po_item_id = 'i2' WHERE id = 'x2'")
+        self.assertEqual(self.rollup('i1')['dispatched_qty'], 40)
+        self.assertEqual(self.rollup('i2')['dispatched_qty'], 30)
+
+        self.conn.execute("DELETE FROM delivery_challans WHERE dc_number = 'DC-2'")  # cascades to x2, x3
+        self.assertEqual(self.rollup('i2')['dispatched_qty'], 0)
+        self.assertEqual(self.rollup('i2')['pending_qty'], 50)
+
+        self.conn.execute("UPDATE purchase_order_items SET ord_qty = 30 WHERE id = 'i1'")
+        self.assertEqual(self.rollup('i1')['pending_qty'], 0)  # over-dispatch clamps to 0
+
+        self.conn.execute("DELETE FROM purchase_orders WHERE po_number = 1001")
+        self.assertIsNone(self.rollup('i1'))
+        self.assertTrue(self.service.check(self.conn)["consistent"])
+
+    def test_triggers_track_invoice_items(self):
+        self.conn.executescript("""
+            INSERT INTO gst_invoice_items (id, invoice_number, quantity, po_item_id) VALUES
+                ('g1', 'INV-1', 25, 'i1'), ('g2', 'INV-1', 5, 'i1'), ('g3', 'INV-1', 7, NULL);
+        """)
+        self.assertEqual(self.rollup('i1')['invoiced_qty'], 30)
+
+        self.conn.execute("UPDATE gst_invoice_items SET po_item_id = 'i1' WHERE id = 'g3'")
+        self.assertEqual(self.rollup('i1')['invoiced_qty'], 37)
+
+        self.conn.execute("DELETE FROM gst_invoice_items WHERE id = 'g1'")
+        self.assertEqual(self.rollup('i1')['invoiced_qty'], 12)
+        self.assertTrue(self.service.check(self.conn)["consistent"])
+
+    def test_check_and_rebuild(self):
+        self.conn.execute("UPDATE po_item_rollup SET dispatched_qty = 999 WHERE po_item_id = 'i1'")
+        self.conn.execute("DELETE FROM po_item_rollup WHERE po_item_id = 'i3'")
+
+        result = self.service.check(self.conn)
+        self.assertFalse(result["consistent"])
+        self.assertEqual(result["items_checked"], 3)
+        problems = {m["po_item_id"]: m["problem"] for m in result["mismatches"]}
+        self.assertEqual(problems, {"i1": "quantity_mismatch", "i3": "missing_rollup_row"})
+
+        self.assertEqual(self.service.rebuild(self.conn), 3)
+        self.assertTrue(self.service.check(self.conn)["consistent"])
+        self.assertEqual(self.rollup('i1')['dispatched_qty'], 70)
+
+
+if __name__ == '__main__':
+    unittest.main()
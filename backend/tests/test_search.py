@@ -0,0 +1,143 @@
+import unittest
+import sqlite3
+import sys
+import os
+
+# Add backend to path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.search_service import SearchService
+
+SCHEMA_SQL = """
+CREATE TABLE purchase_orders (
+    po_number INTEGER PRIMARY KEY,
+    po_date DATE,
+    supplier_name TEXT,
+    supplier_code TEXT,
+    po_value NUMERIC
+);
+
+CREATE TABLE purchase_order_items (
+    id TEXT PRIMARY KEY,
+    po_number INTEGER NOT NULL REFERENCES purchase_orders(po_number) ON DELETE CASCADE,
+    material_code TEXT,
+    material_description TEXT
+);
+
+CREATE TABLE delivery_challans (
+    dc_number TEXT PRIMARY KEY,
+    dc_date DATE NOT NULL,
+    po_number INTEGER NOT NULL REFERENCES purchase_orders(po_number) ON DELETE CASCADE,
+    consignee_name TEXT
+);
+
+CREATE TABLE gst_invoices (
+    invoice_number TEXT PRIMARY KEY,
+    invoice_date DATE NOT NULL,
+    linked_dc_numbers TEXT,
+    po_numbers TEXT,
+    customer_gstin TEXT,
+    total_invoice_value NUMERIC,
+    buyer_name TEXT
+);
+
+CREATE TABLE schema_version (
+    version INTEGER PRIMARY KEY,
+    description TEXT
+);
+"""
+
+SEED_SQL = """
+INSERT INTO purchase_orders (po_number, po_date, supplier_name, supplier_code, po_value) VALUES
+    (4501234, '05/01/2024', 'Acme Castings', 'SUP-77', 1000),
+    (4509999, '10/02/2024', 'Bharat Forge', 'SUP-12', 2000);
+
+INSERT INTO purchase_order_items (id, po_number, material_code, material_description) VALUES
+    ('i1', 4501234, 'MAT-100', 'GASKET RUBBER 50MM'),
+    ('i2', 4509999, 'MAT-200', 'STEEL FLANGE');
+
+INSERT INTO delivery_challans (dc_number, dc_date, po_number, consignee_name) VALUES
+    ('DC/24/001', '2024-01-20', 4501234, 'BHEL Bhopal');
+
+INSERT INTO gst_invoices (invoice_number, invoice_date, linked_dc_numbers, po_numbers, customer_gstin, total_invoice_value, buyer_name) VALUES
+    ('INV/24/001', '2024-01-22', 'DC/24/001', '4501234', '23AAACB4146P1ZN', 1180, 'BHEL');
+"""
+
+MIGRATIONS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'migrations'))
+
+
+class TestSearchService(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA_SQL)
+        # Half the data exists before the migration (backfill), half arrives through triggers
+        self.conn.execute("INSERT INTO purchase_orders (po_number, supplier_name) VALUES (4400001, 'Old Supplier')")
+        for name in ("007_search_index.sql", "016_search_po_details.sql"):
+            with open(os.path.join(MIGRATIONS_DIR, name)) as f:
+                self.conn.executescript(f.read())
+        self.conn.executescript(SEED_SQL)
+        self.service = SearchService()
+        # As the PO ingestion service does after writing items
+        self.service.refresh_po_details(self.conn, [4501234, 4509999])
+
+    def tearDown(self):
+        self.conn.close()
+
+    def numbers(self, q, **kwargs):
+        return [r["number"] for r in self.service.search(self.conn, q, **kwargs)]
+
+    def test_cross_entity_substring_search(self):
+        self.assertEqual(self.numbers("old supp"), ["4400001"])
+        self.assertEqual(self.numbers("gasket"), ["4501234"])
+        self.assertEqual(self.numbers("sup-12"), ["4509999"])
+
+        # The PO itself ranks above documents that only reference its number
+        results = self.service.search(self.conn, "4501234")
+        self.assertEqual([(r["type"], r["number"]) for r in results][0], ("PO", "4501234"))
+        self.assertEqual({r["type"] for r in results}, {"PO", "DC", "INVOICE"})
+        self.assertIn("<mark>", results[0]["snippet"])
+        self.assertEqual(results[0]["type_label"], "Purchase Order")
+
+        self.assertEqual(self.numbers("4501234", type_filter="dc"), ["DC/24/001"])
+
+    def test_short_queries_and_query_syntax(self):
+        self.assertEqual(self.numbers("DC"), ["DC/24/001"])
+        self.assertEqual(self.numbers("45"), ["4501234", "4509999"])
+        self.assertEqual(self.numbers("%"), [])
+        self.assertEqual(self.numbers('flange OR "x'), [])
+        self.assertEqual(self.numbers("acme 50"), ["4501234"])
+
+    def test_number_match_ranks_first_among_many_matches(self):
+        # Many newer documents mention the term; the older PO whose number it is still comes first
+        self.conn.executemany(
+            "INSERT INTO delivery_challans (dc_number, dc_date, po_number, consignee_name) VALUES (?, '2024-03-01', 4509999, 'Depot 4400001')",
+            [(f"DC/25/{n:04d}",) for n in range(1500)]
+        )
+        results = self.service.search(self.conn, "4400001", limit=5)
+        self.assertEqual(len(results), 5)
+        self.assertEqual((results[0]["type"], results[0]["number"]), ("PO", "4400001"))
+        self.assertIn("<mark>", results[-1]["snippet"])
+
+    def test_triggers_keep_index_in_sync(self):
+        self.conn.execute("UPDATE purchase_order_items SET material_description = 'BRASS VALVE' WHERE id = 'i2'")
+        self.assertEqual(self.numbers("flange"), ["4509999"])  # item text is refreshed per PO, not per row
+        self.service.refresh_po_details(self.conn, [4509999])
+        self.assertEqual(self.numbers("valve"), ["4509999"])
+        self.assertEqual(self.numbers("flange"), [])
+
+        self.conn.execute("UPDATE purchase_orders SET supplier_name = 'Kirloskar' WHERE po_number = 4509999")
+        self.assertEqual(self.numbers("kirlos"), ["4509999"])
+        self.assertEqual(self.numbers("bharat"), [])
+
+        self.conn.execute("DELETE FROM purchase_orders WHERE po_number = 4501234")  # cascades to DC
+        self.assertEqual(self.numbers("gasket"), [])
+        self.assertEqual(self.numbers("bhopal"), [])
+        self.assertEqual(self.numbers("INV/24"), ["INV/24/001"])
+
+        self.conn.execute("INSERT INTO search_index (search_index) VALUES ('integrity-check')")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import unittest
+import asyncio
+import sys
+import os
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add backend to path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.context_manager import ContextManager, ConversationContext, Message
+from app.services.session_store import MemorySessionStore, SQLiteSessionStore
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def age(context: ConversationContext, seconds: int) -> ConversationContext:
+    context.updated_at = (datetime.utcnow() - timedelta(seconds=seconds)).isoformat()
+    return context
+
+
+class TestMemorySessionStore(unittest.TestCase):
+    def setUp(self):
+        self.store = MemorySessionStore(max_sessions=2, ttl_seconds=60)
+        self.manager = ContextManager(max_history=2, store=self.store)
+
+    def test_lru_cap(self):
+        run(self.manager.add_message("a", "user", "hi"))
+        run(self.manager.add_message("b", "user", "hi"))
+        run(self.manager.get_context("a"))  # "a" becomes most recent
+        run(self.manager.add_message("c", "user", "hi"))
+
+        self.assertIsNotNone(self.store.get("a"))
+        self.assertIsNone(self.store.get("b"))
+        stats = self.manager.stats()
+        self.assertEqual((stats["sessions"], stats["evictions"]), (2, 1))
+        self.assertGreater(stats["approx_bytes"], 0)
+
+    def test_ttl_on_access_and_sweep(self):
+        run(self.manager.add_message("a", "user", "old"))
+        run(self.manager.add_message("b", "user", "old"))
+        age(self.store.get("a"), 120)
+        age(self.store.get("b"), 120)
+
+        self.assertEqual(run(self.manager.get_messages_for_llm("a")), [])  # expired -> new session
+        self.assertEqual(run(self.manager.cleanup_expired()), 1)           # "b" swept
+        self.assertEqual(self.manager.stats()["expirations"], 2)
+
+    def test_history_pruned_and_slots(self):
+        for i in range(6):
+            run(self.manager.add_message("a", "user", f"m{i}"))
+        messages = run(self.manager.get_messages_for_llm("a"))
+        self.assertEqual([m["content"] for m in messages], ["m2", "m3", "m4", "m5"])
+        self.assertFalse(hasattr(self.store.get("a").history[0], "__dict__"))
+        self.assertTrue(hasattr(Message, "__slots__"))
+
+    def test_sweeper_task(self):
+        async def scenario():
+            await self.manager.add_message("a", "user", "hi")
+            age(self.store.get("a"), 120)
+            self.manager.start_sweeper(interval_seconds=0.01)
+            await asyncio.sleep(0.05)
+            running = self.manager.stats()["sweeper_running"]
+            await self.manager.stop_sweeper()
+            return running
+
+        self.assertTrue(run(scenario()))
+        self.assertEqual(self.store.expirations, 1)
+
+
+class TestSQLiteSessionStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "sessions.db"
+        self.stores = []
+
+    def tearDown(self):
+        for store in self.stores:
+            store.close()
+        self.tmp.cleanup()
+
+    def open_store(self, max_sessions=10, ttl_seconds=60, busy_timeout_ms=5000):
+        store = SQLiteSessionStore(
+            self.db_path, ConversationContext.from_dict, max_sessions, ttl_seconds, busy_timeout_ms
+        )
+        self.stores.append(store)
+        return store
+
+    def test_shared_between_workers(self):
+        worker_a = ContextManager(store=self.open_store())
+        worker_b = ContextManager(store=self.open_store())
+
+        run(worker_a.add_message("s1", "user", "show PO 123"))
+        run(worker_a.update_entities("s1", {"po_number": "123"}))
+        run(worker_b.add_message("s1", "assistant", "Opening PO 123"))
+
+        context = run(worker_a.get_context("s1"))
+        self.assertEqual([m.content for m in context.history], ["show PO 123", "Opening PO 123"])
+        self.assertEqual(context.entities, {"po_number": "123"})
+        self.assertIsInstance(context.history[0], Message)
+
+        run(worker_b.clear_context("s1"))
+        self.assertEqual(run(worker_a.get_context_summary("s1"))["message_count"], 0)
+
+    def test_expiry_and_cap_sweep(self):
+        store = self.open_store(max_sessions=2, ttl_seconds=60)
+        for session_id in ("a", "b", "c", "d"):
+            store.put(session_id, ConversationContext(session_id=session_id, history=[], entities={}))
+        store.put("old", age(ConversationContext(session_id="old", history=[], entities={}), 120))
+
+        self.assertIsNone(store.get("old"))
+        self.assertEqual(store.sweep(), 2)  # two least recently updated beyond the cap
+        stats = store.stats()
+        self.assertEqual((stats["sessions"], stats["evictions"], stats["expirations"]), (2, 2, 1))
+        self.assertGreater(stats["file_bytes"], 0)
+
+    def test_locked_file_does_not_block_event_loop(self):
+        manager = ContextManager(store=self.open_store(busy_timeout_ms=2000))
+        other_worker = sqlite3.connect(str(self.db_path), isolation_level=None)
+        other_worker.execute("BEGIN IMMEDIATE")  # holds the write lock
+
+        async def scenario():
+            ticks = 0
+
+            async def release_later():
+                nonlocal ticks
+                for _ in range(20):
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+                other_worker.execute("COMMIT")
+
+            # The put waits on busy_timeout; the loop must keep running to release the lock
+            await asyncio.gather(manager.add_message("s1", "user", "hi"), release_later())
+            await manager.cleanup_expired()
+            return ticks
+
+        try:
+            self.assertEqual(run(scenario()), 20)
+        finally:
+            other_worker.close()
+        self.assertEqual(len(run(manager.get_context("s1")).history), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import sqlite3
+import sys
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+# Add backend to path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.db import ConnectionPool
+from app.routers import health
+from app.services.system_sampler import SystemSampler
+
+
+class TestSystemSampler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "test.db"
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("CREATE TABLE t (v TEXT)")
+        conn.close()
+        self.pool = ConnectionPool(self.db_path, readers=1, writers=1, timeout=5)
+        self.sampler = SystemSampler(pool=self.pool, interval_seconds=5, history=3)
+
+    def tearDown(self):
+        self.pool.close()
+        self.tmp.cleanup()
+
+    def test_samples_ring_buffer_and_sqlite_stats(self):
+        first = self.sampler.collect()
+        self.assertTrue(first["sqlite"]["ok"])
+        self.assertEqual(first["sqlite"]["db_bytes"], first["sqlite"]["page_size"] * first["sqlite"]["page_count"])
+
+        with self.pool.connection() as db:
+            db.executemany("INSERT INTO t VALUES (?)", [("x" * 500,)] * 200)
+            db.commit()
+        for _ in range(4):
+            latest = self.sampler.collect()
+
+        self.assertEqual(len(self.sampler.history()), 3)
+        self.assertIs(self.sampler.latest(), latest)
+        self.assertEqual(self.sampler.history(2), self.sampler.history()[-2:])
+        self.assertGreater(latest["sqlite"]["wal_bytes"], first["sqlite"]["wal_bytes"])
+        self.assertFalse(self.sampler.is_stale(latest))
+
+    def test_ready_reads_latest_sample(self):
+        app = FastAPI()
+        app.include_router(health.router, prefix="/api")
+        client = TestClient(app)
+        with mock.patch.object(health, "system_sampler", self.sampler):
+            self.sampler.collect()["logs_writable"] = True
+            self.assertEqual(client.get("/api/health/ready").status_code, 200)
+
+            self.sampler.samples[-1]["timestamp"] -= 60
+            response = client.get("/api/health/ready")
+            self.assertEqual(response.status_code, 503)
+            self.assertIn("sampler", response.json()["detail"]["checks"])
+
+            metrics = client.get("/api/health/metrics?history=5").json()
+            self.assertEqual(len(metrics["history"]), 1)
+            self.assertIn("wal_bytes", metrics["sqlite"])
+
+
+if __name__ == '__main__':
+    unittest.main()
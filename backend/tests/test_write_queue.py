@@ -0,0 +1,82 @@
+import unittest
+import sqlite3
+import sys
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+# Add backend to path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.db import ConnectionPool
+from app.core.write_queue import WriteQueue, WriteQueueFull
+
+
+class TestWriteQueue(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        db_path = Path(self.tmp.name) / "test.db"
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE t (v INTEGER NOT NULL UNIQUE)")
+        conn.close()
+        self.pool = ConnectionPool(db_path, readers=1, writers=1, timeout=5)
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+        self.queue.stop()
+        self.pool.close()
+        self.tmp.cleanup()
+
+    def blocker(self, db):
+        self.started.set()
+        self.release.wait(5)
+        return "blocked"
+
+    def values(self):
+        with self.pool.connection(readonly=True) as db:
+            return sorted(row[0] for row in db.execute("SELECT v FROM t"))
+
+    def test_group_commit_isolates_failing_units(self):
+        self.queue = WriteQueue(pool=self.pool, max_depth=16, group_max=8)
+        first = self.queue.submit(self.blocker)
+        self.started.wait(5)
+
+        futures = [
+            self.queue.submit(lambda db, v=v: db.execute("INSERT INTO t VALUES (?)", (v,)).lastrowid)
+            for v in (1, 2, 2, 3)  # the second 2 violates UNIQUE
+        ]
+        self.release.set()
+
+        self.assertEqual(first.result(5), "blocked")
+        self.assertEqual([f.result(5) for f in (futures[0], futures[1], futures[3])], [1, 2, 3])
+        with self.assertRaises(sqlite3.IntegrityError):
+            futures[2].result(5)
+        self.assertEqual(self.values(), [1, 2, 3])
+
+        stats = self.queue.stats()
+        self.assertEqual(stats["groups"], 2)  # the blocker alone, then the four queued units
+        self.assertEqual(stats["group_size_max"], 4)
+        self.assertEqual((stats["completed"], stats["failed"]), (4, 1))
+
+    def test_full_queue_rejects(self):
+        self.queue = WriteQueue(pool=self.pool, max_depth=2, group_max=8)
+        self.queue.submit(self.blocker)
+        self.started.wait(5)
+        queued = [self.queue.submit(lambda db, v=v: db.execute("INSERT INTO t VALUES (?)", (v,))) for v in (1, 2)]
+
+        with self.assertRaises(WriteQueueFull) as ctx:
+            self.queue.submit(lambda db: None)
+        self.assertEqual(ctx.exception.status_code, 503)
+        self.assertEqual(self.queue.stats()["rejected"], 1)
+
+        self.release.set()
+        for future in queued:
+            future.result(5)
+        self.assertEqual(self.values(), [1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+-- Migration 005: Canonical ISO date columns
+-- Date: 2026-10-17
+-- Purpose: po_date / dely_date are stored as DD/MM/YYYY, which neither sorts nor works with
+--          SQLite date functions. Add sortable YYYY-MM-DD shadow columns, backfill them and
+--          index them so date-range reports become index range scans.
+--          Writers (ingest, DC, invoice services) populate these columns going forward.
+
+ALTER TABLE purchase_orders ADD COLUMN po_date_iso TEXT;
+ALTER TABLE purchase_order_deliveries ADD COLUMN dely_date_iso TEXT;
+ALTER TABLE delivery_challans ADD COLUMN dc_date_iso TEXT;
+ALTER TABLE gst_invoices ADD COLUMN invoice_date_iso TEXT;
+
+-- Backfill: DD/MM/YYYY -> YYYY-MM-DD, ISO values kept as-is (time part dropped), anything else NULL
+UPDATE purchase_orders SET po_date_iso = CASE
+    WHEN po_date LIKE '__/__/____' THEN date(substr(po_date, 7, 4) || '-' || substr(po_date, 4, 2) || '-' || substr(po_date, 1, 2))
+    WHEN po_date LIKE '____-__-__%' THEN date(substr(po_date, 1, 10))
+END;
+
+UPDATE purchase_order_deliveries SET dely_date_iso = CASE
+    WHEN dely_date LIKE '__/__/____' THEN date(substr(dely_date, 7, 4) || '-' || substr(dely_date, 4, 2) || '-' || substr(dely_date, 1, 2))
+    WHEN dely_date LIKE '____-__-__%' THEN date(substr(dely_date, 1, 10))
+END;
+
+UPDATE delivery_challans SET dc_date_iso = CASE
+    WHEN dc_date LIKE '__/__/____' THEN date(substr(dc_date, 7, 4) || '-' || substr(dc_date, 4, 2) || '-' || substr(dc_date, 1, 2))
+    WHEN dc_date LIKE '____-__-__%' THEN date(substr(dc_date, 1, 10))
+END;
+
+UPDATE gst_invoices SET invoice_date_iso = CASE
+    WHEN invoice_date LIKE '__/__/____' THEN date(substr(invoice_date, 7, 4) || '-' || substr(invoice_date, 4, 2) || '-' || substr(invoice_date, 1, 2))
+    WHEN invoice_date LIKE '____-__-__%' THEN date(substr(invoice_date, 1, 10))
+END;
+
+CREATE INDEX IF NOT EXISTS idx_po_date_iso ON purchase_orders(po_date_iso);
+CREATE INDEX IF NOT EXISTS idx_pod_dely_date_iso ON purchase_order_deliveries(dely_date_iso);
+CREATE INDEX IF NOT EXISTS idx_dc_date_iso ON delivery_challans(dc_date_iso);
+CREATE INDEX IF NOT EXISTS idx_invoice_date_iso ON gst_invoices(invoice_date_iso);
+
+-- Update schema version
+INSERT OR IGNORE INTO schema_version (version, description)
+VALUES (5, 'Add canonical ISO date columns with indexes');
@@ -0,0 +1,148 @@
+-- Migration 006: PO item rollup
+-- Date: 2026-10-17
+-- Purpose: Keep ordered / dispatched / invoiced quantities per PO item in one row, maintained
+--          by triggers, so pending lookups no longer aggregate all of delivery_challan_items.
+--          Each trigger recomputes the affected item from its (indexed) child rows, which keeps
+--          the rollup exact instead of accumulating +/- deltas.
+--          Consistency check / rebuild: app.services.rollup_service (python -m app.services.rollup_service)
+
+-- Invoice items need to know which PO item they bill
+ALTER TABLE gst_invoice_items ADD COLUMN po_item_id TEXT REFERENCES purchase_order_items(id) ON DELETE SET NULL;
+CREATE INDEX IF NOT EXISTS idx_gii_po_item_id ON gst_invoice_items(po_item_id);
+
+-- Backfill: match on the invoice's DC items by lot number and description
+UPDATE gst_invoice_items SET po_item_id = (
+    SELECT dci.po_item_id
+    FROM delivery_challan_items dci
+    JOIN purchase_order_items poi ON poi.id = dci.po_item_id
+    WHERE dci.dc_number IN (
+        SELECT dc_number FROM gst_invoice_dc_links WHERE invoice_number = gst_invoice_items.invoice_number
+        UNION
+        SELECT linked_dc_numbers FROM gst_invoices WHERE invoice_number = gst_invoice_items.invoice_number
+    )
+    AND COALESCE(CAST(dci.lot_no AS TEXT), '') = COALESCE(gst_invoice_items.po_sl_no, '')
+    AND COALESCE(poi.material_description, '') = gst_invoice_items.description
+    LIMIT 1
+)
+WHERE po_item_id IS NULL;
+
+CREATE TABLE IF NOT EXISTS po_item_rollup (
+    po_item_id TEXT PRIMARY KEY REFERENCES purchase_order_items(id) ON DELETE CASCADE,
+    po_number INTEGER NOT NULL,
+    ordered_qty NUMERIC NOT NULL DEFAULT 0,
+    dispatched_qty NUMERIC NOT NULL DEFAULT 0,
+    invoiced_qty NUMERIC NOT NULL DEFAULT 0,
+    pending_qty NUMERIC GENERATED ALWAYS AS (MAX(ordered_qty - dispatched_qty, 0)) VIRTUAL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_rollup_po_number ON po_item_rollup(po_number);
+
+-- Backfill
+INSERT OR REPLACE INTO po_item_rollup (po_item_id, po_number, ordered_qty, dispatched_qty, invoiced_qty)
+SELECT
+    poi.id,
+    poi.po_number,
+    COALESCE(poi.ord_qty, 0),
+    (SELECT COALESCE(SUM(dci.dispatch_qty), 0) FROM delivery_challan_items dci WHERE dci.po_item_id = poi.id),
+    (SELECT COALESCE(SUM(gii.quantity), 0) FROM gst_invoice_items gii WHERE gii.po_item_id = poi.id)
+FROM purchase_order_items poi;
+
+-- PO items: create / resize / delete the rollup row
+DROP TRIGGER IF EXISTS rollup_poi_insert;
+CREATE TRIGGER rollup_poi_insert
+AFTER INSERT ON purchase_order_items
+BEGIN
+    INSERT OR REPLACE INTO po_item_rollup (po_item_id, po_number, ordered_qty, dispatched_qty, invoiced_qty)
+    VALUES (
+        NEW.id,
+        NEW.po_number,
+        COALESCE(NEW.ord_qty, 0),
+        (SELECT COALESCE(SUM(dispatch_qty), 0) FROM delivery_challan_items WHERE po_item_id = NEW.id),
+        (SELECT COALESCE(SUM(quantity), 0) FROM gst_invoice_items WHERE po_item_id = NEW.id)
+    );
+END;
+
+DROP TRIGGER IF EXISTS rollup_poi_update;
+CREATE TRIGGER rollup_poi_update
+AFTER UPDATE OF ord_qty, po_number ON purchase_order_items
+BEGIN
+    UPDATE po_item_rollup
+    SET ordered_qty = COALESCE(NEW.ord_qty, 0), po_number = NEW.po_number, updated_at = CURRENT_TIMESTAMP
+    WHERE po_item_id = NEW.id;
+END;
+
+DROP TRIGGER IF EXISTS rollup_poi_delete;
+CREATE TRIGGER rollup_poi_delete
+AFTER DELETE ON purchase_order_items
+BEGIN
+    DELETE FROM po_item_rollup WHERE po_item_id = OLD.id;
+END;
+
+-- DC items: dispatched quantity
+DROP TRIGGER IF EXISTS rollup_dci_insert;
+CREATE TRIGGER rollup_dci_insert
+AFTER INSERT ON delivery_challan_items
+BEGIN
+    UPDATE po_item_rollup
+    SET dispatched_qty = (SELECT COALESCE(SUM(dispatch_qty), 0) FROM delivery_challan_items WHERE po_item_id = NEW.po_item_id),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE po_item_id = NEW.po_item_id;
+END;
+
+DROP TRIGGER IF EXISTS rollup_dci_update;
+CREATE TRIGGER rollup_dci_update
+AFTER UPDATE OF dispatch_qty, po_item_id ON delivery_challan_items
+BEGIN
+    UPDATE po_item_rollup
+    SET dispatched_qty = (SELECT COALESCE(SUM(dispatch_qty), 0) FROM delivery_challan_items WHERE po_item_id = po_item_rollup.po_item_id),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE po_item_id IN (OLD.po_item_id, NEW.po_item_id);
+END;
+
+DROP TRIGGER IF EXISTS rollup_dci_delete;
+CREATE TRIGGER rollup_dci_delete
+AFTER DELETE ON delivery_challan_items
+BEGIN
+    UPDATE po_item_rollup
+    SET dispatched_qty = (SELECT COALESCE(SUM(dispatch_qty), 0) FROM delivery_challan_items WHERE po_item_id = OLD.po_item_id),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE po_item_id = OLD.po_item_id;
+END;
+
+-- Invoice items: invoiced quantity
+DROP TRIGGER IF EXISTS rollup_gii_insert;
+CREATE TRIGGER rollup_gii_insert
+AFTER INSERT ON gst_invoice_items
+WHEN NEW.po_item_id IS NOT NULL
+BEGIN
+    UPDATE po_item_rollup
+    SET invoiced_qty = (SELECT COALESCE(SUM(quantity), 0) FROM gst_invoice_items WHERE po_item_id = NEW.po_item_id),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE po_item_id = NEW.po_item_id;
+END;
+
+DROP TRIGGER IF EXISTS rollup_gii_update;
+CREATE TRIGGER rollup_gii_update
+AFTER UPDATE OF quantity, po_item_id ON gst_invoice_items
+BEGIN
+    UPDATE po_item_rollup
+    SET invoiced_qty = (SELECT COALESCE(SUM(quantity), 0) FROM gst_invoice_items WHERE po_item_id = po_item_rollup.po_item_id),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE po_item_id IN (OLD.po_item_id, NEW.po_item_id);
+END;
+
+DROP TRIGGER IF EXISTS rollup_gii_delete;
+CREATE TRIGGER rollup_gii_delete
+AFTER DELETE ON gst_invoice_items
+WHEN OLD.po_item_id IS NOT NULL
+BEGIN
+    UPDATE po_item_rollup
+    SET invoiced_qty = (SELECT COALESCE(SUM(quantity), 0) FROM gst_invoice_items WHERE po_item_id = OLD.po_item_id),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE po_item_id = OLD.po_item_id;
+END;
+
+-- Update schema version
+INSERT OR IGNORE INTO schema_version (version, description)
+VALUES (6, 'Add po_item_rollup maintained by triggers, gst_invoice_items.po_item_id');
@@ -0,0 +1,199 @@
+-- Migration 007: Global search index
+-- Date: 2026-10-17
+-- Purpose: Replace LIKE '%q%' scans in /api/search with an FTS5 trigram index.
+--          search_documents holds one row per PO / DC / invoice (searchable text plus the
+--          display fields the search box shows); search_index is an external-content FTS5
+--          table over it. Triggers on the source tables upsert the document rows, and
+--          triggers on search_documents keep the FTS index in step (delete + insert by rowid).
+
+CREATE TABLE IF NOT EXISTS search_documents (
+    id INTEGER PRIMARY KEY,
+    entity_type TEXT NOT NULL CHECK (entity_type IN ('PO', 'DC', 'INVOICE')),
+    entity_id TEXT NOT NULL,
+    number TEXT NOT NULL COLLATE NOCASE,
+    party TEXT,
+    details TEXT,
+    doc_date TEXT,
+    value NUMERIC,
+    UNIQUE (entity_type, entity_id)
+);
+
+-- Queries shorter than a trigram fall back to number-prefix lookups (LIKE 'q%' uses this index)
+CREATE INDEX IF NOT EXISTS idx_search_documents_number ON search_documents(number);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+    number, party, details,
+    content='search_documents', content_rowid='id',
+    tokenize='trigram'
+);
+
+-- search_documents -> search_index
+DROP TRIGGER IF EXISTS search_documents_ai;
+CREATE TRIGGER search_documents_ai AFTER INSERT ON search_documents
+BEGIN
+    INSERT INTO search_index (rowid, number, party, details)
+    VALUES (NEW.id, NEW.number, NEW.party, NEW.details);
+END;
+
+DROP TRIGGER IF EXISTS search_documents_ad;
+CREATE TRIGGER search_documents_ad AFTER DELETE ON search_documents
+BEGIN
+    INSERT INTO search_index (search_index, rowid, number, party, details)
+    VALUES ('delete', OLD.id, OLD.number, OLD.party, OLD.details);
+END;
+
+DROP TRIGGER IF EXISTS search_documents_au;
+CREATE TRIGGER search_documents_au AFTER UPDATE OF number, party, details ON search_documents
+BEGIN
+    INSERT INTO search_index (search_index, rowid, number, party, details)
+    VALUES ('delete', OLD.id, OLD.number, OLD.party, OLD.details);
+    INSERT INTO search_index (rowid, number, party, details)
+    VALUES (NEW.id, NEW.number, NEW.party, NEW.details);
+END;
+
+-- Purchase orders: number, supplier name / code, material codes and descriptions
+DROP TRIGGER IF EXISTS search_po_ai;
+CREATE TRIGGER search_po_ai AFTER INSERT ON purchase_orders
+BEGIN
+    INSERT INTO search_documents (entity_type, entity_id, number, party, details, doc_date, value)
+    VALUES ('PO', CAST(NEW.po_number AS TEXT), CAST(NEW.po_number AS TEXT), NEW.supplier_name,
+            TRIM(COALESCE(NEW.supplier_code, '') || ' ' || COALESCE((
+                SELECT group_concat(COALESCE(material_code, '') || ' ' || COALESCE(material_description, ''), ' ')
+                FROM purchase_order_items WHERE po_number = NEW.po_number
+            ), '')),
+            NEW.po_date, NEW.po_value)
+    ON CONFLICT (entity_type, entity_id) DO UPDATE SET
+        party = excluded.party, details = excluded.details, doc_date = excluded.doc_date, value = excluded.value;
+END;
+
+DROP TRIGGER IF EXISTS search_po_au;
+CREATE TRIGGER search_po_au AFTER UPDATE OF supplier_name, supplier_code, po_date, po_value ON purchase_orders
+BEGIN
+    UPDATE search_documents
+    SET party = NEW.supplier_name,
+        details = TRIM(COALESCE(NEW.supplier_code, '') || ' ' || COALESCE((
+            SELECT group_concat(COALESCE(material_code, '') || ' ' || COALESCE(material_description, ''), ' ')
+            FROM purchase_order_items WHERE po_number = NEW.po_number
+        ), '')),
+        doc_date = NEW.po_date,
+        value = NEW.po_value
+    WHERE entity_type = 'PO' AND entity_id = CAST(NEW.po_number AS TEXT);
+END;
+
+DROP TRIGGER IF EXISTS search_po_ad;
+CREATE TRIGGER search_po_ad AFTER DELETE ON purchase_orders
+BEGIN
+    DELETE FROM search_documents WHERE entity_type = 'PO' AND entity_id = CAST(OLD.po_number AS TEXT);
+END;
+
+-- PO items only change the PO document's details
+DROP TRIGGER IF EXISTS search_poi_ai;
+CREATE TRIGGER search_poi_ai AFTER INSERT ON purchase_order_items
+BEGIN
+    UPDATE search_documents
+    SET details = TRIM(COALESCE((SELECT supplier_code FROM purchase_orders WHERE po_number = NEW.po_number), '') || ' ' || COALESCE((
+            SELECT group_concat(COALESCE(material_code, '') || ' ' || COALESCE(material_description, ''), ' ')
+            FROM purchase_order_items WHERE po_number = NEW.po_number
+        ), ''))
+    WHERE entity_type = 'PO' AND entity_id = CAST(NEW.po_number AS TEXT);
+END;
+
+DROP TRIGGER IF EXISTS search_poi_au;
+CREATE TRIGGER search_poi_au AFTER UPDATE OF material_code, material_description ON purchase_order_items
+BEGIN
+    UPDATE search_documents
+    SET details = TRIM(COALESCE((SELECT supplier_code FROM purchase_orders WHERE po_number = NEW.po_number), '') || ' ' || COALESCE((
+            SELECT group_concat(COALESCE(material_code, '') || ' ' || COALESCE(material_description, ''), ' ')
+            FROM purchase_order_items WHERE po_number = NEW.po_number
+        ), ''))
+    WHERE entity_type = 'PO' AND entity_id = CAST(NEW.po_number AS TEXT);
+END;
+
+DROP TRIGGER IF EXISTS search_poi_ad;
+CREATE TRIGGER search_poi_ad AFTER DELETE ON purchase_order_items
+BEGIN
+    UPDATE search_documents
+    SET details = TRIM(COALESCE((SELECT supplier_code FROM purchase_orders WHERE po_number = OLD.po_number), '') || ' ' || COALESCE((
+            SELECT group_concat(COALESCE(material_code, '') || ' ' || COALESCE(material_description, ''), ' ')
+            FROM purchase_order_items WHERE po_number = OLD.po_number
+        ), ''))
+    WHERE entity_type = 'PO' AND entity_id = CAST(OLD.po_number AS TEXT);
+END;
+
+-- Delivery challans: DC number, consignee, PO number
+DROP TRIGGER IF EXISTS search_dc_ai;
+CREATE TRIGGER search_dc_ai AFTER INSERT ON delivery_challans
+BEGIN
+    INSERT INTO search_documents (entity_type, entity_id, number, party, details, doc_date, value)
+    VALUES ('DC', NEW.dc_number, NEW.dc_number, NEW.consignee_name, CAST(NEW.po_number AS TEXT), NEW.dc_date, NULL)
+    ON CONFLICT (entity_type, entity_id) DO UPDATE SET
+        party = excluded.party, details = excluded.details, doc_date = excluded.doc_date;
+END;
+
+DROP TRIGGER IF EXISTS search_dc_au;
+CREATE TRIGGER search_dc_au AFTER UPDATE OF dc_number, consignee_name, po_number, dc_date ON delivery_challans
+BEGIN
+    UPDATE search_documents
+    SET entity_id = NEW.dc_number, number = NEW.dc_number, party = NEW.consignee_name,
+        details = CAST(NEW.po_number AS TEXT), doc_date = NEW.dc_date
+    WHERE entity_type = 'DC' AND entity_id = OLD.dc_number;
+END;
+
+DROP TRIGGER IF EXISTS search_dc_ad;
+CREATE TRIGGER search_dc_ad AFTER DELETE ON delivery_challans
+BEGIN
+    DELETE FROM search_documents WHERE entity_type = 'DC' AND entity_id = OLD.dc_number;
+END;
+
+-- GST invoices: invoice number, buyer, GSTIN, linked PO / DC numbers
+DROP TRIGGER IF EXISTS search_invoice_ai;
+CREATE TRIGGER search_invoice_ai AFTER INSERT ON gst_invoices
+BEGIN
+    INSERT INTO search_documents (entity_type, entity_id, number, party, details, doc_date, value)
+    VALUES ('INVOICE', NEW.invoice_number, NEW.invoice_number, COALESCE(NEW.buyer_name, NEW.customer_gstin),
+            TRIM(COALESCE(NEW.customer_gstin, '') || ' ' || COALESCE(NEW.po_numbers, '') || ' ' || COALESCE(NEW.linked_dc_numbers, '')),
+            NEW.invoice_date, NEW.total_invoice_value)
+    ON CONFLICT (entity_type, entity_id) DO UPDATE SET
+        party = excluded.party, details = excluded.details, doc_date = excluded.doc_date, value = excluded.value;
+END;
+
+DROP TRIGGER IF EXISTS search_invoice_au;
+CREATE TRIGGER search_invoice_au
+AFTER UPDATE OF invoice_number, buyer_name, customer_gstin, po_numbers, linked_dc_numbers, invoice_date, total_invoice_value ON gst_invoices
+BEGIN
+    UPDATE search_documents
+    SET entity_id = NEW.invoice_number, number = NEW.invoice_number, party = COALESCE(NEW.buyer_name, NEW.customer_gstin),
+        details = TRIM(COALESCE(NEW.customer_gstin, '') || ' ' || COALESCE(NEW.po_numbers, '') || ' ' || COALESCE(NEW.linked_dc_numbers, '')),
+        doc_date = NEW.invoice_date, value = NEW.total_invoice_value
+    WHERE entity_type = 'INVOICE' AND entity_id = OLD.invoice_number;
+END;
+
+DROP TRIGGER IF EXISTS search_invoice_ad;
+CREATE TRIGGER search_invoice_ad AFTER DELETE ON gst_invoices
+BEGIN
+    DELETE FROM search_documents WHERE entity_type = 'INVOICE' AND entity_id = OLD.invoice_number;
+END;
+
+-- Backfill (document triggers populate search_index)
+INSERT OR IGNORE INTO search_documents (entity_type, entity_id, number, party, details, doc_date, value)
+SELECT 'PO', CAST(po.po_number AS TEXT), CAST(po.po_number AS TEXT), po.supplier_name,
+       TRIM(COALESCE(po.supplier_code, '') || ' ' || COALESCE((
+           SELECT group_concat(COALESCE(material_code, '') || ' ' || COALESCE(material_description, ''), ' ')
+           FROM purchase_order_items WHERE po_number = po.po_number
+       ), '')),
+       po.po_date, po.po_value
+FROM purchase_orders po;
+
+INSERT OR IGNORE INTO search_documents (entity_type, entity_id, number, party, details, doc_date, value)
+SELECT 'DC', dc_number, dc_number, consignee_name, CAST(po_number AS TEXT), dc_date, NULL
+FROM delivery_challans;
+
+INSERT OR IGNORE INTO search_documents (entity_type, entity_id, number, party, details, doc_date, value)
+SELECT 'INVOICE', invoice_number, invoice_number, COALESCE(buyer_name, customer_gstin),
+       TRIM(COALESCE(customer_gstin, '') || ' ' || COALESCE(po_numbers, '') || ' ' || COALESCE(linked_dc_numbers, '')),
+       invoice_date, total_invoice_value
+FROM gst_invoices;
+
+-- Update schema version
+INSERT OR IGNORE INTO schema_version (version, description)
+VALUES (7, 'Add FTS5 trigram search index over POs, DCs and invoices');
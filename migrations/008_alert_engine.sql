@@ -0,0 +1,92 @@
+-- Migration 008: Incremental alert engine
+-- Date: 2026-10-17
+-- Purpose: Alert rules run as set-based INSERT ... SELECT statements (app.services.alert_service).
+--          * One open alert per (alert_type, entity_type, entity_id), enforced by a partial unique index.
+--          * alert_changes is a change log written by triggers: every write that can change a rule's
+--            outcome records the PO / DC it touched. A run only re-evaluates entities logged after the
+--            watermark in alert_engine_state, then advances it.
+
+-- Drop duplicate open alerts (keep the oldest) so the unique index can be built
+DELETE FROM alerts
+WHERE is_acknowledged = 0
+  AND rowid NOT IN (
+      SELECT MIN(rowid) FROM alerts
+      WHERE is_acknowledged = 0
+      GROUP BY alert_type, entity_type, entity_id
+  );
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_alerts_open_unique
+    ON alerts(alert_type, entity_type, entity_id) WHERE is_acknowledged = 0;
+
+CREATE TABLE IF NOT EXISTS alert_changes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    entity_type TEXT NOT NULL CHECK (entity_type IN ('PO', 'DC')),
+    entity_id TEXT NOT NULL,
+    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Single row: last change consumed and the DC ageing cutoff used by the last run
+-- (last_dc_cutoff IS NULL means the next run evaluates everything)
+CREATE TABLE IF NOT EXISTS alert_engine_state (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    last_change_id INTEGER NOT NULL DEFAULT 0,
+    last_dc_cutoff TEXT,
+    last_run_at TIMESTAMP
+);
+
+INSERT OR IGNORE INTO alert_engine_state (id, last_change_id) VALUES (1, 0);
+
+-- PO quantities (ordered / dispatched) move through po_item_rollup
+DROP TRIGGER IF EXISTS alert_changes_rollup_insert;
+CREATE TRIGGER alert_changes_rollup_insert AFTER INSERT ON po_item_rollup
+BEGIN
+    INSERT INTO alert_changes (entity_type, entity_id) VALUES ('PO', CAST(NEW.po_number AS TEXT));
+END;
+
+DROP TRIGGER IF EXISTS alert_changes_rollup_update;
+CREATE TRIGGER alert_changes_rollup_update AFTER UPDATE OF ordered_qty, dispatched_qty ON po_item_rollup
+BEGIN
+    INSERT INTO alert_changes (entity_type, entity_id) VALUES ('PO', CAST(NEW.po_number AS TEXT));
+END;
+
+-- Removing an invoice can make its POs uninvoiced again
+DROP TRIGGER IF EXISTS alert_changes_invoice_delete;
+CREATE TRIGGER alert_changes_invoice_delete AFTER DELETE ON gst_invoices
+WHEN OLD.po_numbers IS NOT NULL
+BEGIN
+    INSERT INTO alert_changes (entity_type, entity_id)
+    SELECT 'PO', CAST(po_number AS TEXT) FROM purchase_orders
+    WHERE OLD.po_numbers LIKE '%' || po_number || '%';
+END;
+
+DROP TRIGGER IF EXISTS alert_changes_invoice_update;
+CREATE TRIGGER alert_changes_invoice_update AFTER UPDATE OF po_numbers ON gst_invoices
+WHEN OLD.po_numbers IS NOT NULL
+BEGIN
+    INSERT INTO alert_changes (entity_type, entity_id)
+    SELECT 'PO', CAST(po_number AS TEXT) FROM purchase_orders
+    WHERE OLD.po_numbers LIKE '%' || po_number || '%';
+END;
+
+-- DCs: new / re-dated / re-linked challans, and invoice links being removed
+DROP TRIGGER IF EXISTS alert_changes_dc_insert;
+CREATE TRIGGER alert_changes_dc_insert AFTER INSERT ON delivery_challans
+BEGIN
+    INSERT INTO alert_changes (entity_type, entity_id) VALUES ('DC', NEW.dc_number);
+END;
+
+DROP TRIGGER IF EXISTS alert_changes_dc_update;
+CREATE TRIGGER alert_changes_dc_update AFTER UPDATE OF dc_date_iso, po_number ON delivery_challans
+BEGIN
+    INSERT INTO alert_changes (entity_type, entity_id) VALUES ('DC', NEW.dc_number);
+END;
+
+DROP TRIGGER IF EXISTS alert_changes_dc_link_delete;
+CREATE TRIGGER alert_changes_dc_link_delete AFTER DELETE ON gst_invoice_dc_links
+BEGIN
+    INSERT INTO alert_changes (entity_type, entity_id) VALUES ('DC', OLD.dc_number);
+END;
+
+-- Update schema version
+INSERT OR IGNORE INTO schema_version (version, description)
+VALUES (8, 'Add incremental alert engine: open-alert unique index, change log, watermark');
@@ -0,0 +1,69 @@
+-- Migration 009: Normalized invoice -> PO / DC links
+-- Date: 2026-10-17
+-- Purpose: gst_invoices.po_numbers / linked_dc_numbers are comma-joined display text. Queries that
+--          matched on them (LIKE '%x%', or equality joins that break for multi-DC invoices) move to
+--          gst_invoice_dc_links and the new gst_invoice_po_links, both indexed on the PO / DC side.
+--          The text columns stay as denormalized display values.
+
+CREATE TABLE IF NOT EXISTS gst_invoice_po_links (
+    invoice_number TEXT NOT NULL REFERENCES gst_invoices(invoice_number) ON DELETE CASCADE ON UPDATE CASCADE,
+    po_number INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (invoice_number, po_number)
+);
+
+CREATE INDEX IF NOT EXISTS idx_invoice_po_links_po ON gst_invoice_po_links(po_number);
+
+-- Backfill DC links from linked_dc_numbers (only DCs that exist; links already present are kept)
+WITH RECURSIVE split(invoice_number, item, rest) AS (
+    SELECT invoice_number, '', COALESCE(linked_dc_numbers, '') || ','
+    FROM gst_invoices
+    UNION ALL
+    SELECT invoice_number, TRIM(substr(rest, 1, instr(rest, ',') - 1)), substr(rest, instr(rest, ',') + 1)
+    FROM split
+    WHERE rest <> ''
+)
+INSERT INTO gst_invoice_dc_links (id, invoice_number, dc_number)
+SELECT lower(hex(randomblob(16))), s.invoice_number, s.item
+FROM split s
+JOIN delivery_challans dc ON dc.dc_number = s.item
+WHERE s.item <> ''
+  AND NOT EXISTS (
+      SELECT 1 FROM gst_invoice_dc_links l
+      WHERE l.invoice_number = s.invoice_number AND l.dc_number = s.item
+  );
+
+-- Backfill PO links from po_numbers (numeric entries only)
+WITH RECURSIVE split(invoice_number, item, rest) AS (
+    SELECT invoice_number, '', COALESCE(po_numbers, '') || ','
+    FROM gst_invoices
+    UNION ALL
+    SELECT invoice_number, TRIM(substr(rest, 1, instr(rest, ',') - 1)), substr(rest, instr(rest, ',') + 1)
+    FROM split
+    WHERE rest <> ''
+)
+INSERT OR IGNORE INTO gst_invoice_po_links (invoice_number, po_number)
+SELECT invoice_number, CAST(item AS INTEGER)
+FROM split
+WHERE item <> '' AND item NOT GLOB '*[^0-9]*';
+
+-- ... and from the POs of linked DCs
+INSERT OR IGNORE INTO gst_invoice_po_links (invoice_number, po_number)
+SELECT l.invoice_number, dc.po_number
+FROM gst_invoice_dc_links l
+JOIN delivery_challans dc ON dc.dc_number = l.dc_number
+WHERE dc.po_number IS NOT NULL;
+
+-- Alert change log: invoice -> PO coverage now lives in the link table
+DROP TRIGGER IF EXISTS alert_changes_invoice_delete;
+DROP TRIGGER IF EXISTS alert_changes_invoice_update;
+
+DROP TRIGGER IF EXISTS alert_changes_po_link_delete;
+CREATE TRIGGER alert_changes_po_link_delete AFTER DELETE ON gst_invoice_po_links
+BEGIN
+    INSERT INTO alert_changes (entity_type, entity_id) VALUES ('PO', CAST(OLD.po_number AS TEXT));
+END;
+
+-- Update schema version
+INSERT OR IGNORE INTO schema_version (version, description)
+VALUES (9, 'Add gst_invoice_po_links, backfill invoice PO / DC links from text columns');
@@ -0,0 +1,282 @@
+-- Migration 010: Daily facts
+-- Date: 2026-10-17
+-- Purpose: One row per calendar day with the totals the dashboard KPIs and trends need, so any
+--          period (month / quarter / year / FY) is a sum over at most ~366 rows.
+--          Maintained on write by delta triggers (+new / -old) on the source tables:
+--            * po_count, ordered_value                 - purchase_orders, by po_date_iso
+--            * po_ordered_qty, po_dispatched_qty       - po_item_rollup, by the PO's po_date_iso
+--              (PO cohort: quantities of POs dated that day, used for efficiency / pending)
+--            * dc_count, dispatched_qty                - delivery_challans / items, by dc_date_iso
+--            * invoice_count, invoiced_value           - gst_invoices, by invoice_date_iso
+--          Parent deletes use BEFORE DELETE triggers: the cascaded child deletes that follow can no
+--          longer look up the parent's date, so the parent subtracts everything it carried.
+--          Consistency check / rebuild: app.services.daily_facts_service
+
+CREATE TABLE IF NOT EXISTS daily_facts (
+    day TEXT PRIMARY KEY,
+    po_count INTEGER NOT NULL DEFAULT 0,
+    ordered_value NUMERIC NOT NULL DEFAULT 0,
+    po_ordered_qty NUMERIC NOT NULL DEFAULT 0,
+    po_dispatched_qty NUMERIC NOT NULL DEFAULT 0,
+    dc_count INTEGER NOT NULL DEFAULT 0,
+    dispatched_qty NUMERIC NOT NULL DEFAULT 0,
+    invoice_count INTEGER NOT NULL DEFAULT 0,
+    invoiced_value NUMERIC NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+-- Purchase orders
+DROP TRIGGER IF EXISTS facts_po_insert;
+CREATE TRIGGER facts_po_insert AFTER INSERT ON purchase_orders
+WHEN NEW.po_date_iso IS NOT NULL
+BEGIN
+    INSERT INTO daily_facts (day, po_count, ordered_value)
+    VALUES (NEW.po_date_iso, 1, COALESCE(NEW.po_value, 0))
+    ON CONFLICT (day) DO UPDATE SET
+        po_count = po_count + excluded.po_count,
+        ordered_value = ordered_value + excluded.ordered_value;
+END;
+
+DROP TRIGGER IF EXISTS facts_po_update;
+CREATE TRIGGER facts_po_update AFTER UPDATE OF po_date_iso, po_value ON purchase_orders
+BEGIN
+    INSERT INTO daily_facts (day, po_count, ordered_value, po_ordered_qty, po_dispatched_qty)
+    SELECT OLD.po_date_iso, -1, -COALESCE(OLD.po_value, 0), -qty.ordered, -qty.dispatched
+    FROM (
+        SELECT COALESCE(SUM(ordered_qty), 0) AS ordered, COALESCE(SUM(dispatched_qty), 0) AS dispatched
+        FROM po_item_rollup WHERE po_number = OLD.po_number
+    ) qty
+    WHERE OLD.po_date_iso IS NOT NULL
+    ON CONFLICT (day) DO UPDATE SET
+        po_count = po_count + excluded.po_count,
+        ordered_value = ordered_value + excluded.ordered_value,
+        po_ordered_qty = po_ordered_qty + excluded.po_ordered_qty,
+        po_dispatched_qty = po_dispatched_qty + excluded.po_dispatched_qty;
+
+    INSERT INTO daily_facts (day, po_count, ordered_value, po_ordered_qty, po_dispatched_qty)
+    SELECT NEW.po_date_iso, 1, COALESCE(NEW.po_value, 0), qty.ordered, qty.dispatched
+    FROM (
+        SELECT COALESCE(SUM(ordered_qty), 0) AS ordered, COALESCE(SUM(dispatched_qty), 0) AS dispatched
+        FROM po_item_rollup WHERE po_number = NEW.po_number
+    ) qty
+    WHERE NEW.po_date_iso IS NOT NULL
+    ON CONFLICT (day) DO UPDATE SET
+        po_count = po_count + excluded.po_count,
+        ordered_value = ordered_value + excluded.ordered_value,
+        po_ordered_qty = po_ordered_qty + excluded.po_ordered_qty,
+        po_dispatched_qty = po_dispatched_qty + excluded.po_dispatched_qty;
+END;
+
+DROP TRIGGER IF EXISTS facts_po_delete;
+CREATE TRIGGER facts_po_delete BEFORE DELETE ON purchase_orders
+WHEN OLD.po_date_iso IS NOT NULL
+BEGIN
+    INSERT INTO daily_facts (day, po_count, ordered_value, po_ordered_qty, po_dispatched_qty)
+    SELECT OLD.po_date_iso, -1, -COALESCE(OLD.po_value, 0),
+           -COALESCE(SUM(ordered_qty), 0), -COALESCE(SUM(dispatched_qty), 0)
+    FROM po_item_rollup
+    WHERE po_number = OLD.po_number
+    ON CONFLICT (day) DO UPDATE SET
+        po_count = po_count + excluded.po_count,
+        ordered_value = ordered_value + excluded.ordered_value,
+        po_ordered_qty = po_ordered_qty + excluded.po_ordered_qty,
+        po_dispatched_qty = po_dispatched_qty + excluded.po_dispatched_qty;
+END;
+
+-- PO cohort quantities (po_item_rollup already folds in PO items and DC items)
+DROP TRIGGER IF EXISTS facts_rollup_insert;
+CREATE TRIGGER facts_rollup_insert AFTER INSERT ON po_item_rollup
+BEGIN
+    INSERT INTO daily_facts (day, po_ordered_qty, po_dispatched_qty)
+    SELECT po_date_iso, NEW.ordered_qty, NEW.dispatched_qty
+    FROM purchase_orders
+    WHERE po_number = NEW.po_number AND po_date_iso IS NOT NULL
+    ON CONFLICT (day) DO UPDATE SET
+        po_ordered_qty = po_ordered_qty + excluded.po_ordered_qty,
+        po_dispatched_qty = po_dispatched_qty + excluded.po_dispatched_qty;
+END;
+
+DROP TRIGGER IF EXISTS facts_rollup_update;
+CREATE TRIGGER facts_rollup_update AFTER UPDATE OF ordered_qty, dispatched_qty, po_number ON po_item_rollup
+BEGIN
+    INSERT INTO daily_facts (day, po_ordered_qty, po_dispatched_qty)
+    SELECT po_date_iso, -OLD.ordered_qty, -OLD.dispatched_qty
+    FROM purchase_orders
+    WHERE po_number = OLD.po_number AND po_date_iso IS NOT NULL
+    ON CONFLICT (day) DO UPDATE SET
+        po_ordered_qty = po_ordered_qty + excluded.po_ordered_qty,
+        po_dispatched_qty = po_dispatched_qty + excluded.po_dispatched_qty;
+
+    INSERT INTO daily_facts (day, po_ordered_qty, po_dispatched_qty)
+    SELECT po_date_iso, NEW.ordered_qty, NEW.dispatched_qty
+    FROM purchase_orders
+    WHERE po_number = NEW.po_number AND po_date_iso IS NOT NULL
+    ON CONFLICT (day) DO UPDATE SET
+        po_ordered_qty = po_ordered_qty + excluded.po_ordered_qty,
+        po_dispatched_qty = po_dispatched_qty + excluded.po_dispatched_qty;
+END;
+
+-- No-op once the PO itself is gone (facts_po_delete already subtracted it)
+DROP TRIGGER IF EXISTS facts_rollup_delete;
+CREATE TRIGGER facts_rollup_delete AFTER DELETE ON po_item_rollup
+BEGIN
+    INSERT INTO daily_facts (day, po_ordered_qty, po_dispatched_qty)
+    SELECT po_date_iso, -OLD.ordered_qty, -OLD.dispatched_qty
+    FROM purchase_orders
+    WHERE po_number = OLD.po_number AND po_date_iso IS NOT NULL
+    ON CONFLICT (day) DO UPDATE SET
+        po_ordered_qty = po_ordered_qty + excluded.po_ordered_qty,
+        po_dispatched_qty = po_dispatched_qty + excluded.po_dispatched_qty;
+END;
+
+-- Delivery challans
+DROP TRIGGER IF EXISTS facts_dc_insert;
+CREATE TRIGGER facts_dc_insert AFTER INSERT ON delivery_challans
+WHEN NEW.dc_date_iso IS NOT NULL
+BEGIN
+    INSERT INTO daily_facts (day, dc_count) VALUES (NEW.dc_date_iso, 1)
+    ON CONFLICT (day) DO UPDATE SET dc_count = dc_count + excluded.dc_count;
+END;
+
+DROP TRIGGER IF EXISTS facts_dc_update;
+CREATE TRIGGER facts_dc_update AFTER UPDATE OF dc_date_iso ON delivery_challans
+BEGIN
+    INSERT INTO daily_facts (day, dc_count, dispatched_qty)
+    SELECT OLD.dc_date_iso, -1, -qty.dispatched
+    FROM (
+        SELECT COALESCE(SUM(dispatch_qty), 0) AS dispatched
+        FROM delivery_challan_items WHERE dc_number = OLD.dc_number
+    ) qty
+    WHERE OLD.dc_date_iso IS NOT NULL
+    ON CONFLICT (day) DO UPDATE SET
+        dc_count = dc_count + excluded.dc_count,
+        dispatched_qty = dispatched_qty + excluded.dispatched_qty;
+
+    INSERT INTO daily_facts (day, dc_count, dispatched_qty)
+    SELECT NEW.dc_date_iso, 1, qty.dispatched
+    FROM (
+        SELECT COALESCE(SUM(dispatch_qty), 0) AS dispatched
+        FROM delivery_challan_items WHERE dc_number = NEW.dc_number
+    ) qty
+    WHERE NEW.dc_date_iso IS NOT NULL
+    ON CONFLICT (day) DO UPDATE SET
+        dc_count = dc_count + excluded.dc_count,
+        dispatched_qty = dispatched_qty + excluded.dispatched_qty;
+END;
+
+DROP TRIGGER IF EXISTS facts_dc_delete;
+CREATE TRIGGER facts_dc_delete BEFORE DELETE ON delivery_challans
+WHEN OLD.dc_date_iso IS NOT NULL
+BEGIN
+    INSERT INTO daily_facts (day, dc_count, dispatched_qty)
+    SELECT OLD.dc_date_iso, -1, -COALESCE(SUM(dispatch_qty), 0)
+    FROM delivery_challan_items
+    WHERE dc_number = OLD.dc_number
+    ON CONFLICT (day) DO UPDATE SET
+        dc_count = dc_count + excluded.dc_count,
+        dispatched_qty = dispatched_qty + excluded.dispatched_qty;
+END;
+
+DROP TRIGGER IF EXISTS facts_dci_insert;
+CREATE TRIGGER facts_dci_insert AFTER INSERT ON delivery_challan_items
+BEGIN
+    INSERT INTO daily_facts (day, dispatched_qty)
+    SELECT dc_date_iso, NEW.dispatch_qty
+    FROM delivery_challans
+    WHERE dc_number = NEW.dc_number AND dc_date_iso IS NOT NULL
+    ON CONFLICT (day) DO UPDATE SET dispatched_qty = dispatched_qty + excluded.dispatched_qty;
+END;
+
+DROP TRIGGER IF EXISTS facts_dci_update;
+CREATE TRIGGER facts_dci_update AFTER UPDATE OF dispatch_qty, dc_number ON delivery_challan_items
+BEGIN
+    INSERT INTO daily_facts (day, dispatched_qty)
+    SELECT dc_date_iso, -OLD.dispatch_qty
+    FROM delivery_challans
+    WHERE dc_number = OLD.dc_number AND dc_date_iso IS NOT NULL
+    ON CONFLICT (day) DO UPDATE SET dispatched_qty = dispatched_qty + excluded.dispatched_qty;
+
+    INSERT INTO daily_facts (day, dispatched_qty)
+    SELECT dc_date_iso, NEW.dispatch_qty
+    FROM delivery_challans
+    WHERE dc_number = NEW.dc_number AND dc_date_iso IS NOT NULL
+    ON CONFLICT (day) DO UPDATE SET dispatched_qty = dispatched_qty + excluded.dispatched_qty;
+END;
+
+-- No-op once the DC itself is gone (facts_dc_delete already subtracted it)
+DROP TRIGGER IF EXISTS facts_dci_delete;
+CREATE TRIGGER facts_dci_delete AFTER DELETE ON delivery_challan_items
+BEGIN
+    INSERT INTO daily_facts (day, dispatched_qty)
+    SELECT dc_date_iso, -OLD.dispatch_qty
+    FROM delivery_challans
+    WHERE dc_number = OLD.dc_number AND dc_date_iso IS NOT NULL
+    ON CONFLICT (day) DO UPDATE SET dispatched_qty = dispatched_qty + excluded.dispatched_qty;
+END;
+
+-- GST invoices
+DROP TRIGGER IF EXISTS facts_invoice_insert;
+CREATE TRIGGER facts_invoice_insert AFTER INSERT ON gst_invoices
+WHEN NEW.invoice_date_iso IS NOT NULL
+BEGIN
+    INSERT INTO daily_facts (day, invoice_count, invoiced_value)
+    VALUES (NEW.invoice_date_iso, 1, COALESCE(NEW.total_invoice_value, 0))
+    ON CONFLICT (day) DO UPDATE SET
+        invoice_count = invoice_count + excluded.invoice_count,
+        invoiced_value = invoiced_value + excluded.invoiced_value;
+END;
+
+DROP TRIGGER IF EXISTS facts_invoice_update;
+CREATE TRIGGER facts_invoice_update AFTER UPDATE OF invoice_date_iso, total_invoice_value ON gst_invoices
+BEGIN
+    INSERT INTO daily_facts (day, invoice_count, invoiced_value)
+    SELECT OLD.invoice_date_iso, -1, -COALESCE(OLD.total_invoice_value, 0)
+    WHERE OLD.invoice_date_iso IS NOT NULL
+    ON CONFLICT (day) DO UPDATE SET
+        invoice_count = invoice_count + excluded.invoice_count,
+        invoiced_value = invoiced_value + excluded.invoiced_value;
+
+    INSERT INTO daily_facts (day, invoice_count, invoiced_value)
+    SELECT NEW.invoice_date_iso, 1, COALESCE(NEW.total_invoice_value, 0)
+    WHERE NEW.invoice_date_iso IS NOT NULL
+    ON CONFLICT (day) DO UPDATE SET
+        invoice_count = invoice_count + excluded.invoice_count,
+        invoiced_value = invoiced_value + excluded.invoiced_value;
+END;
+
+DROP TRIGGER IF EXISTS facts_invoice_delete;
+CREATE TRIGGER facts_invoice_delete AFTER DELETE ON gst_invoices
+WHEN OLD.invoice_date_iso IS NOT NULL
+BEGIN
+    INSERT INTO daily_facts (day, invoice_count, invoiced_value)
+    VALUES (OLD.invoice_date_iso, -1, -COALESCE(OLD.total_invoice_value, 0))
+    ON CONFLICT (day) DO UPDATE SET
+        invoice_count = invoice_count + excluded.invoice_count,
+        invoiced_value = invoiced_value + excluded.invoiced_value;
+END;
+
+-- Backfill
+INSERT INTO daily_facts (day, po_count, ordered_value, po_ordered_qty, po_dispatched_qty,
+                         dc_count, dispatched_qty, invoice_count, invoiced_value)
+SELECT day, SUM(po_count), SUM(ordered_value), SUM(po_ordered_qty), SUM(po_dispatched_qty),
+       SUM(dc_count), SUM(dispatched_qty), SUM(invoice_count), SUM(invoiced_value)
+FROM (
+    SELECT po.po_date_iso AS day, 1 AS po_count, COALESCE(po.po_value, 0) AS ordered_value,
+           COALESCE((SELECT SUM(ordered_qty) FROM po_item_rollup r WHERE r.po_number = po.po_number), 0) AS po_ordered_qty,
+           COALESCE((SELECT SUM(dispatched_qty) FROM po_item_rollup r WHERE r.po_number = po.po_number), 0) AS po_dispatched_qty,
+           0 AS dc_count, 0 AS dispatched_qty, 0 AS invoice_count, 0 AS invoiced_value
+    FROM purchase_orders po WHERE po.po_date_iso IS NOT NULL
+    UNION ALL
+    SELECT dc.dc_date_iso, 0, 0, 0, 0, 1,
+           COALESCE((SELECT SUM(dispatch_qty) FROM delivery_challan_items dci WHERE dci.dc_number = dc.dc_number), 0),
+           0, 0
+    FROM delivery_challans dc WHERE dc.dc_date_iso IS NOT NULL
+    UNION ALL
+    SELECT invoice_date_iso, 0, 0, 0, 0, 0, 0, 1, COALESCE(total_invoice_value, 0)
+    FROM gst_invoices WHERE invoice_date_iso IS NOT NULL
+)
+GROUP BY day
+ON CONFLICT (day) DO NOTHING;
+
+-- Update schema version
+INSERT OR IGNORE INTO schema_version (version, description)
+VALUES (10, 'Add daily_facts maintained by delta triggers');
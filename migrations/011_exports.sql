@@ -0,0 +1,34 @@
+-- Migration 011: Export jobs
+-- Date: 2026-10-17
+-- Purpose: Tracking table for asynchronous report exports (app.services.export_job_service).
+--          Jobs are rendered to disk by a background worker pool; content_key identifies the
+--          report (type + format + parameters) so identical requests within the freshness
+--          window reuse the queued / running / completed job instead of rendering again.
+
+CREATE TABLE IF NOT EXISTS exports (
+    id TEXT PRIMARY KEY,
+    content_key TEXT NOT NULL,
+    report_type TEXT NOT NULL,
+    format TEXT NOT NULL,
+    params TEXT NOT NULL,                -- JSON
+    status TEXT NOT NULL DEFAULT 'queued'
+        CHECK (status IN ('queued', 'running', 'completed', 'failed', 'expired')),
+    rows_total INTEGER,
+    rows_written INTEGER NOT NULL DEFAULT 0,
+    file_name TEXT,
+    file_path TEXT,
+    file_size INTEGER,
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    completed_at TIMESTAMP,
+    last_accessed_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_exports_content_key ON exports(content_key, created_at);
+CREATE INDEX IF NOT EXISTS idx_exports_created ON exports(created_at);
+CREATE INDEX IF NOT EXISTS idx_exports_status ON exports(status);
+
+-- Update schema version
+INSERT OR IGNORE INTO schema_version (version, description)
+VALUES (11, 'Add exports table for asynchronous export jobs');
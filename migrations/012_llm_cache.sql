@@ -0,0 +1,141 @@
+-- Migration 012: LLM response cache
+-- Date: 2026-10-17
+-- Purpose: Persistent cache for LLM answers (app.services.llm_cache), keyed on provider, model,
+--          normalized messages and a fingerprint of the data fed into the prompt.
+--          data_version is bumped by triggers on every write to the business tables; entries
+--          record the version they were computed at and are discarded once it moves on.
+
+CREATE TABLE IF NOT EXISTS llm_cache (
+    cache_key TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,              -- JSON
+    data_version INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL,
+    last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used_at);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_expires ON llm_cache(expires_at);
+
+-- Single row: incremented on any change to the tables LLM prompts are built from
+CREATE TABLE IF NOT EXISTS data_version (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 0);
+
+DROP TRIGGER IF EXISTS data_version_purchase_orders_insert;
+CREATE TRIGGER data_version_purchase_orders_insert AFTER INSERT ON purchase_orders
+BEGIN
+    UPDATE data_version SET version = version + 1 WHERE id = 1;
+END;
+
+DROP TRIGGER IF EXISTS data_version_purchase_orders_update;
+CREATE TRIGGER data_version_purchase_orders_update AFTER UPDATE ON purchase_orders
+BEGIN
+    UPDATE data_version SET version = version + 1 WHERE id = 1;
+END;
+
+DROP TRIGGER IF EXISTS data_version_purchase_orders_delete;
+CREATE TRIGGER data_version_purchase_orders_delete AFTER DELETE ON purchase_orders
+BEGIN
+    UPDATE data_version SET version = version + 1 WHERE id = 1;
+END;
+
+DROP TRIGGER IF EXISTS data_version_purchase_order_items_insert;
+CREATE TRIGGER data_version_purchase_order_items_insert AFTER INSERT ON purchase_order_items
+BEGIN
+    UPDATE data_version SET version = version + 1 WHERE id = 1;
+END;
+
+DROP TRIGGER IF EXISTS data_version_purchase_order_items_update;
+CREATE TRIGGER data_version_purchase_order_items_update AFTER UPDATE ON purchase_order_items
+BEGIN
+    UPDATE data_version SET version = version + 1 WHERE id = 1;
+END;
+
+DROP TRIGGER IF EXISTS data_version_purchase_order_items_delete;
+CREATE TRIGGER data_version_purchase_order_items_delete AFTER DELETE ON purchase_order_items
+BEGIN
+    UPDATE data_version SET version = version + 1 WHERE id = 1;
+END;
+
+DROP TRIGGER IF EXISTS data_version_delivery_challans_insert;
+CREATE TRIGGER data_version_delivery_challans_insert AFTER INSERT ON delivery_challans
+BEGIN
+    UPDATE data_version SET version = version + 1 WHERE id = 1;
+END;
+
+DROP TRIGGER IF EXISTS data_version_delivery_challans_update;
+CREATE TRIGGER data_version_delivery_challans_update AFTER UPDATE ON delivery_challans
+BEGIN
+    UPDATE data_version SET version = version + 1 WHERE id = 1;
+END;
+
+DROP TRIGGER IF EXISTS data_version_delivery_challans_delete;
+CREATE TRIGGER data_version_delivery_challans_delete AFTER DELETE ON delivery_challans
+BEGIN
+    UPDATE data_version SET version = version + 1 WHERE id = 1;
+END;
+
+DROP TRIGGER IF EXISTS data_version_delivery_challan_items_insert;
+CREATE TRIGGER data_version_delivery_challan_items_insert AFTER INSERT ON delivery_challan_items
+BEGIN
+    UPDATE data_version SET version = version + 1 WHERE id = 1;
+END;
+
+DROP TRIGGER IF EXISTS data_version_delivery_challan_items_update;
+CREATE TRIGGER data_version_delivery_challan_items_update AFTER UPDATE ON delivery_challan_items
+BEGIN
+    UPDATE data_version SET version = version + 1 WHERE id = 1;
+END;
+
+DROP TRIGGER IF EXISTS data_version_delivery_challan_items_delete;
+CREATE TRIGGER data_version_delivery_challan_items_delete AFTER DELETE ON delivery_challan_items
+BEGIN
+    UPDATE data_version SET version = version + 1 WHERE id = 1;
+END;
+
+DROP TRIGGER IF EXISTS data_version_gst_invoices_insert;
+CREATE TRIGGER data_version_gst_invoices_insert AFTER INSERT ON gst_invoices
+BEGIN
+    UPDATE data_version SET version = version + 1 WHERE id = 1;
+END;
+
+DROP TRIGGER IF EXISTS data_version_gst_invoices_update;
+CREATE TRIGGER data_version_gst_invoices_update AFTER UPDATE ON gst_invoices
+BEGIN
+    UPDATE data_version SET version = version + 1 WHERE id = 1;
+END;
+
+DROP TRIGGER IF EXISTS data_version_gst_invoices_delete;
+CREATE TRIGGER data_version_gst_invoices_delete AFTER DELETE ON gst_invoices
+BEGIN
+    UPDATE data_version SET version = version + 1 WHERE id = 1;
+END;
+
+DROP TRIGGER IF EXISTS data_version_gst_invoice_items_insert;
+CREATE TRIGGER data_version_gst_invoice_items_insert AFTER INSERT ON gst_invoice_items
+BEGIN
+    UPDATE data_version SET version = version + 1 WHERE id = 1;
+END;
+
+DROP TRIGGER IF EXISTS data_version_gst_invoice_items_update;
+CREATE TRIGGER data_version_gst_invoice_items_update AFTER UPDATE ON gst_invoice_items
+BEGIN
+    UPDATE data_version SET version = version + 1 WHERE id = 1;
+END;
+
+DROP TRIGGER IF EXISTS data_version_gst_invoice_items_delete;
+CREATE TRIGGER data_version_gst_invoice_items_delete AFTER DELETE ON gst_invoice_items
+BEGIN
+    UPDATE data_version SET version = version + 1 WHERE id = 1;
+END;
+
+-- Update schema version
+INSERT OR IGNORE INTO schema_version (version, description)
+VALUES (12, 'Add llm_cache and trigger-maintained data_version');
@@ -0,0 +1,12 @@
+-- Migration 013: PO content hash
+-- Date: 2026-10-17
+-- Purpose: POIngestionService merges re-uploaded POs item by item instead of deleting and
+--          reinserting them. content_hash fingerprints the normalized scraper output of the
+--          last ingested version, so re-uploading an identical PO is skipped without any write.
+--          Existing rows start with NULL and get a hash on their next upload.
+
+ALTER TABLE purchase_orders ADD COLUMN content_hash TEXT;
+
+-- Update schema version
+INSERT OR IGNORE INTO schema_version (version, description)
+VALUES (13, 'Add purchase_orders.content_hash for amendment-aware PO merge');
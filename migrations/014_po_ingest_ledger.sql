@@ -0,0 +1,29 @@
+-- Migration 014: PO ingestion ledger
+-- Date: 2026-10-17
+-- Purpose: One row per uploaded PO file (app.services.ingest_ledger): SHA-256 of the raw bytes,
+--          parsed PO number, resulting amendment number, outcome and time. A file whose digest
+--          was already ingested, and whose PO still holds the content it produced
+--          (content_hash), is skipped before parsing. The table doubles as the upload audit log.
+
+CREATE TABLE IF NOT EXISTS po_ingest_ledger (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    file_sha256 TEXT NOT NULL,
+    file_name TEXT,
+    file_size INTEGER,
+    po_number INTEGER,
+    amend_no INTEGER,
+    content_hash TEXT,                   -- purchase_orders.content_hash this file left behind
+    status TEXT NOT NULL
+        CHECK (status IN ('created', 'updated', 'unchanged', 'duplicate', 'superseded', 'failed')),
+    message TEXT,
+    source TEXT NOT NULL DEFAULT 'upload',
+    ingested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_po_ingest_ledger_sha ON po_ingest_ledger(file_sha256);
+CREATE INDEX IF NOT EXISTS idx_po_ingest_ledger_po ON po_ingest_ledger(po_number, id);
+CREATE INDEX IF NOT EXISTS idx_po_ingest_ledger_time ON po_ingest_ledger(ingested_at);
+
+-- Update schema version
+INSERT OR IGNORE INTO schema_version (version, description)
+VALUES (14, 'Add po_ingest_ledger for upload dedupe and audit');
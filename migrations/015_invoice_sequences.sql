@@ -0,0 +1,26 @@
+-- Migration 015: Invoice number sequences
+-- Date: 2026-10-17
+-- Purpose: One counter per financial year for INV/{FY}/{NNN} numbers
+--          (app.services.invoice.reserve_invoice_numbers). Numbers are taken by incrementing
+--          the row inside the invoice transaction instead of text-sorting gst_invoices, which
+--          put INV/../1000 before INV/../999. Seeded with the highest existing number per FY.
+
+CREATE TABLE IF NOT EXISTS invoice_sequences (
+    fy TEXT PRIMARY KEY,                 -- e.g. 2025-26
+    last_number INTEGER NOT NULL DEFAULT 0 CHECK (last_number >= 0),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT OR IGNORE INTO invoice_sequences (fy, last_number)
+SELECT fy, MAX(CAST(seq AS INTEGER))
+FROM (
+    SELECT substr(rest, 1, instr(rest, '/') - 1) AS fy,
+           substr(rest, instr(rest, '/') + 1) AS seq
+    FROM (SELECT substr(invoice_number, 5) AS rest FROM gst_invoices WHERE invoice_number LIKE 'INV/%/%')
+)
+WHERE fy <> '' AND seq <> '' AND seq NOT GLOB '*[^0-9]*'
+GROUP BY fy;
+
+-- Update schema version
+INSERT OR IGNORE INTO schema_version (version, description)
+VALUES (15, 'Add invoice_sequences for per-FY invoice numbering');
@@ -0,0 +1,15 @@
+-- Migration 016: PO search details built once per PO
+-- Date: 2026-10-17
+-- Purpose: The purchase_order_items triggers from migration 007 rebuilt the PO document's
+--          details (group_concat over all of the PO's items) and rewrote its FTS row on every
+--          item insert / update / delete: O(N^2) work per N-item PO on the ingestion paths.
+--          They are dropped; the PO ingestion service refreshes details once per PO after
+--          writing its items (app.services.search_service.refresh_po_details).
+
+DROP TRIGGER IF EXISTS search_poi_ai;
+DROP TRIGGER IF EXISTS search_poi_au;
+DROP TRIGGER IF EXISTS search_poi_ad;
+
+-- Update schema version
+INSERT OR IGNORE INTO schema_version (version, description)
+VALUES (16, 'Drop per-item search triggers; PO details refreshed per PO on ingestion');
@@ -0,0 +1,57 @@
+-- Migration 017: One pending alert change per entity
+-- Date: 2026-10-17
+-- Purpose: The alert_changes triggers (migrations 008 / 009) appended a row on every rollup,
+--          DC and link write, and rows are only removed by an alert run, so the log grew with
+--          write volume while nothing called /alerts/generate. A run only needs to know which
+--          entities changed, so the log now keeps at most one row per (entity_type, entity_id):
+--          the triggers INSERT OR IGNORE against a unique index and the table is bounded by the
+--          number of POs and DCs.
+
+-- Keep the newest row per entity (it is the pending one if any row is past the watermark)
+DELETE FROM alert_changes
+WHERE id NOT IN (
+    SELECT MAX(id) FROM alert_changes GROUP BY entity_type, entity_id
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_alert_changes_entity
+    ON alert_changes(entity_type, entity_id);
+
+DROP TRIGGER IF EXISTS alert_changes_rollup_insert;
+CREATE TRIGGER alert_changes_rollup_insert AFTER INSERT ON po_item_rollup
+BEGIN
+    INSERT OR IGNORE INTO alert_changes (entity_type, entity_id) VALUES ('PO', CAST(NEW.po_number AS TEXT));
+END;
+
+DROP TRIGGER IF EXISTS alert_changes_rollup_update;
+CREATE TRIGGER alert_changes_rollup_update AFTER UPDATE OF ordered_qty, dispatched_qty ON po_item_rollup
+BEGIN
+    INSERT OR IGNORE INTO alert_changes (entity_type, entity_id) VALUES ('PO', CAST(NEW.po_number AS TEXT));
+END;
+
+DROP TRIGGER IF EXISTS alert_changes_po_link_delete;
+CREATE TRIGGER alert_changes_po_link_delete AFTER DELETE ON gst_invoice_po_links
+BEGIN
+    INSERT OR IGNORE INTO alert_changes (entity_type, entity_id) VALUES ('PO', CAST(OLD.po_number AS TEXT));
+END;
+
+DROP TRIGGER IF EXISTS alert_changes_dc_insert;
+CREATE TRIGGER alert_changes_dc_insert AFTER INSERT ON delivery_challans
+BEGIN
+    INSERT OR IGNORE INTO alert_changes (entity_type, entity_id) VALUES ('DC', NEW.dc_number);
+END;
+
+DROP TRIGGER IF EXISTS alert_changes_dc_update;
+CREATE TRIGGER alert_changes_dc_update AFTER UPDATE OF dc_date_iso, po_number ON delivery_challans
+BEGIN
+    INSERT OR IGNORE INTO alert_changes (entity_type, entity_id) VALUES ('DC', NEW.dc_number);
+END;
+
+DROP TRIGGER IF EXISTS alert_changes_dc_link_delete;
+CREATE TRIGGER alert_changes_dc_link_delete AFTER DELETE ON gst_invoice_dc_links
+BEGIN
+    INSERT OR IGNORE INTO alert_changes (entity_type, entity_id) VALUES ('DC', OLD.dc_number);
+END;
+
+-- Update schema version
+INSERT OR IGNORE INTO schema_version (version, description)
+VALUES (17, 'Deduplicate alert_changes per entity');